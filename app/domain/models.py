@@ -1,8 +1,56 @@
 from __future__ import annotations
 from dataclasses import dataclass, field
-from typing import Dict, List, Tuple
+from typing import Any, Callable, Dict, Iterable, List, Tuple
 
-@dataclass(frozen=True)
+# Effect tuples (pri/prefix/substats) repeat heavily across an account, so the
+# models share one canonical instance per distinct value instead of keeping a
+# separate list per rune.  Upgrade simulations keep creating new rolls, so the
+# table is dropped once it holds _EFFECT_TUPLES_MAX values; tuples handed out
+# before stay valid, they just are not shared with later ones.
+_EFFECT_TUPLES_MAX = 1 << 16
+_EFFECT_TUPLES: Dict[Tuple, Tuple] = {}
+# id -> canonical instance; compared by identity, so a reused id never matches.
+_CANONICAL_BY_ID: Dict[int, Tuple] = {}
+
+
+def _is_canonical(values: Any) -> bool:
+    return _CANONICAL_BY_ID.get(id(values)) is values
+
+
+def clear_effect_tuples() -> None:
+    """Drop the shared effect tuples, e.g. before another account is loaded."""
+    _EFFECT_TUPLES.clear()
+    _CANONICAL_BY_ID.clear()
+
+
+def _effect_tuple(values: Iterable) -> Tuple:
+    if _is_canonical(values):
+        return values  # type: ignore[return-value]
+    t = tuple(values or ())
+    # Key on the value types too: (204, 5) and (204, 5.0) compare equal but
+    # must not be swapped for one another.
+    key = (t, tuple(type(v) for v in t))
+    try:
+        if len(_EFFECT_TUPLES) >= _EFFECT_TUPLES_MAX and key not in _EFFECT_TUPLES:
+            clear_effect_tuples()
+        canonical = _EFFECT_TUPLES.setdefault(key, t)
+    except TypeError:  # unhashable payload from an odd export; keep it unshared
+        return t
+    _CANONICAL_BY_ID[id(canonical)] = canonical
+    return canonical
+
+
+def _effect_tuples(rows: Iterable) -> Tuple[Tuple, ...]:
+    if type(rows) is tuple:
+        for row in rows:
+            if not _is_canonical(row):
+                break
+        else:
+            return rows
+    return tuple(_effect_tuple(row) for row in (rows or ()))
+
+
+@dataclass(frozen=True, slots=True)
 class Unit:
     unit_id: int
     unit_master_id: int
@@ -18,7 +66,7 @@ class Unit:
     crit_rate: int
     crit_dmg: int
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Rune:
     rune_id: int
     slot_no: int
@@ -28,12 +76,17 @@ class Rune:
     upgrade_curr: int
     pri_eff: Tuple[int, int]
     prefix_eff: Tuple[int, int]
-    sec_eff: List[Tuple[int, int, int, int]]
+    sec_eff: Tuple[Tuple[int, int, int, int], ...]
     occupied_type: int
     occupied_id: int
     origin_class: int = 0
 
-@dataclass(frozen=True)
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "pri_eff", _effect_tuple(self.pri_eff))
+        object.__setattr__(self, "prefix_eff", _effect_tuple(self.prefix_eff))
+        object.__setattr__(self, "sec_eff", _effect_tuples(self.sec_eff))
+
+@dataclass(frozen=True, slots=True)
 class Artifact:
     artifact_id: int          # rid oder artifact_id
     occupied_id: int
@@ -44,9 +97,13 @@ class Artifact:
     level: int                # bei summary ggf. 0
     original_rank: int = 0    # Ausgangsqualität (natural_rank aus Export)
     pri_effect: Tuple[int, ...] = ()          # [effect_id, value, ...]
-    sec_effects: List[List] = field(default_factory=list)  # [[eff_id, value, upgrades, ...], ...]
+    sec_effects: Tuple[Tuple, ...] = ()       # ((eff_id, value, upgrades, ...), ...)
     json_score: float = 0.0   # Vorberechneter Score aus dem JSON-Export (0.0 = nicht vorhanden)
 
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "pri_effect", _effect_tuple(self.pri_effect))
+        object.__setattr__(self, "sec_effects", _effect_tuples(self.sec_effects))
+
 @dataclass
 class AccountData:
     # In-memory normalized store
@@ -77,6 +134,10 @@ class AccountData:
     # RTA artifact equipment: unit_id -> [artifact_id, ...]
     rta_artifact_equip: Dict[int, List[int]] = field(default_factory=dict)
 
+    # Lazily built lookup indexes (see cached_index); not part of the account data.
+    _index_cache: Dict[str, Any] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _index_key: Tuple = field(default=(), init=False, repr=False, compare=False)
+
     def siege_def_teams(self) -> List[List[int]]:
         ids = self.guildsiege_defense_unit_list
         # Group into chunks of 3 (4 defs typical, but we don't assume count)
@@ -108,9 +169,109 @@ class AccountData:
                     result.append(uid)
         return result
 
+    # ------------------------------------------------------------
+    # Lookup indexes
+    # ------------------------------------------------------------
+    # Indexes are built on first use and dropped automatically when the
+    # rune/artifact lists or the equip maps are replaced.  Code that mutates
+    # them in place must call invalidate_indexes().  Returned dicts are shared
+    # and must be treated as read-only; list results are fresh copies.
+
+    def invalidate_indexes(self) -> None:
+        """Drop all derived indexes (rebuilt lazily on next access)."""
+        self._index_cache = {}
+        self._index_key = ()
+
+    def _current_index_key(self) -> Tuple:
+        return (
+            id(self.runes), len(self.runes),
+            id(self.artifacts), len(self.artifacts),
+            id(self.guild_rune_equip), id(self.rta_rune_equip), id(self.rta_artifact_equip),
+        )
+
+    def built_index(self, name: str) -> Any:
+        """The derived index *name* if it is already built and current, else None."""
+        if self._current_index_key() != self._index_key:
+            return None
+        return self._index_cache.get(name)
+
+    def cached_index(self, name: str, build: Callable[[], Any]) -> Any:
+        """Return the derived index *name*, building it with *build()* if needed."""
+        key = self._current_index_key()
+        if key != self._index_key:
+            self._index_cache = {}
+            self._index_key = key
+        cache = self._index_cache
+        value = cache.get(name)
+        if value is None:
+            value = build()
+            cache[name] = value
+        return value
+
+    def _group_runes(self, name: str, key: Callable[[Rune], int]) -> Dict[int, List[Rune]]:
+        def _build() -> Dict[int, List[Rune]]:
+            out: Dict[int, List[Rune]] = {}
+            for r in self.runes:
+                out.setdefault(key(r), []).append(r)
+            return out
+        return self.cached_index(name, _build)
+
     def runes_by_id(self) -> Dict[int, Rune]:
         """Fast lookup: rune_id -> Rune."""
-        return {r.rune_id: r for r in self.runes}
+        return self.cached_index("runes_by_id", lambda: {r.rune_id: r for r in self.runes})
+
+    def artifacts_by_id(self) -> Dict[int, Artifact]:
+        """Fast lookup: artifact_id -> Artifact."""
+        return self.cached_index("artifacts_by_id", lambda: {int(a.artifact_id): a for a in self.artifacts})
+
+    def runes_in_slot(self, slot_no: int) -> List[Rune]:
+        return list(self._group_runes("runes_by_slot", lambda r: int(r.slot_no or 0)).get(int(slot_no), []))
+
+    def runes_of_set(self, set_id: int) -> List[Rune]:
+        return list(self._group_runes("runes_by_set", lambda r: int(r.set_id or 0)).get(int(set_id), []))
+
+    def runes_with_mainstat(self, eff_id: int) -> List[Rune]:
+        def _main(r: Rune) -> int:
+            try:
+                return int(r.pri_eff[0] or 0)
+            except Exception:
+                return 0
+        return list(self._group_runes("runes_by_mainstat", _main).get(int(eff_id), []))
+
+    def _pve_runes_by_unit(self) -> Dict[int, List[Rune]]:
+        def _build() -> Dict[int, List[Rune]]:
+            out: Dict[int, List[Rune]] = {}
+            for r in self.runes:
+                if r.occupied_type == 1:
+                    out.setdefault(int(r.occupied_id or 0), []).append(r)
+            for runes in out.values():
+                runes.sort(key=lambda r: int(r.slot_no or 0))
+            return out
+        return self.cached_index("pve_runes_by_unit", _build)
+
+    def rune_owner_by_id(self, mode: str = "pve") -> Dict[int, int]:
+        """rune_id -> unit_id for the equip source of *mode* ("pve", "guild", "rta")."""
+        if mode == "guild":
+            equip = self.guild_rune_equip
+        elif mode == "rta":
+            equip = self.rta_rune_equip
+        else:
+            return self.cached_index(
+                "rune_owner_pve",
+                lambda: {
+                    r.rune_id: int(r.occupied_id or 0)
+                    for r in self.runes
+                    if r.occupied_type == 1 and int(r.occupied_id or 0) > 0
+                },
+            )
+
+        def _build() -> Dict[int, int]:
+            out: Dict[int, int] = {}
+            for uid, rids in equip.items():
+                for rid in rids:
+                    out[rid] = uid
+            return out
+        return self.cached_index(f"rune_owner_{mode}", _build)
 
     def equipped_runes_for(self, unit_id: int, mode: str = "pve") -> List[Rune]:
         """Return the runes equipped on *unit_id* for the given mode.
@@ -133,10 +294,27 @@ class AccountData:
                 return sorted(runes, key=lambda r: int(r.slot_no or 0))
 
         # fallback: PVE runes (occupied_type==1, occupied_id==unit_id)
-        return sorted(
-            [r for r in self.runes if r.occupied_type == 1 and int(r.occupied_id or 0) == int(unit_id)],
-            key=lambda r: int(r.slot_no or 0),
-        )
+        return list(self._pve_runes_by_unit().get(int(unit_id), []))
+
+    def artifacts_equipped_on(self, unit_id: int, mode: str = "pve") -> List[Artifact]:
+        """Artifacts on *unit_id*: RTA equip list for mode "rta", else PvE occupied_id.
+
+        No fallback between modes; callers decide how to combine them.
+        """
+        if mode == "rta":
+            by_id = self.artifacts_by_id()
+            return [
+                by_id[int(aid)]
+                for aid in (self.rta_artifact_equip.get(int(unit_id), []) or [])
+                if int(aid) in by_id
+            ]
+
+        def _build() -> Dict[int, List[Artifact]]:
+            out: Dict[int, List[Artifact]] = {}
+            for a in self.artifacts:
+                out.setdefault(int(a.occupied_id or 0), []).append(a)
+            return out
+        return list(self.cached_index("pve_artifacts_by_unit", _build).get(int(unit_id), []))
 
 
 # ============================================================
@@ -151,72 +329,12 @@ def compute_unit_stats(unit: Unit, equipped_runes: List[Rune],
     *speed_lead_pct* is the best speed-lead percentage in the team (0 if none).
     *sky_tribe_totem_spd_pct* is the account-wide SPD building bonus in percent.
     """
-    base_hp  = int((unit.base_con or 0) * 15)
-    base_atk = int(unit.base_atk or 0)
-    base_def = int(unit.base_def or 0)
-    base_spd = int(unit.base_spd or 0)
-    base_cr  = int(unit.crit_rate or 15)
-    base_cd  = int(unit.crit_dmg or 50)
-    base_res = int(unit.base_res or 15)
-    base_acc = int(unit.base_acc or 0)
-
-    flat_hp = flat_atk = flat_def = 0
-    pct_hp = pct_atk = pct_def = 0
-    add_spd = add_cr = add_cd = add_res = add_acc = 0
-    rune_set_ids: List[int] = []
-
-    def _acc(eff_id: int, value: int) -> None:
-        nonlocal flat_hp, flat_atk, flat_def, pct_hp, pct_atk, pct_def
-        nonlocal add_spd, add_cr, add_cd, add_res, add_acc
-        m = {1: 'fhp', 2: 'php', 3: 'fatk', 4: 'patk', 5: 'fdef', 6: 'pdef',
-             8: 'spd', 9: 'cr', 10: 'cd', 11: 'res', 12: 'acc'}
-        k = m.get(eff_id)
-        if k == 'fhp':   flat_hp  += value
-        elif k == 'php':  pct_hp   += value
-        elif k == 'fatk': flat_atk += value
-        elif k == 'patk': pct_atk  += value
-        elif k == 'fdef': flat_def += value
-        elif k == 'pdef': pct_def  += value
-        elif k == 'spd':  add_spd  += value
-        elif k == 'cr':   add_cr   += value
-        elif k == 'cd':   add_cd   += value
-        elif k == 'res':  add_res  += value
-        elif k == 'acc':  add_acc  += value
-
-    for rune in equipped_runes:
-        rune_set_ids.append(int(rune.set_id or 0))
-        try:
-            _acc(int(rune.pri_eff[0] or 0), int(rune.pri_eff[1] or 0))
-        except Exception:
-            pass
-        try:
-            _acc(int(rune.prefix_eff[0] or 0), int(rune.prefix_eff[1] or 0))
-        except Exception:
-            pass
-        for sec in (rune.sec_eff or []):
-            if not sec:
-                continue
-            try:
-                eff = int(sec[0] or 0)
-                val = int(sec[1] or 0)
-                grind = int(sec[3] or 0) if len(sec) >= 4 else 0
-                _acc(eff, val + grind)
-            except Exception:
-                continue
+    from app.engine.unit_stats import compute_units_stats
 
-    # set bonuses
-    swift_sets = rune_set_ids.count(3) // 4
-    spd_from_swift = int(base_spd * (25 * swift_sets) / 100)
-    spd_from_lead = int(base_spd * speed_lead_pct / 100)
-    spd_from_totem = int(base_spd * int(sky_tribe_totem_spd_pct or 0) / 100)
-
-    return {
-        "HP":  int(base_hp  + flat_hp  + base_hp  * pct_hp  // 100),
-        "ATK": int(base_atk + flat_atk + base_atk * pct_atk // 100),
-        "DEF": int(base_def + flat_def + base_def * pct_def // 100),
-        "SPD": int(base_spd + add_spd + spd_from_swift + spd_from_lead + spd_from_totem),
-        "CR":  int(base_cr  + add_cr),
-        "CD":  int(base_cd  + add_cd),
-        "RES": int(base_res + add_res),
-        "ACC": int(base_acc + add_acc),
-    }
+    stats = compute_units_stats(
+        [unit],
+        [equipped_runes],
+        leaders=[("SPD%", int(speed_lead_pct or 0))],
+        sky_tribe_totem_spd_pct=int(sky_tribe_totem_spd_pct or 0),
+    )
+    return stats.as_dict(0)
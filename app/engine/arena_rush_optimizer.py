@@ -9,7 +9,6 @@ from typing import Any, Dict, List
 from app.domain.models import AccountData, Artifact
 from app.domain.presets import BuildStore, Build
 from app.domain.speed_ticks import LEO_LOW_SPD_TICK, min_spd_for_tick, max_spd_for_tick
-from app.engine.efficiency import artifact_efficiency, rune_efficiency
 from app.engine.arena_rush_timing import (
     OpeningTurnEffect,
     effective_spd_buff_pct_for_unit,
@@ -18,7 +17,14 @@ from app.engine.arena_rush_timing import (
     simulate_opening_order,
     spd_buff_increase_pct_by_unit_from_assignments,
 )
-from app.engine.greedy_optimizer import GreedyRequest, GreedyResult, GreedyUnitResult, optimize_greedy
+from app.engine.greedy_optimizer import (
+    GreedyRequest,
+    GreedyResult,
+    GreedyUnitResult,
+    PassScorer,
+    UnitSolveCache,
+    optimize_greedy,
+)
 
 
 LEO_LOW_TICK_SPEED_TIEBREAK_WEIGHT = 0
@@ -55,6 +61,9 @@ class ArenaRushRequest:
     rune_top_per_set: int = 0
     broken_set_excluded_set_ids: set[int] = field(default_factory=set)
     max_runtime_s: float = 300.0
+    solve_backend: str = "thread"  # thread | process (parallel defense candidates)
+    # Single-unit results shared by all stages and candidates (one per run when None).
+    unit_solve_cache: UnitSolveCache | None = None
     is_cancelled: object | None = None
     register_solver: object | None = None
     progress_callback: object | None = None
@@ -563,27 +572,16 @@ def _arena_rush_all_results(res: ArenaRushResult) -> List[GreedyUnitResult]:
     return out
 
 
-def _arena_rush_efficiency_score(account: AccountData, res: ArenaRushResult) -> int:
-    runes_by_id = account.runes_by_id()
-    artifacts_by_id: Dict[int, Artifact] = {int(a.artifact_id): a for a in account.artifacts}
-    total = 0
-    for row in _arena_rush_all_results(res):
-        if not bool(getattr(row, "ok", False)):
-            continue
-        for rid in dict(row.runes_by_slot or {}).values():
-            rune = runes_by_id.get(int(rid or 0))
-            if rune is None:
-                continue
-            total += int(round(float(rune_efficiency(rune)) * 1000.0))
-        for aid in dict(row.artifacts_by_type or {}).values():
-            art = artifacts_by_id.get(int(aid or 0))
-            if art is None:
-                continue
-            total += int(round(float(artifact_efficiency(art)) * 1000.0))
-    return int(total)
+def _arena_rush_efficiency_score(account: AccountData, res: ArenaRushResult, scorer: PassScorer | None = None) -> int:
+    scorer = scorer if scorer is not None else PassScorer(account)
+    return scorer.efficiency_milli(_arena_rush_all_results(res))
 
 
-def _arena_rush_candidate_score(account: AccountData, res: ArenaRushResult) -> tuple[int, int, int, int, int, int, int, int]:
+def _arena_rush_candidate_score(
+    account: AccountData,
+    res: ArenaRushResult,
+    scorer: PassScorer | None = None,
+) -> tuple[int, int, int, int, int, int, int, int]:
     offense_count = int(len(res.offenses or []))
     offense_ok_count = int(sum(1 for off in list(res.offenses or []) if bool(off.optimization.ok)))
     total_penalty = int(sum(int(off.opening_penalty or 0) for off in list(res.offenses or [])))
@@ -597,7 +595,7 @@ def _arena_rush_candidate_score(account: AccountData, res: ArenaRushResult) -> t
         int(offense_ok_count),
         int(-total_penalty),
         int(ok_unit_count),
-        int(_arena_rush_efficiency_score(account, res)),
+        int(_arena_rush_efficiency_score(account, res, scorer)),
         int(speed_sum),
     )
 
@@ -612,31 +610,18 @@ def _optimize_arena_rush_single(
     def _ok_count(rows: List[GreedyUnitResult]) -> int:
         return int(sum(1 for r in list(rows or []) if bool(getattr(r, "ok", False))))
 
+    scorer = PassScorer(account)
+
     def _eff_speed_score(rows: List[GreedyUnitResult]) -> tuple[int, int]:
-        runes_by_id = account.runes_by_id()
-        artifacts_by_id: Dict[int, Artifact] = {int(a.artifact_id): a for a in account.artifacts}
-        eff_sum = 0
-        speed_sum = 0
-        for rr in list(rows or []):
-            if not bool(getattr(rr, "ok", False)):
-                continue
-            speed_sum += int(getattr(rr, "final_speed", 0) or 0)
-            for rid in dict(getattr(rr, "runes_by_slot", {}) or {}).values():
-                rune = runes_by_id.get(int(rid or 0))
-                if rune is None:
-                    continue
-                eff_sum += int(round(float(rune_efficiency(rune)) * 1000.0))
-            for aid in dict(getattr(rr, "artifacts_by_type", {}) or {}).values():
-                art = artifacts_by_id.get(int(aid or 0))
-                if art is None:
-                    continue
-                eff_sum += int(round(float(artifact_efficiency(art)) * 1000.0))
-        return int(eff_sum), int(speed_sum)
+        ok_rows = [rr for rr in list(rows or []) if bool(getattr(rr, "ok", False))]
+        speed_sum = sum(int(getattr(rr, "final_speed", 0) or 0) for rr in ok_rows)
+        return int(scorer.efficiency_milli(ok_rows)), int(speed_sum)
 
     defense_unit_ids = _unique_unit_ids(list(req.defense_unit_ids or []))
     if not defense_unit_ids:
         empty = GreedyResult(False, "Arena Rush: no defense units selected.", [])
         return ArenaRushResult(False, empty.message, empty, [])
+    solve_cache = req.unit_solve_cache if req.unit_solve_cache is not None else UnitSolveCache()
 
     preflight_defense_min_final_by_uid, preflight_defense_max_final_by_uid = (
         _preflight_defense_shared_speed_bounds_from_offense_ticks(
@@ -693,6 +678,7 @@ def _optimize_arena_rush_single(
             progress_callback=req.progress_callback if callable(req.progress_callback) else None,
             is_cancelled=req.is_cancelled if callable(req.is_cancelled) else None,
             register_solver=req.register_solver if callable(req.register_solver) else None,
+            unit_solve_cache=solve_cache,
             enforce_turn_order=True,
             unit_team_index=defense_team_index,
             unit_team_turn_order=defense_turn_order,
@@ -741,6 +727,7 @@ def _optimize_arena_rush_single(
                     progress_callback=req.progress_callback if callable(req.progress_callback) else None,
                     is_cancelled=req.is_cancelled if callable(req.is_cancelled) else None,
                     register_solver=req.register_solver if callable(req.register_solver) else None,
+                    unit_solve_cache=solve_cache,
                     enforce_turn_order=True,
                     unit_team_index=defense_team_index,
                     unit_team_turn_order=defense_turn_order,
@@ -786,7 +773,7 @@ def _optimize_arena_rush_single(
     global_locked_runes: set[int] = set(defense_locked_runes)
     global_locked_artifacts: set[int] = set(defense_locked_artifacts)
 
-    artifact_lookup: Dict[int, Artifact] = {int(a.artifact_id): a for a in account.artifacts}
+    artifact_lookup: Dict[int, Artifact] = account.artifacts_by_id()
     offense_results: List[ArenaRushOffenseResult] = []
     offense_cfg_rows: List[Dict[str, object]] = []
     seen_offense_units: set[int] = set()
@@ -979,6 +966,7 @@ def _optimize_arena_rush_single(
             progress_callback=req.progress_callback if callable(req.progress_callback) else None,
             is_cancelled=req.is_cancelled if callable(req.is_cancelled) else None,
             register_solver=req.register_solver if callable(req.register_solver) else None,
+            unit_solve_cache=solve_cache,
             enforce_turn_order=bool(global_enforce_turn_order),
             unit_team_index=dict(all_team_index_by_uid),
             unit_team_turn_order=dict(all_turn_order_by_uid),
@@ -1085,6 +1073,7 @@ def _optimize_arena_rush_single(
                 progress_callback=req.progress_callback if callable(req.progress_callback) else None,
                 is_cancelled=req.is_cancelled if callable(req.is_cancelled) else None,
                 register_solver=req.register_solver if callable(req.register_solver) else None,
+                unit_solve_cache=solve_cache,
                 enforce_turn_order=bool(global_enforce_turn_order),
                 unit_team_index=dict(all_team_index_by_uid),
                 unit_team_turn_order=dict(all_turn_order_by_uid),
@@ -1162,6 +1151,7 @@ def _optimize_arena_rush_single(
                     progress_callback=req.progress_callback if callable(req.progress_callback) else None,
                     is_cancelled=req.is_cancelled if callable(req.is_cancelled) else None,
                     register_solver=req.register_solver if callable(req.register_solver) else None,
+                    unit_solve_cache=solve_cache,
                     enforce_turn_order=bool(global_enforce_turn_order),
                     unit_team_index=dict(all_team_index_by_uid),
                     unit_team_turn_order=dict(all_turn_order_by_uid),
@@ -1298,6 +1288,7 @@ def _optimize_arena_rush_single(
                 progress_callback=req.progress_callback if callable(req.progress_callback) else None,
                 is_cancelled=req.is_cancelled if callable(req.is_cancelled) else None,
                 register_solver=req.register_solver if callable(req.register_solver) else None,
+                unit_solve_cache=solve_cache,
                 enforce_turn_order=True,
                 unit_team_index={int(uid): 0 for uid in expected_order},
                 unit_team_turn_order=dict(unit_turn_order or {int(uid): int(pos + 1) for pos, uid in enumerate(expected_order)}),
@@ -1583,6 +1574,9 @@ def _optimize_arena_rush_single(
 def optimize_arena_rush(account: AccountData, presets: BuildStore, req: ArenaRushRequest) -> ArenaRushResult:
     candidate_count = max(1, int(req.defense_candidate_count or 1))
     max_runtime_s = max(0.0, float(req.max_runtime_s or 0.0))
+    if req.unit_solve_cache is None:
+        # Rescue, repair, deep and strict stages re-solve many identical unit sub-problems.
+        req = replace(req, unit_solve_cache=UnitSolveCache())
     deadline_ts = (float(time.monotonic()) + float(max_runtime_s)) if float(max_runtime_s) > 0.0 else 0.0
 
     def _deadline_reached() -> bool:
@@ -1613,6 +1607,7 @@ def optimize_arena_rush(account: AccountData, presets: BuildStore, req: ArenaRus
     best_score: tuple[int, int, int, int, int, int, int, int] | None = None
     best_idx = 10**9
     seen_defense_signatures: set[tuple[tuple[object, ...], ...]] = set()
+    scorer = PassScorer(account)
     evaluated = 0
     unique_defense = 0
 
@@ -1658,20 +1653,43 @@ def optimize_arena_rush(account: AccountData, presets: BuildStore, req: ArenaRus
             if defense_sig not in seen_defense_signatures:
                 seen_defense_signatures.add(defense_sig)
                 unique_defense += 1
-            cand_score = _arena_rush_candidate_score(account, candidate)
+            cand_score = _arena_rush_candidate_score(account, candidate, scorer)
             if best_score is None or cand_score > best_score or (cand_score == best_score and int(ridx) < int(best_idx)):
                 best_score = cand_score
                 best_result = candidate
                 best_idx = int(ridx)
     else:
-        with ThreadPoolExecutor(max_workers=int(parallel_candidates)) as ex:
+        use_processes = str(getattr(req, "solve_backend", "thread") or "thread").strip().lower() == "process"
+        if use_processes:
+            # Candidates build their models in separate processes instead of sharing one GIL.
+            from app.engine.process_pool import ProcessJobPool
+
+            ex = ProcessJobPool(account, presets, int(parallel_candidates), is_cancelled=base_cancel)
+            # The deadline is handed over as wall-clock time; monotonic clocks are per process.
+            wall_deadline = (time.time() + (float(deadline_ts) - time.monotonic())) if float(deadline_ts) > 0.0 else 0.0
+            futures = {
+                ex.submit(
+                    _optimize_arena_rush_single,
+                    replace(req, workers=int(workers_per_candidate)),
+                    deadline=wall_deadline,
+                    defense_global_seed_offset=int(idx * 100003),
+                    offense_global_seed_offset=int(idx * 100003) + 50021,
+                ): int(idx)
+                for idx in range(int(candidate_count))
+            }
+        else:
+            ex = ThreadPoolExecutor(max_workers=int(parallel_candidates))
             futures = {
                 ex.submit(_run_candidate, int(idx)): int(idx)
                 for idx in range(int(candidate_count))
             }
+        with ex:
             for fut in as_completed(futures):
                 try:
-                    ridx, candidate = fut.result()
+                    if use_processes:
+                        ridx, candidate = futures[fut], fut.result()
+                    else:
+                        ridx, candidate = fut.result()
                 except Exception:
                     if (callable(base_cancel) and bool(base_cancel())) or bool(_deadline_reached()):
                         for ff in futures:
@@ -1688,7 +1706,7 @@ def optimize_arena_rush(account: AccountData, presets: BuildStore, req: ArenaRus
                 if defense_sig not in seen_defense_signatures:
                     seen_defense_signatures.add(defense_sig)
                     unique_defense += 1
-                cand_score = _arena_rush_candidate_score(account, candidate)
+                cand_score = _arena_rush_candidate_score(account, candidate, scorer)
                 if best_score is None or cand_score > best_score or (cand_score == best_score and int(ridx) < int(best_idx)):
                     best_score = cand_score
                     best_result = candidate
@@ -2,11 +2,93 @@
 from __future__ import annotations
 
 import dataclasses
-from typing import Dict, List, Literal, Optional, Tuple
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Literal, Optional, Sequence, Tuple
+
+import numpy as np
 
 from app.domain.models import Rune, Artifact
 
 
+# ============================================================
+# Memo cache
+# ============================================================
+# Runes and artifacts are immutable, and the optimizers and UI tables ask for
+# the same efficiency / quality numbers of the same item over and over.  The
+# memo holds one entry per item id together with the item it was computed
+# for (and its content hash); a lookup with a different item under the same
+# id -- a re-imported, upgraded rune -- replaces the entry.
+
+class _ContentMemo:
+    """Bounded per-item value memo, keyed on item id + content hash."""
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = int(maxsize)
+        self._entries: Dict[int, Tuple[Any, int, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, item_id: int, item: Any, key: str, compute: Callable[[], Any]) -> Any:
+        entry = self._entries.get(item_id)
+        if entry is not None and entry[0] is not item:
+            try:
+                if entry[1] != hash(item) or entry[0] != item:
+                    entry = None
+            except TypeError:
+                return compute()
+        if entry is None:
+            try:
+                entry = (item, hash(item), {})
+            except TypeError:
+                return compute()
+            with self._lock:
+                while len(self._entries) >= self.maxsize > 0:
+                    # dicts keep insertion order: drop the oldest entry
+                    del self._entries[next(iter(self._entries))]
+                self._entries[item_id] = entry
+        values = entry[2]
+        value = values.get(key)
+        if value is None:
+            value = compute()
+            values[key] = value
+        return value
+
+    def forget(self, item_ids: Iterable[int]) -> None:
+        with self._lock:
+            for item_id in item_ids:
+                self._entries.pop(int(item_id), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_RUNE_MEMO = _ContentMemo(maxsize=65536)
+_ARTIFACT_MEMO = _ContentMemo(maxsize=16384)
+
+
+def rune_memo(rune: Rune, key: str, compute: Callable[[], Any]) -> Any:
+    """Memoized per-rune value *key*; *compute* runs on the first request only."""
+    return _RUNE_MEMO.get(int(rune.rune_id or 0), rune, key, compute)
+
+
+def artifact_memo(art: Artifact, key: str, compute: Callable[[], Any]) -> Any:
+    return _ARTIFACT_MEMO.get(int(art.artifact_id or 0), art, key, compute)
+
+
+def forget_memoized(rune_ids: Iterable[int] = (), artifact_ids: Iterable[int] = ()) -> None:
+    """Drop memo entries of changed items (called after a re-import)."""
+    _RUNE_MEMO.forget(rune_ids)
+    _ARTIFACT_MEMO.forget(artifact_ids)
+
+
+def clear_efficiency_memo() -> None:
+    _RUNE_MEMO.clear()
+    _ARTIFACT_MEMO.clear()
+
+
 # ============================================================
 # Rune efficiency
 # ============================================================
@@ -164,11 +246,11 @@ def _rune_efficiency_internal(rune: Rune, max_tier: Literal["hero", "legend"] |
 
 
 def rune_efficiency(rune: Rune) -> float:
-    return _rune_efficiency_internal(rune)
+    return rune_memo(rune, "eff", lambda: _rune_efficiency_internal(rune))
 
 
 def rune_efficiency_max(rune: Rune, tier: Literal["hero", "legend"]) -> float:
-    return _rune_efficiency_internal(rune, max_tier=tier)
+    return rune_memo(rune, f"eff_{tier}", lambda: _rune_efficiency_internal(rune, max_tier=tier))
 
 
 # ============================================================
@@ -231,6 +313,10 @@ _FIVE_PCT: set[int] = {
 
 
 def artifact_score(art: Artifact) -> float:
+    return artifact_memo(art, "score", lambda: _artifact_score_internal(art))
+
+
+def _artifact_score_internal(art: Artifact) -> float:
     json_score = float(getattr(art, "json_score", 0.0) or 0.0)
     if json_score > 0.0:
         return round(json_score, 2)
@@ -290,7 +376,7 @@ def artifact_score(art: Artifact) -> float:
 
 
 def artifact_efficiency(art: Artifact) -> float:
-    return round(artifact_score(art) / 2.0, 2)
+    return artifact_memo(art, "eff", lambda: round(artifact_score(art) / 2.0, 2))
 
 
 # ============================================================
@@ -322,8 +408,259 @@ def rune_efficiency_gem_swap(
 
 
 def rune_efficiencies(runes: List[Rune]) -> List[float]:
-    return [rune_efficiency(r) for r in runes]
+    return rune_efficiency_arrays(runes, ("current",))["current"].tolist()
 
 
 def artifact_efficiencies(artifacts: List[Artifact]) -> List[float]:
-    return [artifact_efficiency(a) for a in artifacts if a.sec_effects]
+    with_secs = [a for a in artifacts if a.sec_effects]
+    return artifact_efficiency_array(with_secs).tolist()
+
+
+# ============================================================
+# Vectorized batch versions
+# ============================================================
+# Same formulas as the scalar functions above, evaluated for a whole rune /
+# artifact list at once.  Substats are packed into (n, k) arrays and the
+# per-stat sums are accumulated column by column in substat order, so every
+# float operation happens in the same order as in the scalar code and the
+# results are bit-identical (tests/test_efficiency_vectorized.py).
+
+_N_EFF_IDS = 13  # rune effect ids 0..12; anything else lands in the unused slot 0
+
+
+def _rune_cap_tables(
+    normal: Dict[Literal["hero", "legend"], Dict[int, float]],
+    ancient: Dict[Literal["hero", "legend"], Dict[int, float]],
+    missing: float,
+) -> Dict[str, np.ndarray]:
+    """Per tier, a (2, _N_EFF_IDS) lookup: row 0 normal, row 1 ancient runes."""
+    out: Dict[str, np.ndarray] = {}
+    for tier in ("hero", "legend"):
+        table = np.full((2, _N_EFF_IDS), missing, dtype=np.float64)
+        for row, caps in enumerate((normal[tier], ancient[tier])):
+            for eff_id, cap in caps.items():
+                table[row, eff_id] = float(cap)
+        out[tier] = table
+    return out
+
+
+_GRIND_CAP_TABLE = _rune_cap_tables(_GRIND_MAX, _GRIND_MAX_ANCIENT, 0.0)
+_GEM_CAP_TABLE = _rune_cap_tables(_GEM_MAX, _GEM_MAX_ANCIENT, np.nan)  # NaN: "no gem cap" -> val
+_GRINDABLE_TABLE = np.zeros(_N_EFF_IDS, dtype=bool)
+_GRINDABLE_TABLE[sorted(_GRINDABLE_EFF_IDS)] = True
+
+
+@dataclasses.dataclass
+class _PackedRunes:
+    eff: np.ndarray        # (n, k) int64, 0 for padding
+    val: np.ndarray        # (n, k) float64
+    grind: np.ndarray      # (n, k) float64
+    valid: np.ndarray      # (n, k) bool
+    enchanted: np.ndarray  # (n,) bool, some sub has enchanted == 1
+    prefix_eff: np.ndarray
+    prefix_val: np.ndarray
+    ancient: np.ndarray    # (n,) int64, 1 for ancient runes
+
+
+def _pack_runes(runes: Sequence[Rune]) -> _PackedRunes:
+    n = len(runes)
+    prefix_eff: List[int] = []
+    prefix_val: List[float] = []
+    ancient: List[bool] = []
+    enchanted: List[bool] = []
+    rows: List[int] = []
+    cols: List[int] = []
+    flat_eff: List[int] = []
+    flat_val: List[float] = []
+    flat_grind: List[float] = []
+    width = 0
+    for i, rune in enumerate(runes):
+        try:
+            p_eff, p_val = int(rune.prefix_eff[0] or 0), float(rune.prefix_eff[1] or 0)
+        except Exception:
+            p_eff, p_val = 0, 0.0
+        prefix_eff.append(p_eff if 0 <= p_eff < _N_EFF_IDS else 0)
+        prefix_val.append(p_val)
+        ancient.append(_is_ancient_rune(rune))
+        has_enchanted = False
+        k = 0
+        for sec in (rune.sec_eff or []):
+            if not sec:
+                continue
+            try:
+                eff_id = int(sec[0] or 0)
+                val = float(sec[1] or 0)
+                ench = int(sec[2] or 0) if len(sec) >= 3 else 0
+                grind = float(sec[3] or 0) if len(sec) >= 4 else 0.0
+            except Exception:
+                continue
+            rows.append(i)
+            cols.append(k)
+            flat_eff.append(eff_id if 0 <= eff_id < _N_EFF_IDS else 0)
+            flat_val.append(val)
+            flat_grind.append(grind)
+            has_enchanted = has_enchanted or ench == 1
+            k += 1
+        enchanted.append(has_enchanted)
+        if k > width:
+            width = k
+
+    eff = np.zeros((n, width), dtype=np.int64)
+    val = np.zeros((n, width), dtype=np.float64)
+    grind = np.zeros((n, width), dtype=np.float64)
+    valid = np.zeros((n, width), dtype=bool)
+    if rows:
+        idx = (np.asarray(rows, dtype=np.int64), np.asarray(cols, dtype=np.int64))
+        eff[idx] = flat_eff
+        val[idx] = flat_val
+        grind[idx] = flat_grind
+        valid[idx] = True
+    return _PackedRunes(
+        eff, val, grind, valid,
+        enchanted=np.asarray(enchanted, dtype=bool),
+        prefix_eff=np.asarray(prefix_eff, dtype=np.int64),
+        prefix_val=np.asarray(prefix_val, dtype=np.float64),
+        ancient=np.asarray(ancient, dtype=np.int64),
+    )
+
+
+def _round2(raw: np.ndarray) -> np.ndarray:
+    # Python's round() (correctly rounded), not np.round(), to match the scalar path.
+    return np.fromiter((round(x, 2) for x in raw.tolist()), dtype=np.float64, count=raw.size)
+
+
+def _rune_score_from_totals(packed: _PackedRunes, totals: np.ndarray) -> np.ndarray:
+    n, width = packed.eff.shape
+    row_idx = np.arange(n)
+    sums = np.zeros((n, _N_EFF_IDS), dtype=np.float64)
+    sums[row_idx, packed.prefix_eff] += packed.prefix_val
+    for k in range(width):
+        sums[row_idx, packed.eff[:, k]] += np.where(packed.valid[:, k], totals[:, k], 0.0)
+    score = (
+        1
+        + (sums[:, 2] + sums[:, 4] + sums[:, 6] + sums[:, 12] + sums[:, 11]) / 40
+        + (sums[:, 8] + sums[:, 9]) / 30
+        + sums[:, 10] / 35
+        + sums[:, 1] / 1875 * 0.35
+        + (sums[:, 3] + sums[:, 5]) / 100 * 0.35
+    )
+    return _round2(score / 2.8 * 100)
+
+
+def _rune_max_totals(packed: _PackedRunes, tier: Literal["hero", "legend"]) -> np.ndarray:
+    grind_cap = _GRIND_CAP_TABLE[tier][packed.ancient[:, None], packed.eff]
+    gem_cap = _GEM_CAP_TABLE[tier][packed.ancient[:, None], packed.eff]
+    gem_cap = np.where(np.isnan(gem_cap), packed.val, gem_cap)
+    grindable = _GRINDABLE_TABLE[packed.eff]
+
+    # 1) Max grinds on existing grindable substats
+    totals = np.where(grindable, packed.val + np.maximum(packed.grind, grind_cap), packed.val)
+    if totals.shape[1] == 0:
+        return totals
+
+    # 2) At most one gem upgrade (the largest gain), only if no sub was already enchanted
+    target = gem_cap + np.where(grindable, grind_cap, 0.0)
+    delta = np.where(packed.valid & (gem_cap > packed.val), target - totals, -np.inf)
+    best = np.argmax(delta, axis=1)
+    row_idx = np.arange(len(best))
+    apply = ~packed.enchanted & (delta[row_idx, best] > 0)
+    totals[row_idx[apply], best[apply]] = target[row_idx[apply], best[apply]]
+    return totals
+
+
+def rune_efficiency_arrays(
+    runes: Sequence[Rune],
+    tiers: Sequence[str] = ("current", "hero", "legend"),
+) -> Dict[str, np.ndarray]:
+    """Efficiency of every rune for each requested tier, as float64 arrays.
+
+    ``"current"`` matches rune_efficiency(), ``"hero"`` / ``"legend"`` match
+    rune_efficiency_max(); the substats are parsed once for all tiers.
+    """
+    packed = _pack_runes(list(runes or []))
+    out: Dict[str, np.ndarray] = {}
+    for tier in tiers:
+        if tier == "current":
+            out[tier] = _rune_score_from_totals(packed, packed.val + packed.grind)
+        elif tier in ("hero", "legend"):
+            out[tier] = _rune_score_from_totals(packed, _rune_max_totals(packed, tier))
+        else:
+            raise ValueError(f"unknown efficiency tier {tier!r}")
+    return out
+
+
+# Artifact accumulator columns; effect divisor overrides go to _ART_SUM_6.
+_ART_SUM_4, _ART_SUM_5, _ART_SUM_6, _ART_LIFEDRAIN, _ART_CDBAD = 0, 1, 2, 3, 4
+_ART_ADD_SPD, _ART_ADD_HP, _ART_ADD_ATK, _ART_ADD_DEF = 5, 6, 7, 8
+_ART_COLUMN: Dict[int, int] = {
+    **{eid: _ART_SUM_5 for eid in _FIVE_PCT},
+    **{eid: _ART_SUM_4 for eid in _FOUR_PCT},
+    _EFF_LIFEDRAIN: _ART_LIFEDRAIN,
+    _EFF_CDBAD: _ART_CDBAD,
+    _EFF_ADD_SPD: _ART_ADD_SPD,
+    _EFF_ADD_HP: _ART_ADD_HP,
+    _EFF_ADD_ATK: _ART_ADD_ATK,
+    _EFF_ADD_DEF: _ART_ADD_DEF,
+    **{eid: _ART_SUM_6 for eid in _EFFECT_DIVISOR_OVERRIDE},
+}
+_ART_FACTOR: Dict[int, float] = {eid: 30.0 / div for eid, div in _EFFECT_DIVISOR_OVERRIDE.items()}
+
+
+def artifact_score_array(artifacts: Sequence[Artifact]) -> np.ndarray:
+    """artifact_score() of every artifact, as a float64 array."""
+    arts = list(artifacts or [])
+    n = len(arts)
+    json_score = np.zeros(n, dtype=np.float64)
+    rows: List[int] = []
+    cols: List[int] = []
+    flat_target: List[int] = []
+    flat_val: List[float] = []
+    flat_factor: List[float] = []
+    width = 0
+    for i, art in enumerate(arts):
+        json_score[i] = float(getattr(art, "json_score", 0.0) or 0.0)
+        k = 0
+        for sec in (art.sec_effects or []):
+            if not sec or len(sec) < 2:
+                continue
+            try:
+                eid = int(sec[0])
+                val = float(sec[1])
+            except (ValueError, TypeError):
+                continue
+            rows.append(i)
+            cols.append(k)
+            flat_target.append(_ART_COLUMN.get(eid, _ART_SUM_6))
+            flat_val.append(val)
+            flat_factor.append(_ART_FACTOR.get(eid, 1.0))
+            k += 1
+        width = max(width, k)
+
+    target = np.zeros((n, width), dtype=np.int64)
+    contrib = np.zeros((n, width), dtype=np.float64)
+    if rows:
+        idx = (np.asarray(rows, dtype=np.int64), np.asarray(cols, dtype=np.int64))
+        target[idx] = flat_target
+        contrib[idx] = np.asarray(flat_val) * np.asarray(flat_factor)
+    row_idx = np.arange(n)
+    sums = np.zeros((n, 9), dtype=np.float64)
+    for k in range(width):
+        # Padding contributes 0.0 to column 0, which leaves the sum unchanged.
+        sums[row_idx, target[:, k]] += contrib[:, k]
+
+    inner = (
+        sums[:, _ART_SUM_4] / 20
+        + sums[:, _ART_SUM_5] / 25
+        + sums[:, _ART_SUM_6] / 30
+        + sums[:, _ART_LIFEDRAIN] / 40
+        + sums[:, _ART_CDBAD] / 60
+        + sums[:, _ART_ADD_SPD] / 200
+        + sums[:, _ART_ADD_HP] / 1.5
+        + (sums[:, _ART_ADD_ATK] + sums[:, _ART_ADD_DEF]) / 20
+    )
+    return np.where(json_score > 0.0, _round2(json_score), _round2(inner * 125.0))
+
+
+def artifact_efficiency_array(artifacts: Sequence[Artifact]) -> np.ndarray:
+    """artifact_efficiency() of every artifact, as a float64 array."""
+    return _round2(artifact_score_array(artifacts) / 2.0)
@@ -7,7 +7,6 @@ from ortools.sat.python import cp_model
 from app.domain.models import AccountData, Rune, Artifact
 from app.domain.presets import BuildStore, Build, EFFECT_ID_TO_MAINSTAT_KEY, SET_SIZES
 from app.domain.speed_ticks import min_spd_for_tick, max_spd_for_tick
-from app.engine.efficiency import rune_efficiency, artifact_efficiency
 from app.engine.greedy_optimizer import (
     ACC_OVERCAP_PENALTY_PER_POINT,
     ARENA_RUSH_DEF_ART_WEIGHT,
@@ -37,10 +36,6 @@ from app.engine.greedy_optimizer import (
     _artifact_hint_score,
     _artifact_hint_critical_effect_ids,
     _count_required_set_pieces,
-    _rune_flat_spd,
-    _rune_stat_total,
-    _rune_quality_score,
-    _artifact_quality_score,
     _artifact_damage_score_proxy,
     _artifact_defensive_score_proxy,
     _artifact_quality_score_defensive,
@@ -60,14 +55,39 @@ from app.engine.greedy_optimizer import (
     _scaling_stat_from_hints,
     _artifact_scaling_score_proxy,
     _builds_for_unit_with_cloud_prior,
+    _add_warm_start_hints,
+    _collapse_equivalent_runes,
+    _solve_until_plateau,
+    _warm_start_hint_vars,
 )
+from app.engine.rune_table import artifact_table_for, rune_table_for
 from app.i18n import tr
 
 GLOBAL_SOLVER_OVERCAP_PENALTY_SCALE = 100
 GLOBAL_BASELINE_REGRESSION_GUARD_WEIGHT = 1500
 
 
-def optimize_global(account: AccountData, presets: BuildStore, req: GreedyRequest) -> GreedyResult:
+def _discounted(coef: int, discount_pct: int) -> int:
+    """Objective coefficient of an item made less attractive by *discount_pct* percent."""
+    if discount_pct <= 0:
+        return int(coef)
+    return int(coef) - (abs(int(coef)) * min(100, int(discount_pct))) // 100
+
+
+def optimize_global(
+    account: AccountData,
+    presets: BuildStore,
+    req: GreedyRequest,
+    rune_discount_pct: Optional[Dict[int, int]] = None,
+    artifact_discount_pct: Optional[Dict[int, int]] = None,
+) -> GreedyResult:
+    """One CP-SAT model over all units of *req*.
+
+    *rune_discount_pct* / *artifact_discount_pct* lower the objective value
+    of single items by a percentage (item prices of the team decomposition,
+    see app.engine.team_decomposition); a rune class costs what its cheapest
+    member costs, and that member is handed out first.
+    """
     unit_ids = [int(u) for u in (req.unit_ids_in_order or [])]
     if not unit_ids:
         return GreedyResult(False, tr("opt.no_units"), [])
@@ -80,6 +100,17 @@ def optimize_global(account: AccountData, presets: BuildStore, req: GreedyReques
     for r in pool:
         if 1 <= int(r.slot_no or 0) <= 6:
             runes_by_slot_global[int(r.slot_no)].append(r)
+    # Interchangeable runes get one variable per unit instead of one per rune;
+    # the uniqueness constraint lets a class be used once per member.
+    distinct_rune_ids: Set[int] = set()
+    for by_unit in (req.unit_fixed_runes_by_slot or {}, req.unit_baseline_runes_by_slot or {}):
+        for by_slot in by_unit.values():
+            distinct_rune_ids.update(int(rid or 0) for rid in (by_slot or {}).values())
+    runes_by_slot_global, rune_members = _collapse_equivalent_runes(
+        runes_by_slot_global,
+        owner_ids=set(unit_ids),
+        distinct_ids=distinct_rune_ids,
+    )
 
     artifacts_by_type_global: Dict[int, List[Artifact]] = {1: [], 2: []}
     for a in artifact_pool:
@@ -87,6 +118,19 @@ def optimize_global(account: AccountData, presets: BuildStore, req: GreedyReques
         if t in (1, 2):
             artifacts_by_type_global[t].append(a)
 
+    # Per-item stat totals (STAT_IDS order), efficiency and base quality from the columnar tables.
+    rune_tbl = rune_table_for(pool, account)
+    rune_rows = rune_tbl.rows_for(pool)
+    pool_rids = rune_tbl.rune_id[rune_rows].tolist()
+    rune_by_id: Dict[int, Rune] = {int(r.rune_id): r for r in pool}
+    rune_stats: Dict[int, List[int]] = dict(zip(pool_rids, rune_tbl.stats[rune_rows].tolist()))
+    rune_eff: Dict[int, float] = dict(zip(pool_rids, rune_tbl.efficiency[rune_rows].tolist()))
+    art_tbl = artifact_table_for(artifact_pool, account)
+    art_rows = art_tbl.rows_for(artifact_pool)
+    pool_aids = art_tbl.artifact_id[art_rows].tolist()
+    artifact_by_id: Dict[int, Artifact] = {int(a.artifact_id): a for a in artifact_pool}
+    art_eff: Dict[int, float] = dict(zip(pool_aids, art_tbl.efficiency[art_rows].tolist()))
+
     model = cp_model.CpModel()
 
     # x[(uid, slot, rid)] = 1 if rune rid is assigned to uid in slot
@@ -275,16 +319,13 @@ def optimize_global(account: AccountData, presets: BuildStore, req: GreedyReques
         for slot in range(1, 7):
             for r in rune_candidates_by_slot[slot]:
                 xv = x[(uid, slot, int(r.rune_id))]
-                spd = _rune_flat_spd(r)
+                _hp, _hpp, _atk, _atkp, _def, _defp, spd, cr, _cd, rs, ac = rune_stats[int(r.rune_id)]
                 if spd:
                     speed_terms.append(spd * xv)
-                cr = int(_rune_stat_total(r, 9) or 0)
                 if cr:
                     cr_terms_all.append(cr * xv)
-                rs = int(_rune_stat_total(r, 11) or 0)
                 if rs:
                     res_terms_all.append(rs * xv)
-                ac = int(_rune_stat_total(r, 12) or 0)
                 if ac:
                     acc_terms_all.append(ac * xv)
                 if int(r.set_id or 0) == 3:
@@ -466,9 +507,10 @@ def optimize_global(account: AccountData, presets: BuildStore, req: GreedyReques
                                 rta_rune_ids_for_unit=None,
                             )
                         )
-                        baseline_cr += int(_rune_stat_total(r, 9) or 0)
-                        baseline_res += int(_rune_stat_total(r, 11) or 0)
-                        baseline_acc += int(_rune_stat_total(r, 12) or 0)
+                        _hp, _hpp, _atk, _atkp, _def, _defp, _spd, b_cr, _cd, b_res, b_acc = rune_stats[int(r.rune_id)]
+                        baseline_cr += int(b_cr)
+                        baseline_res += int(b_res)
+                        baseline_acc += int(b_acc)
                     for a in baseline_art_refs:
                         baseline_score += int(
                             _baseline_guard_artifact_coef(
@@ -574,16 +616,10 @@ def optimize_global(account: AccountData, presets: BuildStore, req: GreedyReques
                     for r in rune_candidates_by_slot[slot]:
                         xv = x[(uid, slot, int(r.rune_id))]
                         # stat totals from runes
-                        cr = _rune_stat_total(r, 9)
-                        cd = _rune_stat_total(r, 10)
-                        rs = _rune_stat_total(r, 11)
-                        ac = _rune_stat_total(r, 12)
-                        hp_flat = _rune_stat_total(r, 1)
-                        hp_pct = _rune_stat_total(r, 2)
-                        atk_flat = _rune_stat_total(r, 3)
-                        atk_pct = _rune_stat_total(r, 4)
-                        def_flat = _rune_stat_total(r, 5)
-                        def_pct = _rune_stat_total(r, 6)
+                        (
+                            hp_flat, hp_pct, atk_flat, atk_pct, def_flat, def_pct,
+                            _spd, cr, cd, rs, ac,
+                        ) = rune_stats[int(r.rune_id)]
                         if cr:
                             cr_terms.append(cr * xv)
                         if cd:
@@ -666,7 +702,9 @@ def optimize_global(account: AccountData, presets: BuildStore, req: GreedyReques
     for (uid, slot, rid), vv in x.items():
         rune_use_by_id.setdefault(int(rid), []).append(vv)
     for rid, vars_for_rid in rune_use_by_id.items():
-        model.Add(sum(vars_for_rid) <= 1)
+        capacity = len(rune_members.get(int(rid), (int(rid),)))
+        if len(vars_for_rid) > capacity:
+            model.Add(sum(vars_for_rid) <= capacity)
 
     art_use_by_id: Dict[int, List[cp_model.IntVar]] = {}
     for (uid, _t, aid), vv in xa.items():
@@ -690,10 +728,60 @@ def optimize_global(account: AccountData, presets: BuildStore, req: GreedyReques
                 cur_uid = int(rows_sorted[i])
                 model.Add(final_speed_expr[prev_uid] >= final_speed_expr[cur_uid] + 1)
 
+    # Warm start from explicit hints (e.g. a saved optimization) or the baseline builds.
+    if bool(getattr(req, "warm_start_hints", True)):
+        feasible_only = bool(getattr(req, "warm_start_feasible_only", True))
+        rune_vars: Dict[int, Dict[int, Dict[int, cp_model.IntVar]]] = {}
+        for (uid, slot, rid), vv in x.items():
+            by_slot = rune_vars.setdefault(int(uid), {}).setdefault(int(slot), {})
+            for member in rune_members.get(int(rid), (int(rid),)):
+                by_slot[int(member)] = vv
+        art_vars: Dict[int, Dict[int, Dict[int, cp_model.IntVar]]] = {}
+        for (uid, art_type, aid), vv in xa.items():
+            art_vars.setdefault(int(uid), {}).setdefault(int(art_type), {})[int(aid)] = vv
+        hinted_vars: List[cp_model.IntVar] = []
+        hinted_items: Set[Tuple[str, int]] = set()
+        for uid in unit_ids:
+            hint_runes = (req.unit_hint_runes_by_slot or {}).get(int(uid))
+            hint_arts = (req.unit_hint_artifacts_by_type or {}).get(int(uid))
+            if not hint_runes and not hint_arts:
+                hint_runes = (req.unit_baseline_runes_by_slot or {}).get(int(uid))
+                hint_arts = (req.unit_baseline_artifacts_by_type or {}).get(int(uid))
+            items = {("r", int(rid or 0)) for rid in (hint_runes or {}).values()}
+            items |= {("a", int(aid or 0)) for aid in (hint_arts or {}).values()}
+            # Two units cannot both start from the same item.
+            if feasible_only and items & hinted_items:
+                continue
+            unit_hinted = _warm_start_hint_vars(
+                rune_vars.get(int(uid), {}),
+                art_vars.get(int(uid), {}),
+                hint_runes,
+                hint_arts,
+                feasible_only=feasible_only,
+            )
+            if unit_hinted:
+                hinted_items |= items
+                hinted_vars.extend(unit_hinted)
+        _add_warm_start_hints(model, hinted_vars)
+
     # Objective: efficiency-first, speed as tie-break
     obj_terms: List[cp_model.LinearExpr] = []
+    rune_prices = {int(rid): int(pct) for rid, pct in (rune_discount_pct or {}).items() if int(pct) > 0}
+    rune_discount: Dict[int, int] = {
+        int(rep): min(rune_prices.get(int(member), 0) for member in members)
+        for rep, members in rune_members.items()
+    } if rune_prices else {}
+    art_discount: Dict[int, int] = {int(aid): int(pct) for aid, pct in (artifact_discount_pct or {}).items()}
+    rune_quality_by_uid: Dict[int, Dict[int, int]] = {
+        int(uid): dict(zip(pool_rids, rune_tbl.quality_for_unit(int(uid))[rune_rows].tolist()))
+        for uid in unit_ids
+    }
+    art_quality_by_uid: Dict[int, Dict[int, int]] = {
+        int(uid): dict(zip(pool_aids, art_tbl.quality_for_unit(int(uid))[art_rows].tolist()))
+        for uid in unit_ids
+    }
     for (uid, slot, rid), vv in x.items():
-        r = next((rr for rr in runes_by_slot_global[slot] if int(rr.rune_id) == int(rid)), None)
+        r = rune_by_id.get(int(rid))
         if r is None:
             continue
         base_hp, base_atk, base_def, _base_spd = unit_base_stats_by_uid.get(int(uid), (0, 0, 0, 0))
@@ -707,36 +795,33 @@ def optimize_global(account: AccountData, presets: BuildStore, req: GreedyReques
                 base_def=int(base_def or 0),
             )
         )
-        eff_score = int(round(float(rune_efficiency(r)) * 100.0))
-        qual_score = int(_rune_quality_score(r, uid, None))
+        eff_score = int(round(float(rune_eff[int(rid)]) * 100.0))
+        qual_score = int(rune_quality_by_uid[int(uid)][int(rid)])
         if bool(favor_damage_by_uid.get(int(uid), False)):
             dmg_score = int(_rune_damage_score_proxy(r, base_atk))
-            obj_terms.append(
-                (
-                    eff_score * int(ARENA_RUSH_ATK_EFFICIENCY_SCALE)
-                    + qual_score
-                    + (dmg_score * 140)
-                    + (int(RUNE_SCALING_BONUS_WEIGHT) * scaling_bonus)
-                ) * vv
+            coef = (
+                eff_score * int(ARENA_RUSH_ATK_EFFICIENCY_SCALE)
+                + qual_score
+                + (dmg_score * 140)
+                + (int(RUNE_SCALING_BONUS_WEIGHT) * scaling_bonus)
             )
         elif bool(favor_defense_by_uid.get(int(uid), False)):
             unit_arch = str(archetype_by_uid.get(int(uid), ""))
             qual_score = int(_rune_quality_score_defensive(r, uid, None))
             def_score = int(_rune_defensive_score_proxy(r, base_hp, base_def, unit_arch))
             dmg_penalty = int(_rune_damage_score_proxy(r, base_atk))
-            obj_terms.append(
-                (
-                    eff_score * int(ARENA_RUSH_DEF_EFFICIENCY_SCALE)
-                    + (int(ARENA_RUSH_DEF_QUALITY_WEIGHT) * qual_score)
-                    + (int(ARENA_RUSH_DEF_RUNE_WEIGHT) * def_score)
-                    - (int(ARENA_RUSH_DEF_OFFSTAT_PENALTY_WEIGHT) * dmg_penalty)
-                    + (int(RUNE_SCALING_BONUS_WEIGHT) * scaling_bonus)
-                ) * vv
+            coef = (
+                eff_score * int(ARENA_RUSH_DEF_EFFICIENCY_SCALE)
+                + (int(ARENA_RUSH_DEF_QUALITY_WEIGHT) * qual_score)
+                + (int(ARENA_RUSH_DEF_RUNE_WEIGHT) * def_score)
+                - (int(ARENA_RUSH_DEF_OFFSTAT_PENALTY_WEIGHT) * dmg_penalty)
+                + (int(RUNE_SCALING_BONUS_WEIGHT) * scaling_bonus)
             )
         else:
-            obj_terms.append((eff_score * 100 + qual_score + (int(RUNE_SCALING_BONUS_WEIGHT) * scaling_bonus)) * vv)
+            coef = eff_score * 100 + qual_score + (int(RUNE_SCALING_BONUS_WEIGHT) * scaling_bonus)
+        obj_terms.append(_discounted(coef, rune_discount.get(int(rid), 0)) * vv)
     for (uid, t, aid), vv in xa.items():
-        a = next((aa for aa in artifacts_by_type_global[t] if int(aa.artifact_id) == int(aid)), None)
+        a = artifact_by_id.get(int(aid))
         if a is None:
             continue
         base_hp, base_atk, base_def, base_spd = unit_base_stats_by_uid.get(int(uid), (0, 0, 0, 0))
@@ -745,8 +830,8 @@ def optimize_global(account: AccountData, presets: BuildStore, req: GreedyReques
         unit_hint = dict((req.unit_artifact_hints_by_uid or {}).get(int(uid), {}) or {})
         hint_score = int(_artifact_hint_score(a, unit_hint))
         scaling_score = int(_artifact_scaling_score_proxy(a, scaling_stat=scaling_stat))
-        eff_score = int(round(float(artifact_efficiency(a)) * 100.0))
-        qual_score = int(_artifact_quality_score(a, uid, None))
+        eff_score = int(round(float(art_eff[int(aid)]) * 100.0))
+        qual_score = int(art_quality_by_uid[int(uid)][int(aid)])
         if bool(favor_damage_by_uid.get(int(uid), False)):
             dmg_score = int(
                 _artifact_damage_score_proxy(
@@ -757,14 +842,12 @@ def optimize_global(account: AccountData, presets: BuildStore, req: GreedyReques
                     base_spd=int(base_spd or 0),
                 )
             )
-            obj_terms.append(
-                (
-                    eff_score * int(max(1, int(ARENA_RUSH_ATK_EFFICIENCY_SCALE * 0.8)))
-                    + qual_score
-                    + (dmg_score * 120)
-                    + hint_score
-                    + (int(ARTIFACT_SCALING_BONUS_WEIGHT) * scaling_score)
-                ) * vv
+            coef = (
+                eff_score * int(max(1, int(ARENA_RUSH_ATK_EFFICIENCY_SCALE * 0.8)))
+                + qual_score
+                + (dmg_score * 120)
+                + hint_score
+                + (int(ARTIFACT_SCALING_BONUS_WEIGHT) * scaling_score)
             )
         elif bool(favor_defense_by_uid.get(int(uid), False)):
             unit_arch = str(archetype_by_uid.get(int(uid), ""))
@@ -799,15 +882,13 @@ def optimize_global(account: AccountData, presets: BuildStore, req: GreedyReques
                     base_spd=int(base_spd or 0),
                 )
             )
-            obj_terms.append(
-                (
-                    eff_score * int(ARENA_RUSH_DEF_EFFICIENCY_SCALE)
-                    + (int(ARENA_RUSH_DEF_QUALITY_WEIGHT) * qual_score)
-                    + (int(ARENA_RUSH_DEF_ART_WEIGHT) * def_score)
-                    - (int(ARENA_RUSH_DEF_OFFSTAT_PENALTY_WEIGHT) * dmg_penalty)
-                    + hint_score
-                    + (int(ARTIFACT_SCALING_BONUS_WEIGHT) * scaling_score)
-                ) * vv
+            coef = (
+                eff_score * int(ARENA_RUSH_DEF_EFFICIENCY_SCALE)
+                + (int(ARENA_RUSH_DEF_QUALITY_WEIGHT) * qual_score)
+                + (int(ARENA_RUSH_DEF_ART_WEIGHT) * def_score)
+                - (int(ARENA_RUSH_DEF_OFFSTAT_PENALTY_WEIGHT) * dmg_penalty)
+                + hint_score
+                + (int(ARTIFACT_SCALING_BONUS_WEIGHT) * scaling_score)
             )
         else:
             context_score = int(
@@ -820,15 +901,14 @@ def optimize_global(account: AccountData, presets: BuildStore, req: GreedyReques
                     base_spd=int(base_spd or 0),
                 )
             )
-            obj_terms.append(
-                (
-                    eff_score * 80
-                    + qual_score
-                    + (int(ARTIFACT_ROLE_CONTEXT_WEIGHT) * context_score)
-                    + hint_score
-                    + (int(ARTIFACT_SCALING_BONUS_WEIGHT) * scaling_score)
-                ) * vv
+            coef = (
+                eff_score * 80
+                + qual_score
+                + (int(ARTIFACT_ROLE_CONTEXT_WEIGHT) * context_score)
+                + hint_score
+                + (int(ARTIFACT_SCALING_BONUS_WEIGHT) * scaling_score)
             )
+        obj_terms.append(_discounted(coef, art_discount.get(int(aid), 0)) * vv)
     # Unit-level critical hint satisfaction (balanced/quality guidance):
     # if the candidate pool contains key hint effects, reward selecting at least one.
     for uid in unit_ids:
@@ -898,8 +978,12 @@ def optimize_global(account: AccountData, presets: BuildStore, req: GreedyReques
             req.register_solver(solver)
         except Exception:
             pass
-    # Global model: budget scales with unit count.
-    solver.parameters.max_time_in_seconds = float(max(10.0, float(req.time_limit_per_unit_s) * float(max(1, len(unit_ids))) * 1.5))
+    # Global model: budget scales with unit count unless the run has a total budget
+    # (an explicit budget may be short, e.g. for LNS neighborhoods).
+    if float(getattr(req, "time_budget_s", 0.0) or 0.0) > 0.0:
+        solver.parameters.max_time_in_seconds = float(max(1.0, float(req.time_budget_s)))
+    else:
+        solver.parameters.max_time_in_seconds = float(max(10.0, float(req.time_limit_per_unit_s) * float(max(1, len(unit_ids))) * 1.5))
     solver.parameters.num_search_workers = int(max(1, int(req.workers or 1)))
     status = cp_model.UNKNOWN
 
@@ -961,7 +1045,18 @@ def optimize_global(account: AccountData, presets: BuildStore, req: GreedyReques
         except Exception:
             pass
         model.Maximize(objective_expr)
-        status = solver.Solve(model)
+        # The plateau window scales with the unit count like the time limit.
+        status = _solve_until_plateau(
+            solver,
+            model,
+            float(req.plateau_window_s or 0.0) * float(max(1, len(unit_ids))),
+            int(req.plateau_window_solutions or 0),
+            (
+                (lambda trace, stopped: req.solve_trace_callback(0, trace, stopped))
+                if req.solve_trace_callback
+                else None
+            ),
+        )
         if req.is_cancelled and req.is_cancelled():
             return GreedyResult(False, tr("opt.cancelled"), [])
         if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
@@ -1023,7 +1118,11 @@ def optimize_global(account: AccountData, presets: BuildStore, req: GreedyReques
         msg = "Global infeasible/time limit; fallback heuristic used."
         return GreedyResult(ok_all, msg, fallback)
 
-    # Extract
+    # Extract; every unit that picked a rune class gets its own member of it.
+    unassigned_members: Dict[int, List[int]] = {
+        rep: sorted(ids, key=lambda rid: rune_prices.get(int(rid), 0)) if rune_prices else list(ids)
+        for rep, ids in rune_members.items()
+    }
     results: List[GreedyUnitResult] = []
     for uid in unit_ids:
         chosen_runes: Dict[int, int] = {}
@@ -1032,7 +1131,8 @@ def optimize_global(account: AccountData, presets: BuildStore, req: GreedyReques
             for r in runes_by_slot_global[slot]:
                 key = (uid, slot, int(r.rune_id))
                 if key in best_x_assign:
-                    picked = int(r.rune_id)
+                    free = unassigned_members.get(int(r.rune_id)) or [int(r.rune_id)]
+                    picked = int(free.pop(0))
                     break
             if picked <= 0:
                 results.append(GreedyUnitResult(uid, False, tr("opt.internal_no_rune", slot=slot), runes_by_slot={}))
@@ -65,7 +65,6 @@ from app.domain.presets import (
     EFFECT_ID_TO_MAINSTAT_KEY,
 )
 from app.domain.speed_ticks import min_spd_for_tick, max_spd_for_tick
-from app.engine.efficiency import rune_efficiency, artifact_efficiency
 from app.engine.greedy_optimizer import (
     DEFAULT_BUILD_PRIORITY_PENALTY,
     GreedyRequest,
@@ -79,19 +78,17 @@ from app.engine.greedy_optimizer import (
     _build_pass_orders,
     _evaluate_pass_score,
     _rune_flat_spd,
-    _rune_stat_total,
-    _rune_quality_score,
-    _artifact_quality_score,
     _builds_for_unit_with_cloud_prior,
     _run_pass_with_profile,
 )
+from app.engine.rune_table import STAT_IDS, account_artifact_table, account_rune_table, artifact_table_for, rune_table_for
 from app.i18n import tr
 from app.services.cloud_learning_service import fetch_cloud_prior, upload_learning_run
 
 # ---------------------------------------------------------------------------
 # Stat IDs used for the fixed-size encoding vector
 # ---------------------------------------------------------------------------
-_STAT_IDS = [1, 2, 3, 4, 5, 6, 8, 9, 10, 11, 12]  # HP,HP%,ATK,ATK%,DEF,DEF%,SPD,CR,CD,RES,ACC
+_STAT_IDS = list(STAT_IDS)  # HP,HP%,ATK,ATK%,DEF,DEF%,SPD,CR,CD,RES,ACC (RuneTable column order)
 _STAT_ID_TO_COL = {sid: i for i, sid in enumerate(_STAT_IDS)}
 _N_STATS = len(_STAT_IDS)
 _COL_SPD = _STAT_ID_TO_COL[8]
@@ -241,45 +238,35 @@ def _get_gpu_scorer(provider: str) -> _GpuScorer:
 # ---------------------------------------------------------------------------
 # Rune â†’ numpy vector encoding
 # ---------------------------------------------------------------------------
-def _encode_rune(r: Rune) -> np.ndarray:
-    """Encode a single rune into a fixed-size float32 vector."""
-    vec = np.zeros(_VEC_LEN, dtype=np.float32)
-    for sid in _STAT_IDS:
-        col = _STAT_ID_TO_COL[sid]
-        vec[col] = float(_rune_stat_total(r, sid))
-    vec[_COL_RUNE_ID] = float(r.rune_id)
-    vec[_COL_SET_ID] = float(r.set_id or 0)
-    vec[_COL_SLOT] = float(r.slot_no)
-    vec[_COL_QUALITY] = float(_rune_quality_score(r, 0, None))
-    vec[_COL_EFFICIENCY] = float(rune_efficiency(r))
-    # Mainstat effect_id (for filtering slots 2/4/6)
-    try:
-        vec[_COL_MAINSTAT_ID] = float(int(r.pri_eff[0] or 0))
-    except Exception:
-        vec[_COL_MAINSTAT_ID] = 0.0
-    return vec
-
-
-def _encode_runes(runes: List[Rune]) -> np.ndarray:
-    """Encode a list of runes into a (N, _VEC_LEN) matrix."""
+def _encode_runes(runes: List[Rune], account: Optional[AccountData] = None) -> np.ndarray:
+    """Encode a list of runes into a (N, _VEC_LEN) matrix (gathered from the RuneTable)."""
     if not runes:
         return np.zeros((0, _VEC_LEN), dtype=np.float32)
-    return np.stack([_encode_rune(r) for r in runes])
-
-
-def _encode_artifact(a: Artifact) -> np.ndarray:
-    vec = np.zeros(_ART_VEC_LEN, dtype=np.float32)
-    vec[_ART_COL_ID] = float(a.artifact_id)
-    vec[_ART_COL_TYPE] = float(a.type_ or 0)
-    vec[_ART_COL_QUALITY] = float(_artifact_quality_score(a, 0, None))
-    vec[_ART_COL_EFFICIENCY] = float(artifact_efficiency(a))
-    return vec
+    table = rune_table_for(runes, account)
+    rows = table.rows_for(runes)
+    mat = np.zeros((len(rows), _VEC_LEN), dtype=np.float32)
+    mat[:, :_N_STATS] = table.stats[rows]
+    mat[:, _COL_RUNE_ID] = table.rune_id[rows]
+    mat[:, _COL_SET_ID] = table.set_id[rows]
+    mat[:, _COL_SLOT] = table.slot[rows]
+    mat[:, _COL_QUALITY] = table.quality_for_unit(0)[rows]
+    mat[:, _COL_EFFICIENCY] = table.efficiency[rows]
+    # Mainstat effect_id (for filtering slots 2/4/6)
+    mat[:, _COL_MAINSTAT_ID] = table.mainstat[rows]
+    return mat
 
 
-def _encode_artifacts(arts: List[Artifact]) -> np.ndarray:
+def _encode_artifacts(arts: List[Artifact], account: Optional[AccountData] = None) -> np.ndarray:
     if not arts:
         return np.zeros((0, _ART_VEC_LEN), dtype=np.float32)
-    return np.stack([_encode_artifact(a) for a in arts])
+    table = artifact_table_for(arts, account)
+    rows = table.rows_for(arts)
+    mat = np.zeros((len(rows), _ART_VEC_LEN), dtype=np.float32)
+    mat[:, _ART_COL_ID] = table.artifact_id[rows]
+    mat[:, _ART_COL_TYPE] = table.type_[rows]
+    mat[:, _ART_COL_QUALITY] = table.quality_for_unit(0)[rows]
+    mat[:, _ART_COL_EFFICIENCY] = table.efficiency[rows]
+    return mat
 
 
 # ---------------------------------------------------------------------------
@@ -1590,27 +1577,28 @@ def _adaptive_plan_for_run(
     )
 
 
-def _cap_extra_gpu_runes(extra_runes: List[Rune], limit: int) -> List[Rune]:
+def _cap_extra_gpu_runes(
+    extra_runes: List[Rune],
+    limit: int,
+    account: Optional[AccountData] = None,
+) -> List[Rune]:
     cap = int(limit or 0)
     if cap <= 0 or len(extra_runes) <= cap:
         return list(extra_runes or [])
-    ranked = sorted(
-        list(extra_runes or []),
-        key=lambda r: (
-            float(rune_efficiency(r)),
-            float(_rune_quality_score(r, 0, None)),
-            float(_rune_flat_spd(r)),
-        ),
-        reverse=True,
-    )
-    return ranked[:cap]
+    table = rune_table_for(extra_runes, account)
+    rows = table.rows_for(extra_runes)
+    # lexsort: last key is primary -> efficiency, then quality, then SPD (all descending).
+    order = np.lexsort((
+        -table.stats[rows, _COL_SPD],
+        -table.quality_for_unit(0)[rows],
+        -table.efficiency[rows],
+    ))
+    return [extra_runes[int(i)] for i in order[:cap]]
 
 
 def _result_kpis(account: AccountData, results: List[GreedyUnitResult]) -> Dict[str, float]:
-    runes_by_id = account.runes_by_id()
-    artifacts_by_id: Dict[int, Artifact] = {
-        int(a.artifact_id): a for a in list(account.artifacts or [])
-    }
+    rune_tbl = account_rune_table(account)
+    art_tbl = account_artifact_table(account)
     ok_rows = [r for r in (results or []) if bool(getattr(r, "ok", False))]
     total_units = int(len(results or []))
     ok_units = int(len(ok_rows))
@@ -1621,13 +1609,13 @@ def _result_kpis(account: AccountData, results: List[GreedyUnitResult]) -> Dict[
     art_eff: List[float] = []
     for row in ok_rows:
         for rid in dict(getattr(row, "runes_by_slot", {}) or {}).values():
-            rr = runes_by_id.get(int(rid or 0))
-            if rr is not None:
-                rune_eff.append(float(rune_efficiency(rr)))
+            rune_row = rune_tbl.row_of.get(int(rid or 0))
+            if rune_row is not None:
+                rune_eff.append(float(rune_tbl.efficiency[rune_row]))
         for aid in dict(getattr(row, "artifacts_by_type", {}) or {}).values():
-            aa = artifacts_by_id.get(int(aid or 0))
-            if aa is not None:
-                art_eff.append(float(artifact_efficiency(aa)))
+            art_row = art_tbl.row_of.get(int(aid or 0))
+            if art_row is not None:
+                art_eff.append(float(art_tbl.efficiency[art_row]))
 
     speed_sum = int(sum(speeds))
     speed_mean = float(statistics.fmean(speeds)) if speeds else 0.0
@@ -2181,14 +2169,14 @@ def _gpu_presceen_rune_ids(
     for slot in range(1, 7):
         runes = runes_by_slot_all[slot]
         if runes:
-            preencoded_matrices[slot] = _encode_runes(runes)
+            preencoded_matrices[slot] = _encode_runes(runes, account)
             preencoded_ids[slot] = [r.rune_id for r in runes]
 
     # Pre-encode artifacts once
     art1_list = [a for a in artifact_pool if int(a.type_ or 0) == 1]
     art2_list = [a for a in artifact_pool if int(a.type_ or 0) == 2]
-    art1_matrix = _encode_artifacts(art1_list) if art1_list else None
-    art2_matrix = _encode_artifacts(art2_list) if art2_list else None
+    art1_matrix = _encode_artifacts(art1_list, account) if art1_list else None
+    art2_matrix = _encode_artifacts(art2_list, account) if art2_list else None
     n_art1 = len(art1_list)
     n_art2 = len(art2_list)
 
@@ -2431,7 +2419,7 @@ def _run_gpu_combo_once(
         for rid in gpu_rune_ids
         if rid not in solver_pool_ids and rid in rune_by_id
     ]
-    extra_runes = _cap_extra_gpu_runes(extra_runes_raw, int(adaptive.extra_rune_cap))
+    extra_runes = _cap_extra_gpu_runes(extra_runes_raw, int(adaptive.extra_rune_cap), account)
     merged_pool = list(solver_pool_base) + extra_runes
 
     best_results: Optional[List[GreedyUnitResult]] = None
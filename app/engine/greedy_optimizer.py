@@ -1,19 +1,33 @@
 ﻿from __future__ import annotations
 
+from collections import OrderedDict
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from dataclasses import dataclass, replace
+from dataclasses import dataclass, field, replace
 from functools import lru_cache
+import hashlib
 import json
+import os
 from pathlib import Path
 import threading
+import time
 from typing import Dict, List, Tuple, Set, Optional, Callable, Any
 
+import numpy as np
 from ortools.sat.python import cp_model
 
 from app.domain.artifact_effects import artifact_effect_is_legacy, ARTIFACT_EFFECT_IDS_BY_ARTIFACT_TYPE
 from app.domain.models import AccountData, Rune, Artifact
+from app.domain.optimization_store import SavedOptimization
 from app.domain.speed_ticks import min_spd_for_tick, max_spd_for_tick
-from app.engine.efficiency import rune_efficiency, artifact_efficiency
+from app.engine.efficiency import artifact_memo, rune_memo
+from app.engine.rune_table import (
+    STAT_COL,
+    account_artifact_table,
+    account_rune_table,
+    artifact_table_for,
+    rune_table_for,
+)
+from app.engine.solve_budget import SolveBudget, history_seconds_per_var
 from app.domain.presets import (
     BuildStore,
     Build,
@@ -1221,6 +1235,20 @@ def _projected_rune_mainstat_value(r: Rune) -> int:
 
 def _rune_quality_score(r: Rune, uid: int,
                         rta_rune_ids_for_unit: Optional[Set[int]] = None) -> int:
+    score = int(rune_memo(r, "quality", lambda: _rune_base_quality_score(r)))
+
+    # Keep currently equipped rune on same unit slightly preferred
+    if rta_rune_ids_for_unit is not None:
+        # RTA mode: prefer runes that are RTA-equipped on this unit
+        if r.rune_id in rta_rune_ids_for_unit:
+            score += 45
+    elif r.occupied_type == 1 and r.occupied_id == uid:
+        score += 45
+
+    return score
+
+
+def _rune_base_quality_score(r: Rune) -> int:
     score = 0
     score += int(r.upgrade_curr or 0) * 8
     score += int(r.rank or 0) * 6
@@ -1243,23 +1271,26 @@ def _rune_quality_score(r: Rune, uid: int,
         val = int(sec[1] or 0)
         grind = int(sec[3] or 0) if len(sec) >= 4 else 0
         score += _score_stat(eff_id, val + grind)
+    return score
+
+
+def _rune_quality_score_defensive(
+    r: Rune,
+    uid: int,
+    rta_rune_ids_for_unit: Optional[Set[int]] = None,
+) -> int:
+    score = int(rune_memo(r, "quality_defensive", lambda: _rune_base_quality_score_defensive(r)))
 
-    # Keep currently equipped rune on same unit slightly preferred
     if rta_rune_ids_for_unit is not None:
-        # RTA mode: prefer runes that are RTA-equipped on this unit
         if r.rune_id in rta_rune_ids_for_unit:
             score += 45
     elif r.occupied_type == 1 and r.occupied_id == uid:
         score += 45
 
-    return score
+    return int(score)
 
 
-def _rune_quality_score_defensive(
-    r: Rune,
-    uid: int,
-    rta_rune_ids_for_unit: Optional[Set[int]] = None,
-) -> int:
+def _rune_base_quality_score_defensive(r: Rune) -> int:
     score = 0
     score += int(r.upgrade_curr or 0) * 8
     score += int(r.rank or 0) * 6
@@ -1278,14 +1309,7 @@ def _rune_quality_score_defensive(
 
     if not _is_good_even_slot_mainstat(int(r.pri_eff[0] or 0), int(r.slot_no or 0)):
         score -= 140
-
-    if rta_rune_ids_for_unit is not None:
-        if r.rune_id in rta_rune_ids_for_unit:
-            score += 45
-    elif r.occupied_type == 1 and r.occupied_id == uid:
-        score += 45
-
-    return int(score)
+    return score
 
 
 def _artifact_focus_key(art: Artifact) -> str:
@@ -1311,6 +1335,21 @@ def _artifact_substat_ids(art: Artifact) -> Set[int]:
     return out
 
 
+def _artifact_allowed_by_build(b: Build, art_type: int, art: Artifact) -> bool:
+    """Whether build *b*'s artifact focus/substat filter for *art_type* admits *art*."""
+    cfg_key = "attribute" if int(art_type) == 1 else "type"
+    allowed_focus = [str(x).upper() for x in ((getattr(b, "artifact_focus", {}) or {}).get(cfg_key) or []) if str(x)]
+    if allowed_focus and _artifact_focus_key(art) not in allowed_focus:
+        return False
+    required_subs = [
+        int(x) for x in ((getattr(b, "artifact_substats", {}) or {}).get(cfg_key) or []) if int(x) > 0
+    ][:2]
+    if required_subs:
+        sec_ids = _artifact_substat_ids(art)
+        return all(req_id in sec_ids for req_id in required_subs)
+    return True
+
+
 def _artifact_effect_value_scaled(art: Artifact, effect_id: int) -> int:
     target = int(effect_id or 0)
     if target <= 0:
@@ -1546,11 +1585,19 @@ class GreedyRequest:
     mode: str
     unit_ids_in_order: List[int]   # Reihenfolge = Priorität (wie SWOP)
     time_limit_per_unit_s: float = 10.0
+    # Total wall-clock budget of the run (0 = fixed per-unit limits); split over
+    # the unit solves of all passes by a SolveBudget instead.
+    time_budget_s: float = 0.0
     workers: int = 8
     multi_pass_enabled: bool = True
     multi_pass_count: int = 3
     multi_pass_time_factor: float = 0.2
-    multi_pass_strategy: str = "greedy_refine"  # greedy_only | greedy_refine
+    multi_pass_strategy: str = "greedy_refine"  # greedy_only | greedy_refine | lns
+    multi_pass_parallel: int = 1  # passes solved at the same time (1 = sequential)
+    solve_backend: str = "thread"  # thread | process (parallel max_quality runs)
+    # max_quality: one global model per team, coordinated on shared items
+    # (see app.engine.team_decomposition), instead of one model for all units.
+    decompose_teams: bool = False
     rune_top_per_set: int = 200
     quality_profile: str = "balanced"  # fast | balanced | max_quality | gpu_combo
     speed_slack_for_quality: int = DEFAULT_SPEED_SLACK_FOR_QUALITY
@@ -1572,12 +1619,42 @@ class GreedyRequest:
     unit_baseline_runes_by_slot: Dict[int, Dict[int, int]] | None = None
     unit_baseline_artifacts_by_type: Dict[int, Dict[int, int]] | None = None
     baseline_regression_guard_weight: int = 0
+    # Warm start: CP-SAT solution hints per unit.  Explicit hints (e.g. from
+    # saved_optimization_hints) win over the baseline build; later passes hint
+    # the best solution of the previous passes.
+    warm_start_hints: bool = True
+    warm_start_feasible_only: bool = True  # drop hints that use items no longer selectable
+    unit_hint_runes_by_slot: Dict[int, Dict[int, int]] | None = None
+    unit_hint_artifacts_by_type: Dict[int, Dict[int, int]] | None = None
     global_seed_offset: int = 0
     unit_archetype_by_uid: Dict[int, str] | None = None
     unit_artifact_hints_by_uid: Dict[int, Dict[str, Any]] | None = None
     unit_team_has_spd_buff_by_uid: Dict[int, bool] | None = None
     arena_rush_context: str = ""  # "", "defense", "offense"
     cloud_build_prior_by_uid: Dict[int, List[Build]] | None = None
+    # Per-unit CP-SAT model templates, shared by all passes of one optimize_greedy() run.
+    unit_model_templates: _UnitModelTemplateCache | None = None
+    # Single-unit results, may be shared across runs (see UnitSolveCache).
+    unit_solve_cache: UnitSolveCache | None = None
+    # Scheduler of time_budget_s, shared by all passes of one optimize_greedy() run.
+    solve_budget: SolveBudget | None = None
+    # Pass score tables, shared by all passes of one optimize_greedy() run.
+    pass_scorer: PassScorer | None = None
+    # Score bound of the running multi-pass loop; passes stop once it cannot beat the best pass.
+    pass_bound: PassBound | None = None
+    # Plateau stop: a CP-SAT search ends once its objective has not improved
+    # for plateau_window_s seconds or plateau_window_solutions solutions
+    # (0 = off).  solve_trace_callback(unit_id, [(seconds, objective)], stopped)
+    # receives the improvement trace of every solve (unit_id 0 = global model).
+    plateau_window_s: float = 0.0
+    plateau_window_solutions: int = 0
+    solve_trace_callback: Optional[Callable[[int, List[Tuple[float, float]], bool], None]] = None
+    # Incremental re-optimization: keep previous_result for every unit except
+    # changed_unit_ids and the units they conflict with; above
+    # incremental_max_scope (share of all units) a full run is done instead.
+    previous_result: GreedyResult | None = None
+    changed_unit_ids: Set[int] | None = None
+    incremental_max_scope: float = 0.5
 
 @dataclass
 class GreedyUnitResult:
@@ -1606,16 +1683,6 @@ class _PassOutcome:
     score: Tuple[int, int, int, int, int, int, int]
 
 
-def _rune_pool_rank_score(r: Rune) -> int:
-    # Unit-agnostic pre-ranking for pool pruning (fast and stable enough).
-    base = 0
-    base += int(round(float(rune_efficiency(r)) * 100.0))
-    base += int(r.upgrade_curr or 0) * 40
-    base += int(r.rank or 0) * 30
-    base += int(r.rune_class or 0) * 25
-    return int(base)
-
-
 def _allowed_runes_for_mode(
     account: AccountData,
     req: GreedyRequest,
@@ -1639,6 +1706,17 @@ def _allowed_runes_for_mode(
     mode_key = str(getattr(req, "mode", "") or "").strip().lower()
     arena_rush_pool_by_set_size = mode_key == "arena_rush"
 
+    # Unit-agnostic pre-ranking for pool pruning (fast and stable enough).
+    rune_tbl = rune_table_for(all_runes, account)
+    rows = rune_tbl.rows_for(all_runes)
+    rank_scores = (
+        np.rint(rune_tbl.efficiency[rows] * 100.0).astype(np.int64)
+        + rune_tbl.upgrade[rows] * 40
+        + rune_tbl.rank[rows] * 30
+        + rune_tbl.rune_class[rows] * 25
+    ).tolist()
+    rank_score_by_rid: Dict[int, int] = dict(zip(rune_tbl.rune_id[rows].tolist(), rank_scores))
+
     by_set: Dict[int, List[Rune]] = {}
     for r in all_runes:
         sid = int(r.set_id or 0)
@@ -1655,7 +1733,7 @@ def _allowed_runes_for_mode(
                 per_set_cap = 300
         ranked = sorted(
             runes,
-            key=lambda rr: (_rune_pool_rank_score(rr), int(rr.slot_no or 0), -int(rr.rune_id or 0)),
+            key=lambda rr: (rank_score_by_rid[int(rr.rune_id or 0)], int(rr.slot_no or 0), -int(rr.rune_id or 0)),
             reverse=True,
         )
         pruned.extend(ranked[:max(0, int(per_set_cap))])
@@ -2449,13 +2527,105 @@ def _diagnose_single_unit_hard_constraint_conflict(
     return ""
 
 
-def _solve_single_unit_best(
-    uid: int,
-    pool: List[Rune],
-    artifact_pool: List[Artifact],
+@dataclass(frozen=True)
+class _RuneGroupStats:
+    """Bounds over the candidate runes of one slot that share a mainstat key."""
+
+    spd_min: int
+    spd_max: int
+    all_swift: bool
+    set_ids: frozenset
+    # min_stats key -> largest contribution of a single rune (HP/ATK/DEF incl. % of base)
+    stat_max: Dict[str, float]
+
+
+_PREFLIGHT_FLAT_STATS = {"CR": 9, "CD": 10, "RES": 11, "ACC": 12}
+_PREFLIGHT_PRIMARY_STATS = {"HP": (1, 2), "ATK": (3, 4), "DEF": (5, 6)}
+
+
+def _slot_stat_table(
+    runes_by_slot: Dict[int, List[Rune]],
+    base_hp: int,
+    base_atk: int,
+    base_def: int,
+    account: Optional[AccountData] = None,
+) -> Dict[int, Dict[str, _RuneGroupStats]]:
+    """Per slot: mainstat key -> _RuneGroupStats of the candidate runes."""
+    tbl = rune_table_for([r for slot in range(1, 7) for r in runes_by_slot.get(slot, [])], account)
+    base_by_key = {"HP": int(base_hp or 0), "ATK": int(base_atk or 0), "DEF": int(base_def or 0)}
+    out: Dict[int, Dict[str, _RuneGroupStats]] = {}
+    for slot in range(1, 7):
+        runes = list(runes_by_slot.get(slot, []))
+        groups: Dict[str, _RuneGroupStats] = {}
+        if runes:
+            rows = tbl.rows_for(runes)
+            stats = tbl.stats[rows].astype(np.float64)
+            set_ids = tbl.set_id[rows]
+            keys = [EFFECT_ID_TO_MAINSTAT_KEY.get(int(r.pri_eff[0] or 0), "") for r in runes]
+            for key in set(keys):
+                idx = np.fromiter((i for i, k in enumerate(keys) if k == key), dtype=np.int64)
+                g = stats[idx]
+                spd = g[:, STAT_COL[8]]
+                stat_max = {name: float(g[:, STAT_COL[eid]].max()) for name, eid in _PREFLIGHT_FLAT_STATS.items()}
+                for name, (flat_id, pct_id) in _PREFLIGHT_PRIMARY_STATS.items():
+                    bonus = g[:, STAT_COL[flat_id]] + g[:, STAT_COL[pct_id]] * base_by_key[name] / 100.0
+                    stat_max[name] = float(bonus.max())
+                gsets = set_ids[idx]
+                groups[key] = _RuneGroupStats(
+                    spd_min=int(spd.min()),
+                    spd_max=int(spd.max()),
+                    all_swift=bool((gsets == _SWIFT_SET_ID).all()),
+                    set_ids=frozenset(int(sid) for sid in np.unique(gsets).tolist()),
+                    stat_max=stat_max,
+                )
+        out[slot] = groups
+    return out
+
+
+def _preflight_set_reason(b: Build, groups_by_slot: Dict[int, List[_RuneGroupStats]]) -> str:
+    slots_with: Dict[int, Set[int]] = {}
+    for slot, groups in groups_by_slot.items():
+        for g in groups:
+            for sid in g.set_ids:
+                slots_with.setdefault(int(sid), set()).add(int(slot))
+    intangible_slots = slots_with.get(int(INTANGIBLE_SET_ID), set())
+    first_reason = ""
+    for opt in b.set_options:
+        needed = _count_required_set_pieces([str(sname) for sname in opt])
+        total_pieces = sum(int(v) for v in needed.values())
+        reason = ""
+        if total_pieces > 6:
+            reason = tr("opt.set_too_many", name=b.name, opt=opt, pieces=total_pieces)
+        replacements = 0
+        union: Set[int] = set()
+        for set_id, pieces in needed.items():
+            if reason:
+                break
+            avail = len(slots_with.get(int(set_id), ()))
+            union |= slots_with.get(int(set_id), set())
+            deficit = int(pieces) - avail
+            # One missing piece of a non-Intangible set may be an Intangible rune.
+            if deficit == 1 and int(set_id) != int(INTANGIBLE_SET_ID) and intangible_slots and replacements == 0:
+                replacements = 1
+                continue
+            if deficit > 0:
+                reason = tr("opt.set_not_enough", name=b.name, set_id=set_id, pieces=pieces, avail=avail)
+        if not reason:
+            if replacements:
+                union |= intangible_slots
+            # Every piece needs its own slot among the slots offering one of the sets.
+            if len(union) < total_pieces:
+                reason = tr("opt.set_not_enough", name=b.name, set_id=opt, pieces=total_pieces, avail=len(union))
+        if not reason:
+            return ""
+        first_reason = first_reason or reason
+    return first_reason
+
+
+def _preflight_unit_builds(
+    runes_by_slot: Dict[int, List[Rune]],
+    artifacts_by_type: Dict[int, List[Artifact]],
     builds: List[Build],
-    time_limit_s: float,
-    workers: int,
     base_hp: int,
     base_atk: int,
     base_def: int,
@@ -2465,50 +2635,335 @@ def _solve_single_unit_best(
     base_cd: int,
     base_res: int,
     base_acc: int,
+    min_final_speed: Optional[int],
     max_final_speed: Optional[int],
-    min_final_speed: Optional[int] = None,
+    mode: str,
     account: Optional[AccountData] = None,
-    rta_rune_ids_for_unit: Optional[Set[int]] = None,
-    rta_artifact_ids_for_unit: Optional[Set[int]] = None,
-    speed_hard_priority: bool = True,
-    speed_weight_soft: int = SOFT_SPEED_WEIGHT,
-    speed_tiebreak_weight: int = 1,
-    build_priority_penalty: int = DEFAULT_BUILD_PRIORITY_PENALTY,
-    set_option_preference_offset: int = 0,
-    set_option_preference_bonus: int = SET_OPTION_PREFERENCE_BONUS,
-    fixed_runes_by_slot: Optional[Dict[int, int]] = None,
-    fixed_artifacts_by_type: Optional[Dict[int, int]] = None,
-    baseline_runes_by_slot: Optional[Dict[int, int]] = None,
-    baseline_artifacts_by_type: Optional[Dict[int, int]] = None,
-    baseline_regression_guard_weight: int = 0,
-    avoid_runes_by_slot: Optional[Dict[int, int]] = None,
-    avoid_artifacts_by_type: Optional[Dict[int, int]] = None,
-    avoid_same_rune_penalty: int = 0,
-    avoid_same_artifact_penalty: int = 0,
-    speed_slack_for_quality: int = 0,
-    objective_mode: str = "balanced",  # balanced | efficiency
-    force_speed_priority: bool = False,
-    arena_rush_damage_bias: bool = False,
-    unit_archetype: str = "",
-    artifact_hints: Optional[Dict[str, Any]] = None,
-    broken_set_excluded_set_ids: Optional[Set[int]] = None,
-    is_cancelled: Optional[Callable[[], bool]] = None,
-    register_solver: Optional[Callable[[object], None]] = None,
-    mode: str = "normal",
-) -> GreedyUnitResult:
+) -> List[str]:
+    """Reason per build why it cannot be satisfied ("" = possibly feasible).
+
+    Checks necessary conditions only, against per-slot bounds of the
+    candidate runes (see ``_slot_stat_table``): mainstat filters, artifact
+    filters, set options (one Intangible replacement), the SPD window of
+    floors, caps, ticks and min SPD, and the other min stats.  Locks and
+    blocked items are already applied to the candidates.  A rejected build
+    has no solution in the unit model.
     """
-    Solve for ONE unit:
-    - pick exactly 1 rune per slot (1..6)
-    - pick exactly 1 attribute artifact (type 1) and 1 type artifact (type 2)
-    - pick exactly 1 build
-    - enforce build mainstats (2/4/6) + build set_option + artifact constraints
-    - objective: maximize rune weight - priority penalty
+    table = _slot_stat_table(runes_by_slot, base_hp, base_atk, base_def, account)
+    swift_bonus = int(int(base_spd or 0) * 25 / 100)
+    spd_offset = int(base_spd or 0) + int(base_spd_bonus_flat or 0)
+    base_by_key = {
+        "HP": int(base_hp or 0), "ATK": int(base_atk or 0), "DEF": int(base_def or 0),
+        "CR": int(base_cr or 0), "CD": int(base_cd or 0), "RES": int(base_res or 0), "ACC": int(base_acc or 0),
+    }
+    reasons: List[str] = []
+    for b in builds:
+        reasons.append("")
+        groups_by_slot: Dict[int, List[_RuneGroupStats]] = {}
+        for slot in range(1, 7):
+            allowed = (b.mainstats or {}).get(slot) or [] if slot in (2, 4, 6) else []
+            groups_by_slot[slot] = [g for key, g in table[slot].items() if not allowed or not key or key in allowed]
+            if not groups_by_slot[slot]:
+                reasons[-1] = tr("opt.mainstat_missing", name=b.name, slot=slot, allowed=allowed)
+                break
+        if reasons[-1]:
+            continue
+
+        focus_cfg = dict(getattr(b, "artifact_focus", {}) or {})
+        subs_cfg = dict(getattr(b, "artifact_substats", {}) or {})
+        for art_type, key in ((1, "attribute"), (2, "type")):
+            if not any(_artifact_allowed_by_build(b, art_type, a) for a in artifacts_by_type.get(art_type, [])):
+                reasons[-1] = tr(
+                    "opt.no_artifact_match",
+                    name=b.name,
+                    kind=tr("artifact.attribute") if art_type == 1 else tr("artifact.type"),
+                    focus=[str(x).upper() for x in (focus_cfg.get(key) or []) if str(x)] or "Any",
+                    subs=[int(x) for x in (subs_cfg.get(key) or []) if int(x) > 0][:2] or "Any",
+                )
+                break
+        if reasons[-1]:
+            continue
+
+        if b.set_options:
+            reasons[-1] = _preflight_set_reason(b, groups_by_slot)
+            if reasons[-1]:
+                continue
+
+        lo = int(min_final_speed or 0) if int(min_final_speed or 0) > 0 else 0
+        hi = int(max_final_speed or 0) if int(max_final_speed or 0) > 0 else 10**9
+        tick = int(getattr(b, "spd_tick", 0) or 0)
+        if str(mode or "").strip().lower() != "arena_rush" and tick != 0:
+            lo = max(lo, int(min_spd_for_tick(tick, mode) or 0))
+            tick_max = int(max_spd_for_tick(tick, mode) or 0)
+            if tick_max > 0:
+                hi = min(hi, tick_max)
+        mins = {str(k).strip().upper(): int(v or 0) for k, v in dict(getattr(b, "min_stats", {}) or {}).items()}
+        if mins.get("SPD", 0) > 0:
+            lo = max(lo, mins["SPD"] + int(base_spd_bonus_flat or 0))
+        if mins.get("SPD_NO_BASE", 0) > 0:
+            lo = max(lo, spd_offset + mins["SPD_NO_BASE"])
+        swift_slots = sum(1 for groups in groups_by_slot.values() if any(_SWIFT_SET_ID in g.set_ids for g in groups))
+        forced_swift_slots = sum(1 for groups in groups_by_slot.values() if all(g.all_swift for g in groups))
+        spd_max = spd_offset + sum(max(g.spd_max for g in groups) for groups in groups_by_slot.values())
+        spd_min = spd_offset + sum(min(g.spd_min for g in groups) for groups in groups_by_slot.values())
+        spd_max += swift_bonus if swift_slots >= _SWIFT_SET_PIECES else 0
+        spd_min += swift_bonus if forced_swift_slots >= _SWIFT_SET_PIECES else 0
+        if lo > hi or spd_max < lo or spd_min > hi:
+            reasons[-1] = tr(
+                "opt.preflight_speed", name=b.name, lo=lo, hi=(hi if hi < 10**9 else "-"), min=spd_min, max=spd_max
+            )
+            continue
+
+        for stat_key, target in mins.items():
+            name = stat_key[:-len("_NO_BASE")] if stat_key.endswith("_NO_BASE") else stat_key
+            if target <= 0 or name == "SPD" or name not in base_by_key:
+                continue
+            runes_max = sum(max(g.stat_max[name] for g in groups) for groups in groups_by_slot.values())
+            if name in _PREFLIGHT_PRIMARY_STATS and stat_key.endswith("_NO_BASE"):
+                possible = int(runes_max)
+            elif name in _PREFLIGHT_PRIMARY_STATS:
+                possible = base_by_key[name] + int(runes_max)
+            elif stat_key.endswith("_NO_BASE"):
+                continue
+            else:
+                possible = base_by_key[name] + int(runes_max)
+            if possible < target:
+                reasons[-1] = tr("opt.preflight_min_stat", name=b.name, stat=stat_key, target=target, max=possible)
+                break
+    return reasons
+
+
+@dataclass(frozen=True)
+class _BaselineGuard:
+    """Soft guard against regressing below the baseline build of a unit."""
+
+    constraint: Any  # guard_shortfall >= baseline score - candidate score
+    penalty: cp_model.LinearExpr
+    rune_ids: frozenset
+    artifact_ids: frozenset
+
+
+@dataclass
+class _UnitModelTemplate:
+    """CP-SAT model of one unit over its full candidate pool.
+
+    Holds everything that stays the same between greedy/refine passes: the
+    selection variables, build/set/mainstat/min-stat constraints, the speed
+    expression and the hint/overcap objective terms.  Each solve works on a
+    clone; see ``_solve_single_unit_best`` for the per-solve part.
     """
-    if is_cancelled and is_cancelled():
-        return GreedyUnitResult(uid, False, tr("opt.cancelled"), runes_by_slot={})
 
-    # candidates by slot
+    model: cp_model.CpModel
+    builds: List[Build]
+    x: Dict[Tuple[int, int], cp_model.IntVar]
+    xa: Dict[Tuple[int, int], cp_model.IntVar]
+    use_build: Dict[int, cp_model.IntVar]
+    option_vars_by_build: Dict[int, List[cp_model.IntVar]]
+    final_speed_expr: cp_model.LinearExpr
+    static_quality_terms: List[cp_model.LinearExpr]
+    item_quality_terms: Callable[[str], List[cp_model.LinearExpr]]
+    guard: Optional[_BaselineGuard] = None
+    # representative rune_id -> all rune_ids its x variable stands for
+    rune_members: Dict[int, Tuple[int, ...]] = field(default_factory=dict)
+    # representative rune_id -> (SPD, set_id, mainstat key), see _max_final_speed_by_dp
+    speed_items: Dict[int, Tuple[int, int, str]] = field(default_factory=dict)
+    _item_quality_by_mode: Dict[str, cp_model.LinearExpr] = field(default_factory=dict)
+
+    def item_quality_expr(self, objective_mode: str) -> cp_model.LinearExpr:
+        key = "efficiency" if str(objective_mode) == "efficiency" else "balanced"
+        expr = self._item_quality_by_mode.get(key)
+        if expr is None:
+            expr = sum(self.item_quality_terms(key))
+            self._item_quality_by_mode[key] = expr
+        return expr
+
+
+# Pool fingerprints kept per run; a pass hands the same pool lists to all its unit solves.
+_POOL_FINGERPRINTS_MAX = 64
+
+
+class _UnitModelTemplateCache:
+    """Unit model templates of one optimization run, shared by all its passes."""
+
+    def __init__(self) -> None:
+        self._templates: Dict[Tuple[Any, ...], _UnitModelTemplate] = {}
+        self._fingerprints: "OrderedDict[Tuple[int, int], Tuple[List[Rune], List[Artifact], str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._templates)
+
+    def get_or_build(
+        self,
+        key: Tuple[Any, ...],
+        build: Callable[[], _UnitModelTemplate],
+    ) -> _UnitModelTemplate:
+        with self._lock:
+            template = self._templates.get(key)
+        if template is None:
+            template = build()
+            with self._lock:
+                template = self._templates.setdefault(key, template)
+        return template
+
+    def items_fingerprint(self, pool: List[Rune], artifact_pool: List[Artifact]) -> str:
+        """``_items_fingerprint`` of pool lists this run already hashed (pools are not changed once built)."""
+        key = (id(pool), id(artifact_pool))
+        with self._lock:
+            entry = self._fingerprints.get(key)
+        # Entries hold the lists, so a matching id is the same list.
+        if entry is not None and entry[0] is pool and entry[1] is artifact_pool:
+            return entry[2]
+        fingerprint = _items_fingerprint(pool, artifact_pool)
+        with self._lock:
+            self._fingerprints[key] = (pool, artifact_pool, fingerprint)
+            while len(self._fingerprints) > _POOL_FINGERPRINTS_MAX:
+                self._fingerprints.popitem(last=False)
+        return fingerprint
+
+
+UNIT_SOLVE_CACHE_VERSION = 2
+
+
+class UnitSolveCache:
+    """Single-unit solve results shared across optimization runs.
+
+    Keys cover every input of ``_solve_single_unit_best`` that shapes the
+    result (unit, candidate pool contents, builds, caps, locks, penalties,
+    objective mode), so an identical sub-problem is answered without a
+    solve.  A hit also needs the stored solve to be proven optimal or to have
+    had at least the requested time limit.  Only successful results are kept,
+    least recently used first out.  With *path*, entries are loaded from and
+    ``save()``d to a JSON file.
+    """
+
+    def __init__(self, max_entries: int = 4096, path: str | Path | None = None) -> None:
+        self.max_entries = int(max(1, int(max_entries)))
+        self.path = Path(path) if path else None
+        self._entries: OrderedDict[str, Tuple[Dict[str, Any], float, bool]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if self.path is not None:
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def key_digest(key: Tuple[Any, ...]) -> str:
+        return hashlib.blake2b(repr(key).encode("utf-8"), digest_size=20).hexdigest()
+
+    def get(self, key: str, time_limit_s: float) -> Optional[GreedyUnitResult]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or not (entry[2] or float(entry[1]) >= float(time_limit_s)):
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return _unit_result_from_dict(entry[0])
+
+    def put(self, key: str, result: GreedyUnitResult, time_limit_s: float, optimal: bool) -> None:
+        if not result.ok:
+            return
+        with self._lock:
+            old = self._entries.get(key)
+            if old is not None and (old[2] or float(old[1]) > float(time_limit_s)) and not optimal:
+                return
+            self._entries[key] = (_unit_result_to_dict(result), float(time_limit_s), bool(optimal))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _load(self) -> None:
+        try:
+            raw = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if not isinstance(raw, dict) or int(raw.get("version") or 0) != UNIT_SOLVE_CACHE_VERSION:
+            return
+        for key, entry in list(raw.get("entries") or [])[-self.max_entries:]:
+            try:
+                self._entries[str(key)] = (dict(entry["result"]), float(entry["time_limit_s"]), bool(entry["optimal"]))
+            except (KeyError, TypeError, ValueError):
+                continue
+
+    def save(self) -> bool:
+        """Write the disk layer (best effort; False if there is none or it failed)."""
+        if self.path is None:
+            return False
+        with self._lock:
+            entries = [
+                [key, {"result": res, "time_limit_s": limit, "optimal": optimal}]
+                for key, (res, limit, optimal) in self._entries.items()
+            ]
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        try:
+            tmp.write_text(json.dumps({"version": UNIT_SOLVE_CACHE_VERSION, "entries": entries}), encoding="utf-8")
+            os.replace(tmp, self.path)
+            return True
+        except OSError:
+            try:
+                tmp.unlink()
+            except OSError:
+                pass
+            return False
+
+
+def _unit_result_to_dict(r: GreedyUnitResult) -> Dict[str, Any]:
+    return {
+        "unit_id": int(r.unit_id),
+        "message": str(r.message or ""),
+        "chosen_build_id": str(r.chosen_build_id or ""),
+        "chosen_build_name": str(r.chosen_build_name or ""),
+        "runes_by_slot": {str(k): int(v) for k, v in (r.runes_by_slot or {}).items()},
+        "artifacts_by_type": {str(k): int(v) for k, v in (r.artifacts_by_type or {}).items()},
+        "final_speed": int(r.final_speed or 0),
+    }
+
+
+def _unit_result_from_dict(d: Dict[str, Any]) -> GreedyUnitResult:
+    return GreedyUnitResult(
+        unit_id=int(d["unit_id"]),
+        ok=True,
+        message=str(d.get("message") or "OK"),
+        chosen_build_id=str(d.get("chosen_build_id") or ""),
+        chosen_build_name=str(d.get("chosen_build_name") or ""),
+        runes_by_slot={int(k): int(v) for k, v in dict(d.get("runes_by_slot") or {}).items()},
+        artifacts_by_type={int(k): int(v) for k, v in dict(d.get("artifacts_by_type") or {}).items()},
+        final_speed=int(d.get("final_speed") or 0),
+    )
+
+
+def _item_digest(item: Any) -> bytes:
+    return hashlib.blake2b(repr(item).encode("utf-8"), digest_size=16).digest()
+
+
+def _items_fingerprint(pool: List[Rune], artifact_pool: List[Artifact]) -> str:
+    """Content hash of a candidate pool (stats, upgrades and owners included)."""
+    h = hashlib.blake2b(digest_size=20)
+    for rune in pool:
+        h.update(rune_memo(rune, "fingerprint", lambda: _item_digest(rune)))
+    h.update(b"|")
+    for art in artifact_pool:
+        h.update(artifact_memo(art, "fingerprint", lambda: _item_digest(art)))
+    return h.hexdigest()
+
+
+def _unit_candidates(
+    pool: List[Rune],
+    artifact_pool: List[Artifact],
+    fixed_runes_by_slot: Optional[Dict[int, int]],
+    fixed_artifacts_by_type: Optional[Dict[int, int]],
+) -> Tuple[Dict[int, List[Rune]], Dict[int, List[Artifact]], str]:
+    """Runes per slot and artifacts per type a unit can wear, locks applied.
+
+    The message is empty when every slot and artifact type has a candidate,
+    otherwise it says why the unit cannot be built from these pools.
+    """
     runes_by_slot: Dict[int, List[Rune]] = {s: [] for s in range(1, 7)}
+    artifacts_by_type: Dict[int, List[Artifact]] = {1: [], 2: []}
     for r in pool:
         if 1 <= r.slot_no <= 6:
             runes_by_slot[r.slot_no].append(r)
@@ -2521,20 +2976,18 @@ def _solve_single_unit_best(
     for slot, rune_id in locked_runes.items():
         matches = [r for r in runes_by_slot.get(int(slot), []) if int(r.rune_id or 0) == int(rune_id)]
         if not matches:
-            return GreedyUnitResult(
-                uid,
-                False,
+            return (
+                runes_by_slot,
+                artifacts_by_type,
                 f"Lock-Constraint verletzt: Rune {int(rune_id)} ist fuer Slot {int(slot)} nicht verfuegbar.",
-                runes_by_slot={},
             )
         runes_by_slot[int(slot)] = matches
 
     # Hard feasibility: each slot must have >= 1 candidate
     for s in range(1, 7):
         if not runes_by_slot[s]:
-            return GreedyUnitResult(uid, False, tr("opt.slot_no_runes", slot=s), runes_by_slot={})
+            return runes_by_slot, artifacts_by_type, tr("opt.slot_no_runes", slot=s)
 
-    artifacts_by_type: Dict[int, List[Artifact]] = {1: [], 2: []}
     for art in artifact_pool:
         t = int(art.type_ or 0)
         if t in (1, 2):
@@ -2551,84 +3004,881 @@ def _solve_single_unit_best(
             if int(a.artifact_id or 0) == int(art_id)
         ]
         if not matches:
-            return GreedyUnitResult(
-                uid,
-                False,
+            return (
+                runes_by_slot,
+                artifacts_by_type,
                 f"Lock-Constraint verletzt: Artefakt {int(art_id)} ist fuer Typ {int(art_type)} nicht verfuegbar.",
-                runes_by_slot={},
             )
         artifacts_by_type[int(art_type)] = matches
 
     if not artifacts_by_type[1]:
-        return GreedyUnitResult(uid, False, tr("opt.no_attr_artifact"), runes_by_slot={})
+        return runes_by_slot, artifacts_by_type, tr("opt.no_attr_artifact")
     if not artifacts_by_type[2]:
-        return GreedyUnitResult(uid, False, tr("opt.no_type_artifact"), runes_by_slot={})
+        return runes_by_slot, artifacts_by_type, tr("opt.no_type_artifact")
+
+    return runes_by_slot, artifacts_by_type, ""
+
+
+# Rune stat columns (STAT_IDS order) a build min-stat constraint reads.
+_MIN_STAT_RUNE_COLS: Dict[str, Tuple[int, ...]] = {
+    "HP": (0, 1),
+    "HP_NO_BASE": (0, 1),
+    "ATK": (2, 3),
+    "ATK_NO_BASE": (2, 3),
+    "DEF": (4, 5),
+    "DEF_NO_BASE": (4, 5),
+    "SPD": (6,),
+    "SPD_NO_BASE": (6,),
+    "CR": (7,),
+    "CD": (8,),
+    "RES": (9,),
+    "ACC": (10,),
+}
+_SPD_COL = 6
+_OVERCAP_COLS = (7, 9, 10)  # CR, RES, ACC
 
-    model = cp_model.CpModel()
 
-    # x[slot, rune_id]
-    x: Dict[Tuple[int, int], cp_model.IntVar] = {}
-    for slot in range(1, 7):
-        vs = []
-        for r in runes_by_slot[slot]:
-            v = model.NewBoolVar(f"x_u{uid}_s{slot}_r{r.rune_id}")
-            x[(slot, r.rune_id)] = v
-            vs.append(v)
-        model.Add(sum(vs) == 1)
+def _prune_dominated_runes(
+    runes_by_slot: Dict[int, List[Rune]],
+    rune_stats: Dict[int, List[int]],
+    objective_coefs: Dict[int, Tuple[int, ...]],
+    stat_cols: Tuple[int, ...],
+    exact_cols: Tuple[int, ...],
+    keep: int,
+) -> Dict[int, List[Rune]]:
+    """Drop runes that at least *keep* remaining runes of their bucket dominate.
+
+    Buckets are (slot, set, mainstat) plus the *exact_cols* values.  Rune j
+    dominates rune i when it is at least as good in every objective
+    coefficient (after paying the worst-case CR/RES/ACC overcap penalty for
+    its extra points) and in every constrained *stat_cols* value, so j can
+    replace i in any solution.  With *keep* larger than the number of runes
+    other units (and the avoid penalty) can take away, one dominator is
+    always left and the optimum is unchanged.
+    """
+    keep = max(1, int(keep))
+    overcap_weights = np.array(
+        [CR_OVERCAP_PENALTY_PER_POINT, RES_OVERCAP_PENALTY_PER_POINT, ACC_OVERCAP_PENALTY_PER_POINT],
+        dtype=np.int64,
+    ) * int(SINGLE_SOLVER_OVERCAP_PENALTY_SCALE)
+    out: Dict[int, List[Rune]] = {}
+    for slot, runes in runes_by_slot.items():
+        buckets: Dict[Tuple[int, ...], List[Rune]] = {}
+        for r in runes:
+            stats = rune_stats[int(r.rune_id)]
+            key = (int(r.set_id or 0), int(r.pri_eff[0] or 0), *(int(stats[c]) for c in exact_cols))
+            buckets.setdefault(key, []).append(r)
+        kept_ids: Set[int] = set()
+        for members in buckets.values():
+            if len(members) <= keep:
+                kept_ids.update(int(r.rune_id) for r in members)
+                continue
+            rids = np.array([int(r.rune_id) for r in members], dtype=np.int64)
+            obj = np.array([objective_coefs[int(rid)] for rid in rids.tolist()], dtype=np.int64)
+            stats_arr = np.array([rune_stats[int(rid)] for rid in rids.tolist()], dtype=np.int64)
+            better = stats_arr[:, list(stat_cols)]
+            over = stats_arr[:, list(_OVERCAP_COLS)]
+            # Any dominator sorts before the runes it dominates.
+            order = np.lexsort((rids, over.sum(axis=1), -(obj.sum(axis=1) + better.sum(axis=1))))
+            rids, obj, better, over = rids[order], obj[order], better[order], over[order]
+            margin = (np.maximum(over[None, :, :] - over[:, None, :], 0) * overcap_weights).sum(axis=2)
+            dominated_by = np.all(obj[None, :, :] - margin[:, :, None] >= obj[:, None, :], axis=2)
+            dominated_by &= np.all(better[None, :, :] >= better[:, None, :], axis=2)
+            kept: List[int] = []
+            for i in range(len(rids)):
+                if len(kept) >= keep and int(dominated_by[i, kept].sum()) >= keep:
+                    continue
+                kept.append(i)
+            kept_ids.update(rids[kept].tolist())
+        out[slot] = [r for r in runes if int(r.rune_id) in kept_ids]
+    return out
 
-    # rune unique within this unit is automatically true because each rune has fixed slot,
-    # but keep it safe anyway (in case slot_no mismatch exists)
-    for r in pool:
-        uses = []
-        for slot in range(1, 7):
-            key = (slot, r.rune_id)
-            if key in x:
-                uses.append(x[key])
-        if uses:
-            model.Add(sum(uses) <= 1)
 
-    # artifact selection: exactly one per artifact type (1=attribute, 2=type)
-    xa: Dict[Tuple[int, int], cp_model.IntVar] = {}
-    for art_type in (1, 2):
-        vars_for_type: List[cp_model.IntVar] = []
-        for art in artifacts_by_type[art_type]:
-            v = model.NewBoolVar(f"xa_u{uid}_t{art_type}_a{int(art.artifact_id)}")
-            xa[(art_type, int(art.artifact_id))] = v
-            vars_for_type.append(v)
-        model.Add(sum(vars_for_type) == 1)
+def _rune_equivalence_key(r: Rune, owner_ids: Set[int]) -> Tuple[Any, ...]:
+    """Everything the solvers read from a rune except its id.
 
-    # build selection
-    if not builds:
-        builds = [Build.default_any()]
+    Ownership only matters for the units being optimized (equipped bonus).
+    """
+    owner = int(r.occupied_id or 0) if int(r.occupied_type or 0) == 1 else 0
+    return (
+        int(r.slot_no or 0),
+        int(r.set_id or 0),
+        int(r.rank or 0),
+        int(r.rune_class or 0),
+        int(r.origin_class or 0),
+        int(r.upgrade_curr or 0),
+        tuple(r.pri_eff or ()),
+        tuple(r.prefix_eff or ()),
+        tuple(sorted(tuple(sec) for sec in (r.sec_eff or ()))),
+        owner if owner in owner_ids else 0,
+    )
 
-    use_build: Dict[int, cp_model.IntVar] = {}
-    for b_idx, b in enumerate(builds):
-        use_build[b_idx] = model.NewBoolVar(f"use_build_u{uid}_b{b_idx}")
-    model.Add(sum(use_build.values()) == 1)
 
-    set_choice_vars: Dict[int, List[cp_model.IntVar]] = {}
-    for slot in range(1, 7):
-        for r in runes_by_slot[slot]:
-            sid = int(r.set_id or 0)
-            set_choice_vars.setdefault(sid, []).append(x[(slot, r.rune_id)])
-    intangible_piece_vars = set_choice_vars.get(int(INTANGIBLE_SET_ID), [])
-    intangible_piece_count_expr = sum(intangible_piece_vars) if intangible_piece_vars else 0
+def _collapse_equivalent_runes(
+    runes_by_slot: Dict[int, List[Rune]],
+    owner_ids: Set[int],
+    distinct_ids: Optional[Set[int]] = None,
+) -> Tuple[Dict[int, List[Rune]], Dict[int, Tuple[int, ...]]]:
+    """One representative rune per class of interchangeable runes.
+
+    Returns the representatives per slot (first member of each class, pool
+    order kept) and ``rep rune_id -> member rune_ids``.  Runes in
+    *distinct_ids* (locks, baselines, RTA equips) always form their own class.
+    """
+    distinct = set(distinct_ids or ())
+    reps_by_slot: Dict[int, List[Rune]] = {}
+    members: Dict[int, List[int]] = {}
+    for slot, runes in runes_by_slot.items():
+        rep_by_key: Dict[Tuple[Any, ...], int] = {}
+        reps: List[Rune] = []
+        for r in runes:
+            rid = int(r.rune_id)
+            key = ("id", rid) if rid in distinct else _rune_equivalence_key(r, owner_ids)
+            rep = rep_by_key.get(key)
+            if rep is None:
+                rep_by_key[key] = rid
+                members[rid] = [rid]
+                reps.append(r)
+            else:
+                members[rep].append(rid)
+        reps_by_slot[slot] = reps
+    return reps_by_slot, {rep: tuple(ids) for rep, ids in members.items()}
 
-    # for each build, add constraints only if chosen
-    # set options: if present => choose one option if build chosen
-    option_bias_terms = []
-    apply_rune_set_fallback = not any(bool(getattr(bb, "set_options", []) or []) for bb in (builds or []))
-    fallback_rune_set_ids: List[int] = []
-    if apply_rune_set_fallback:
-        unit_obj = account.units_by_id.get(int(uid))
-        master_id = int((unit_obj.unit_master_id if unit_obj else 0) or 0)
-        fallback_rune_set_ids = _preferred_rune_set_ids_for_monster(master_id, role=str(unit_archetype or ""))
-    for b_idx, b in enumerate(builds):
-        vb = use_build[b_idx]
 
-        # mainstats
-        for slot in (2, 4, 6):
-            allowed = (b.mainstats or {}).get(slot) or []
+def saved_optimization_hints(
+    saved: SavedOptimization,
+) -> Tuple[Dict[int, Dict[int, int]], Dict[int, Dict[int, int]]]:
+    """Per-unit rune and artifact hints of a saved optimization.
+
+    The result fits ``GreedyRequest.unit_hint_runes_by_slot`` and
+    ``GreedyRequest.unit_hint_artifacts_by_type``.
+    """
+    runes: Dict[int, Dict[int, int]] = {}
+    artifacts: Dict[int, Dict[int, int]] = {}
+    for res in saved.results or []:
+        uid = int(res.unit_id or 0)
+        if uid <= 0:
+            continue
+        by_slot = {int(s): int(rid) for s, rid in (res.runes_by_slot or {}).items() if int(rid or 0) > 0}
+        by_type = {int(t): int(aid) for t, aid in (res.artifacts_by_type or {}).items() if int(aid or 0) > 0}
+        if by_slot:
+            runes[uid] = by_slot
+        if by_type:
+            artifacts[uid] = by_type
+    return runes, artifacts
+
+
+def _warm_start_hint_vars(
+    rune_vars_by_slot: Dict[int, Dict[int, cp_model.IntVar]],
+    artifact_vars_by_type: Dict[int, Dict[int, cp_model.IntVar]],
+    hint_runes_by_slot: Optional[Dict[int, int]],
+    hint_artifacts_by_type: Optional[Dict[int, int]],
+    feasible_only: bool,
+) -> List[cp_model.IntVar]:
+    """Variables to hint to 1 for one unit's hinted runes and artifacts.
+
+    The ``*_vars_by_*`` maps hold every currently selectable item id (class
+    members included) and its variable.  With *feasible_only*, a hint naming
+    an item that is no longer selectable is dropped as a whole; otherwise
+    the selectable part is kept as a partial hint.
+    """
+    hinted: List[cp_model.IntVar] = []
+    wanted = [
+        (rune_vars_by_slot.get(int(slot), {}), int(rid or 0))
+        for slot, rid in (hint_runes_by_slot or {}).items()
+    ]
+    wanted.extend(
+        (artifact_vars_by_type.get(int(art_type), {}), int(aid or 0))
+        for art_type, aid in (hint_artifacts_by_type or {}).items()
+    )
+    for var_by_id, item_id in wanted:
+        var = var_by_id.get(item_id)
+        if var is None:
+            if feasible_only:
+                return []
+            continue
+        hinted.append(var)
+    return hinted
+
+
+def _add_warm_start_hints(model: cp_model.CpModel, hinted: List[cp_model.IntVar]) -> None:
+    seen: Set[int] = set()
+    for var in hinted:
+        if var.Index() not in seen:
+            seen.add(var.Index())
+            model.AddHint(var, 1)
+
+
+# Improvements below this share of the incumbent objective count as none.
+_PLATEAU_MIN_REL_GAIN = 1e-4
+
+
+class _PlateauMonitor(cp_model.CpSolverSolutionCallback):
+    """Stops a maximization once its objective stops improving.
+
+    CP-SAT only reports improving solutions, so a gain below
+    *min_rel_gain* of the incumbent counts as no improvement.  The search
+    stops after *window_solutions* such solutions in a row or *window_s*
+    seconds without an improvement; a plateau reports no solutions, so the
+    time window is checked by a watcher thread.  ``improvements`` holds
+    ``(seconds since start, objective)`` of every improvement.
+    """
+
+    def __init__(
+        self,
+        solver: cp_model.CpSolver,
+        window_s: float,
+        window_solutions: int = 0,
+        min_rel_gain: float = _PLATEAU_MIN_REL_GAIN,
+    ) -> None:
+        super().__init__()
+        self._solver = solver
+        self.window_s = float(max(0.0, float(window_s)))
+        self.window_solutions = int(max(0, int(window_solutions)))
+        self.min_rel_gain = float(max(0.0, float(min_rel_gain)))
+        self.improvements: List[Tuple[float, float]] = []
+        self.stopped = False
+        self._stale_solutions = 0
+        self._started = 0.0
+        self._last_improvement = 0.0
+        self._lock = threading.Lock()
+
+    def on_solution_callback(self) -> None:
+        now = time.monotonic()
+        objective = float(self.ObjectiveValue())
+        with self._lock:
+            best = self.improvements[-1][1] if self.improvements else None
+            if best is None or objective - best > self.min_rel_gain * max(1.0, abs(best)):
+                self.improvements.append((now - self._started, objective))
+                self._last_improvement = now
+                self._stale_solutions = 0
+                return
+            self._stale_solutions += 1
+            stop = self.window_solutions > 0 and self._stale_solutions >= self.window_solutions
+        if stop:
+            self.stopped = True
+            self.StopSearch()
+
+    def _watch(self, done: threading.Event) -> None:
+        poll = min(0.25, max(0.02, self.window_s / 4.0))
+        while not done.wait(poll):
+            with self._lock:
+                idle = bool(self.improvements) and time.monotonic() - self._last_improvement >= self.window_s
+            if idle:
+                self.stopped = True
+                self._solver.StopSearch()
+                return
+
+    def solve(self, model: cp_model.CpModel) -> int:
+        self._started = self._last_improvement = time.monotonic()
+        done = threading.Event()
+        watcher: Optional[threading.Thread] = None
+        if self.window_s > 0.0:
+            watcher = threading.Thread(target=self._watch, args=(done,), daemon=True)
+            watcher.start()
+        try:
+            return self._solver.Solve(model, self)
+        finally:
+            done.set()
+            if watcher is not None:
+                watcher.join()
+
+
+def _solve_until_plateau(
+    solver: cp_model.CpSolver,
+    model: cp_model.CpModel,
+    window_s: float,
+    window_solutions: int = 0,
+    trace: Optional[Callable[[List[Tuple[float, float]], bool], None]] = None,
+) -> int:
+    """``solver.Solve(model)`` with a _PlateauMonitor (both windows 0 = plain solve)."""
+    if float(window_s) <= 0.0 and int(window_solutions) <= 0:
+        return solver.Solve(model)
+    monitor = _PlateauMonitor(solver, window_s, window_solutions)
+    status = monitor.solve(model)
+    if trace is not None:
+        try:
+            trace(list(monitor.improvements), bool(monitor.stopped))
+        except Exception:
+            pass
+    return status
+
+
+_SWIFT_SET_ID = 3
+_SWIFT_SET_PIECES = 4
+
+
+def _max_final_speed_by_dp(
+    speed_items_by_slot: Dict[int, List[Tuple[int, int, str]]],
+    artifacts_by_type: Dict[int, List[Artifact]],
+    builds: List[Build],
+    base_spd: int,
+    base_spd_bonus_flat: int,
+    min_final_speed: Optional[int] = None,
+    max_final_speed: Optional[int] = None,
+    force_swift: bool = False,
+    broken_set_excluded_set_ids: Optional[Set[int]] = None,
+    mode: str = "normal",
+) -> Tuple[Optional[int], bool]:
+    """Maximum final speed of the single-unit model, without CP-SAT.
+
+    *speed_items_by_slot* holds ``(spd, set_id, mainstat key)`` of every
+    selectable rune per slot, *artifacts_by_type* the selectable artifacts.
+    A dynamic program over the six slots tracks the piece counts of Swift and
+    of the sets each set option needs, with the reachable SPD sums of a state
+    as an int bitmask; mainstat and artifact filters, Intangible replacement,
+    broken-set exclusions, SPD min stats/ticks and *min_final_speed* /
+    *max_final_speed* are applied exactly.  *force_swift* requires the Swift
+    set (the model forces it when it has Swift runes at all).
+
+    Returns ``(speed, exact)``.  Builds with other min stats are relaxed (those
+    are ignored), so ``exact`` is False when such a build may be the fastest
+    and the speed is then only an upper bound.  ``None`` means no assignment
+    satisfies even the relaxed constraints.
+    """
+    if any(not speed_items_by_slot.get(slot) for slot in range(1, 7)):
+        return None, True
+    excluded = {int(sid) for sid in (broken_set_excluded_set_ids or ()) if int(sid or 0) > 0}
+    swift_bonus = int(int(base_spd or 0) * 25 / 100)
+    apply_native_spd_tick = str(mode or "").strip().lower() != "arena_rush"
+    best_exact: Optional[int] = None
+    best_relaxed: Optional[int] = None
+
+    for b in builds:
+        if any(
+            not any(_artifact_allowed_by_build(b, art_type, a) for a in artifacts_by_type.get(art_type, []))
+            for art_type in (1, 2)
+        ):
+            continue
+        min_stats = {str(k).upper(): int(v or 0) for k, v in dict(getattr(b, "min_stats", {}) or {}).items()}
+        exact = not any(v > 0 for k, v in min_stats.items() if k not in ("SPD", "SPD_NO_BASE"))
+        spd_tick = int(getattr(b, "spd_tick", 0) or 0)
+        lo = max(
+            int(min_final_speed or 0),
+            int(min_stats.get("SPD", 0)) + int(base_spd_bonus_flat or 0),
+            int(base_spd or 0) + int(min_stats.get("SPD_NO_BASE", 0)) + int(base_spd_bonus_flat or 0),
+            int(min_spd_for_tick(spd_tick, mode) or 0) if apply_native_spd_tick else 0,
+        )
+        hi_caps = [int(max_final_speed or 0)]
+        if apply_native_spd_tick and spd_tick != 0:
+            hi_caps.append(int(max_spd_for_tick(spd_tick, mode) or 0))
+        hi_caps = [c for c in hi_caps if c > 0]
+        hi = min(hi_caps) if hi_caps else None
+
+        options: List[Optional[Dict[int, int]]] = [
+            _count_required_set_pieces([str(x) for x in opt]) for opt in (b.set_options or [])
+        ] or [None]
+        for needed in options:
+            caps: Dict[int, int] = {_SWIFT_SET_ID: _SWIFT_SET_PIECES}
+            if needed is not None:
+                caps[int(INTANGIBLE_SET_ID)] = 1
+                for sid, pieces in needed.items():
+                    caps[int(sid)] = max(caps.get(int(sid), 0), int(pieces))
+                for sid in excluded:
+                    caps[sid] = max(caps.get(sid, 0), int(needed.get(sid, 0)) + 1)
+            tracked = sorted(caps)
+            col = {sid: i for i, sid in enumerate(tracked)}
+            limit = [caps[sid] for sid in tracked]
+
+            # state (capped piece counts) -> bitmask of reachable rune SPD sums
+            states: Dict[Tuple[int, ...], int] = {tuple(0 for _ in tracked): 1}
+            for slot in range(1, 7):
+                allowed = ((b.mainstats or {}).get(slot) or []) if slot in (2, 4, 6) else []
+                spds_by_col: Dict[int, Set[int]] = {}
+                for spd, sid, key in speed_items_by_slot[slot]:
+                    if allowed and key and key not in allowed:
+                        continue
+                    spds_by_col.setdefault(col.get(int(sid), -1), set()).add(max(0, int(spd)))
+                next_states: Dict[Tuple[int, ...], int] = {}
+                for state, mask in states.items():
+                    for c, spds in spds_by_col.items():
+                        key_state = state
+                        if c >= 0 and state[c] < limit[c]:
+                            key_state = state[:c] + (state[c] + 1,) + state[c + 1:]
+                        shifted = 0
+                        for spd in spds:
+                            shifted |= mask << spd
+                        next_states[key_state] = next_states.get(key_state, 0) | shifted
+                states = next_states
+                if not states:
+                    break
+
+            for state, mask in states.items():
+                if needed is not None:
+                    intangible = state[col[int(INTANGIBLE_SET_ID)]]
+                    replaced = 0
+                    met = True
+                    for sid, pieces in needed.items():
+                        have = state[col[int(sid)]]
+                        if int(sid) == int(INTANGIBLE_SET_ID) or have >= int(pieces):
+                            met = met and have >= int(pieces)
+                        elif have + 1 == int(pieces):
+                            replaced += 1
+                        else:
+                            met = False
+                    # Excluded sets may not fill broken slots beyond what the option needs.
+                    met = met and all(state[col[sid]] <= int(needed.get(sid, 0)) for sid in excluded)
+                    if not met or replaced > min(1, intangible):
+                        continue
+                swift_active = state[col[_SWIFT_SET_ID]] >= _SWIFT_SET_PIECES
+                if force_swift and not swift_active:
+                    continue
+                offset = int(base_spd or 0) + int(base_spd_bonus_flat or 0) + (swift_bonus if swift_active else 0)
+                if hi is not None:
+                    if hi < offset:
+                        continue
+                    mask &= (1 << (hi - offset + 1)) - 1
+                if not mask:
+                    continue
+                speed = offset + mask.bit_length() - 1
+                if speed < lo:
+                    continue
+                if exact:
+                    best_exact = speed if best_exact is None else max(best_exact, speed)
+                else:
+                    best_relaxed = speed if best_relaxed is None else max(best_relaxed, speed)
+
+    if best_relaxed is not None and (best_exact is None or best_relaxed > best_exact):
+        return best_relaxed, False
+    return best_exact, True
+
+
+def _build_unit_model_template(
+    uid: int,
+    pool: List[Rune],
+    artifact_pool: List[Artifact],
+    builds: List[Build],
+    base_hp: int,
+    base_atk: int,
+    base_def: int,
+    base_spd: int,
+    base_spd_bonus_flat: int,
+    base_cr: int,
+    base_cd: int,
+    base_res: int,
+    base_acc: int,
+    account: Optional[AccountData],
+    rta_rune_ids_for_unit: Optional[Set[int]],
+    rta_artifact_ids_for_unit: Optional[Set[int]],
+    fixed_runes_by_slot: Optional[Dict[int, int]],
+    fixed_artifacts_by_type: Optional[Dict[int, int]],
+    baseline_runes_by_slot: Optional[Dict[int, int]],
+    baseline_artifacts_by_type: Optional[Dict[int, int]],
+    baseline_regression_guard_weight: int,
+    force_speed_priority: bool,
+    arena_rush_damage_bias: bool,
+    unit_archetype: str,
+    artifact_hints: Optional[Dict[str, Any]],
+    broken_set_excluded_set_ids: Optional[Set[int]],
+    mode: str,
+    dominance_keep: int = 0,
+    speed_cap_possible: bool = True,
+) -> _UnitModelTemplate:
+    """Hard constraints and pass-independent objective terms of one unit.
+
+    Interchangeable runes share one variable (see ``_collapse_equivalent_runes``);
+    with *dominance_keep* > 0 runes dominated by that many others of their
+    (slot, set, mainstat) bucket get no variable at all.
+    """
+    runes_by_slot, artifacts_by_type, _ = _unit_candidates(
+        pool, artifact_pool, fixed_runes_by_slot, fixed_artifacts_by_type
+    )
+    runes_by_slot, rune_members = _collapse_equivalent_runes(
+        runes_by_slot,
+        owner_ids={int(uid)},
+        distinct_ids=(
+            {int(rid) for rid in (baseline_runes_by_slot or {}).values()}
+            | {int(rid) for rid in (rta_rune_ids_for_unit or ())}
+        ),
+    )
+
+    # Per-item numbers from the columnar tables (stat totals in STAT_IDS order).
+    rune_tbl = rune_table_for(pool, account)
+    rune_rows = rune_tbl.rows_for(pool)
+    pool_rids = rune_tbl.rune_id[rune_rows].tolist()
+    rune_stats: Dict[int, List[int]] = dict(zip(pool_rids, rune_tbl.stats[rune_rows].tolist()))
+    rune_quality: Dict[int, int] = dict(
+        zip(pool_rids, rune_tbl.quality_for_unit(uid, rta_rune_ids_for_unit)[rune_rows].tolist())
+    )
+    rune_eff: Dict[int, float] = dict(zip(pool_rids, rune_tbl.efficiency[rune_rows].tolist()))
+    art_tbl = artifact_table_for(artifact_pool, account)
+    art_rows = art_tbl.rows_for(artifact_pool)
+    pool_aids = art_tbl.artifact_id[art_rows].tolist()
+    art_quality: Dict[int, int] = dict(
+        zip(pool_aids, art_tbl.quality_for_unit(uid, rta_artifact_ids_for_unit)[art_rows].tolist())
+    )
+    art_eff: Dict[int, float] = dict(zip(pool_aids, art_tbl.efficiency[art_rows].tolist()))
+
+    # quality objective (2nd phase after speed is pinned)
+    is_arena_rush_mode = str(mode or "").strip().lower() == "arena_rush"
+    unit_role = _arena_role_from_archetype(str(unit_archetype or ""))
+    artifact_role_for_scoring = str(unit_role)
+    if artifact_role_for_scoring == "unknown":
+        artifact_role_for_scoring = (
+            "attack"
+            if _is_attack_type_unit(base_hp, base_atk, base_def, archetype=str(unit_archetype or ""))
+            else "support"
+        )
+    favor_damage_for_atk_type = (
+        bool(arena_rush_damage_bias)
+        and is_arena_rush_mode
+        and str(unit_role) == "attack"
+    )
+    favor_defense_for_role = bool(
+        is_arena_rush_mode
+        and str(unit_role) in ("defense", "hp", "support")
+    )
+    scaling_stat = _scaling_stat_from_hints(artifact_hints)
+
+    def _rune_objective_coef(r: Rune, objective_mode: str) -> int:
+        coef = 0
+        if str(objective_mode) == "efficiency":
+            if favor_damage_for_atk_type:
+                eff_scale = int(ARENA_RUSH_ATK_EFFICIENCY_SCALE)
+            elif favor_defense_for_role:
+                eff_scale = int(ARENA_RUSH_DEF_EFFICIENCY_SCALE)
+            else:
+                eff_scale = 100
+            eff_bonus = int(round(float(rune_eff[int(r.rune_id)]) * float(eff_scale)))
+            if eff_bonus:
+                coef += eff_bonus
+            if favor_defense_for_role:
+                def_q = int(_rune_quality_score_defensive(r, uid, rta_rune_ids_for_unit))
+                if def_q:
+                    coef += int(ARENA_RUSH_DEF_QUALITY_WEIGHT) * def_q
+            if favor_damage_for_atk_type:
+                dmg_bonus = _rune_damage_score_proxy(r, int(base_atk or 0))
+                if dmg_bonus:
+                    coef += dmg_bonus
+            if favor_defense_for_role:
+                def_bonus = _rune_defensive_score_proxy(
+                    r,
+                    int(base_hp or 0),
+                    int(base_def or 0),
+                    str(unit_archetype or ""),
+                )
+                if def_bonus:
+                    coef += int(ARENA_RUSH_DEF_RUNE_WEIGHT) * def_bonus
+                dmg_penalty = _rune_damage_score_proxy(r, int(base_atk or 0))
+                if dmg_penalty:
+                    coef -= int(ARENA_RUSH_DEF_OFFSTAT_PENALTY_WEIGHT) * int(dmg_penalty)
+            scaling_bonus = int(
+                _rune_scaling_score_proxy(
+                    r,
+                    scaling_stat=str(scaling_stat),
+                    base_hp=int(base_hp or 0),
+                    base_atk=int(base_atk or 0),
+                    base_def=int(base_def or 0),
+                )
+            )
+            if scaling_bonus:
+                coef += int(RUNE_SCALING_BONUS_WEIGHT) * scaling_bonus
+        else:
+            if favor_defense_for_role:
+                w = _rune_quality_score_defensive(r, uid, rta_rune_ids_for_unit)
+            else:
+                w = rune_quality[int(r.rune_id)]
+            coef += w
+            if favor_damage_for_atk_type:
+                eff_weight = int(ARENA_RUSH_ATK_RUNE_EFF_WEIGHT)
+            elif favor_defense_for_role:
+                eff_weight = int(ARENA_RUSH_DEF_EFFICIENCY_SCALE)
+            else:
+                eff_weight = int(RUNE_EFFICIENCY_WEIGHT_SOLVER)
+            eff_bonus = int(round(float(rune_eff[int(r.rune_id)]) * float(eff_weight)))
+            if eff_bonus:
+                coef += eff_bonus
+            if favor_damage_for_atk_type:
+                dmg_bonus = _rune_damage_score_proxy(r, int(base_atk or 0))
+                if dmg_bonus:
+                    coef += dmg_bonus
+            if favor_defense_for_role:
+                def_bonus = _rune_defensive_score_proxy(
+                    r,
+                    int(base_hp or 0),
+                    int(base_def or 0),
+                    str(unit_archetype or ""),
+                )
+                if def_bonus:
+                    coef += int(ARENA_RUSH_DEF_RUNE_WEIGHT) * def_bonus
+                dmg_penalty = _rune_damage_score_proxy(r, int(base_atk or 0))
+                if dmg_penalty:
+                    coef -= int(ARENA_RUSH_DEF_OFFSTAT_PENALTY_WEIGHT) * int(dmg_penalty)
+            scaling_bonus = int(
+                _rune_scaling_score_proxy(
+                    r,
+                    scaling_stat=str(scaling_stat),
+                    base_hp=int(base_hp or 0),
+                    base_atk=int(base_atk or 0),
+                    base_def=int(base_def or 0),
+                )
+            )
+            if scaling_bonus:
+                coef += int(RUNE_SCALING_BONUS_WEIGHT) * scaling_bonus
+        return int(coef)
+
+    def _artifact_objective_coef(art: Artifact, objective_mode: str) -> int:
+        coef = 0
+        if str(objective_mode) == "efficiency":
+            if favor_damage_for_atk_type:
+                eff_scale = int(ARENA_RUSH_ATK_EFFICIENCY_SCALE)
+            elif favor_defense_for_role:
+                eff_scale = int(ARENA_RUSH_DEF_EFFICIENCY_SCALE)
+            else:
+                eff_scale = 100
+            art_eff_bonus = int(round(float(art_eff[int(art.artifact_id)]) * float(eff_scale)))
+            if art_eff_bonus:
+                coef += art_eff_bonus
+            if favor_defense_for_role:
+                def_q = int(
+                    _artifact_quality_score_defensive(
+                        art,
+                        uid,
+                        rta_artifact_ids_for_unit,
+                        archetype=str(unit_archetype or ""),
+                        base_hp=int(base_hp or 0),
+                        base_atk=int(base_atk or 0),
+                        base_def=int(base_def or 0),
+                        base_spd=int(base_spd or 0),
+                    )
+                )
+                if def_q:
+                    coef += int(ARENA_RUSH_DEF_QUALITY_WEIGHT) * def_q
+            if favor_damage_for_atk_type:
+                dmg_bonus = _artifact_damage_score_proxy(
+                    art,
+                    base_hp=int(base_hp or 0),
+                    base_atk=int(base_atk or 0),
+                    base_def=int(base_def or 0),
+                    base_spd=int(base_spd or 0),
+                )
+                if dmg_bonus:
+                    coef += dmg_bonus
+            if favor_defense_for_role:
+                def_bonus = _artifact_defensive_score_proxy(
+                    art,
+                    str(unit_archetype or ""),
+                    base_hp=int(base_hp or 0),
+                    base_atk=int(base_atk or 0),
+                    base_def=int(base_def or 0),
+                    base_spd=int(base_spd or 0),
+                )
+                if def_bonus:
+                    coef += int(ARENA_RUSH_DEF_ART_WEIGHT) * def_bonus
+                dmg_penalty = _artifact_damage_score_proxy(
+                    art,
+                    base_hp=int(base_hp or 0),
+                    base_atk=int(base_atk or 0),
+                    base_def=int(base_def or 0),
+                    base_spd=int(base_spd or 0),
+                )
+                if dmg_penalty:
+                    coef -= int(ARENA_RUSH_DEF_OFFSTAT_PENALTY_WEIGHT) * int(dmg_penalty)
+            if not favor_damage_for_atk_type and not favor_defense_for_role:
+                context_bonus = int(
+                    _artifact_context_score_proxy(
+                        art,
+                        role=str(artifact_role_for_scoring),
+                        base_hp=int(base_hp or 0),
+                        base_atk=int(base_atk or 0),
+                        base_def=int(base_def or 0),
+                        base_spd=int(base_spd or 0),
+                    )
+                )
+                if context_bonus:
+                    coef += int(ARTIFACT_ROLE_CONTEXT_WEIGHT) * context_bonus
+        else:
+            if favor_defense_for_role:
+                aw = _artifact_quality_score_defensive(
+                    art,
+                    uid,
+                    rta_artifact_ids_for_unit,
+                    archetype=str(unit_archetype or ""),
+                    base_hp=int(base_hp or 0),
+                    base_atk=int(base_atk or 0),
+                    base_def=int(base_def or 0),
+                    base_spd=int(base_spd or 0),
+                )
+            else:
+                aw = art_quality[int(art.artifact_id)]
+            coef += aw
+            if favor_damage_for_atk_type:
+                eff_weight = int(ARENA_RUSH_ATK_ART_EFF_WEIGHT)
+            elif favor_defense_for_role:
+                eff_weight = int(ARENA_RUSH_DEF_EFFICIENCY_SCALE)
+            else:
+                eff_weight = int(ARTIFACT_EFFICIENCY_WEIGHT_SOLVER)
+            art_eff_bonus = int(round(float(art_eff[int(art.artifact_id)]) * float(eff_weight)))
+            if art_eff_bonus:
+                coef += art_eff_bonus
+            if favor_damage_for_atk_type:
+                dmg_bonus = _artifact_damage_score_proxy(
+                    art,
+                    base_hp=int(base_hp or 0),
+                    base_atk=int(base_atk or 0),
+                    base_def=int(base_def or 0),
+                    base_spd=int(base_spd or 0),
+                )
+                if dmg_bonus:
+                    coef += dmg_bonus
+            if favor_defense_for_role:
+                def_bonus = _artifact_defensive_score_proxy(
+                    art,
+                    str(unit_archetype or ""),
+                    base_hp=int(base_hp or 0),
+                    base_atk=int(base_atk or 0),
+                    base_def=int(base_def or 0),
+                    base_spd=int(base_spd or 0),
+                )
+                if def_bonus:
+                    coef += int(ARENA_RUSH_DEF_ART_WEIGHT) * def_bonus
+                dmg_penalty = _artifact_damage_score_proxy(
+                    art,
+                    base_hp=int(base_hp or 0),
+                    base_atk=int(base_atk or 0),
+                    base_def=int(base_def or 0),
+                    base_spd=int(base_spd or 0),
+                )
+                if dmg_penalty:
+                    coef -= int(ARENA_RUSH_DEF_OFFSTAT_PENALTY_WEIGHT) * int(dmg_penalty)
+            if not favor_damage_for_atk_type and not favor_defense_for_role:
+                context_bonus = int(
+                    _artifact_context_score_proxy(
+                        art,
+                        role=str(artifact_role_for_scoring),
+                        base_hp=int(base_hp or 0),
+                        base_atk=int(base_atk or 0),
+                        base_def=int(base_def or 0),
+                        base_spd=int(base_spd or 0),
+                    )
+                )
+                if context_bonus:
+                    coef += int(ARTIFACT_ROLE_CONTEXT_WEIGHT) * context_bonus
+        hint_bonus = int(_artifact_hint_score(art, artifact_hints))
+        if hint_bonus:
+            coef += hint_bonus
+        scaling_bonus = int(_artifact_scaling_score_proxy(art, scaling_stat=str(scaling_stat)))
+        if scaling_bonus:
+            coef += int(ARTIFACT_SCALING_BONUS_WEIGHT) * scaling_bonus
+        return int(coef)
+
+    rune_coefs_by_mode: Dict[str, Dict[int, int]] = {}
+    guard_possible = int(baseline_regression_guard_weight or 0) > 0 and bool(baseline_runes_by_slot)
+    if int(dominance_keep) > 0 and not guard_possible:
+        modes = ("balanced", "efficiency")
+        for objective_mode in modes:
+            rune_coefs_by_mode[objective_mode] = {
+                int(r.rune_id): _rune_objective_coef(r, objective_mode)
+                for slot_runes in runes_by_slot.values()
+                for r in slot_runes
+            }
+        stat_cols = {
+            col
+            for b in builds
+            for stat_key, value in dict(getattr(b, "min_stats", {}) or {}).items()
+            if int(value or 0) > 0
+            for col in _MIN_STAT_RUNE_COLS.get(str(stat_key).upper(), ())
+        }
+        # An upper speed bound (turn order, unit cap, tick window) makes extra SPD
+        # a liability, so only runes with equal SPD can replace each other then.
+        speed_capped = bool(speed_cap_possible) or (
+            str(mode or "").strip().lower() != "arena_rush"
+            and any(int(getattr(b, "spd_tick", 0) or 0) != 0 for b in builds)
+        )
+        if speed_capped:
+            stat_cols.discard(_SPD_COL)
+        else:
+            stat_cols.add(_SPD_COL)
+        runes_by_slot = _prune_dominated_runes(
+            runes_by_slot,
+            rune_stats=rune_stats,
+            objective_coefs={
+                rid: tuple(rune_coefs_by_mode[m][rid] for m in modes) for rid in rune_coefs_by_mode[modes[0]]
+            },
+            stat_cols=tuple(sorted(stat_cols)),
+            exact_cols=(_SPD_COL,) if speed_capped else (),
+            keep=int(dominance_keep),
+        )
+
+    def _item_quality_terms(objective_mode: str) -> List[cp_model.LinearExpr]:
+        quality_terms = []
+        known_rune_coefs = rune_coefs_by_mode.get(str(objective_mode), {})
+        for slot in range(1, 7):
+            for r in runes_by_slot[slot]:
+                coef = known_rune_coefs.get(int(r.rune_id))
+                if coef is None:
+                    coef = _rune_objective_coef(r, objective_mode)
+                if coef:
+                    quality_terms.append(coef * x[(slot, r.rune_id)])
+        for art_type in (1, 2):
+            for art in artifacts_by_type[art_type]:
+                coef = _artifact_objective_coef(art, objective_mode)
+                if coef:
+                    quality_terms.append(coef * xa[(art_type, int(art.artifact_id))])
+        return quality_terms
+
+
+    model = cp_model.CpModel()
+
+    # x[slot, rune_id]
+    x: Dict[Tuple[int, int], cp_model.IntVar] = {}
+    for slot in range(1, 7):
+        vs = []
+        for r in runes_by_slot[slot]:
+            v = model.NewBoolVar(f"x_u{uid}_s{slot}_r{r.rune_id}")
+            x[(slot, r.rune_id)] = v
+            vs.append(v)
+        model.Add(sum(vs) == 1)
+
+    # rune unique within this unit is automatically true because each rune has fixed slot,
+    # but keep it safe anyway (in case slot_no mismatch exists)
+    for r in pool:
+        uses = []
+        for slot in range(1, 7):
+            key = (slot, r.rune_id)
+            if key in x:
+                uses.append(x[key])
+        if uses:
+            model.Add(sum(uses) <= 1)
+
+    # artifact selection: exactly one per artifact type (1=attribute, 2=type)
+    xa: Dict[Tuple[int, int], cp_model.IntVar] = {}
+    for art_type in (1, 2):
+        vars_for_type: List[cp_model.IntVar] = []
+        for art in artifacts_by_type[art_type]:
+            v = model.NewBoolVar(f"xa_u{uid}_t{art_type}_a{int(art.artifact_id)}")
+            xa[(art_type, int(art.artifact_id))] = v
+            vars_for_type.append(v)
+        model.Add(sum(vars_for_type) == 1)
+
+    use_build: Dict[int, cp_model.IntVar] = {}
+    for b_idx, b in enumerate(builds):
+        use_build[b_idx] = model.NewBoolVar(f"use_build_u{uid}_b{b_idx}")
+    model.Add(sum(use_build.values()) == 1)
+
+    set_choice_vars: Dict[int, List[cp_model.IntVar]] = {}
+    for slot in range(1, 7):
+        for r in runes_by_slot[slot]:
+            sid = int(r.set_id or 0)
+            set_choice_vars.setdefault(sid, []).append(x[(slot, r.rune_id)])
+    intangible_piece_vars = set_choice_vars.get(int(INTANGIBLE_SET_ID), [])
+    intangible_piece_count_expr = sum(intangible_piece_vars) if intangible_piece_vars else 0
+
+    # for each build, add constraints only if chosen
+    # set options: if present => choose one option if build chosen
+    option_vars_by_build: Dict[int, List[cp_model.IntVar]] = {}
+    apply_rune_set_fallback = not any(bool(getattr(bb, "set_options", []) or []) for bb in (builds or []))
+    fallback_rune_set_ids: List[int] = []
+    if apply_rune_set_fallback:
+        unit_obj = account.units_by_id.get(int(uid))
+        master_id = int((unit_obj.unit_master_id if unit_obj else 0) or 0)
+        fallback_rune_set_ids = _preferred_rune_set_ids_for_monster(master_id, role=str(unit_archetype or ""))
+    for b_idx, b in enumerate(builds):
+        vb = use_build[b_idx]
+
+        # mainstats
+        for slot in (2, 4, 6):
+            allowed = (b.mainstats or {}).get(slot) or []
             if not allowed:
                 continue
             for r in runes_by_slot[slot]:
@@ -2637,23 +3887,10 @@ def _solve_single_unit_best(
                     model.Add(x[(slot, r.rune_id)] == 0).OnlyEnforceIf(vb)
 
         # artifact constraints (separate for attribute/type artifact)
-        artifact_focus_cfg = dict(getattr(b, "artifact_focus", {}) or {})
-        artifact_sub_cfg = dict(getattr(b, "artifact_substats", {}) or {})
-        for art_type, cfg_key in ((1, "attribute"), (2, "type")):
-            allowed_focus = [str(x).upper() for x in (artifact_focus_cfg.get(cfg_key) or []) if str(x)]
-            required_subs = [int(x) for x in (artifact_sub_cfg.get(cfg_key) or []) if int(x) > 0][:2]
-            if not allowed_focus and not required_subs:
-                continue
+        for art_type in (1, 2):
             for art in artifacts_by_type[art_type]:
-                av = xa[(art_type, int(art.artifact_id))]
-                if allowed_focus:
-                    if _artifact_focus_key(art) not in allowed_focus:
-                        model.Add(av == 0).OnlyEnforceIf(vb)
-                        continue
-                if required_subs:
-                    sec_ids = _artifact_substat_ids(art)
-                    if any(req_id not in sec_ids for req_id in required_subs):
-                        model.Add(av == 0).OnlyEnforceIf(vb)
+                if not _artifact_allowed_by_build(b, art_type, art):
+                    model.Add(xa[(art_type, int(art.artifact_id))] == 0).OnlyEnforceIf(vb)
 
         # sets
         if b.set_options:
@@ -2663,15 +3900,10 @@ def _solve_single_unit_best(
 
             model.Add(sum(opt_vars) == 1).OnlyEnforceIf(vb)
             model.Add(sum(opt_vars) == 0).OnlyEnforceIf(vb.Not())
+            option_vars_by_build[b_idx] = opt_vars
 
             for o_idx, opt in enumerate(b.set_options):
                 vo = opt_vars[o_idx]
-                if len(opt_vars) > 1 and int(set_option_preference_bonus) > 0:
-                    pref_idx = int(set_option_preference_offset) % len(opt_vars)
-                    distance = (o_idx - pref_idx) % len(opt_vars)
-                    bias = max(0, int(set_option_preference_bonus) - (distance * 12))
-                    if bias > 0:
-                        option_bias_terms.append(bias * vo)
                 needed = _count_required_set_pieces([str(s) for s in opt])
                 excluded_set_ids = {
                     int(sid)
@@ -2729,16 +3961,10 @@ def _solve_single_unit_best(
             for slot in range(1, 7):
                 for r in runes_by_slot[slot]:
                     xv = x[(slot, r.rune_id)]
-                    cr = _rune_stat_total(r, 9)
-                    cd = _rune_stat_total(r, 10)
-                    res = _rune_stat_total(r, 11)
-                    acc = _rune_stat_total(r, 12)
-                    hp_flat = _rune_stat_total(r, 1)
-                    hp_pct = _rune_stat_total(r, 2)
-                    atk_flat = _rune_stat_total(r, 3)
-                    atk_pct = _rune_stat_total(r, 4)
-                    def_flat = _rune_stat_total(r, 5)
-                    def_pct = _rune_stat_total(r, 6)
+                    (
+                        hp_flat, hp_pct, atk_flat, atk_pct, def_flat, def_pct,
+                        _spd, cr, cd, res, acc,
+                    ) = rune_stats[int(r.rune_id)]
                     if cr:
                         cr_terms.append(cr * xv)
                     if cd:
@@ -2812,16 +4038,13 @@ def _solve_single_unit_best(
     for slot in range(1, 7):
         for r in runes_by_slot[slot]:
             v = x[(slot, r.rune_id)]
-            spd = _rune_flat_spd(r)
+            _hp, _hpp, _atk, _atkp, _def, _defp, spd, cr, _cd, res, acc = rune_stats[int(r.rune_id)]
             if spd:
                 speed_terms.append(spd * v)
-            cr = _rune_stat_total(r, 9)
             if cr:
                 cr_terms_all.append(cr * v)
-            res = _rune_stat_total(r, 11)
             if res:
                 res_terms_all.append(res * v)
-            acc = _rune_stat_total(r, 12)
             if acc:
                 acc_terms_all.append(acc * v)
             if int(r.set_id or 0) == 3:
@@ -2849,10 +4072,6 @@ def _solve_single_unit_best(
     )
     # Combat SPD for turn-order/tick/caps: includes tower and leader.
     final_speed_expr = final_speed_raw_expr + int(base_spd_bonus_flat or 0)
-    if min_final_speed is not None and int(min_final_speed) > 0:
-        model.Add(final_speed_expr >= int(min_final_speed))
-    if max_final_speed is not None and max_final_speed > 0:
-        model.Add(final_speed_expr <= int(max_final_speed))
 
     for b_idx, b in enumerate(builds):
         vb = use_build[b_idx]
@@ -2895,266 +4114,8 @@ def _solve_single_unit_best(
         + (int(ACC_OVERCAP_PENALTY_PER_POINT) * acc_over_var)
     )
 
-    # quality objective (2nd phase after speed is pinned)
-    is_arena_rush_mode = str(mode or "").strip().lower() == "arena_rush"
-    unit_role = _arena_role_from_archetype(str(unit_archetype or ""))
-    artifact_role_for_scoring = str(unit_role)
-    if artifact_role_for_scoring == "unknown":
-        artifact_role_for_scoring = (
-            "attack"
-            if _is_attack_type_unit(base_hp, base_atk, base_def, archetype=str(unit_archetype or ""))
-            else "support"
-        )
-    favor_damage_for_atk_type = (
-        bool(arena_rush_damage_bias)
-        and is_arena_rush_mode
-        and str(unit_role) == "attack"
-    )
-    favor_defense_for_role = bool(
-        is_arena_rush_mode
-        and str(unit_role) in ("defense", "hp", "support")
-    )
-    scaling_stat = _scaling_stat_from_hints(artifact_hints)
-    quality_terms = []
-    for slot in range(1, 7):
-        for r in runes_by_slot[slot]:
-            v = x[(slot, r.rune_id)]
-            if str(objective_mode) == "efficiency":
-                if favor_damage_for_atk_type:
-                    eff_scale = int(ARENA_RUSH_ATK_EFFICIENCY_SCALE)
-                elif favor_defense_for_role:
-                    eff_scale = int(ARENA_RUSH_DEF_EFFICIENCY_SCALE)
-                else:
-                    eff_scale = 100
-                eff_bonus = int(round(float(rune_efficiency(r)) * float(eff_scale)))
-                if eff_bonus:
-                    quality_terms.append(eff_bonus * v)
-                if favor_defense_for_role:
-                    def_q = int(_rune_quality_score_defensive(r, uid, rta_rune_ids_for_unit))
-                    if def_q:
-                        quality_terms.append((int(ARENA_RUSH_DEF_QUALITY_WEIGHT) * def_q) * v)
-                if favor_damage_for_atk_type:
-                    dmg_bonus = _rune_damage_score_proxy(r, int(base_atk or 0))
-                    if dmg_bonus:
-                        quality_terms.append(dmg_bonus * v)
-                if favor_defense_for_role:
-                    def_bonus = _rune_defensive_score_proxy(
-                        r,
-                        int(base_hp or 0),
-                        int(base_def or 0),
-                        str(unit_archetype or ""),
-                    )
-                    if def_bonus:
-                        quality_terms.append((int(ARENA_RUSH_DEF_RUNE_WEIGHT) * def_bonus) * v)
-                    dmg_penalty = _rune_damage_score_proxy(r, int(base_atk or 0))
-                    if dmg_penalty:
-                        quality_terms.append(
-                            (-int(ARENA_RUSH_DEF_OFFSTAT_PENALTY_WEIGHT) * int(dmg_penalty)) * v
-                        )
-                scaling_bonus = int(
-                    _rune_scaling_score_proxy(
-                        r,
-                        scaling_stat=str(scaling_stat),
-                        base_hp=int(base_hp or 0),
-                        base_atk=int(base_atk or 0),
-                        base_def=int(base_def or 0),
-                    )
-                )
-                if scaling_bonus:
-                    quality_terms.append((int(RUNE_SCALING_BONUS_WEIGHT) * scaling_bonus) * v)
-            else:
-                if favor_defense_for_role:
-                    w = _rune_quality_score_defensive(r, uid, rta_rune_ids_for_unit)
-                else:
-                    w = _rune_quality_score(r, uid, rta_rune_ids_for_unit)
-                quality_terms.append(w * v)
-                if favor_damage_for_atk_type:
-                    eff_weight = int(ARENA_RUSH_ATK_RUNE_EFF_WEIGHT)
-                elif favor_defense_for_role:
-                    eff_weight = int(ARENA_RUSH_DEF_EFFICIENCY_SCALE)
-                else:
-                    eff_weight = int(RUNE_EFFICIENCY_WEIGHT_SOLVER)
-                eff_bonus = int(round(float(rune_efficiency(r)) * float(eff_weight)))
-                if eff_bonus:
-                    quality_terms.append(eff_bonus * v)
-                if favor_damage_for_atk_type:
-                    dmg_bonus = _rune_damage_score_proxy(r, int(base_atk or 0))
-                    if dmg_bonus:
-                        quality_terms.append(dmg_bonus * v)
-                if favor_defense_for_role:
-                    def_bonus = _rune_defensive_score_proxy(
-                        r,
-                        int(base_hp or 0),
-                        int(base_def or 0),
-                        str(unit_archetype or ""),
-                    )
-                    if def_bonus:
-                        quality_terms.append((int(ARENA_RUSH_DEF_RUNE_WEIGHT) * def_bonus) * v)
-                    dmg_penalty = _rune_damage_score_proxy(r, int(base_atk or 0))
-                    if dmg_penalty:
-                        quality_terms.append(
-                            (-int(ARENA_RUSH_DEF_OFFSTAT_PENALTY_WEIGHT) * int(dmg_penalty)) * v
-                        )
-                scaling_bonus = int(
-                    _rune_scaling_score_proxy(
-                        r,
-                        scaling_stat=str(scaling_stat),
-                        base_hp=int(base_hp or 0),
-                        base_atk=int(base_atk or 0),
-                        base_def=int(base_def or 0),
-                    )
-                )
-                if scaling_bonus:
-                    quality_terms.append((int(RUNE_SCALING_BONUS_WEIGHT) * scaling_bonus) * v)
-    for art_type in (1, 2):
-        for art in artifacts_by_type[art_type]:
-            av = xa[(art_type, int(art.artifact_id))]
-            if str(objective_mode) == "efficiency":
-                if favor_damage_for_atk_type:
-                    eff_scale = int(ARENA_RUSH_ATK_EFFICIENCY_SCALE)
-                elif favor_defense_for_role:
-                    eff_scale = int(ARENA_RUSH_DEF_EFFICIENCY_SCALE)
-                else:
-                    eff_scale = 100
-                art_eff_bonus = int(round(float(artifact_efficiency(art)) * float(eff_scale)))
-                if art_eff_bonus:
-                    quality_terms.append(art_eff_bonus * av)
-                if favor_defense_for_role:
-                    def_q = int(
-                        _artifact_quality_score_defensive(
-                            art,
-                            uid,
-                            rta_artifact_ids_for_unit,
-                            archetype=str(unit_archetype or ""),
-                            base_hp=int(base_hp or 0),
-                            base_atk=int(base_atk or 0),
-                            base_def=int(base_def or 0),
-                            base_spd=int(base_spd or 0),
-                        )
-                    )
-                    if def_q:
-                        quality_terms.append((int(ARENA_RUSH_DEF_QUALITY_WEIGHT) * def_q) * av)
-                if favor_damage_for_atk_type:
-                    dmg_bonus = _artifact_damage_score_proxy(
-                        art,
-                        base_hp=int(base_hp or 0),
-                        base_atk=int(base_atk or 0),
-                        base_def=int(base_def or 0),
-                        base_spd=int(base_spd or 0),
-                    )
-                    if dmg_bonus:
-                        quality_terms.append(dmg_bonus * av)
-                if favor_defense_for_role:
-                    def_bonus = _artifact_defensive_score_proxy(
-                        art,
-                        str(unit_archetype or ""),
-                        base_hp=int(base_hp or 0),
-                        base_atk=int(base_atk or 0),
-                        base_def=int(base_def or 0),
-                        base_spd=int(base_spd or 0),
-                    )
-                    if def_bonus:
-                        quality_terms.append((int(ARENA_RUSH_DEF_ART_WEIGHT) * def_bonus) * av)
-                    dmg_penalty = _artifact_damage_score_proxy(
-                        art,
-                        base_hp=int(base_hp or 0),
-                        base_atk=int(base_atk or 0),
-                        base_def=int(base_def or 0),
-                        base_spd=int(base_spd or 0),
-                    )
-                    if dmg_penalty:
-                        quality_terms.append(
-                            (-int(ARENA_RUSH_DEF_OFFSTAT_PENALTY_WEIGHT) * int(dmg_penalty)) * av
-                        )
-                if not favor_damage_for_atk_type and not favor_defense_for_role:
-                    context_bonus = int(
-                        _artifact_context_score_proxy(
-                            art,
-                            role=str(artifact_role_for_scoring),
-                            base_hp=int(base_hp or 0),
-                            base_atk=int(base_atk or 0),
-                            base_def=int(base_def or 0),
-                            base_spd=int(base_spd or 0),
-                        )
-                    )
-                    if context_bonus:
-                        quality_terms.append((int(ARTIFACT_ROLE_CONTEXT_WEIGHT) * context_bonus) * av)
-            else:
-                if favor_defense_for_role:
-                    aw = _artifact_quality_score_defensive(
-                        art,
-                        uid,
-                        rta_artifact_ids_for_unit,
-                        archetype=str(unit_archetype or ""),
-                        base_hp=int(base_hp or 0),
-                        base_atk=int(base_atk or 0),
-                        base_def=int(base_def or 0),
-                        base_spd=int(base_spd or 0),
-                    )
-                else:
-                    aw = _artifact_quality_score(art, uid, rta_artifact_ids_for_unit)
-                quality_terms.append(aw * av)
-                if favor_damage_for_atk_type:
-                    eff_weight = int(ARENA_RUSH_ATK_ART_EFF_WEIGHT)
-                elif favor_defense_for_role:
-                    eff_weight = int(ARENA_RUSH_DEF_EFFICIENCY_SCALE)
-                else:
-                    eff_weight = int(ARTIFACT_EFFICIENCY_WEIGHT_SOLVER)
-                art_eff_bonus = int(round(float(artifact_efficiency(art)) * float(eff_weight)))
-                if art_eff_bonus:
-                    quality_terms.append(art_eff_bonus * av)
-                if favor_damage_for_atk_type:
-                    dmg_bonus = _artifact_damage_score_proxy(
-                        art,
-                        base_hp=int(base_hp or 0),
-                        base_atk=int(base_atk or 0),
-                        base_def=int(base_def or 0),
-                        base_spd=int(base_spd or 0),
-                    )
-                    if dmg_bonus:
-                        quality_terms.append(dmg_bonus * av)
-                if favor_defense_for_role:
-                    def_bonus = _artifact_defensive_score_proxy(
-                        art,
-                        str(unit_archetype or ""),
-                        base_hp=int(base_hp or 0),
-                        base_atk=int(base_atk or 0),
-                        base_def=int(base_def or 0),
-                        base_spd=int(base_spd or 0),
-                    )
-                    if def_bonus:
-                        quality_terms.append((int(ARENA_RUSH_DEF_ART_WEIGHT) * def_bonus) * av)
-                    dmg_penalty = _artifact_damage_score_proxy(
-                        art,
-                        base_hp=int(base_hp or 0),
-                        base_atk=int(base_atk or 0),
-                        base_def=int(base_def or 0),
-                        base_spd=int(base_spd or 0),
-                    )
-                    if dmg_penalty:
-                        quality_terms.append(
-                            (-int(ARENA_RUSH_DEF_OFFSTAT_PENALTY_WEIGHT) * int(dmg_penalty)) * av
-                        )
-                if not favor_damage_for_atk_type and not favor_defense_for_role:
-                    context_bonus = int(
-                        _artifact_context_score_proxy(
-                            art,
-                            role=str(artifact_role_for_scoring),
-                            base_hp=int(base_hp or 0),
-                            base_atk=int(base_atk or 0),
-                            base_def=int(base_def or 0),
-                            base_spd=int(base_spd or 0),
-                        )
-                    )
-                    if context_bonus:
-                        quality_terms.append((int(ARTIFACT_ROLE_CONTEXT_WEIGHT) * context_bonus) * av)
-            hint_bonus = int(_artifact_hint_score(art, artifact_hints))
-            if hint_bonus:
-                quality_terms.append(hint_bonus * av)
-            scaling_bonus = int(_artifact_scaling_score_proxy(art, scaling_stat=str(scaling_stat)))
-            if scaling_bonus:
-                quality_terms.append((int(ARTIFACT_SCALING_BONUS_WEIGHT) * scaling_bonus) * av)
 
+    static_quality_terms: List[cp_model.LinearExpr] = []
     if apply_rune_set_fallback and fallback_rune_set_ids:
         for rank, sid in enumerate(fallback_rune_set_ids[:3]):
             set_vars = list(set_choice_vars.get(int(sid), []) or [])
@@ -3163,14 +4124,14 @@ def _solve_single_unit_best(
             piece_bonus = int(_RUNE_SET_HINT_PIECE_BONUS_BY_RANK[min(rank, len(_RUNE_SET_HINT_PIECE_BONUS_BY_RANK) - 1)])
             full_bonus = int(_RUNE_SET_HINT_FULL_BONUS_BY_RANK[min(rank, len(_RUNE_SET_HINT_FULL_BONUS_BY_RANK) - 1)])
             if piece_bonus > 0:
-                quality_terms.append(int(piece_bonus) * sum(set_vars))
+                static_quality_terms.append(int(piece_bonus) * sum(set_vars))
             needed = int(SET_SIZES.get(int(sid), 2) or 2)
             if full_bonus > 0 and needed > 0:
                 count_expr = sum(set_vars)
                 full_var = model.NewBoolVar(f"hint_set_full_u{uid}_s{int(sid)}_r{int(rank)}")
                 model.Add(count_expr >= int(needed)).OnlyEnforceIf(full_var)
                 model.Add(count_expr <= int(max(0, int(needed) - 1))).OnlyEnforceIf(full_var.Not())
-                quality_terms.append(int(full_bonus) * full_var)
+                static_quality_terms.append(int(full_bonus) * full_var)
 
     # Unit-level critical hint satisfaction:
     # reward selecting at least one artifact carrying each critical effect
@@ -3201,20 +4162,20 @@ def _solve_single_unit_best(
             hit_count = model.NewIntVar(0, 2, f"hint_cnt_u{uid}_e{int(eff_id)}_r{int(rank)}")
             model.Add(hit_count == sum(hit_vars))
             if per_hit_bonus > 0:
-                quality_terms.append(int(per_hit_bonus) * hit_count)
+                static_quality_terms.append(int(per_hit_bonus) * hit_count)
             if target_hits > 0 and shortfall_penalty > 0:
                 shortfall = model.NewIntVar(0, int(target_hits), f"hint_short_u{uid}_e{int(eff_id)}_r{int(rank)}")
                 model.Add(shortfall >= int(target_hits) - hit_count)
-                quality_terms.append((-int(shortfall_penalty)) * shortfall)
+                static_quality_terms.append((-int(shortfall_penalty)) * shortfall)
             if roll_terms:
                 roll_sum = model.NewIntVar(0, 20, f"hint_roll_u{uid}_e{int(eff_id)}_r{int(rank)}")
                 model.Add(roll_sum == sum(roll_terms))
                 if per_roll_bonus > 0:
-                    quality_terms.append(int(per_roll_bonus) * roll_sum)
+                    static_quality_terms.append(int(per_roll_bonus) * roll_sum)
                 if target_roll_sum > 0 and roll_shortfall_penalty > 0:
                     roll_shortfall = model.NewIntVar(0, int(target_roll_sum), f"hint_roll_short_u{uid}_e{int(eff_id)}_r{int(rank)}")
                     model.Add(roll_shortfall >= int(target_roll_sum) - roll_sum)
-                    quality_terms.append((-int(roll_shortfall_penalty)) * roll_shortfall)
+                    static_quality_terms.append((-int(roll_shortfall_penalty)) * roll_shortfall)
 
     # Build-aware artifact quality:
     # if artifact filters are selected, prefer higher rolls in those selected effects.
@@ -3248,26 +4209,10 @@ def _solve_single_unit_best(
                 model.Add(z <= av)
                 model.Add(z <= vb)
                 model.Add(z >= av + vb - 1)
-                quality_terms.append(bonus * z)
-
-    for b_idx, b in enumerate(builds):
-        if str(objective_mode) == "efficiency":
-            quality_terms.append((-int(b.priority) * int(max(20, build_priority_penalty // 3))) * use_build[b_idx])
-        else:
-            quality_terms.append((-int(b.priority) * int(build_priority_penalty)) * use_build[b_idx])
-    quality_terms.extend(option_bias_terms)
-    if avoid_runes_by_slot and int(avoid_same_rune_penalty) > 0:
-        for slot, rid in avoid_runes_by_slot.items():
-            key = (int(slot), int(rid))
-            if key in x:
-                quality_terms.append((-int(avoid_same_rune_penalty)) * x[key])
-    if avoid_artifacts_by_type and int(avoid_same_artifact_penalty) > 0:
-        for art_type, aid in avoid_artifacts_by_type.items():
-            akey = (int(art_type), int(aid))
-            if akey in xa:
-                quality_terms.append((-int(avoid_same_artifact_penalty)) * xa[akey])
-    quality_terms.append((-int(SINGLE_SOLVER_OVERCAP_PENALTY_SCALE)) * overcap_penalty_expr)
+                static_quality_terms.append(bonus * z)
+    static_quality_terms.append((-int(SINGLE_SOLVER_OVERCAP_PENALTY_SCALE)) * overcap_penalty_expr)
 
+    guard: Optional[_BaselineGuard] = None
     guard_weight = int(max(0, int(baseline_regression_guard_weight or 0)))
     if guard_weight > 0:
         baseline_slots = {
@@ -3369,9 +4314,9 @@ def _solve_single_unit_best(
                             rta_rune_ids_for_unit=rta_rune_ids_for_unit,
                         )
                     )
-                    baseline_cr_total += int(_rune_stat_total(r, 9) or 0)
-                    baseline_res_total += int(_rune_stat_total(r, 11) or 0)
-                    baseline_acc_total += int(_rune_stat_total(r, 12) or 0)
+                    baseline_cr_total += int(rune_tbl.stat_of(int(r.rune_id), 9))
+                    baseline_res_total += int(rune_tbl.stat_of(int(r.rune_id), 11))
+                    baseline_acc_total += int(rune_tbl.stat_of(int(r.rune_id), 12))
                 for art in baseline_artifacts:
                     baseline_guard_score += int(
                         _baseline_guard_artifact_coef(
@@ -3393,8 +4338,353 @@ def _solve_single_unit_best(
                 baseline_guard_score -= int(SINGLE_SOLVER_OVERCAP_PENALTY_SCALE) * int(baseline_over)
                 shortfall_cap = max(200000, abs(int(baseline_guard_score)) + 200000)
                 guard_shortfall = model.NewIntVar(0, int(shortfall_cap), f"baseline_guard_shortfall_u{uid}")
-                model.Add(guard_shortfall >= int(baseline_guard_score) - guard_expr)
-                quality_terms.append((-int(guard_weight)) * guard_shortfall)
+                guard = _BaselineGuard(
+                    constraint=(guard_shortfall >= int(baseline_guard_score) - guard_expr),
+                    penalty=(-int(guard_weight)) * guard_shortfall,
+                    rune_ids=frozenset(int(r.rune_id) for r in baseline_runes),
+                    artifact_ids=frozenset(int(a.artifact_id) for a in baseline_artifacts),
+                )
+
+    return _UnitModelTemplate(
+        model=model,
+        builds=list(builds),
+        x=x,
+        xa=xa,
+        use_build=use_build,
+        option_vars_by_build=option_vars_by_build,
+        final_speed_expr=final_speed_expr,
+        static_quality_terms=static_quality_terms,
+        item_quality_terms=_item_quality_terms,
+        guard=guard,
+        rune_members=rune_members,
+        speed_items={
+            int(r.rune_id): (
+                int(rune_stats[int(r.rune_id)][_SPD_COL]),
+                int(r.set_id or 0),
+                EFFECT_ID_TO_MAINSTAT_KEY.get(int(r.pri_eff[0] or 0), ""),
+            )
+            for slot in range(1, 7)
+            for r in runes_by_slot[slot]
+        },
+    )
+
+
+def _solve_single_unit_best(
+    uid: int,
+    pool: List[Rune],
+    artifact_pool: List[Artifact],
+    builds: List[Build],
+    time_limit_s: float,
+    workers: int,
+    base_hp: int,
+    base_atk: int,
+    base_def: int,
+    base_spd: int,
+    base_spd_bonus_flat: int,
+    base_cr: int,
+    base_cd: int,
+    base_res: int,
+    base_acc: int,
+    max_final_speed: Optional[int],
+    min_final_speed: Optional[int] = None,
+    account: Optional[AccountData] = None,
+    rta_rune_ids_for_unit: Optional[Set[int]] = None,
+    rta_artifact_ids_for_unit: Optional[Set[int]] = None,
+    speed_hard_priority: bool = True,
+    speed_weight_soft: int = SOFT_SPEED_WEIGHT,
+    speed_tiebreak_weight: int = 1,
+    build_priority_penalty: int = DEFAULT_BUILD_PRIORITY_PENALTY,
+    set_option_preference_offset: int = 0,
+    set_option_preference_bonus: int = SET_OPTION_PREFERENCE_BONUS,
+    fixed_runes_by_slot: Optional[Dict[int, int]] = None,
+    fixed_artifacts_by_type: Optional[Dict[int, int]] = None,
+    baseline_runes_by_slot: Optional[Dict[int, int]] = None,
+    baseline_artifacts_by_type: Optional[Dict[int, int]] = None,
+    baseline_regression_guard_weight: int = 0,
+    avoid_runes_by_slot: Optional[Dict[int, int]] = None,
+    avoid_artifacts_by_type: Optional[Dict[int, int]] = None,
+    avoid_same_rune_penalty: int = 0,
+    avoid_same_artifact_penalty: int = 0,
+    speed_slack_for_quality: int = 0,
+    objective_mode: str = "balanced",  # balanced | efficiency
+    force_speed_priority: bool = False,
+    arena_rush_damage_bias: bool = False,
+    unit_archetype: str = "",
+    artifact_hints: Optional[Dict[str, Any]] = None,
+    broken_set_excluded_set_ids: Optional[Set[int]] = None,
+    is_cancelled: Optional[Callable[[], bool]] = None,
+    register_solver: Optional[Callable[[object], None]] = None,
+    mode: str = "normal",
+    blocked_rune_ids: Optional[Set[int]] = None,
+    blocked_artifact_ids: Optional[Set[int]] = None,
+    model_templates: Optional[_UnitModelTemplateCache] = None,
+    dominance_keep: int = 0,
+    speed_cap_possible: bool = True,
+    hint_runes_by_slot: Optional[Dict[int, int]] = None,
+    hint_artifacts_by_type: Optional[Dict[int, int]] = None,
+    hint_build_id: str = "",
+    hint_final_speed: int = 0,
+    hint_feasible_only: bool = True,
+    result_cache: Optional[UnitSolveCache] = None,
+    time_budget: Optional[SolveBudget] = None,
+    plateau_window_s: float = 0.0,
+    plateau_window_solutions: int = 0,
+    solve_trace: Optional[Callable[[List[Tuple[float, float]], bool], None]] = None,
+) -> GreedyUnitResult:
+    """
+    Solve for ONE unit:
+    - pick exactly 1 rune per slot (1..6)
+    - pick exactly 1 attribute artifact (type 1) and 1 type artifact (type 2)
+    - pick exactly 1 build
+    - enforce build mainstats (2/4/6) + build set_option + artifact constraints
+    - objective: maximize rune weight - priority penalty
+
+    The model covers all of *pool* / *artifact_pool* and is reused from
+    *model_templates* when given; ids in *blocked_rune_ids* /
+    *blocked_artifact_ids* are only fixed to 0 for this solve.
+    *dominance_keep* enables exact dominance pruning of the rune candidates
+    (see ``_prune_dominated_runes``); it must exceed the number of runes per
+    slot that other units can block plus one avoided rune.
+    *hint_runes_by_slot* / *hint_artifacts_by_type* / *hint_build_id* warm
+    start the search; with *hint_feasible_only* the hint is skipped when one
+    of its items is blocked or pruned, or its known *hint_final_speed* breaks
+    this solve's speed bounds.
+    *result_cache* answers repeated identical sub-problems (hints excluded).
+    Builds rejected by ``_preflight_unit_builds`` are switched off before
+    solving; when all are rejected the unit fails without a solve.
+    With *time_budget* the time limit is the unit's slice of the run budget
+    (sized by the candidate items) instead of *time_limit_s*.
+    The optimizing solves stop early on an objective plateau (see
+    ``_PlateauMonitor``); *solve_trace* receives their improvement traces.
+    """
+    if is_cancelled and is_cancelled():
+        return GreedyUnitResult(uid, False, tr("opt.cancelled"), runes_by_slot={})
+    if not builds:
+        builds = [Build.default_any()]
+
+    cache_key = ""
+    if result_cache is not None:
+        cache_key = UnitSolveCache.key_digest((
+            int(uid),
+            (
+                model_templates.items_fingerprint(pool, artifact_pool)
+                if model_templates is not None
+                else _items_fingerprint(pool, artifact_pool)
+            ),
+            repr(builds),
+            (base_hp, base_atk, base_def, base_spd, base_spd_bonus_flat, base_cr, base_cd, base_res, base_acc),
+            (max_final_speed, min_final_speed),
+            sorted(rta_rune_ids_for_unit or ()),
+            sorted(rta_artifact_ids_for_unit or ()),
+            (bool(speed_hard_priority), int(speed_weight_soft), int(speed_tiebreak_weight)),
+            (int(build_priority_penalty), int(set_option_preference_offset), int(set_option_preference_bonus)),
+            sorted((fixed_runes_by_slot or {}).items()),
+            sorted((fixed_artifacts_by_type or {}).items()),
+            sorted((baseline_runes_by_slot or {}).items()),
+            sorted((baseline_artifacts_by_type or {}).items()),
+            int(baseline_regression_guard_weight or 0),
+            sorted((avoid_runes_by_slot or {}).items()),
+            sorted((avoid_artifacts_by_type or {}).items()),
+            (int(avoid_same_rune_penalty), int(avoid_same_artifact_penalty), int(speed_slack_for_quality)),
+            str(objective_mode),
+            (bool(force_speed_priority), bool(arena_rush_damage_bias), str(unit_archetype or "")),
+            sorted((artifact_hints or {}).items(), key=lambda kv: str(kv[0])),
+            sorted(broken_set_excluded_set_ids or ()),
+            str(mode or ""),
+            sorted(blocked_rune_ids or ()),
+            sorted(blocked_artifact_ids or ()),
+            (int(dominance_keep), bool(speed_cap_possible)),
+            (float(plateau_window_s), int(plateau_window_solutions)),
+        ))
+
+    blocked_runes = set(blocked_rune_ids or ())
+    blocked_arts = set(blocked_artifact_ids or ())
+    available_pool = [r for r in pool if int(r.rune_id) not in blocked_runes] if blocked_runes else pool
+    available_art_pool = (
+        [a for a in artifact_pool if int(a.artifact_id or 0) not in blocked_arts] if blocked_arts else artifact_pool
+    )
+    # The effective limit is known before the cache lookup, so get and put use the same value.
+    if time_budget is not None:
+        time_limit_s = time_budget.slice_for(uid, len(available_pool) + len(available_art_pool))
+    if result_cache is not None:
+        cached = result_cache.get(cache_key, float(time_limit_s))
+        if cached is not None:
+            return cached
+    runes_by_slot, artifacts_by_type, failure = _unit_candidates(
+        available_pool, available_art_pool, fixed_runes_by_slot, fixed_artifacts_by_type
+    )
+    if failure:
+        return GreedyUnitResult(uid, False, failure, runes_by_slot={})
+    # Builds that cannot be satisfied are rejected here instead of by a full solve.
+    build_rejections = _preflight_unit_builds(
+        runes_by_slot,
+        artifacts_by_type,
+        builds,
+        base_hp=base_hp,
+        base_atk=base_atk,
+        base_def=base_def,
+        base_spd=base_spd,
+        base_spd_bonus_flat=base_spd_bonus_flat,
+        base_cr=base_cr,
+        base_cd=base_cd,
+        base_res=base_res,
+        base_acc=base_acc,
+        min_final_speed=min_final_speed,
+        max_final_speed=max_final_speed,
+        mode=mode,
+        account=account,
+    )
+    if all(build_rejections):
+        detail = " | ".join(build_rejections[:3])
+        return GreedyUnitResult(uid, False, tr("opt.not_feasible", detail=detail), runes_by_slot={})
+    # A negative speed weight also makes extra SPD a liability.
+    speed_cap_possible = (
+        bool(speed_cap_possible)
+        or int(max_final_speed or 0) > 0
+        or min(int(speed_weight_soft), int(speed_tiebreak_weight)) < 0
+    )
+
+    def _build_template() -> _UnitModelTemplate:
+        return _build_unit_model_template(
+            uid=uid,
+            pool=pool,
+            artifact_pool=artifact_pool,
+            builds=builds,
+            base_hp=base_hp,
+            base_atk=base_atk,
+            base_def=base_def,
+            base_spd=base_spd,
+            base_spd_bonus_flat=base_spd_bonus_flat,
+            base_cr=base_cr,
+            base_cd=base_cd,
+            base_res=base_res,
+            base_acc=base_acc,
+            account=account,
+            rta_rune_ids_for_unit=rta_rune_ids_for_unit,
+            rta_artifact_ids_for_unit=rta_artifact_ids_for_unit,
+            fixed_runes_by_slot=fixed_runes_by_slot,
+            fixed_artifacts_by_type=fixed_artifacts_by_type,
+            baseline_runes_by_slot=baseline_runes_by_slot,
+            baseline_artifacts_by_type=baseline_artifacts_by_type,
+            baseline_regression_guard_weight=baseline_regression_guard_weight,
+            force_speed_priority=force_speed_priority,
+            arena_rush_damage_bias=arena_rush_damage_bias,
+            unit_archetype=unit_archetype,
+            artifact_hints=artifact_hints,
+            broken_set_excluded_set_ids=broken_set_excluded_set_ids,
+            mode=mode,
+            dominance_keep=dominance_keep,
+            speed_cap_possible=speed_cap_possible,
+        )
+
+    if model_templates is None:
+        template = _build_template()
+    else:
+        # Everything the template depends on; pass-specific inputs (blocked items,
+        # speed caps, penalties, time limit) are applied per solve below.
+        template_key = (
+            int(uid),
+            tuple(int(r.rune_id) for r in pool),
+            tuple(int(a.artifact_id or 0) for a in artifact_pool),
+            repr(builds),
+            (base_hp, base_atk, base_def, base_spd, base_spd_bonus_flat, base_cr, base_cd, base_res, base_acc),
+            frozenset(rta_rune_ids_for_unit or ()),
+            frozenset(rta_artifact_ids_for_unit or ()),
+            repr(sorted((fixed_runes_by_slot or {}).items())),
+            repr(sorted((fixed_artifacts_by_type or {}).items())),
+            repr(sorted((baseline_runes_by_slot or {}).items())),
+            repr(sorted((baseline_artifacts_by_type or {}).items())),
+            int(baseline_regression_guard_weight or 0),
+            bool(force_speed_priority),
+            bool(arena_rush_damage_bias),
+            str(unit_archetype or ""),
+            repr(sorted((artifact_hints or {}).items(), key=lambda kv: str(kv[0]))),
+            frozenset(broken_set_excluded_set_ids or ()),
+            str(mode or ""),
+            int(dominance_keep),
+            bool(speed_cap_possible),
+        )
+        template = model_templates.get_or_build(template_key, _build_template)
+
+    x, xa, use_build = template.x, template.xa, template.use_build
+    rune_members = template.rune_members
+    final_speed_expr = template.final_speed_expr
+    model = template.model.Clone()
+    # A rune class stays selectable while any of its members is available.
+    free_members: Dict[int, List[int]] = {
+        int(rid): [m for m in rune_members.get(int(rid), (int(rid),)) if m not in blocked_runes]
+        for (_slot, rid) in x
+    }
+    blocked_vars = [v for (_slot, rid), v in x.items() if not free_members[int(rid)]]
+    blocked_vars.extend(v for (_t, aid), v in xa.items() if int(aid) in blocked_arts)
+    blocked_vars.extend(use_build[b_idx] for b_idx, reason in enumerate(build_rejections) if reason)
+    if blocked_vars:
+        model.AddBoolAnd([v.Not() for v in blocked_vars])
+    if min_final_speed is not None and int(min_final_speed) > 0:
+        model.Add(final_speed_expr >= int(min_final_speed))
+    if max_final_speed is not None and max_final_speed > 0:
+        model.Add(final_speed_expr <= int(max_final_speed))
+    if hint_runes_by_slot or hint_artifacts_by_type:
+        hint_speed = int(hint_final_speed or 0)
+        speed_ok = hint_speed <= 0 or (
+            hint_speed >= int(min_final_speed or 0)
+            and (not max_final_speed or int(max_final_speed) <= 0 or hint_speed <= int(max_final_speed))
+        )
+        if speed_ok or not hint_feasible_only:
+            rune_vars_by_slot: Dict[int, Dict[int, cp_model.IntVar]] = {}
+            for (slot, rid), v in x.items():
+                for m in free_members[int(rid)]:
+                    rune_vars_by_slot.setdefault(int(slot), {})[int(m)] = v
+            art_vars_by_type: Dict[int, Dict[int, cp_model.IntVar]] = {}
+            for (art_type, aid), v in xa.items():
+                if int(aid) not in blocked_arts:
+                    art_vars_by_type.setdefault(int(art_type), {})[int(aid)] = v
+            hinted = _warm_start_hint_vars(
+                rune_vars_by_slot,
+                art_vars_by_type,
+                hint_runes_by_slot,
+                hint_artifacts_by_type,
+                feasible_only=bool(hint_feasible_only),
+            )
+            if hinted:
+                if hint_build_id:
+                    hinted.extend(use_build[b_idx] for b_idx, b in enumerate(builds) if b.id == hint_build_id)
+                _add_warm_start_hints(model, hinted)
+
+    quality_terms = [template.item_quality_expr(objective_mode)]
+    quality_terms.extend(template.static_quality_terms)
+    for b_idx, b in enumerate(builds):
+        if str(objective_mode) == "efficiency":
+            quality_terms.append((-int(b.priority) * int(max(20, build_priority_penalty // 3))) * use_build[b_idx])
+        else:
+            quality_terms.append((-int(b.priority) * int(build_priority_penalty)) * use_build[b_idx])
+    if int(set_option_preference_bonus) > 0:
+        for opt_vars in template.option_vars_by_build.values():
+            if len(opt_vars) <= 1:
+                continue
+            pref_idx = int(set_option_preference_offset) % len(opt_vars)
+            for o_idx, vo in enumerate(opt_vars):
+                distance = (o_idx - pref_idx) % len(opt_vars)
+                bias = max(0, int(set_option_preference_bonus) - (distance * 12))
+                if bias > 0:
+                    quality_terms.append(bias * vo)
+    avoid_rids = {int(rid) for rid in (avoid_runes_by_slot or {}).values()}
+    if avoid_rids and int(avoid_same_rune_penalty) > 0:
+        # Only penalize a class when no other free member can stand in for the avoided rune.
+        for (slot, rid), v in x.items():
+            free = free_members[int(rid)]
+            if free and all(m in avoid_rids for m in free):
+                quality_terms.append((-int(avoid_same_rune_penalty)) * v)
+    if avoid_artifacts_by_type and int(avoid_same_artifact_penalty) > 0:
+        for art_type, aid in avoid_artifacts_by_type.items():
+            akey = (int(art_type), int(aid))
+            if akey in xa:
+                quality_terms.append((-int(avoid_same_artifact_penalty)) * xa[akey])
+    guard = template.guard
+    # The guard only applies while the whole baseline build is still available.
+    if guard is not None and not (guard.rune_ids & blocked_runes) and not (guard.artifact_ids & blocked_arts):
+        model.Add(guard.constraint)
+        quality_terms.append(guard.penalty)
 
     solver = cp_model.CpSolver()
     if register_solver:
@@ -3409,16 +4699,46 @@ def _solve_single_unit_best(
     if is_cancelled and is_cancelled():
         return GreedyUnitResult(uid, False, tr("opt.cancelled"), runes_by_slot={})
 
+    solve_started = time.monotonic()
     if speed_hard_priority or bool(force_speed_priority):
-        # Fix 1: Phase 1 (max speed) uses a short time cap — in practice done in <0.1s.
-        # Phase 2 (quality) gets the full time budget.
+        # Phase 1 (max speed) comes from the slot DP; CP-SAT only confirms a DP
+        # upper bound (min-stat builds) or, failing that, maximizes speed itself
+        # under a short time cap.  Phase 2 (quality) gets the full time budget.
         solver.parameters.max_time_in_seconds = min(1.5, float(time_limit_s) * 0.25)
-        model.Maximize(final_speed_expr)
-        status = solver.Solve(model)
-        if is_cancelled and is_cancelled():
-            return GreedyUnitResult(uid, False, tr("opt.cancelled"), runes_by_slot={})
-        if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
-            best_speed = int(solver.Value(final_speed_expr))
+        speed_items_by_slot: Dict[int, List[Tuple[int, int, str]]] = {}
+        for (slot, rid) in x:
+            if free_members[int(rid)]:
+                speed_items_by_slot.setdefault(int(slot), []).append(template.speed_items[int(rid)])
+        best_speed, speed_exact = _max_final_speed_by_dp(
+            speed_items_by_slot,
+            artifacts_by_type,
+            builds,
+            base_spd=int(base_spd or 0),
+            base_spd_bonus_flat=int(base_spd_bonus_flat or 0),
+            min_final_speed=min_final_speed,
+            max_final_speed=max_final_speed,
+            force_swift=bool(force_speed_priority) and any(
+                int(sid) == _SWIFT_SET_ID for _spd, sid, _key in template.speed_items.values()
+            ),
+            broken_set_excluded_set_ids=broken_set_excluded_set_ids,
+            mode=mode,
+        )
+        status = cp_model.UNKNOWN
+        if best_speed is not None and not speed_exact:
+            probe = model.Clone()
+            probe.Add(final_speed_expr >= int(best_speed))
+            if solver.Solve(probe) not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+                best_speed = None
+            if is_cancelled and is_cancelled():
+                return GreedyUnitResult(uid, False, tr("opt.cancelled"), runes_by_slot={})
+        if best_speed is None:
+            model.Maximize(final_speed_expr)
+            status = _solve_until_plateau(solver, model, plateau_window_s, plateau_window_solutions, solve_trace)
+            if is_cancelled and is_cancelled():
+                return GreedyUnitResult(uid, False, tr("opt.cancelled"), runes_by_slot={})
+            if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+                best_speed = int(solver.Value(final_speed_expr))
+        if best_speed is not None:
             keep_speed_min = int(best_speed)
             if not bool(force_speed_priority):
                 keep_speed_min = max(0, int(best_speed) - max(0, int(speed_slack_for_quality)))
@@ -3426,7 +4746,7 @@ def _solve_single_unit_best(
             model.Add(final_speed_expr >= keep_speed_min)
             model.Maximize(sum(quality_terms) + (int(speed_tiebreak_weight) * final_speed_expr))
             solver.parameters.max_time_in_seconds = float(time_limit_s)
-            status = solver.Solve(model)
+            status = _solve_until_plateau(solver, model, plateau_window_s, plateau_window_solutions, solve_trace)
             if is_cancelled and is_cancelled():
                 return GreedyUnitResult(uid, False, tr("opt.cancelled"), runes_by_slot={})
     else:
@@ -3436,12 +4756,14 @@ def _solve_single_unit_best(
             model.Maximize((sum(quality_terms) * 1000) + (int(speed_tiebreak_weight) * final_speed_expr))
         else:
             model.Maximize(sum(quality_terms) + (int(speed_weight_soft) * final_speed_expr))
-        status = solver.Solve(model)
+        status = _solve_until_plateau(solver, model, plateau_window_s, plateau_window_solutions, solve_trace)
         if is_cancelled and is_cancelled():
             return GreedyUnitResult(uid, False, tr("opt.cancelled"), runes_by_slot={})
+    if time_budget is not None:
+        time_budget.record(uid, time.monotonic() - solve_started, time_limit_s, status == cp_model.OPTIMAL)
 
     if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
-        detail = _diagnose_single_unit_infeasible(pool, artifact_pool, builds)
+        detail = _diagnose_single_unit_infeasible(available_pool, available_art_pool, builds)
         if str(detail) == str(tr("opt.feasible")):
             hard_detail = _diagnose_single_unit_hard_constraint_conflict(
                 runes_by_slot=runes_by_slot,
@@ -3473,12 +4795,13 @@ def _solve_single_unit_best(
             break
 
     chosen: Dict[int, int] = {}
+    chosen_class = {int(slot): int(rep) for (slot, rep), xv in x.items() if solver.Value(xv) == 1}
+    hinted_rids = {int(rid) for rid in (hint_runes_by_slot or {}).values()}
     for slot in range(1, 7):
-        rid = None
-        for r in runes_by_slot[slot]:
-            if solver.Value(x[(slot, r.rune_id)]) == 1:
-                rid = r.rune_id
-                break
+        free = free_members.get(chosen_class.get(slot, 0), [])
+        rid = next((m for m in free if m in hinted_rids and m not in avoid_rids), None)
+        if rid is None:
+            rid = next((m for m in free if m not in avoid_rids), free[0] if free else None)
         if rid is None:
             return GreedyUnitResult(uid, False, tr("opt.internal_no_rune", slot=slot), runes_by_slot={})
         chosen[slot] = rid
@@ -3494,7 +4817,7 @@ def _solve_single_unit_best(
             return GreedyUnitResult(uid, False, tr("opt.internal_no_artifact", art_type=art_type), runes_by_slot={})
         chosen_artifacts[art_type] = aid
 
-    return GreedyUnitResult(
+    result = GreedyUnitResult(
         unit_id=uid,
         ok=True,
         message="OK",
@@ -3504,6 +4827,14 @@ def _solve_single_unit_best(
         artifacts_by_type=chosen_artifacts,
         final_speed=int(solver.Value(final_speed_expr)),
     )
+    if result_cache is not None:
+        # A plateau stop only searched for the time it ran, not for the whole limit.
+        solved_s = float(time_limit_s)
+        elapsed_s = time.monotonic() - solve_started
+        if status != cp_model.OPTIMAL and elapsed_s < 0.9 * solved_s:
+            solved_s = elapsed_s
+        result_cache.put(cache_key, result, solved_s, optimal=status == cp_model.OPTIMAL)
+    return result
 
 
 def _reorder_for_turn_order(req: GreedyRequest, unit_ids: List[int]) -> List[int]:
@@ -3569,15 +4900,242 @@ def _build_pass_orders(base_unit_ids: List[int], pass_count: int) -> List[List[i
     return out[:max(1, int(pass_count))]
 
 
+class PassScorer:
+    """Score tables for ``_evaluate_pass_score``, built once per request.
+
+    Rune quality per unit is a column of the account rune table; the artifact
+    score of a (unit, artifact) pair (quality, role context and hint score)
+    is computed on first use and kept.  Unit inputs (base stats, role,
+    sanitized artifact hints) are resolved once per unit.  Without *req* only
+    the efficiency sums are available.
+    """
+
+    def __init__(self, account: AccountData, req: Optional[GreedyRequest] = None) -> None:
+        self.account = account
+        self.req = req
+        self.rune_tbl = account_rune_table(account)
+        self.art_tbl = account_artifact_table(account)
+        self._rune_eff_deci = np.rint(self.rune_tbl.efficiency * 10.0).astype(np.int64)
+        self._art_eff_deci = np.rint(self.art_tbl.efficiency * 10.0).astype(np.int64)
+        self._rune_eff_milli = np.rint(self.rune_tbl.efficiency * 1000.0).astype(np.int64)
+        self._art_eff_milli = np.rint(self.art_tbl.efficiency * 1000.0).astype(np.int64)
+        self._rune_quality: Dict[int, np.ndarray] = {}
+        self._art_quality: Dict[int, np.ndarray] = {}
+        self._art_score: Dict[Tuple[int, int], int] = {}
+        self._unit_ctx: Dict[int, Tuple[int, int, int, int, str, Dict[str, Any]]] = {}
+
+    def _rta_ids(self, uid: int, equip: Dict[int, List[int]]) -> Optional[Set[int]]:
+        if not equip:
+            return None
+        return set(int(item_id) for item_id in equip.get(uid, []))
+
+    def rune_quality(self, uid: int) -> np.ndarray:
+        quality = self._rune_quality.get(int(uid))
+        if quality is None:
+            rta_equip = self.account.rta_rune_equip if self.req.mode == "rta" else {}
+            quality = self.rune_tbl.quality_for_unit(int(uid), self._rta_ids(int(uid), rta_equip))
+            self._rune_quality[int(uid)] = quality
+        return quality
+
+    def _unit_context(self, uid: int) -> Tuple[int, int, int, int, str, Dict[str, Any]]:
+        ctx = self._unit_ctx.get(int(uid))
+        if ctx is not None:
+            return ctx
+        req = self.req
+        unit = self.account.units_by_id.get(int(uid))
+        base_hp = int((unit.base_con or 0) * 15) if unit else 0
+        base_atk = int(unit.base_atk or 0) if unit else 0
+        base_def = int(unit.base_def or 0) if unit else 0
+        base_spd = int(unit.base_spd or 0) if unit else 0
+        unit_arch = str((req.unit_archetype_by_uid or {}).get(int(uid), "") or "")
+        role = _arena_role_from_archetype(unit_arch)
+        if role == "unknown":
+            role = "attack" if _is_attack_type_unit(base_hp, base_atk, base_def, archetype=unit_arch) else "support"
+        hints = dict((req.unit_artifact_hints_by_uid or {}).get(int(uid), {}) or {})
+        team_spd_map = dict(req.unit_team_has_spd_buff_by_uid or {})
+        if int(uid) in team_spd_map:
+            hints["team_has_spd_buff"] = bool(team_spd_map.get(int(uid), False))
+        ctx = (base_hp, base_atk, base_def, base_spd, str(role), _sanitize_artifact_hints_for_team_context(hints))
+        self._unit_ctx[int(uid)] = ctx
+        return ctx
+
+    def artifact_score(self, uid: int, art_row: int) -> int:
+        key = (int(uid), int(art_row))
+        score = self._art_score.get(key)
+        if score is not None:
+            return score
+        quality = self._art_quality.get(int(uid))
+        if quality is None:
+            rta_equip = self.account.rta_artifact_equip if self.req.mode == "rta" else {}
+            quality = self.art_tbl.quality_for_unit(int(uid), self._rta_ids(int(uid), rta_equip))
+            self._art_quality[int(uid)] = quality
+        base_hp, base_atk, base_def, base_spd, role, hints = self._unit_context(int(uid))
+        art = self.art_tbl.artifacts[int(art_row)]
+        score = int(quality[int(art_row)])
+        score += int(
+            ARTIFACT_ROLE_CONTEXT_WEIGHT
+            * _artifact_context_score_proxy(
+                art, role=role, base_hp=base_hp, base_atk=base_atk, base_def=base_def, base_spd=base_spd
+            )
+        )
+        score += int(_artifact_hint_score(art, dict(hints)))
+        self._art_score[key] = score
+        return score
+
+    def unit_quality_and_efficiency(self, res: GreedyUnitResult) -> Tuple[int, int]:
+        """(quality, efficiency x10) of one unit result."""
+        uid = int(res.unit_id)
+        rune_rows = [
+            self.rune_tbl.row_of[int(rid)] for rid in res.runes_by_slot.values() if int(rid) in self.rune_tbl.row_of
+        ]
+        quality = 0
+        eff_scaled = 0
+        if rune_rows:
+            quality += int(self.rune_quality(uid)[rune_rows].sum())
+            eff_scaled += int(self._rune_eff_deci[rune_rows].sum())
+        for aid in (res.artifacts_by_type or {}).values():
+            art_row = self.art_tbl.row_of.get(int(aid))
+            if art_row is None:
+                continue
+            quality += self.artifact_score(uid, art_row)
+            eff_scaled += int(self._art_eff_deci[art_row])
+        return quality, eff_scaled
+
+    def efficiency_milli(self, results: List[GreedyUnitResult]) -> int:
+        """Sum of rune and artifact efficiency x1000 over the ok results."""
+        total = 0
+        for res in results:
+            if not bool(getattr(res, "ok", False)):
+                continue
+            rune_rows = [
+                self.rune_tbl.row_of[int(rid or 0)]
+                for rid in dict(res.runes_by_slot or {}).values()
+                if int(rid or 0) in self.rune_tbl.row_of
+            ]
+            art_rows = [
+                self.art_tbl.row_of[int(aid or 0)]
+                for aid in dict(res.artifacts_by_type or {}).values()
+                if int(aid or 0) in self.art_tbl.row_of
+            ]
+            total += int(self._rune_eff_milli[rune_rows].sum()) + int(self._art_eff_milli[art_rows].sum())
+        return int(total)
+
+
+class PassBound:
+    """Optimistic ``_evaluate_pass_score`` prefix for pruning hopeless passes.
+
+    A unit's bound takes, per rune slot and artifact type, the unblocked item
+    with the largest score contribution, as if no other unit competed for it
+    and every build constraint held; turn-gap penalties are left out.  A pass
+    whose solved units plus the bounds of its open units cannot beat
+    *best_score* cannot change the result.  *best_score* is set by the pass
+    loop and read by running passes.
+    """
+
+    def __init__(self, scorer: PassScorer, req: GreedyRequest) -> None:
+        self.scorer = scorer
+        self.best_score: Optional[Tuple[int, int, int, int, int, int, int]] = None
+        self._excluded_runes = {int(rid) for rid in (req.excluded_rune_ids or ())}
+        self._excluded_arts = {int(aid) for aid in (req.excluded_artifact_ids or ())}
+        self._fixed_runes = {
+            int(uid): {int(rid) for rid in dict(by_slot or {}).values() if int(rid or 0) > 0}
+            for uid, by_slot in dict(req.unit_fixed_runes_by_slot or {}).items()
+        }
+        self._fixed_arts = {
+            int(uid): {int(aid) for aid in dict(by_type or {}).values() if int(aid or 0) > 0}
+            for uid, by_type in dict(req.unit_fixed_artifacts_by_type or {}).items()
+        }
+        # uid -> [(is_rune, blocked ids, ids by contribution, contributions, ids by quality, qualities)]
+        self._orders: Dict[int, List[Tuple[bool, Set[int], np.ndarray, np.ndarray, np.ndarray, np.ndarray]]] = {}
+
+    @staticmethod
+    def _group(is_rune: bool, blocked: Set[int], ids: np.ndarray, effective: np.ndarray, quality: np.ndarray):
+        by_eff = np.argsort(-effective, kind="stable")
+        by_quality = np.argsort(-quality, kind="stable")
+        return is_rune, blocked, ids[by_eff], effective[by_eff], ids[by_quality], quality[by_quality]
+
+    def _unit_orders(self, uid: int):
+        orders = self._orders.get(int(uid))
+        if orders is not None:
+            return orders
+        scorer = self.scorer
+        reserved_runes = set().union(*(rids for u, rids in self._fixed_runes.items() if u != int(uid)))
+        reserved_arts = set().union(*(aids for u, aids in self._fixed_arts.items() if u != int(uid)))
+        blocked_runes = self._excluded_runes | reserved_runes
+        blocked_arts = self._excluded_arts | reserved_arts
+        orders = []
+        rune_tbl = scorer.rune_tbl
+        rune_quality = scorer.rune_quality(int(uid))
+        rune_effective = rune_quality + scorer._rune_eff_deci * int(PASS_EFFICIENCY_WEIGHT)
+        for slot in range(1, 7):
+            rows = np.flatnonzero(rune_tbl.slot == slot)
+            orders.append(
+                self._group(True, blocked_runes, rune_tbl.rune_id[rows], rune_effective[rows], rune_quality[rows])
+            )
+        art_tbl = scorer.art_tbl
+        for art_type in (1, 2):
+            rows = np.flatnonzero(art_tbl.type_ == art_type)
+            art_quality = np.fromiter((scorer.artifact_score(int(uid), int(row)) for row in rows), dtype=np.int64)
+            art_effective = art_quality + scorer._art_eff_deci[rows] * int(PASS_EFFICIENCY_WEIGHT)
+            orders.append(self._group(False, blocked_arts, art_tbl.artifact_id[rows], art_effective, art_quality))
+        self._orders[int(uid)] = orders
+        return orders
+
+    @staticmethod
+    def _first_free(ids: np.ndarray, values: np.ndarray, blocked: Set[int], taken: Set[int]) -> int:
+        for i in range(len(ids)):
+            item_id = int(ids[i])
+            if item_id not in blocked and item_id not in taken:
+                # An empty slot contributes nothing, so the bound never drops below 0.
+                return max(0, int(values[i]))
+        return 0
+
+    def unit_bound(self, uid: int, taken_runes: Set[int] = frozenset(), taken_arts: Set[int] = frozenset()):
+        """(effective quality, quality) bound of *uid* without the *taken* items."""
+        effective = 0
+        quality = 0
+        for is_rune, blocked, eff_ids, eff_vals, q_ids, q_vals in self._unit_orders(int(uid)):
+            taken = taken_runes if is_rune else taken_arts
+            effective += self._first_free(eff_ids, eff_vals, blocked, taken)
+            quality += self._first_free(q_ids, q_vals, blocked, taken)
+        return effective, quality
+
+    def can_improve(self, done: List[GreedyUnitResult], remaining: List[int]) -> bool:
+        """False if no way to solve *remaining* after *done* beats *best_score*."""
+        best = self.best_score
+        if best is None or not remaining:
+            return True
+        ok_count = 0
+        effective = 0
+        quality = 0
+        taken_runes: Set[int] = set()
+        taken_arts: Set[int] = set()
+        for res in done:
+            if not res.ok or not res.runes_by_slot:
+                continue
+            unit_quality, unit_eff_scaled = self.scorer.unit_quality_and_efficiency(res)
+            ok_count += 1
+            quality += int(unit_quality)
+            effective += int(unit_quality) + int(unit_eff_scaled) * int(PASS_EFFICIENCY_WEIGHT)
+            taken_runes.update(int(rid) for rid in res.runes_by_slot.values())
+            taken_arts.update(int(aid) for aid in (res.artifacts_by_type or {}).values())
+        for uid in remaining:
+            unit_effective, unit_quality = self.unit_bound(int(uid), taken_runes, taken_arts)
+            ok_count += 1
+            effective += unit_effective
+            quality += unit_quality
+        # Score order: ok units, effective quality, total quality, then tie-breaks.
+        return (ok_count, effective, quality) >= tuple(best[:3])
+
+
 def _evaluate_pass_score(
     account: AccountData,
     req: GreedyRequest,
     results: List[GreedyUnitResult],
 ) -> Tuple[int, int, int, int, int, int, int]:
-    runes_by_id = account.runes_by_id()
-    artifacts_by_id: Dict[int, Artifact] = {int(a.artifact_id): a for a in account.artifacts}
-    rta_equip = account.rta_rune_equip if req.mode == "rta" else {}
-    rta_art_equip = account.rta_artifact_equip if req.mode == "rta" else {}
+    scorer = req.pass_scorer
+    if scorer is None or scorer.account is not account:
+        scorer = PassScorer(account, req)
 
     ok_count = 0
     unit_scores: List[int] = []
@@ -3588,61 +5146,7 @@ def _evaluate_pass_score(
         if not res.ok or not res.runes_by_slot:
             continue
         uid = int(res.unit_id)
-        unit = account.units_by_id.get(int(uid))
-        base_hp = int((unit.base_con or 0) * 15) if unit else 0
-        base_atk = int(unit.base_atk or 0) if unit else 0
-        base_def = int(unit.base_def or 0) if unit else 0
-        base_spd = int(unit.base_spd or 0) if unit else 0
-        unit_arch = str((req.unit_archetype_by_uid or {}).get(int(uid), "") or "")
-        role_for_art = _arena_role_from_archetype(unit_arch)
-        if role_for_art == "unknown":
-            role_for_art = (
-                "attack"
-                if _is_attack_type_unit(base_hp, base_atk, base_def, archetype=unit_arch)
-                else "support"
-            )
-        rta_rids: Optional[Set[int]] = None
-        if rta_equip:
-            rta_rids = set(int(rid) for rid in rta_equip.get(uid, []))
-        rta_aids: Optional[Set[int]] = None
-        if rta_art_equip:
-            rta_aids = set(int(aid) for aid in rta_art_equip.get(uid, []))
-        unit_quality = 0
-        unit_eff_scaled = 0
-        for rid in res.runes_by_slot.values():
-            rune = runes_by_id.get(int(rid))
-            if rune is None:
-                continue
-            unit_quality += _rune_quality_score(rune, uid, rta_rids)
-            unit_eff_scaled += int(round(float(rune_efficiency(rune)) * 10.0))
-        for aid in (res.artifacts_by_type or {}).values():
-            art = artifacts_by_id.get(int(aid))
-            if art is None:
-                continue
-            eval_hints = dict((req.unit_artifact_hints_by_uid or {}).get(int(uid), {}) or {})
-            team_spd_map = dict(req.unit_team_has_spd_buff_by_uid or {})
-            if int(uid) in team_spd_map:
-                eval_hints["team_has_spd_buff"] = bool(team_spd_map.get(int(uid), False))
-            eval_hints = _sanitize_artifact_hints_for_team_context(eval_hints)
-            unit_quality += _artifact_quality_score(art, uid, rta_aids)
-            unit_quality += int(
-                ARTIFACT_ROLE_CONTEXT_WEIGHT
-                * _artifact_context_score_proxy(
-                    art,
-                    role=str(role_for_art),
-                    base_hp=int(base_hp or 0),
-                    base_atk=int(base_atk or 0),
-                    base_def=int(base_def or 0),
-                    base_spd=int(base_spd or 0),
-                )
-            )
-            unit_quality += int(
-                _artifact_hint_score(
-                    art,
-                    dict(eval_hints),
-                )
-            )
-            unit_eff_scaled += int(round(float(artifact_efficiency(art)) * 10.0))
+        unit_quality, unit_eff_scaled = scorer.unit_quality_and_efficiency(res)
         ok_count += 1
         unit_scores.append(int(unit_quality))
         total_eff_scaled += int(unit_eff_scaled)
@@ -3711,8 +5215,12 @@ def _run_pass_with_profile(
     objective_mode: str = "balanced",
     rune_top_per_set_override: Optional[int] = None,
     rune_pool_override: Optional[List[Any]] = None,
+    hint_solution_by_unit: Optional[Dict[int, GreedyUnitResult]] = None,
 ) -> List[GreedyUnitResult]:
     unit_ids = _reorder_for_turn_order(req, unit_ids)
+    # Warm start from the previous solution (the avoided one when not given).
+    if hint_solution_by_unit is None:
+        hint_solution_by_unit = avoid_solution_by_unit
 
     # initial pool
     if rune_pool_override is not None:
@@ -3751,15 +5259,28 @@ def _run_pass_with_profile(
     for unit_pos, uid in enumerate(unit_ids):
         if req.is_cancelled and req.is_cancelled():
             break
-        cur_pool = [
-            r for r in pool
-            if (r.rune_id not in blocked) or (int(reserved_rune_owner.get(int(r.rune_id), 0)) == int(uid))
-        ]
-        cur_art_pool = [
-            a for a in artifact_pool
-            if (int(a.artifact_id or 0) not in blocked_artifacts)
-            or (int(reserved_artifact_owner.get(int(a.artifact_id or 0), 0)) == int(uid))
-        ]
+        # Even optimal solves of the open units could not beat the best pass:
+        # the partial result is returned and loses the pass comparison.
+        if req.pass_bound is not None and not req.pass_bound.can_improve(results, unit_ids[unit_pos:]):
+            if req.solve_budget is not None:
+                for skipped_uid in unit_ids[unit_pos:]:
+                    req.solve_budget.finish(int(skipped_uid))
+            break
+        # The unit's model covers everything not reserved for another unit; what
+        # earlier units took in this pass is only blocked for this solve.
+        unit_pool = pool
+        if reserved_rune_owner:
+            unit_pool = [r for r in pool if int(reserved_rune_owner.get(int(r.rune_id), uid)) == int(uid)]
+        unit_art_pool = artifact_pool
+        if reserved_artifact_owner:
+            unit_art_pool = [
+                a for a in artifact_pool
+                if int(reserved_artifact_owner.get(int(a.artifact_id or 0), uid)) == int(uid)
+            ]
+        unit_blocked = {rid for rid in blocked if int(reserved_rune_owner.get(rid, 0)) != int(uid)}
+        unit_blocked_artifacts = {
+            aid for aid in blocked_artifacts if int(reserved_artifact_owner.get(aid, 0)) != int(uid)
+        }
         unit = account.units_by_id.get(uid)
         base_hp = int((unit.base_con or 0) * 15) if unit else 0
         base_atk = int(unit.base_atk or 0) if unit else 0
@@ -3792,6 +5313,12 @@ def _run_pass_with_profile(
                         prev_caps.append(int(prev.final_speed) - 1)
                 if prev_caps:
                     max_speed_cap = min(prev_caps)
+        # Turn-order caps depend on what earlier units got and differ between passes.
+        speed_cap_possible = bool(
+            req.enforce_turn_order
+            and (req.unit_team_index or {}).get(int(uid)) is not None
+            and int((req.unit_team_turn_order or {}).get(int(uid), 0) or 0) > 1
+        )
         min_floor_map = dict(req.unit_min_final_speed or {})
         min_speed_value = int(min_floor_map.get(int(uid), 0) or 0)
         if min_speed_value > 0:
@@ -3799,6 +5326,7 @@ def _run_pass_with_profile(
         max_cap_map = dict(req.unit_max_final_speed or {})
         max_speed_value = int(max_cap_map.get(int(uid), 0) or 0)
         if max_speed_value > 0:
+            speed_cap_possible = True
             if max_speed_cap is None:
                 max_speed_cap = int(max_speed_value)
             else:
@@ -3827,11 +5355,29 @@ def _run_pass_with_profile(
         if int(uid) in team_spd_map:
             artifact_hints_for_unit["team_has_spd_buff"] = bool(team_spd_map.get(int(uid), False))
         artifact_hints_for_unit = _sanitize_artifact_hints_for_team_context(artifact_hints_for_unit)
+        hint_ref = (hint_solution_by_unit or {}).get(int(uid))
+        hint_runes_by_slot: Dict[int, int] = {}
+        hint_artifacts_by_type: Dict[int, int] = {}
+        if not bool(getattr(req, "warm_start_hints", True)):
+            hint_ref = None
+        elif hint_ref is not None and hint_ref.ok and hint_ref.runes_by_slot:
+            hint_runes_by_slot = dict(hint_ref.runes_by_slot)
+            hint_artifacts_by_type = dict(hint_ref.artifacts_by_type or {})
+        else:
+            hint_ref = None
+            explicit_runes = (req.unit_hint_runes_by_slot or {}).get(int(uid))
+            explicit_arts = (req.unit_hint_artifacts_by_type or {}).get(int(uid))
+            if explicit_runes or explicit_arts:
+                hint_runes_by_slot = dict(explicit_runes or {})
+                hint_artifacts_by_type = dict(explicit_arts or {})
+            else:
+                hint_runes_by_slot = dict(baseline_runes_by_slot)
+                hint_artifacts_by_type = dict(baseline_artifacts_by_type)
 
         r = _solve_single_unit_best(
             uid=uid,
-            pool=cur_pool,
-            artifact_pool=cur_art_pool,
+            pool=unit_pool,
+            artifact_pool=unit_art_pool,
             builds=builds,
             time_limit_s=float(time_limit_per_unit_s),
             workers=req.workers,
@@ -3879,7 +5425,29 @@ def _run_pass_with_profile(
             is_cancelled=req.is_cancelled,
             register_solver=req.register_solver,
             mode=str(req.mode),
+            blocked_rune_ids=unit_blocked,
+            blocked_artifact_ids=unit_blocked_artifacts,
+            model_templates=req.unit_model_templates,
+            result_cache=req.unit_solve_cache,
+            time_budget=req.solve_budget,
+            plateau_window_s=float(req.plateau_window_s or 0.0),
+            plateau_window_solutions=int(req.plateau_window_solutions or 0),
+            solve_trace=(
+                (lambda trace, stopped, _uid=int(uid): req.solve_trace_callback(_uid, trace, stopped))
+                if req.solve_trace_callback
+                else None
+            ),
+            # Every other unit can block one rune per slot, the avoid penalty one more.
+            dominance_keep=len(unit_ids) + 1,
+            speed_cap_possible=speed_cap_possible,
+            hint_runes_by_slot=hint_runes_by_slot,
+            hint_artifacts_by_type=hint_artifacts_by_type,
+            hint_build_id=str(hint_ref.chosen_build_id or "") if hint_ref else "",
+            hint_final_speed=int(hint_ref.final_speed or 0) if hint_ref else 0,
+            hint_feasible_only=bool(getattr(req, "warm_start_feasible_only", True)),
         )
+        if req.solve_budget is not None:
+            req.solve_budget.finish(int(uid))
         if str(r.message or "") == tr("opt.cancelled"):
             break
         results.append(r)
@@ -3904,6 +5472,7 @@ def _run_greedy_pass(
     time_limit_per_unit_s: float,
     speed_slack_for_quality: int = 0,
     rune_top_per_set_override: Optional[int] = None,
+    hint_solution_by_unit: Optional[Dict[int, GreedyUnitResult]] = None,
 ) -> List[GreedyUnitResult]:
     return _run_pass_with_profile(
         account=account,
@@ -3918,6 +5487,7 @@ def _run_greedy_pass(
         speed_slack_for_quality=max(0, int(speed_slack_for_quality)),
         objective_mode="balanced",
         rune_top_per_set_override=rune_top_per_set_override,
+        hint_solution_by_unit=hint_solution_by_unit,
     )
 
 
@@ -3948,16 +5518,155 @@ def _results_signature(
     return tuple(sig)
 
 
+def _optimize_incremental(account: AccountData, presets: BuildStore, req: GreedyRequest) -> Optional[GreedyResult]:
+    """Re-solve only the changed units of *req.previous_result*.
+
+    The scope starts with the changed units and units without a usable
+    previous result.  Kept units whose runes/artifacts are gone, excluded or
+    locked to a unit in scope join it, as do kept teammates whose turn order
+    no longer holds against the re-solved speeds.  Kept items are excluded
+    from the sub-run, and kept earlier teammates cap the speed of re-solved
+    units.  Returns None when the scope outgrows ``incremental_max_scope``.
+    """
+    unit_ids = [int(u) for u in req.unit_ids_in_order]
+    prev_by_uid: Dict[int, GreedyUnitResult] = {
+        int(r.unit_id): r for r in (req.previous_result.results or []) if r.ok and r.runes_by_slot
+    }
+    changed = {int(uid) for uid in (req.changed_unit_ids or ())}
+    scope: Set[int] = {uid for uid in unit_ids if uid in changed or uid not in prev_by_uid}
+    max_scope = max(1, int(float(req.incremental_max_scope) * len(unit_ids)))
+    runes_by_id = account.runes_by_id()
+    artifacts_by_id = account.artifacts_by_id()
+    excluded_runes = {int(rid) for rid in (req.excluded_rune_ids or ())}
+    excluded_arts = {int(aid) for aid in (req.excluded_artifact_ids or ())}
+    team_idx_map = dict(req.unit_team_index or {}) if req.enforce_turn_order else {}
+    team_turn_map = dict(req.unit_team_turn_order or {})
+
+    def _turn(uid: int) -> int:
+        return int(team_turn_map.get(int(uid), 0) or 0)
+
+    def _teammates(uid: int) -> List[int]:
+        team = team_idx_map.get(int(uid))
+        if team is None or _turn(uid) <= 0:
+            return []
+        return [u for u in unit_ids if u != uid and team_idx_map.get(u) == team and _turn(u) > 0]
+
+    new_by_uid: Dict[int, GreedyUnitResult] = {}
+    while True:
+        # Locks of units in scope take items away from kept units.
+        locked_runes: Set[int] = set()
+        locked_arts: Set[int] = set()
+        for uid in scope:
+            locked_runes.update(int(r) for r in ((req.unit_fixed_runes_by_slot or {}).get(uid) or {}).values())
+            locked_arts.update(int(a) for a in ((req.unit_fixed_artifacts_by_type or {}).get(uid) or {}).values())
+        for uid in unit_ids:
+            if uid in scope:
+                continue
+            prev = prev_by_uid[uid]
+            rids = {int(rid) for rid in (prev.runes_by_slot or {}).values()}
+            aids = {int(aid) for aid in (prev.artifacts_by_type or {}).values()}
+            if (
+                any(rid not in runes_by_id or rid in excluded_runes or rid in locked_runes for rid in rids)
+                or any(aid not in artifacts_by_id or aid in excluded_arts or aid in locked_arts for aid in aids)
+            ):
+                scope.add(uid)
+        if len(scope) > max_scope:
+            return None
+        if not scope:
+            break
+
+        kept = [uid for uid in unit_ids if uid not in scope]
+        max_final_speed = dict(req.unit_max_final_speed or {})
+        for uid in scope:
+            caps = [
+                int(prev_by_uid[mate].final_speed) - 1
+                for mate in _teammates(uid)
+                if mate in prev_by_uid and mate not in scope and _turn(mate) < _turn(uid)
+            ]
+            user_cap = int(max_final_speed.get(uid, 0) or 0)
+            if caps:
+                max_final_speed[uid] = min(min(caps), user_cap) if user_cap > 0 else min(caps)
+        sub_req = replace(
+            req,
+            unit_ids_in_order=[uid for uid in unit_ids if uid in scope],
+            excluded_rune_ids=excluded_runes | {
+                int(rid) for uid in kept for rid in (prev_by_uid[uid].runes_by_slot or {}).values()
+            },
+            excluded_artifact_ids=excluded_arts | {
+                int(aid) for uid in kept for aid in (prev_by_uid[uid].artifacts_by_type or {}).values()
+            },
+            unit_max_final_speed=max_final_speed or None,
+            previous_result=None,
+            changed_unit_ids=None,
+        )
+        sub = _optimize_greedy(account, presets, sub_req)
+        new_by_uid = {int(r.unit_id): r for r in sub.results}
+        if req.is_cancelled and req.is_cancelled():
+            break
+        # Kept later teammates must stay slower than re-solved earlier units.
+        conflicts = {
+            mate
+            for uid in scope
+            if uid in new_by_uid and new_by_uid[uid].ok
+            for mate in _teammates(uid)
+            if mate not in scope
+            and _turn(mate) > _turn(uid)
+            and int(prev_by_uid[mate].final_speed or 0) >= int(new_by_uid[uid].final_speed or 0)
+        }
+        if not conflicts:
+            break
+        scope |= conflicts
+
+    results = [
+        (new_by_uid.get(uid) or GreedyUnitResult(uid, False, tr("opt.cancelled"), runes_by_slot={}))
+        if uid in scope
+        else prev_by_uid[uid]
+        for uid in unit_ids
+    ]
+    if req.is_cancelled and req.is_cancelled():
+        return GreedyResult(False, tr("opt.cancelled"), results)
+    ok_all = all(r.ok for r in results)
+    prefix = tr("opt.ok") if ok_all else tr("opt.partial_fail")
+    return GreedyResult(ok_all, tr("opt.incremental", prefix=prefix, solved=len(scope), total=len(unit_ids)), results)
+
+
 def optimize_greedy(account: AccountData, presets: BuildStore, req: GreedyRequest) -> GreedyResult:
     """
     Extended SWOP-like greedy:
     - runs one or multiple passes with different optimization orders
     - pass 1 uses greedy seed; optional later passes can use refine strategy
+    - later passes (and their remaining unit solves) are skipped once their
+      score bound (see PassBound) cannot beat the best pass
     - keeps the best full-account outcome (units built + fair quality distribution)
+    - strategy "lns" replaces the passes by a large-neighborhood search
+      (see app.engine.lns_optimizer)
     """
+    if req.unit_model_templates is None:
+        req = replace(req, unit_model_templates=_UnitModelTemplateCache())
+    if req.pass_scorer is None:
+        req = replace(req, pass_scorer=PassScorer(account, req))
+    own_budget: Optional[SolveBudget] = None
+    if req.solve_budget is None and float(req.time_budget_s or 0.0) > 0.0:
+        own_budget = SolveBudget(
+            float(req.time_budget_s),
+            prior_s_per_var=history_seconds_per_var(str(req.mode or "")),
+        )
+        req = replace(req, solve_budget=own_budget)
+    try:
+        return _optimize_greedy(account, presets, req)
+    finally:
+        if own_budget is not None:
+            own_budget.record_history(str(req.mode or ""))
+
+
+def _optimize_greedy(account: AccountData, presets: BuildStore, req: GreedyRequest) -> GreedyResult:
     base_unit_ids = list(req.unit_ids_in_order)
     if not base_unit_ids:
         return GreedyResult(False, tr("opt.no_units"), [])
+    if req.previous_result is not None and req.changed_unit_ids is not None:
+        incremental = _optimize_incremental(account, presets, req)
+        if incremental is not None:
+            return incremental
 
     if req.cloud_build_prior_by_uid is None:
         try:
@@ -3983,9 +5692,16 @@ def optimize_greedy(account: AccountData, presets: BuildStore, req: GreedyReques
     if profile == "gpu_combo":
         from app.engine.gpu_combo_optimizer import optimize_gpu_combo
 
-        return optimize_gpu_combo(account, presets, req)
+        # gpu_combo plans its pass times itself (adaptive plan from its history).
+        return optimize_gpu_combo(account, presets, replace(req, solve_budget=None))
     if profile == "max_quality":
         from app.engine.global_optimizer import optimize_global
+
+        if bool(req.decompose_teams):
+            from app.engine.team_decomposition import _team_groups, optimize_team_decomposed
+
+            if len(_team_groups(req)) > 1:
+                return optimize_team_decomposed(account, presets, req)
         run_count = int(max(1, int(req.multi_pass_count or 1))) if bool(req.multi_pass_enabled) else 1
         if run_count <= 1:
             return optimize_global(account, presets, req)
@@ -3993,20 +5709,27 @@ def optimize_greedy(account: AccountData, presets: BuildStore, req: GreedyReques
         max_parallel = int(max(1, int(req.workers or 1)))
         parallel_runs = int(max(1, min(int(run_count), int(max_parallel))))
         workers_per_run = int(max(1, int(max_parallel // parallel_runs)))
+        # The runs go in waves of parallel_runs; together they keep to the run's budget.
+        waves = -(-int(run_count) // int(parallel_runs))
+        run_budget_s = float(req.time_budget_s or 0.0) / float(waves)
 
-        def _run_global_once(run_idx: int) -> tuple[int, GreedyResult]:
-            if req.is_cancelled and req.is_cancelled():
-                return int(run_idx), GreedyResult(False, tr("opt.cancelled"), [])
-            sub_req = replace(
+        def _sub_request(run_idx: int) -> GreedyRequest:
+            return replace(
                 req,
                 workers=int(workers_per_run),
+                time_budget_s=run_budget_s,
+                solve_budget=None,
                 multi_pass_enabled=False,
                 multi_pass_count=1,
                 progress_callback=None,
                 register_solver=None,
                 global_seed_offset=int(run_idx * 100003),
             )
-            return int(run_idx), optimize_global(account, presets, sub_req)
+
+        def _run_global_once(run_idx: int) -> tuple[int, GreedyResult]:
+            if req.is_cancelled and req.is_cancelled():
+                return int(run_idx), GreedyResult(False, tr("opt.cancelled"), [])
+            return int(run_idx), optimize_global(account, presets, _sub_request(run_idx))
 
         completed = 0
         run_results: List[tuple[int, GreedyResult]] = []
@@ -4027,18 +5750,33 @@ def optimize_greedy(account: AccountData, presets: BuildStore, req: GreedyReques
 
         hb_thread = threading.Thread(target=_heartbeat, daemon=True)
         hb_thread.start()
+        use_processes = str(getattr(req, "solve_backend", "thread") or "thread").strip().lower() == "process"
         try:
-            with ThreadPoolExecutor(max_workers=int(parallel_runs)) as ex:
-                futures = [ex.submit(_run_global_once, int(i)) for i in range(int(run_count))]
+            if use_processes:
+                # Model building is pure Python; separate processes keep the runs off one GIL.
+                from app.engine.process_pool import ProcessJobPool
+
+                ex = ProcessJobPool(account, presets, int(parallel_runs), is_cancelled=req.is_cancelled)
+                run_idx_by_future = {
+                    ex.submit(optimize_global, _sub_request(int(i))): int(i) for i in range(int(run_count))
+                }
+            else:
+                ex = ThreadPoolExecutor(max_workers=int(parallel_runs))
+                run_idx_by_future = {ex.submit(_run_global_once, int(i)): int(i) for i in range(int(run_count))}
+            with ex:
+                futures = list(run_idx_by_future)
                 for fut in as_completed(futures):
                     if req.is_cancelled and req.is_cancelled():
                         for ff in futures:
                             ff.cancel()
                         break
                     try:
-                        run_results.append(fut.result())
+                        fut_result = fut.result()
                     except Exception:
                         continue
+                    if use_processes:
+                        fut_result = (run_idx_by_future[fut], fut_result)
+                    run_results.append(fut_result)
                     completed += 1
                     with heartbeat_lock:
                         heartbeat_state["completed"] = int(completed)
@@ -4079,8 +5817,12 @@ def optimize_greedy(account: AccountData, presets: BuildStore, req: GreedyReques
         )
         return GreedyResult(bool(best_result.ok), msg, list(best_result.results or []))
     strategy = str(getattr(req, "multi_pass_strategy", "greedy_refine") or "greedy_refine").strip().lower()
-    if strategy not in ("greedy_only", "greedy_refine"):
+    if strategy not in ("greedy_only", "greedy_refine", "lns"):
         strategy = "greedy_refine"
+    if strategy == "lns" and profile != "fast" and len(base_unit_ids) > 1 and bool(req.multi_pass_enabled):
+        from app.engine.lns_optimizer import optimize_lns
+
+        return optimize_lns(account, presets, req)
     requested_top_n_raw = int(getattr(req, "rune_top_per_set", 200) or 200)
     use_full_rune_pool = int(requested_top_n_raw) <= 0
     if profile == "fast":
@@ -4106,79 +5848,145 @@ def optimize_greedy(account: AccountData, presets: BuildStore, req: GreedyReques
     early_stop_reason = ""
     best_outcome: Optional[_PassOutcome] = None
     total_passes = len(pass_orders)
-    for idx, unit_ids in enumerate(pass_orders):
-        if req.is_cancelled and req.is_cancelled():
-            break
-        if req.progress_callback:
-            try:
-                req.progress_callback(idx + 1, total_passes)
-            except Exception:
-                pass
-        pass_time = float(req.time_limit_per_unit_s)
-        if idx > 0:
-            if profile == "max_quality":
-                pass_time = max(1.5, float(req.time_limit_per_unit_s) * max(1.2, float(req.multi_pass_time_factor)))
-            elif strategy == "greedy_refine":
-                # Refinement needs real search time; tiny budgets collapse to pass-1 clones.
-                pass_time = max(1.0, float(req.time_limit_per_unit_s) * max(0.8, float(req.multi_pass_time_factor)))
-            else:
-                pass_time = max(0.5, float(req.time_limit_per_unit_s) * float(req.multi_pass_time_factor))
-        use_refine = idx > 0 and strategy == "greedy_refine"
-        if use_refine:
+
+    def _pass_time(idx: int) -> float:
+        if idx <= 0:
+            return float(req.time_limit_per_unit_s)
+        if profile == "max_quality":
+            return max(1.5, float(req.time_limit_per_unit_s) * max(1.2, float(req.multi_pass_time_factor)))
+        if strategy == "greedy_refine":
+            # Refinement needs real search time; tiny budgets collapse to pass-1 clones.
+            return max(1.0, float(req.time_limit_per_unit_s) * max(0.8, float(req.multi_pass_time_factor)))
+        return max(0.5, float(req.time_limit_per_unit_s) * float(req.multi_pass_time_factor))
+
+    def _run_pass(pass_req: GreedyRequest, idx: int, avoid_outcome: Optional[_PassOutcome]) -> List[GreedyUnitResult]:
+        unit_ids = pass_orders[idx]
+        if idx > 0 and strategy == "greedy_refine":
             from app.engine.refine_optimizer import run_refine_pass
 
-            pass_results = run_refine_pass(
+            return run_refine_pass(
                 account=account,
                 presets=presets,
-                req=req,
+                req=pass_req,
                 unit_ids=unit_ids,
-                time_limit_per_unit_s=pass_time,
+                time_limit_per_unit_s=_pass_time(idx),
                 pass_idx=idx,
                 avoid_solution_by_unit=(
-                    {int(r.unit_id): r for r in (best_outcome.results if best_outcome else [])}
+                    {int(r.unit_id): r for r in (avoid_outcome.results if avoid_outcome else [])}
                 ),
                 speed_slack_for_quality=max(0, int(speed_slack_effective)),
                 rune_top_per_set_override=max(0, int(rune_top_per_set_effective)),
             )
-        else:
-            pass_results = _run_greedy_pass(
-                account=account,
-                presets=presets,
-                req=req,
-                unit_ids=unit_ids,
-                time_limit_per_unit_s=pass_time,
-                speed_slack_for_quality=(
-                    0 if idx == 0 else max(0, int(speed_slack_effective))
-                ),
-                rune_top_per_set_override=max(0, int(rune_top_per_set_effective)),
-            )
-        outcome = _PassOutcome(
-            pass_idx=idx,
-            order=list(unit_ids),
-            results=pass_results,
-            score=_evaluate_pass_score(account, req, pass_results),
+        return _run_greedy_pass(
+            account=account,
+            presets=presets,
+            req=pass_req,
+            unit_ids=unit_ids,
+            time_limit_per_unit_s=_pass_time(idx),
+            speed_slack_for_quality=(
+                0 if idx == 0 else max(0, int(speed_slack_effective))
+            ),
+            rune_top_per_set_override=max(0, int(rune_top_per_set_effective)),
+            hint_solution_by_unit=(
+                {int(r.unit_id): r for r in avoid_outcome.results} if avoid_outcome else None
+            ),
         )
-        outcomes.append(outcome)
 
-        sig = _results_signature(pass_results)
-        repeated_solution = sig in seen_signatures
-        seen_signatures.add(sig)
-
-        improved = best_score is None or outcome.score > best_score
-        if improved:
-            best_score = outcome.score
-            best_outcome = outcome
-            no_improve_streak = 0
-        else:
-            no_improve_streak += 1
-
-        if idx > 0:
-            if repeated_solution and not improved and strategy != "greedy_refine":
-                early_stop_reason = tr("opt.stable_solution")
+    # Parallel pass mode: up to multi_pass_parallel passes run at once on a bounded
+    # pool with req.workers split between them.  greedy_only passes are independent
+    # and all queued at once; refine passes run in waves after the seed pass and
+    # avoid the best solution known when their wave starts.  Outcomes are still
+    # evaluated in pass order, so early stop and signature dedupe are unchanged.
+    parallel_passes = int(max(1, int(getattr(req, "multi_pass_parallel", 1) or 1)))
+    parallel_passes = int(min(parallel_passes, len(pass_orders), max(1, int(req.workers or 1))))
+    pass_bound: Optional[PassBound] = None
+    if len(pass_orders) > 1:
+        pass_bound = PassBound(req.pass_scorer or PassScorer(account, req), req)
+        req = replace(req, pass_bound=pass_bound)
+    if req.solve_budget is not None:
+        req.solve_budget.concurrency = parallel_passes
+        req.solve_budget.plan(base_unit_ids, repeats=len(pass_orders))
+    stop_parallel = threading.Event()
+    pass_executor: Optional[ThreadPoolExecutor] = None
+    pending: Dict[int, Any] = {}
+    if parallel_passes > 1:
+        pass_req = replace(
+            req,
+            workers=int(max(1, int(req.workers or 1) // parallel_passes)),
+            progress_callback=None,
+            is_cancelled=lambda: stop_parallel.is_set() or bool(req.is_cancelled and req.is_cancelled()),
+        )
+        pass_executor = ThreadPoolExecutor(max_workers=parallel_passes)
+    try:
+        for idx in range(len(pass_orders)):
+            unit_ids = pass_orders[idx]
+            if req.is_cancelled and req.is_cancelled():
                 break
-            if no_improve_streak >= int(no_improve_patience):
-                early_stop_reason = tr("opt.no_improvement")
+            if idx > 0 and req.solve_budget is not None and req.solve_budget.exhausted():
+                early_stop_reason = tr("opt.time_budget_used")
                 break
+            # The bound does not depend on the order, so no later pass can improve either.
+            if idx > 0 and pass_bound is not None and not pass_bound.can_improve([], unit_ids):
+                early_stop_reason = tr("opt.bound_reached")
+                if req.solve_budget is not None:
+                    # Queued passes finish their units themselves or end with the run.
+                    for skipped_idx in range(idx, len(pass_orders)):
+                        if skipped_idx not in pending:
+                            for skipped_uid in pass_orders[skipped_idx]:
+                                req.solve_budget.finish(int(skipped_uid))
+                break
+            if req.progress_callback:
+                try:
+                    req.progress_callback(idx + 1, total_passes)
+                except Exception:
+                    pass
+            if pass_executor is None:
+                pass_results = _run_pass(req, idx, best_outcome)
+            else:
+                if idx not in pending:
+                    if strategy == "greedy_only":
+                        wave = range(idx, len(pass_orders))
+                    elif idx == 0:
+                        wave = range(0, 1)
+                    else:
+                        wave = range(idx, min(len(pass_orders), idx + parallel_passes))
+                    for widx in wave:
+                        pending[widx] = pass_executor.submit(_run_pass, pass_req, widx, best_outcome)
+                pass_results = pending.pop(idx).result()
+            outcome = _PassOutcome(
+                pass_idx=idx,
+                order=list(unit_ids),
+                results=pass_results,
+                score=_evaluate_pass_score(account, req, pass_results),
+            )
+            outcomes.append(outcome)
+
+            sig = _results_signature(pass_results)
+            repeated_solution = sig in seen_signatures
+            seen_signatures.add(sig)
+
+            improved = best_score is None or outcome.score > best_score
+            if improved:
+                best_score = outcome.score
+                best_outcome = outcome
+                no_improve_streak = 0
+                if pass_bound is not None:
+                    pass_bound.best_score = best_score
+            else:
+                no_improve_streak += 1
+
+            if idx > 0:
+                if repeated_solution and not improved and strategy != "greedy_refine":
+                    early_stop_reason = tr("opt.stable_solution")
+                    break
+                if no_improve_streak >= int(no_improve_patience):
+                    early_stop_reason = tr("opt.no_improvement")
+                    break
+    finally:
+        if pass_executor is not None:
+            # Passes past an early stop are dropped; running ones abort at their next unit.
+            stop_parallel.set()
+            pass_executor.shutdown(wait=True, cancel_futures=True)
 
     if not outcomes:
         return GreedyResult(False, tr("opt.cancelled"), [])
@@ -0,0 +1,288 @@
+"""Large-neighborhood search over a whole-roster assignment.
+
+Starts from one greedy pass, then repeatedly frees a small neighborhood of
+units and re-solves it jointly with the global CP-SAT model while every other
+unit keeps its runes and artifacts.  A move is kept when it raises
+``_evaluate_pass_score`` of the whole roster.  Neighborhoods are
+
+- ``contested``: a unit plus the units holding its best-scoring items,
+- ``team``: all units of one team,
+- ``chain``: teammates whose turn order is held by a 1-SPD gap.
+
+The search is anytime: it stops at its time budget, on cancel, or after a
+full sweep over all neighborhoods without an improvement.
+"""
+from __future__ import annotations
+
+from dataclasses import replace
+import random
+import time
+from typing import Dict, List, Set, Tuple
+
+import numpy as np
+
+from app.domain.models import AccountData
+from app.domain.presets import BuildStore
+from app.engine.global_optimizer import optimize_global
+from app.engine.greedy_optimizer import (
+    PASS_EFFICIENCY_WEIGHT,
+    GreedyRequest,
+    GreedyResult,
+    GreedyUnitResult,
+    PassScorer,
+    _evaluate_pass_score,
+    _optimize_greedy,
+)
+from app.i18n import tr
+
+# Largest neighborhood re-solved at once.
+LNS_NEIGHBORHOOD_SIZE = 4
+# Items per slot/type of a unit that count as contested when another unit holds them.
+LNS_CONTESTED_TOP = 3
+# Shortest useful neighborhood solve; the search ends when less time is left.
+LNS_MIN_SOLVE_S = 1.0
+# Share of a total time budget the greedy seed pass may use.
+LNS_SEED_BUDGET_SHARE = 0.5
+
+_NEIGHBORHOOD_KINDS = ("contested", "team", "chain")
+
+
+def _lns_time_budget(req: GreedyRequest) -> float:
+    if float(req.time_budget_s or 0.0) > 0.0:
+        return float(req.time_budget_s)
+    # Without a total budget: what the refine passes of a multi-pass run would get.
+    passes = max(1, int(req.multi_pass_count or 1) - 1)
+    return float(req.time_limit_per_unit_s) * len(req.unit_ids_in_order) * passes * max(
+        0.8, float(req.multi_pass_time_factor)
+    )
+
+
+class _Neighborhoods:
+    """Neighborhood generators over the current assignment."""
+
+    def __init__(self, req: GreedyRequest, scorer: PassScorer, unit_ids: List[int], size: int) -> None:
+        self.req = req
+        self.scorer = scorer
+        self.unit_ids = list(unit_ids)
+        self.size = int(max(2, size))
+        self.team_idx = dict(req.unit_team_index or {})
+        self.turn = {int(u): int(t or 0) for u, t in dict(req.unit_team_turn_order or {}).items()}
+        self._top_items: Dict[int, Tuple[Set[int], Set[int]]] = {}
+
+    def _team(self, uid: int) -> List[int]:
+        team = self.team_idx.get(int(uid))
+        if team is None:
+            return []
+        return [u for u in self.unit_ids if self.team_idx.get(u) == team]
+
+    def top_items(self, uid: int) -> Tuple[Set[int], Set[int]]:
+        """(rune ids, artifact ids) *uid* scores highest per slot/type."""
+        cached = self._top_items.get(int(uid))
+        if cached is not None:
+            return cached
+        scorer = self.scorer
+        rune_value = scorer.rune_quality(int(uid)) + scorer._rune_eff_deci * int(PASS_EFFICIENCY_WEIGHT)
+        runes: Set[int] = set()
+        for slot in range(1, 7):
+            rows = np.flatnonzero(scorer.rune_tbl.slot == slot)
+            best = rows[np.argsort(-rune_value[rows], kind="stable")[:LNS_CONTESTED_TOP]]
+            runes.update(int(rid) for rid in scorer.rune_tbl.rune_id[best].tolist())
+        arts: Set[int] = set()
+        for art_type in (1, 2):
+            rows = np.flatnonzero(scorer.art_tbl.type_ == art_type)
+            values = np.fromiter(
+                (scorer.artifact_score(int(uid), int(row)) for row in rows), dtype=np.int64, count=len(rows)
+            ) + scorer._art_eff_deci[rows] * int(PASS_EFFICIENCY_WEIGHT)
+            best = rows[np.argsort(-values, kind="stable")[:LNS_CONTESTED_TOP]]
+            arts.update(int(aid) for aid in scorer.art_tbl.artifact_id[best].tolist())
+        self._top_items[int(uid)] = (runes, arts)
+        return runes, arts
+
+    def contested(self, uid: int, current: Dict[int, GreedyUnitResult]) -> List[int]:
+        runes, arts = self.top_items(uid)
+        held: Dict[int, int] = {}
+        for other, res in current.items():
+            if other == int(uid) or not res.ok:
+                continue
+            count = sum(1 for rid in (res.runes_by_slot or {}).values() if int(rid) in runes)
+            count += sum(1 for aid in (res.artifacts_by_type or {}).values() if int(aid) in arts)
+            if count:
+                held[int(other)] = count
+        owners = sorted(held, key=lambda u: (-held[u], self.unit_ids.index(u)))
+        return [int(uid)] + owners[: self.size - 1]
+
+    def team(self, uid: int, current: Dict[int, GreedyUnitResult]) -> List[int]:
+        mates = self._team(uid)
+        if len(mates) <= 1:
+            return [int(uid)]
+        start = mates.index(int(uid))
+        # Teams larger than a neighborhood are freed in windows around *uid*.
+        return [mates[(start + k) % len(mates)] for k in range(min(len(mates), self.size))]
+
+    def chain(self, uid: int, current: Dict[int, GreedyUnitResult]) -> List[int]:
+        if not self.req.enforce_turn_order or self.turn.get(int(uid), 0) <= 0:
+            return [int(uid)]
+        mates = sorted((u for u in self._team(uid) if self.turn.get(u, 0) > 0), key=lambda u: self.turn[u])
+        if int(uid) not in mates:
+            return [int(uid)]
+        pos = mates.index(int(uid))
+
+        def _tight(a: int, b: int) -> bool:
+            ra, rb = current.get(a), current.get(b)
+            return bool(ra and rb and ra.ok and rb.ok and int(ra.final_speed or 0) - int(rb.final_speed or 0) <= 1)
+
+        lo = hi = pos
+        while hi - lo + 1 < self.size:
+            if lo > 0 and _tight(mates[lo - 1], mates[lo]):
+                lo -= 1
+            elif hi + 1 < len(mates) and _tight(mates[hi], mates[hi + 1]):
+                hi += 1
+            else:
+                break
+        return mates[lo:hi + 1]
+
+    def sweep(self, current: Dict[int, GreedyUnitResult], rng: random.Random) -> List[Tuple[str, Tuple[int, ...]]]:
+        """All distinct multi-unit neighborhoods of the current assignment, shuffled."""
+        seen: Set[Tuple[int, ...]] = set()
+        out: List[Tuple[str, Tuple[int, ...]]] = []
+        for kind in _NEIGHBORHOOD_KINDS:
+            for uid in self.unit_ids:
+                members = getattr(self, kind)(int(uid), current)
+                hood = tuple(u for u in self.unit_ids if u in set(members))
+                if len(hood) < 2 or hood in seen:
+                    continue
+                seen.add(hood)
+                out.append((kind, hood))
+        rng.shuffle(out)
+        return out
+
+
+def _neighborhood_request(
+    req: GreedyRequest,
+    unit_ids: List[int],
+    hood: Tuple[int, ...],
+    current: Dict[int, GreedyUnitResult],
+    time_limit_s: float,
+) -> GreedyRequest:
+    """Sub-request re-solving *hood* around the fixed assignment of all other units."""
+    kept = [uid for uid in unit_ids if uid not in hood and current[uid].ok]
+    turn = dict(req.unit_team_turn_order or {})
+    team_idx = dict(req.unit_team_index or {}) if req.enforce_turn_order else {}
+    max_final_speed = dict(req.unit_max_final_speed or {})
+    min_final_speed = dict(req.unit_min_final_speed or {})
+    for uid in hood:
+        my_turn = int(turn.get(uid, 0) or 0)
+        if team_idx.get(uid) is None or my_turn <= 0:
+            continue
+        mates = [m for m in kept if team_idx.get(m) == team_idx.get(uid) and int(turn.get(m, 0) or 0) > 0]
+        # Kept earlier teammates cap the speed, kept later ones set its floor.
+        caps = [int(current[m].final_speed) - 1 for m in mates if int(turn[m]) < my_turn]
+        floors = [int(current[m].final_speed) + 1 for m in mates if int(turn[m]) > my_turn]
+        if caps:
+            user_cap = int(max_final_speed.get(uid, 0) or 0)
+            max_final_speed[uid] = min(min(caps), user_cap) if user_cap > 0 else min(caps)
+        if floors:
+            min_final_speed[uid] = max(max(floors), int(min_final_speed.get(uid, 0) or 0))
+    return replace(
+        req,
+        unit_ids_in_order=list(hood),
+        time_budget_s=float(time_limit_s),
+        multi_pass_enabled=False,
+        excluded_rune_ids={int(rid) for rid in (req.excluded_rune_ids or ())} | {
+            int(rid) for uid in kept for rid in (current[uid].runes_by_slot or {}).values()
+        },
+        excluded_artifact_ids={int(aid) for aid in (req.excluded_artifact_ids or ())} | {
+            int(aid) for uid in kept for aid in (current[uid].artifacts_by_type or {}).values()
+        },
+        unit_max_final_speed=max_final_speed or None,
+        unit_min_final_speed=min_final_speed or None,
+        # The current assignment of the neighborhood is the warm start.
+        unit_hint_runes_by_slot={uid: dict(current[uid].runes_by_slot or {}) for uid in hood if current[uid].ok},
+        unit_hint_artifacts_by_type={
+            uid: dict(current[uid].artifacts_by_type or {}) for uid in hood if current[uid].ok
+        },
+        progress_callback=None,
+        solve_budget=None,
+        previous_result=None,
+        changed_unit_ids=None,
+    )
+
+
+def optimize_lns(
+    account: AccountData,
+    presets: BuildStore,
+    req: GreedyRequest,
+    neighborhood_size: int = LNS_NEIGHBORHOOD_SIZE,
+) -> GreedyResult:
+    """Greedy seed pass, then large-neighborhood search until the time budget is used."""
+    unit_ids = [int(u) for u in req.unit_ids_in_order]
+    started = time.monotonic()
+    budget_s = _lns_time_budget(req)
+    deadline = started + budget_s
+    seed_req = replace(req, multi_pass_enabled=False, multi_pass_strategy="greedy_only", previous_result=None)
+    if float(req.time_budget_s or 0.0) > 0.0:
+        seed_req = replace(
+            seed_req,
+            solve_budget=None,
+            time_budget_s=0.0,
+            time_limit_per_unit_s=min(
+                float(req.time_limit_per_unit_s), budget_s * LNS_SEED_BUDGET_SHARE / max(1, len(unit_ids))
+            ),
+        )
+    seed = _optimize_greedy(account, presets, seed_req)
+    if req.is_cancelled and req.is_cancelled():
+        return GreedyResult(False, tr("opt.cancelled"), list(seed.results or []))
+    current: Dict[int, GreedyUnitResult] = {int(r.unit_id): r for r in (seed.results or [])}
+    if len(unit_ids) < 2 or any(uid not in current for uid in unit_ids):
+        return seed
+
+    scorer = req.pass_scorer if req.pass_scorer is not None and req.pass_scorer.account is account else None
+    scorer = scorer or PassScorer(account, req)
+    neighborhoods = _Neighborhoods(req, scorer, unit_ids, neighborhood_size)
+    rng = random.Random(int(req.global_seed_offset or 0))
+    current_score = _evaluate_pass_score(account, req, [current[uid] for uid in unit_ids])
+    tried = 0
+    accepted = 0
+    stop_reason = tr("opt.lns_local_optimum")
+    improved = True
+    while improved:
+        improved = False
+        sweep = neighborhoods.sweep(current, rng)
+        for pos, (_kind, hood) in enumerate(sweep):
+            if req.is_cancelled and req.is_cancelled():
+                stop_reason = tr("opt.cancelled")
+                break
+            remaining = deadline - time.monotonic()
+            if remaining < LNS_MIN_SOLVE_S:
+                stop_reason = tr("opt.time_budget_used")
+                break
+            if req.progress_callback:
+                try:
+                    req.progress_callback(pos + 1, len(sweep))
+                except Exception:
+                    pass
+            time_limit = min(remaining, max(LNS_MIN_SOLVE_S, float(req.time_limit_per_unit_s) * len(hood)))
+            sub = optimize_global(account, presets, _neighborhood_request(req, unit_ids, hood, current, time_limit))
+            tried += 1
+            sub_by_uid = {int(r.unit_id): r for r in (sub.results or [])}
+            if any(uid not in sub_by_uid for uid in hood):
+                continue
+            candidate = dict(current)
+            candidate.update({uid: sub_by_uid[uid] for uid in hood})
+            score = _evaluate_pass_score(account, req, [candidate[uid] for uid in unit_ids])
+            if score > current_score:
+                current = candidate
+                current_score = score
+                accepted += 1
+                improved = True
+                # Neighborhoods depend on the assignment; start a fresh sweep.
+                break
+
+    results = [current[uid] for uid in unit_ids]
+    if req.is_cancelled and req.is_cancelled():
+        return GreedyResult(False, tr("opt.cancelled"), results)
+    ok_all = all(r.ok for r in results)
+    prefix = tr("opt.ok") if ok_all else tr("opt.partial_fail")
+    return GreedyResult(
+        ok_all, tr("opt.lns", prefix=prefix, accepted=accepted, tried=tried, reason=stop_reason), results
+    )
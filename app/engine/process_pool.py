@@ -0,0 +1,123 @@
+"""Process-pool backend for optimizer jobs that serialize on the GIL in threads.
+
+Model construction in the CP-SAT engines is pure Python, so thread pools only
+overlap the native solve.  A :class:`ProcessJobPool` ships the account and the
+presets once per worker process (pool initializer); each job then only moves
+its request in and its result out.  Jobs are module-level functions with the
+``fn(account, presets, req, **kwargs)`` signature of the optimizers.
+
+Callbacks cannot cross the process boundary: progress and solver registration
+are dropped, and cancellation is relayed through a shared event that the
+worker checks between units (a running CP-SAT solve finishes its time limit).
+"""
+from __future__ import annotations
+
+from concurrent.futures import Future, ProcessPoolExecutor
+import dataclasses
+import multiprocessing
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from app.domain.models import AccountData
+from app.domain.presets import BuildStore
+
+_CALLBACK_FIELDS = (
+    "progress_callback",
+    "is_cancelled",
+    "register_solver",
+    "unit_model_templates",
+    "unit_solve_cache",
+    "solve_budget",
+    "solve_trace_callback",
+    "pass_scorer",
+    "pass_bound",
+)
+
+# Worker process state, set once by _init_worker.
+_WORKER_ACCOUNT: Optional[AccountData] = None
+_WORKER_PRESETS: Optional[BuildStore] = None
+_WORKER_CANCEL: Any = None
+
+
+def _init_worker(account: AccountData, presets: BuildStore, cancel_event: Any) -> None:
+    global _WORKER_ACCOUNT, _WORKER_PRESETS, _WORKER_CANCEL
+    _WORKER_ACCOUNT = account
+    _WORKER_PRESETS = presets
+    _WORKER_CANCEL = cancel_event
+
+
+def _run_job(fn: Callable[..., Any], req: Any, kwargs: Dict[str, Any], deadline: float) -> Any:
+    def _is_cancelled() -> bool:
+        if _WORKER_CANCEL is not None and _WORKER_CANCEL.is_set():
+            return True
+        return bool(deadline > 0.0 and time.time() >= deadline)
+
+    if hasattr(req, "is_cancelled"):
+        req = dataclasses.replace(req, is_cancelled=_is_cancelled)
+    return fn(_WORKER_ACCOUNT, _WORKER_PRESETS, req, **kwargs)
+
+
+def picklable_request(req: Any) -> Any:
+    """Copy of the request dataclass *req* without callbacks and run caches."""
+    changes = {name: None for name in _CALLBACK_FIELDS if hasattr(req, name)}
+    return dataclasses.replace(req, **changes) if changes else req
+
+
+class ProcessJobPool:
+    """Bounded process pool running optimizer jobs against one account."""
+
+    def __init__(
+        self,
+        account: AccountData,
+        presets: BuildStore,
+        max_workers: int,
+        is_cancelled: Optional[Callable[[], bool]] = None,
+    ) -> None:
+        # spawn: forking a process that runs Qt and solver threads is not safe.
+        ctx = multiprocessing.get_context("spawn")
+        self._cancel = ctx.Event()
+        # A fresh copy drops the lazily built indexes; workers rebuild their own.
+        self._executor = ProcessPoolExecutor(
+            max_workers=int(max(1, int(max_workers))),
+            mp_context=ctx,
+            initializer=_init_worker,
+            initargs=(dataclasses.replace(account), presets, self._cancel),
+        )
+        self._watch_stop = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+        if is_cancelled is not None:
+            self._watcher = threading.Thread(target=self._watch, args=(is_cancelled,), daemon=True)
+            self._watcher.start()
+
+    def _watch(self, is_cancelled: Callable[[], bool]) -> None:
+        while not self._watch_stop.wait(0.2):
+            try:
+                if is_cancelled():
+                    self._cancel.set()
+                    return
+            except Exception:
+                continue
+
+    def submit(self, fn: Callable[..., Any], req: Any, deadline: float = 0.0, **kwargs: Any) -> Future:
+        """Run ``fn(account, presets, req, **kwargs)`` in a worker process.
+
+        *deadline* is a ``time.time()`` timestamp after which the job reports
+        itself cancelled (0 = none).
+        """
+        return self._executor.submit(_run_job, fn, picklable_request(req), dict(kwargs), float(deadline))
+
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    def shutdown(self, cancel: bool = False) -> None:
+        if cancel:
+            self._cancel.set()
+        self._watch_stop.set()
+        self._executor.shutdown(wait=True, cancel_futures=bool(cancel))
+
+    def __enter__(self) -> "ProcessJobPool":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.shutdown(cancel=exc_type is not None)
@@ -0,0 +1,352 @@
+"""Columnar NumPy views of the rune and artifact inventory.
+
+The optimizers and the rune/artifact widgets all need the same per-item
+numbers (stat totals, efficiency, quality) for thousands of items, often
+many times per run.  ``RuneTable`` / ``ArtifactTable`` compute those numbers
+once per account and expose them as aligned NumPy columns, so callers do
+array lookups instead of re-walking ``pri_eff`` / ``sec_eff`` per rune.
+
+Row order follows the source list; ``row_of`` maps item id -> row.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Set
+
+import numpy as np
+
+from app.domain.models import AccountData, Artifact, Rune
+from app.engine.efficiency import artifact_efficiency_array, rune_efficiency_arrays
+
+# Stat columns, in the same order as the GPU encoder uses.
+STAT_IDS: List[int] = [1, 2, 3, 4, 5, 6, 8, 9, 10, 11, 12]  # HP,HP%,ATK,ATK%,DEF,DEF%,SPD,CR,CD,RES,ACC
+STAT_COL: Dict[int, int] = {sid: i for i, sid in enumerate(STAT_IDS)}
+N_STATS = len(STAT_IDS)
+
+SAME_UNIT_RUNE_BONUS = 45
+
+
+def _rune_stat_row(r: Rune, out: np.ndarray, projected_main: int) -> int:
+    """Fill *out* with the stat totals of *r*; return the mainstat effect id."""
+    main_id = 0
+    try:
+        main_id = int(r.pri_eff[0] or 0)
+        col = STAT_COL.get(main_id)
+        if col is not None:
+            out[col] += int(projected_main)
+    except Exception:
+        pass
+    try:
+        col = STAT_COL.get(int(r.prefix_eff[0] or 0))
+        if col is not None:
+            out[col] += int(r.prefix_eff[1] or 0)
+    except Exception:
+        pass
+    for sec in (r.sec_eff or []):
+        if not sec:
+            continue
+        try:
+            col = STAT_COL.get(int(sec[0] or 0))
+            if col is None:
+                continue
+            out[col] += int(sec[1] or 0)
+            if len(sec) >= 4:
+                out[col] += int(sec[3] or 0)
+        except Exception:
+            continue
+    return main_id
+
+
+@dataclass
+class RuneTable:
+    runes: List[Rune]
+    rune_id: np.ndarray
+    slot: np.ndarray
+    set_id: np.ndarray
+    mainstat: np.ndarray
+    rank: np.ndarray
+    rune_class: np.ndarray
+    upgrade: np.ndarray
+    occupied_type: np.ndarray
+    occupied_id: np.ndarray
+    stats: np.ndarray          # (n, N_STATS) int32, same totals as _rune_stat_total
+    efficiency: np.ndarray     # float64, rune_efficiency()
+    quality: np.ndarray        # int64, _rune_quality_score() without the same-unit bonus
+    row_of: Dict[int, int] = field(default_factory=dict)
+    _eff_max: Dict[str, np.ndarray] = field(default_factory=dict, repr=False)
+
+    @classmethod
+    def build(cls, runes: Sequence[Rune], previous: Optional["RuneTable"] = None) -> "RuneTable":
+        """Table over *runes*.  Rows whose rune object is also a row of
+        *previous* (same instance) are copied from it instead of recomputed."""
+        from app.engine.greedy_optimizer import (
+            SET_SCORE_BONUS,
+            STAT_SCORE_WEIGHTS,
+            _projected_rune_mainstat_value,
+        )
+
+        rows = list(runes or [])
+        n = len(rows)
+        stats = np.zeros((n, N_STATS), dtype=np.int32)
+        ints = np.zeros((n, 9), dtype=np.int64)
+        efficiency = np.zeros(n, dtype=np.float64)
+        fresh, new_rows, old_rows = _split_rows(rows, previous, "rune_id")
+        if old_rows.size:
+            stats[new_rows] = previous.stats[old_rows]
+            ints[new_rows] = np.column_stack(
+                (
+                    previous.rune_id, previous.slot, previous.set_id, previous.mainstat,
+                    previous.rank, previous.rune_class, previous.upgrade,
+                    previous.occupied_type, previous.occupied_id,
+                )
+            )[old_rows]
+            efficiency[new_rows] = previous.efficiency[old_rows]
+        for i in fresh:
+            r = rows[i]
+            main_id = _rune_stat_row(r, stats[i], _projected_rune_mainstat_value(r))
+            ints[i] = (
+                int(r.rune_id or 0),
+                int(r.slot_no or 0),
+                int(r.set_id or 0),
+                main_id,
+                int(r.rank or 0),
+                int(r.rune_class or 0),
+                int(r.upgrade_curr or 0),
+                int(r.occupied_type or 0),
+                int(r.occupied_id or 0),
+            )
+        fresh_runes = [rows[i] for i in fresh]
+        tiers = ["current"] + (list(previous._eff_max) if previous is not None else [])
+        fresh_eff = rune_efficiency_arrays(fresh_runes, tiers)
+        efficiency[fresh] = fresh_eff["current"]
+
+        weights = np.array([int(STAT_SCORE_WEIGHTS.get(sid, 0)) for sid in STAT_IDS], dtype=np.int64)
+        set_bonus = np.array([int(SET_SCORE_BONUS.get(int(s), 0)) for s in ints[:, 2]], dtype=np.int64)
+        slot = ints[:, 1]
+        mainstat = ints[:, 3]
+        bad_even_main = np.isin(slot, (2, 4, 6)) & ~np.isin(mainstat, (2, 4, 6, 8, 9, 10, 11, 12))
+        quality = (
+            ints[:, 6] * 8
+            + ints[:, 4] * 6
+            + ints[:, 5] * 10
+            + set_bonus
+            + stats.astype(np.int64) @ weights
+            - bad_even_main.astype(np.int64) * 140
+        )
+        eff_max: Dict[str, np.ndarray] = {}
+        if previous is not None:
+            for tier, prev_col in previous._eff_max.items():
+                col = np.zeros(n, dtype=np.float64)
+                col[new_rows] = prev_col[old_rows]
+                col[fresh] = fresh_eff[tier]
+                eff_max[tier] = col
+        return cls(
+            runes=rows,
+            rune_id=ints[:, 0].copy(),
+            slot=slot.copy(),
+            set_id=ints[:, 2].copy(),
+            mainstat=mainstat.copy(),
+            rank=ints[:, 4].copy(),
+            rune_class=ints[:, 5].copy(),
+            upgrade=ints[:, 6].copy(),
+            occupied_type=ints[:, 7].copy(),
+            occupied_id=ints[:, 8].copy(),
+            stats=stats,
+            efficiency=efficiency,
+            quality=quality,
+            row_of={int(rid): i for i, rid in enumerate(ints[:, 0].tolist())},
+            _eff_max=eff_max,
+        )
+
+    def __len__(self) -> int:
+        return len(self.runes)
+
+    def covers(self, runes: Iterable[Rune]) -> bool:
+        """True if every rune in *runes* is (by identity) a row of this table."""
+        for r in runes:
+            row = self.row_of.get(int(r.rune_id or 0))
+            if row is None or self.runes[row] is not r:
+                return False
+        return True
+
+    def rows_for(self, runes: Iterable[Rune]) -> np.ndarray:
+        return np.fromiter((self.row_of[int(r.rune_id or 0)] for r in runes), dtype=np.int64)
+
+    def stat(self, eff_id: int) -> np.ndarray:
+        return self.stats[:, STAT_COL[int(eff_id)]]
+
+    def stat_of(self, rune_id: int, eff_id: int) -> int:
+        return int(self.stats[self.row_of[int(rune_id)], STAT_COL[int(eff_id)]])
+
+    def quality_for_unit(
+        self,
+        uid: int,
+        rta_rune_ids_for_unit: Optional[Set[int]] = None,
+    ) -> np.ndarray:
+        """Vector of _rune_quality_score(r, uid, rta_rune_ids_for_unit) over all rows."""
+        if rta_rune_ids_for_unit is not None:
+            same = np.isin(self.rune_id, np.fromiter(rta_rune_ids_for_unit, dtype=np.int64))
+        else:
+            same = (self.occupied_type == 1) & (self.occupied_id == int(uid))
+        return self.quality + same.astype(np.int64) * SAME_UNIT_RUNE_BONUS
+
+    def efficiency_max(self, tier: str) -> np.ndarray:
+        """Vector of rune_efficiency_max(r, tier); computed on first use."""
+        cached = self._eff_max.get(str(tier))
+        if cached is None:
+            cached = rune_efficiency_arrays(self.runes, (str(tier),))[str(tier)]
+            self._eff_max[str(tier)] = cached
+        return cached
+
+
+@dataclass
+class ArtifactTable:
+    artifacts: List[Artifact]
+    artifact_id: np.ndarray
+    type_: np.ndarray
+    attribute: np.ndarray
+    rank: np.ndarray           # original_rank, falling back to rank
+    level: np.ndarray
+    occupied_id: np.ndarray
+    mainstat: np.ndarray
+    efficiency: np.ndarray     # float64, artifact_efficiency()
+    quality: np.ndarray        # int64, _artifact_quality_score() without the same-unit bonus
+    row_of: Dict[int, int] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, artifacts: Sequence[Artifact], previous: Optional["ArtifactTable"] = None) -> "ArtifactTable":
+        """Table over *artifacts*, copying rows of unchanged instances from *previous*."""
+        rows = list(artifacts or [])
+        n = len(rows)
+        ints = np.zeros((n, 7), dtype=np.int64)
+        efficiency = np.zeros(n, dtype=np.float64)
+        quality = np.zeros(n, dtype=np.int64)
+        fresh, new_rows, old_rows = _split_rows(rows, previous, "artifact_id")
+        if old_rows.size:
+            ints[new_rows] = np.column_stack(
+                (
+                    previous.artifact_id, previous.type_, previous.attribute, previous.rank,
+                    previous.level, previous.occupied_id, previous.mainstat,
+                )
+            )[old_rows]
+            efficiency[new_rows] = previous.efficiency[old_rows]
+            quality[new_rows] = previous.quality[old_rows]
+        for i in fresh:
+            a = rows[i]
+            base_rank = int(getattr(a, "original_rank", 0) or 0)
+            if base_rank <= 0:
+                base_rank = int(a.rank or 0)
+            try:
+                main_id = int((a.pri_effect or (0,))[0] or 0)
+            except Exception:
+                main_id = 0
+            ints[i] = (
+                int(a.artifact_id or 0),
+                int(a.type_ or 0),
+                int(a.attribute or 0),
+                base_rank,
+                int(a.level or 0),
+                int(a.occupied_id or 0),
+                main_id,
+            )
+            q = int(a.level or 0) * 8 + base_rank * 6
+            for sec in (a.sec_effects or []):
+                if not sec or len(sec) < 2:
+                    continue
+                try:
+                    q += int(round(float(sec[1] or 0) * 4))
+                except Exception:
+                    continue
+            quality[i] = q
+        efficiency[fresh] = artifact_efficiency_array([rows[i] for i in fresh])
+        return cls(
+            artifacts=rows,
+            artifact_id=ints[:, 0].copy(),
+            type_=ints[:, 1].copy(),
+            attribute=ints[:, 2].copy(),
+            rank=ints[:, 3].copy(),
+            level=ints[:, 4].copy(),
+            occupied_id=ints[:, 5].copy(),
+            mainstat=ints[:, 6].copy(),
+            efficiency=efficiency,
+            quality=quality,
+            row_of={int(aid): i for i, aid in enumerate(ints[:, 0].tolist())},
+        )
+
+    def __len__(self) -> int:
+        return len(self.artifacts)
+
+    def covers(self, artifacts: Iterable[Artifact]) -> bool:
+        for a in artifacts:
+            row = self.row_of.get(int(a.artifact_id or 0))
+            if row is None or self.artifacts[row] is not a:
+                return False
+        return True
+
+    def rows_for(self, artifacts: Iterable[Artifact]) -> np.ndarray:
+        return np.fromiter((self.row_of[int(a.artifact_id or 0)] for a in artifacts), dtype=np.int64)
+
+    def quality_for_unit(
+        self,
+        uid: int,
+        rta_artifact_ids_for_unit: Optional[Set[int]] = None,
+    ) -> np.ndarray:
+        """Vector of _artifact_quality_score(a, uid, rta_artifact_ids_for_unit) over all rows."""
+        from app.engine.greedy_optimizer import ARTIFACT_BONUS_FOR_SAME_UNIT
+
+        if rta_artifact_ids_for_unit is not None:
+            same = np.isin(self.artifact_id, np.fromiter(rta_artifact_ids_for_unit, dtype=np.int64))
+        else:
+            same = self.occupied_id == int(uid)
+        return self.quality + same.astype(np.int64) * int(ARTIFACT_BONUS_FOR_SAME_UNIT)
+
+
+def _split_rows(rows: Sequence, previous, id_attr: str):
+    """Partition *rows* into fresh row indices and (new, old) row pairs that
+    can be copied from *previous* because the item instance is unchanged."""
+    fresh: List[int] = []
+    new_rows: List[int] = []
+    old_rows: List[int] = []
+    if previous is None:
+        fresh = list(range(len(rows)))
+    else:
+        prev_items = previous.runes if isinstance(previous, RuneTable) else previous.artifacts
+        prev_row_of = previous.row_of
+        for i, item in enumerate(rows):
+            j = prev_row_of.get(int(getattr(item, id_attr) or 0))
+            if j is not None and prev_items[j] is item:
+                new_rows.append(i)
+                old_rows.append(j)
+            else:
+                fresh.append(i)
+    return fresh, np.asarray(new_rows, dtype=np.int64), np.asarray(old_rows, dtype=np.int64)
+
+
+def account_rune_table(account: AccountData) -> RuneTable:
+    """Account-wide RuneTable, kept with the account's other lookup indexes."""
+    return account.cached_index("rune_table", lambda: RuneTable.build(account.runes))
+
+
+def account_artifact_table(account: AccountData) -> ArtifactTable:
+    """Account-wide ArtifactTable, kept with the account's other lookup indexes."""
+    return account.cached_index("artifact_table", lambda: ArtifactTable.build(account.artifacts))
+
+
+def rune_table_for(runes: Sequence[Rune], account: Optional[AccountData] = None) -> RuneTable:
+    """Table whose rows include *runes*; reuses the account table when it covers them."""
+    if account is not None:
+        table = account_rune_table(account)
+        if table.covers(runes):
+            return table
+    return RuneTable.build(runes)
+
+
+def artifact_table_for(
+    artifacts: Sequence[Artifact],
+    account: Optional[AccountData] = None,
+) -> ArtifactTable:
+    if account is not None:
+        table = account_artifact_table(account)
+        if table.covers(artifacts):
+            return table
+    return ArtifactTable.build(artifacts)
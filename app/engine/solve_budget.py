@@ -0,0 +1,171 @@
+"""One wall-clock budget shared by all single-unit solves of an optimizer run.
+
+Instead of a fixed ``time_limit_per_unit_s``, every solve asks
+:meth:`SolveBudget.slice_for` for its time limit right before it starts.  The
+slice is the unit's share of the time that is still left, weighted by the
+expected effort of every solve still planned:
+
+- a unit solved before costs what it took last time (proven optimum) or more
+  than it got (stopped at its limit);
+- an unseen unit costs its model size times the observed seconds per model
+  variable of this run, or of earlier runs (``history.jsonl``) at the start.
+
+Because slices are cut from the remaining time, whatever an easy unit leaves
+unused automatically flows to the solves after it.
+"""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+import statistics
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+# Own file: gpu_combo keeps only the tail of its learning history, which these rows would crowd out.
+_HISTORY_PATH = Path(__file__).resolve().parents[1] / "data" / "solve_budget" / "history.jsonl"
+_HISTORY_KIND = "solve_budget"
+
+# Solves that stop at their limit are assumed to need this much more next time.
+_HARD_UNIT_GROWTH = 2.0
+
+
+def history_seconds_per_var(mode: str = "", max_entries: int = 400, path: Path | None = None) -> Optional[float]:
+    """Median solve seconds per model variable of earlier budgeted runs."""
+    history_path = Path(path) if path is not None else _HISTORY_PATH
+    if not history_path.exists():
+        return None
+    rates: list = []
+    mode_key = str(mode or "").strip().lower()
+    try:
+        with open(history_path, "r", encoding="utf-8") as f:
+            lines = f.readlines()[-int(max_entries) * 4:]
+    except Exception:
+        return None
+    for line in lines:
+        try:
+            row = json.loads(line)
+        except Exception:
+            continue
+        if not isinstance(row, dict) or str(row.get("kind", "") or "") != _HISTORY_KIND:
+            continue
+        if mode_key and str(row.get("mode", "") or "").strip().lower() != mode_key:
+            continue
+        try:
+            rate = float(row.get("seconds_per_var", 0.0) or 0.0)
+        except (TypeError, ValueError):
+            continue
+        if rate > 0.0:
+            rates.append(rate)
+    rates = rates[-int(max_entries):]
+    return float(statistics.median(rates)) if rates else None
+
+
+class SolveBudget:
+    """Thread-safe scheduler splitting *total_s* seconds over planned unit solves."""
+
+    def __init__(
+        self,
+        total_s: float,
+        min_slice_s: float = 0.2,
+        concurrency: int = 1,
+        prior_s_per_var: Optional[float] = None,
+    ) -> None:
+        self.total_s = float(max(0.0, float(total_s)))
+        self.min_slice_s = float(max(0.01, float(min_slice_s)))
+        self.concurrency = int(max(1, int(concurrency)))
+        self.prior_s_per_var = float(prior_s_per_var) if prior_s_per_var and prior_s_per_var > 0 else None
+        self._deadline = time.monotonic() + self.total_s
+        self._lock = threading.Lock()
+        self._pending: Dict[int, int] = {}
+        self._size: Dict[int, int] = {}
+        self._need_s: Dict[int, float] = {}
+        self._spent_s = 0.0
+        self._spent_vars = 0
+        self._solves = 0
+
+    def remaining(self) -> float:
+        return max(0.0, self._deadline - time.monotonic())
+
+    def exhausted(self) -> bool:
+        return self.remaining() <= 0.0
+
+    def plan(self, unit_ids: Iterable[int], repeats: int = 1) -> None:
+        """Announce *repeats* upcoming solves of every unit in *unit_ids*."""
+        with self._lock:
+            for uid in unit_ids:
+                self._pending[int(uid)] = self._pending.get(int(uid), 0) + int(max(0, int(repeats)))
+
+    def finish(self, uid: int) -> None:
+        """One planned solve of *uid* is done (solved, cached or failed)."""
+        with self._lock:
+            left = self._pending.get(int(uid), 0) - 1
+            if left > 0:
+                self._pending[int(uid)] = left
+            else:
+                self._pending.pop(int(uid), None)
+
+    def _rate_locked(self) -> Optional[float]:
+        if self._spent_vars > 0 and self._spent_s > 0.0:
+            return self._spent_s / float(self._spent_vars)
+        return self.prior_s_per_var
+
+    def _demand_locked(self, uid: int, rate: Optional[float], default_size: float) -> float:
+        size = float(self._size.get(uid, default_size))
+        if rate is None:
+            # Nothing timed yet: model sizes alone set the weights.
+            return max(1.0, size)
+        if uid in self._need_s:
+            return max(self.min_slice_s, self._need_s[uid])
+        return max(self.min_slice_s, size * rate)
+
+    def slice_for(self, uid: int, model_size: int) -> float:
+        """Time limit in seconds for the next solve of *uid* (a model of *model_size* variables)."""
+        uid = int(uid)
+        with self._lock:
+            self._size[uid] = int(max(1, int(model_size)))
+            pending = dict(self._pending)
+            pending[uid] = max(1, pending.get(uid, 0))
+            rate = self._rate_locked()
+            default_size = float(statistics.mean(self._size.values()))
+            demand = {u: self._demand_locked(u, rate, default_size) for u in pending}
+        remaining = self.remaining()
+        total_demand = sum(demand[u] * n for u, n in pending.items())
+        share = remaining * float(self.concurrency) * demand[uid] / max(1e-9, total_demand)
+        return float(max(self.min_slice_s, min(remaining, share)))
+
+    def record(self, uid: int, elapsed_s: float, slice_s: float, optimal: bool) -> None:
+        """Observed solve time of *uid*; drives the next slices."""
+        uid = int(uid)
+        elapsed = float(max(0.0, float(elapsed_s)))
+        with self._lock:
+            if optimal or elapsed < 0.9 * float(slice_s):
+                self._need_s[uid] = elapsed
+            else:
+                self._need_s[uid] = max(self._need_s.get(uid, 0.0), float(slice_s) * _HARD_UNIT_GROWTH)
+            self._spent_s += elapsed
+            self._spent_vars += int(self._size.get(uid, 0))
+            self._solves += 1
+
+    def record_history(self, mode: str = "", path: Path | None = None) -> None:
+        """Append this run's seconds per variable to ``history.jsonl``."""
+        with self._lock:
+            if self._solves <= 0 or self._spent_vars <= 0:
+                return
+            entry = {
+                "kind": _HISTORY_KIND,
+                "timestamp": time.time(),
+                "mode": str(mode or ""),
+                "solves": int(self._solves),
+                "budget_s": round(self.total_s, 3),
+                "spent_s": round(self._spent_s, 3),
+                "model_vars": int(self._spent_vars),
+                "seconds_per_var": self._spent_s / float(self._spent_vars),
+            }
+        history_path = Path(path) if path is not None else _HISTORY_PATH
+        try:
+            history_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(history_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        except Exception:
+            pass
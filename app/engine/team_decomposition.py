@@ -0,0 +1,208 @@
+"""Team-decomposed global optimization.
+
+``optimize_global`` over a whole Siege roster is one model with every unit x
+every candidate item.  Here every team is its own global model, and the
+teams are solved in parallel.  Teams only interact through items that
+several of them pick.  Such contested items get a price (an objective
+discount, see ``optimize_global``) that rises every round they stay
+contested, and only the teams holding a contested item are solved again.
+Conflicts left after the last round are repaired: teams keep their items in
+team order, and each later team in conflict is solved again without the
+items already kept.
+"""
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from app.domain.models import AccountData
+from app.domain.presets import BuildStore
+from app.engine.global_optimizer import optimize_global
+from app.engine.greedy_optimizer import GreedyRequest, GreedyResult, GreedyUnitResult
+from app.i18n import tr
+
+# Pricing rounds before the repair step.
+DECOMPOSITION_MAX_ROUNDS = 4
+# Price increase per round and extra claimant of a contested item (percent of its value).
+DECOMPOSITION_PRICE_STEP_PCT = 25
+# Share of the time budget for the pricing rounds; the rest is left for the repair.
+DECOMPOSITION_ROUNDS_SHARE = 0.7
+# Shortest useful team solve.
+DECOMPOSITION_MIN_SOLVE_S = 1.0
+
+
+def _team_groups(req: GreedyRequest) -> List[List[int]]:
+    """Units grouped by team, in order of first appearance; units without a team stay alone."""
+    groups: List[List[int]] = []
+    by_team: Dict[int, List[int]] = {}
+    for uid in (int(u) for u in req.unit_ids_in_order):
+        team = (req.unit_team_index or {}).get(uid)
+        if team is None:
+            groups.append([uid])
+        elif int(team) in by_team:
+            by_team[int(team)].append(uid)
+        else:
+            by_team[int(team)] = [uid]
+            groups.append(by_team[int(team)])
+    return groups
+
+
+def _items(results: List[GreedyUnitResult]) -> Tuple[Set[int], Set[int]]:
+    runes: Set[int] = set()
+    arts: Set[int] = set()
+    for res in results:
+        if not res.ok:
+            continue
+        runes.update(int(rid) for rid in (res.runes_by_slot or {}).values())
+        arts.update(int(aid) for aid in (res.artifacts_by_type or {}).values())
+    return runes, arts
+
+
+def _contested(items_by_team: Dict[int, Set[int]]) -> Dict[int, List[int]]:
+    """item id -> teams using it, for items used by more than one team."""
+    users: Dict[int, List[int]] = {}
+    for team, items in items_by_team.items():
+        for item in items:
+            users.setdefault(int(item), []).append(int(team))
+    return {item: teams for item, teams in users.items() if len(teams) > 1}
+
+
+def optimize_team_decomposed(account: AccountData, presets: BuildStore, req: GreedyRequest) -> GreedyResult:
+    """Per-team global models coordinated by prices on contested items, then repaired."""
+    unit_ids = [int(u) for u in req.unit_ids_in_order]
+    teams = _team_groups(req)
+    if len(teams) <= 1:
+        return optimize_global(account, presets, req)
+    started = time.monotonic()
+    # Same total as the monolithic model would get.
+    if float(req.time_budget_s or 0.0) > 0.0:
+        budget_s = float(req.time_budget_s)
+    else:
+        budget_s = max(10.0, float(req.time_limit_per_unit_s) * len(unit_ids) * 1.5)
+    deadline = started + budget_s
+    rounds_deadline = started + budget_s * DECOMPOSITION_ROUNDS_SHARE
+    parallel = int(max(1, min(len(teams), int(req.workers or 1))))
+    workers_per_team = int(max(1, int(req.workers or 1) // parallel))
+
+    # A unit's locked items are off limits for every other team.
+    fixed_runes_by_uid = {
+        int(uid): {int(rid) for rid in dict(by_slot or {}).values() if int(rid or 0) > 0}
+        for uid, by_slot in dict(req.unit_fixed_runes_by_slot or {}).items()
+    }
+    fixed_arts_by_uid = {
+        int(uid): {int(aid) for aid in dict(by_type or {}).values() if int(aid or 0) > 0}
+        for uid, by_type in dict(req.unit_fixed_artifacts_by_type or {}).items()
+    }
+    base_runes = {int(rid) for rid in (req.excluded_rune_ids or ())}
+    base_arts = {int(aid) for aid in (req.excluded_artifact_ids or ())}
+
+    def _solve(
+        team_idx: int,
+        time_limit_s: float,
+        rune_pct: Dict[int, int],
+        art_pct: Dict[int, int],
+        hint: Optional[List[GreedyUnitResult]],
+        kept_runes: Set[int] = frozenset(),
+        kept_arts: Set[int] = frozenset(),
+    ) -> GreedyResult:
+        team = teams[team_idx]
+        others = [uid for uid in unit_ids if uid not in team]
+        hint_by_uid = {int(r.unit_id): r for r in (hint or []) if r.ok}
+        sub_req = replace(
+            req,
+            unit_ids_in_order=list(team),
+            workers=workers_per_team,
+            time_budget_s=float(max(DECOMPOSITION_MIN_SOLVE_S, time_limit_s)),
+            multi_pass_enabled=False,
+            excluded_rune_ids=base_runes | set(kept_runes) | {
+                rid for uid in others for rid in fixed_runes_by_uid.get(uid, ())
+            },
+            excluded_artifact_ids=base_arts | set(kept_arts) | {
+                aid for uid in others for aid in fixed_arts_by_uid.get(uid, ())
+            },
+            # The team's previous solution is the warm start.
+            unit_hint_runes_by_slot=(
+                {uid: dict(r.runes_by_slot or {}) for uid, r in hint_by_uid.items()} or req.unit_hint_runes_by_slot
+            ),
+            unit_hint_artifacts_by_type=(
+                {uid: dict(r.artifacts_by_type or {}) for uid, r in hint_by_uid.items()}
+                or req.unit_hint_artifacts_by_type
+            ),
+            progress_callback=None,
+            solve_budget=None,
+            previous_result=None,
+            changed_unit_ids=None,
+        )
+        return optimize_global(account, presets, sub_req, rune_discount_pct=rune_pct, artifact_discount_pct=art_pct)
+
+    results_by_team: Dict[int, List[GreedyUnitResult]] = {}
+    rune_pct: Dict[int, int] = {}
+    art_pct: Dict[int, int] = {}
+    pending = list(range(len(teams)))
+    rounds = 0
+    with ThreadPoolExecutor(max_workers=parallel) as ex:
+        while pending and rounds < DECOMPOSITION_MAX_ROUNDS:
+            if req.is_cancelled and req.is_cancelled():
+                break
+            round_s = (rounds_deadline - time.monotonic()) / float(DECOMPOSITION_MAX_ROUNDS - rounds)
+            if rounds > 0 and round_s < DECOMPOSITION_MIN_SOLVE_S:
+                break
+            futures = {
+                t: ex.submit(_solve, t, round_s, dict(rune_pct), dict(art_pct), results_by_team.get(t))
+                for t in pending
+            }
+            for t, fut in futures.items():
+                results_by_team[t] = list(fut.result().results or [])
+            rounds += 1
+            if req.progress_callback:
+                try:
+                    req.progress_callback(rounds, DECOMPOSITION_MAX_ROUNDS)
+                except Exception:
+                    pass
+            items = {t: _items(res) for t, res in results_by_team.items()}
+            contested_runes = _contested({t: runes for t, (runes, _arts) in items.items()})
+            contested_arts = _contested({t: arts for t, (_runes, arts) in items.items()})
+            for prices, contested in ((rune_pct, contested_runes), (art_pct, contested_arts)):
+                for item, users in contested.items():
+                    prices[item] = min(100, prices.get(item, 0) + DECOMPOSITION_PRICE_STEP_PCT * (len(users) - 1))
+            # Only teams holding a contested item can change their answer to the new prices.
+            pending = sorted(
+                {t for users in contested_runes.values() for t in users}
+                | {t for users in contested_arts.values() for t in users}
+            )
+
+    if req.is_cancelled and req.is_cancelled():
+        partial = [r for t in sorted(results_by_team) for r in results_by_team[t]]
+        return GreedyResult(False, tr("opt.cancelled"), partial)
+
+    # Repair: earlier teams keep their items, later teams in conflict are solved around them.
+    kept_runes: Set[int] = set()
+    kept_arts: Set[int] = set()
+    repaired = 0
+    for t in range(len(teams)):
+        res = results_by_team.get(t, [])
+        runes, arts = _items(res)
+        if not res or runes & kept_runes or arts & kept_arts:
+            time_left = (deadline - time.monotonic()) / float(len(teams) - t)
+            res = list(_solve(t, time_left, {}, {}, res, kept_runes, kept_arts).results or [])
+            runes, arts = _items(res)
+            repaired += 1
+        results_by_team[t] = res
+        kept_runes |= runes
+        kept_arts |= arts
+
+    by_uid = {int(r.unit_id): r for res in results_by_team.values() for r in res}
+    results = [
+        by_uid.get(uid) or GreedyUnitResult(uid, False, tr("opt.cancelled"), runes_by_slot={}) for uid in unit_ids
+    ]
+    if req.is_cancelled and req.is_cancelled():
+        return GreedyResult(False, tr("opt.cancelled"), results)
+    ok_all = all(r.ok for r in results)
+    prefix = tr("opt.ok") if ok_all else tr("opt.partial_fail")
+    return GreedyResult(
+        ok_all,
+        tr("opt.team_decomposition", prefix=prefix, teams=len(teams), rounds=rounds, repaired=repaired),
+        results,
+    )
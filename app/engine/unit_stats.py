@@ -0,0 +1,200 @@
+"""Batched final-stat computation for many units at once.
+
+``compute_units_stats`` takes N units with their rune (and optionally
+artifact) assignments and returns the stat contributions as aligned
+``(N, 8)`` integer arrays -- base, runes incl. set bonuses, artifact
+mainstats, leader skill, totem and caller supplied extras (e.g. the Arena
+Rush SPD buff).  ``compute_unit_stats`` in ``app.domain.models``, the result
+dialog stats in ``stats_helpers`` and the Siege/RTA monster cards all read
+their numbers from here.
+
+Per-rune stat lines are memoized through ``rune_memo`` so re-rendering the
+same teams only sums cached rows.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.domain.models import Artifact, Rune, Unit
+from app.engine.efficiency import rune_memo
+
+STAT_KEYS: Tuple[str, ...] = ("HP", "ATK", "DEF", "SPD", "CR", "CD", "RES", "ACC")
+N_UNIT_STATS = len(STAT_KEYS)
+_HP, _ATK, _DEF, _SPD, _CR, _CD, _RES, _ACC = range(N_UNIT_STATS)
+
+# Rune effect id -> column of the per-rune line (flat HP/ATK/DEF, their %, the rest)
+_RUNE_EFF_COL: Dict[int, int] = {1: 0, 2: 1, 3: 2, 4: 3, 5: 4, 6: 5, 8: 6, 9: 7, 10: 8, 11: 9, 12: 10}
+_N_RUNE_COLS = 11
+_SWIFT_SET_ID = 3
+
+# Artifact mainstat effect ids that add a flat base stat
+_ARTIFACT_FLAT_COL: Dict[int, int] = {1: _HP, 100: _HP, 3: _ATK, 101: _ATK, 5: _DEF, 102: _DEF}
+
+_LEADER_PCT_COL: Dict[str, int] = {"HP%": _HP, "ATK%": _ATK, "DEF%": _DEF, "SPD%": _SPD}
+_LEADER_FLAT_COL: Dict[str, int] = {"CR%": _CR, "CD%": _CD, "RES%": _RES, "ACC%": _ACC}
+
+LeaderBonus = Optional[Tuple[str, int]]  # (stat, amount), e.g. ("SPD%", 24)
+
+
+def _rune_stat_line(rune: Rune) -> Tuple[int, ...]:
+    out = [0] * _N_RUNE_COLS
+
+    def _acc(eff_id: int, value: int) -> None:
+        col = _RUNE_EFF_COL.get(eff_id)
+        if col is not None:
+            out[col] += value
+
+    try:
+        _acc(int(rune.pri_eff[0] or 0), int(rune.pri_eff[1] or 0))
+    except Exception:
+        pass
+    try:
+        _acc(int(rune.prefix_eff[0] or 0), int(rune.prefix_eff[1] or 0))
+    except Exception:
+        pass
+    for sec in (rune.sec_eff or []):
+        if not sec:
+            continue
+        try:
+            eff = int(sec[0] or 0)
+            val = int(sec[1] or 0)
+            grind = int(sec[3] or 0) if len(sec) >= 4 else 0
+            _acc(eff, val + grind)
+        except Exception:
+            continue
+    return tuple(out)
+
+
+def _artifact_flat_line(art: Artifact) -> Tuple[int, int]:
+    """(stat column, value) of the artifact mainstat, or (-1, 0)."""
+    try:
+        if art.pri_effect and len(art.pri_effect) >= 2:
+            col = _ARTIFACT_FLAT_COL.get(int(art.pri_effect[0] or 0))
+            if col is not None:
+                return col, int(art.pri_effect[1] or 0)
+    except Exception:
+        pass
+    return -1, 0
+
+
+def _pct_of(base: np.ndarray, pct: np.ndarray) -> np.ndarray:
+    """int(base * pct / 100), truncating toward zero like the scalar code."""
+    prod = base * pct
+    return np.sign(prod) * (np.abs(prod) // 100)
+
+
+def unit_base_stat_array(units: Sequence[Unit]) -> np.ndarray:
+    return np.array(
+        [
+            (
+                int((u.base_con or 0) * 15),
+                int(u.base_atk or 0),
+                int(u.base_def or 0),
+                int(u.base_spd or 0),
+                int(u.crit_rate or 15),
+                int(u.crit_dmg or 50),
+                int(u.base_res or 15),
+                int(u.base_acc or 0),
+            )
+            for u in units
+        ],
+        dtype=np.int64,
+    ).reshape(len(units), N_UNIT_STATS)
+
+
+@dataclass(frozen=True)
+class UnitStats:
+    """Stat contributions of a batch of units; every array is (n, 8) int64."""
+
+    base: np.ndarray
+    runes: np.ndarray       # rune stats plus rune set bonuses (Swift)
+    artifacts: np.ndarray   # flat HP/ATK/DEF from artifact mainstats
+    leader: np.ndarray
+    totem: np.ndarray
+    extra: np.ndarray
+
+    def __len__(self) -> int:
+        return int(self.base.shape[0])
+
+    @property
+    def total(self) -> np.ndarray:
+        return self.base + self.runes + self.artifacts + self.leader + self.totem + self.extra
+
+    def as_dict(self, row: int, array: Optional[np.ndarray] = None) -> Dict[str, int]:
+        values = (self.total if array is None else array)[row].tolist()
+        return dict(zip(STAT_KEYS, (int(v) for v in values)))
+
+
+def compute_units_stats(
+    units: Sequence[Unit],
+    runes_per_unit: Sequence[Sequence[Rune]],
+    *,
+    artifacts_per_unit: Optional[Sequence[Sequence[Artifact]]] = None,
+    leaders: Optional[Sequence[LeaderBonus]] = None,
+    sky_tribe_totem_spd_pct: int = 0,
+    extra_spd: Optional[Sequence[int]] = None,
+) -> UnitStats:
+    """Final-stat contributions of ``units[i]`` wearing ``runes_per_unit[i]``.
+
+    *leaders* gives the leader skill applying to each unit (None for none);
+    *extra_spd* adds a flat SPD bonus per unit.  Artifacts only contribute
+    when *artifacts_per_unit* is given.
+    """
+    n = len(units)
+    base = unit_base_stat_array(units)
+    base_spd = base[:, _SPD]
+
+    # Runes: sum cached per-rune lines per unit, count Swift runes.
+    owner = [i for i, runes in enumerate(runes_per_unit) for _ in runes]
+    flat_runes = [r for runes in runes_per_unit for r in runes]
+    rune_cols = np.zeros((n, _N_RUNE_COLS), dtype=np.int64)
+    swift = np.zeros(n, dtype=np.int64)
+    if flat_runes:
+        lines = np.array([rune_memo(r, "unit_stat_line", lambda: _rune_stat_line(r)) for r in flat_runes],
+                         dtype=np.int64)
+        owner_idx = np.asarray(owner, dtype=np.int64)
+        np.add.at(rune_cols, owner_idx, lines)
+        is_swift = np.fromiter((int(r.set_id or 0) == _SWIFT_SET_ID for r in flat_runes), dtype=np.int64,
+                               count=len(flat_runes))
+        swift = np.bincount(owner_idx, weights=is_swift, minlength=n).astype(np.int64)
+
+    runes = np.zeros((n, N_UNIT_STATS), dtype=np.int64)
+    runes[:, _HP] = rune_cols[:, 0] + _pct_of(base[:, _HP], rune_cols[:, 1])
+    runes[:, _ATK] = rune_cols[:, 2] + _pct_of(base[:, _ATK], rune_cols[:, 3])
+    runes[:, _DEF] = rune_cols[:, 4] + _pct_of(base[:, _DEF], rune_cols[:, 5])
+    runes[:, _SPD] = rune_cols[:, 6] + _pct_of(base_spd, 25 * (swift // 4))
+    runes[:, _CR:] = rune_cols[:, 7:]
+
+    artifacts = np.zeros((n, N_UNIT_STATS), dtype=np.int64)
+    if artifacts_per_unit is not None:
+        for i, arts in enumerate(artifacts_per_unit):
+            for art in arts or []:
+                col, value = _artifact_flat_line(art)
+                if col >= 0:
+                    artifacts[i, col] += value
+
+    leader = np.zeros((n, N_UNIT_STATS), dtype=np.int64)
+    if leaders is not None:
+        for i, lead in enumerate(leaders):
+            if not lead:
+                continue
+            stat, amount = str(lead[0] or "").strip().upper(), int(lead[1] or 0)
+            if amount <= 0:
+                continue
+            col = _LEADER_PCT_COL.get(stat)
+            if col is not None:
+                leader[i, col] = int(int(base[i, col]) * amount / 100)
+            elif stat in _LEADER_FLAT_COL:
+                leader[i, _LEADER_FLAT_COL[stat]] = amount
+
+    totem = np.zeros((n, N_UNIT_STATS), dtype=np.int64)
+    totem[:, _SPD] = _pct_of(base_spd, np.int64(int(sky_tribe_totem_spd_pct or 0)))
+
+    extra = np.zeros((n, N_UNIT_STATS), dtype=np.int64)
+    if extra_spd is not None:
+        extra[:, _SPD] = np.asarray(list(extra_spd), dtype=np.int64)
+
+    return UnitStats(base=base, runes=runes, artifacts=artifacts, leader=leader, totem=totem, extra=extra)
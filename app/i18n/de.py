@@ -7,6 +7,9 @@ STRINGS: dict[str, str] = {
     "main.no_import": "Kein Import geladen.",
     "main.import_label": "Import: {source}",
     "main.import_failed": "Import fehlgeschlagen",
+    "main.importing": "Account wird importiert...",
+    "main.import_unchanged": "Der Import enthält keine Änderungen.",
+    "main.import_changes": "Import: {runes} Runen und {artifacts} Artefakte geändert.",
     "main.file_dialog_title": "Summoners War JSON auswählen",
     "main.file_dialog_filter": "JSON (*.json);;Alle Dateien (*.*)",
     "main.search_placeholder": "Monster suchen...",
@@ -532,6 +535,14 @@ STRINGS: dict[str, str] = {
     ),
     "opt.set_too_many": "Build '{name}': Set-Option {opt} benötigt {pieces} Teile (>6).",
     "opt.set_not_enough": "Build '{name}': Set {set_id} braucht {pieces}, verfügbar {avail}.",
+    "opt.preflight_speed": (
+        "Build '{name}': geforderter SPD-Bereich {lo}..{hi} liegt "
+        "außerhalb des möglichen Bereichs {min}..{max}."
+    ),
+    "opt.preflight_min_stat": (
+        "Build '{name}': Min-Stat {stat} >= {target} "
+        "nicht erfüllbar (maximal möglich {max})."
+    ),
     "opt.infeasible": "Nicht erfuellbar: Pool/Build-Constraints passen nicht zusammen.",
     "opt.not_feasible": "Nicht erfuellbar: {detail}",
     "opt.internal_no_rune": "Interner Fehler: Slot {slot} keine Rune.",
@@ -542,6 +553,8 @@ STRINGS: dict[str, str] = {
     "opt.partial_fail": "Fertig, aber mindestens ein Monster konnte nicht gebaut werden.",
     "opt.stable_solution": "stabile Lösung ohne weitere Verbesserung",
     "opt.no_improvement": "keine Verbesserung in aufeinanderfolgenden Passes",
+    "opt.time_budget_used": "Zeitbudget aufgebraucht",
+    "opt.bound_reached": "kein weiterer Pass kann den besten übertreffen",
     "opt.multi_pass": (
         "{prefix} Multi-Pass aktiv: bestes Ergebnis aus {used} "
         "Durchläufen (Pass {pass_idx})."
@@ -551,6 +564,13 @@ STRINGS: dict[str, str] = {
         "geplanten Durchläufen (Pass {pass_idx}); vorzeitig gestoppt "
         "({reason})."
     ),
+    "opt.incremental": "{prefix} Inkrementell: {solved} von {total} Einheiten neu optimiert.",
+    "opt.lns": "{prefix} LNS: {accepted} von {tried} Nachbarschafts-Lösungen haben das Ergebnis verbessert ({reason}).",
+    "opt.lns_local_optimum": "keine Nachbarschaft verbessert weiter",
+    "opt.team_decomposition": (
+        "{prefix} Team-Zerlegung: {teams} Teams, {rounds} Preisrunden, "
+        "{repaired} Teams in der Reparatur neu gelöst."
+    ),
 
     # -- Update service messages ---------------------------------
     "svc.no_repo": "Kein GitHub-Repo konfiguriert (github_repo fehlt).",
@@ -7,6 +7,9 @@ STRINGS: dict[str, str] = {
     "main.no_import": "No import loaded.",
     "main.import_label": "Import: {source}",
     "main.import_failed": "Import failed",
+    "main.importing": "Importing account...",
+    "main.import_unchanged": "Import contains no changes.",
+    "main.import_changes": "Import: {runes} runes and {artifacts} artifacts changed.",
     "main.file_dialog_title": "Select Summoners War JSON",
     "main.file_dialog_filter": "JSON (*.json);;All files (*.*)",
     "main.search_placeholder": "Search monster...",
@@ -523,6 +526,14 @@ STRINGS: dict[str, str] = {
     ),
     "opt.set_too_many": "Build '{name}': Set option {opt} requires {pieces} pieces (>6).",
     "opt.set_not_enough": "Build '{name}': Set {set_id} needs {pieces}, available {avail}.",
+    "opt.preflight_speed": (
+        "Build '{name}': required SPD {lo}..{hi} is outside "
+        "the reachable range {min}..{max}."
+    ),
+    "opt.preflight_min_stat": (
+        "Build '{name}': min stat {stat} >= {target} "
+        "not reachable (max {max})."
+    ),
     "opt.infeasible": "Infeasible: pool/build constraints are incompatible.",
     "opt.not_feasible": "Not feasible: {detail}",
     "opt.internal_no_rune": "Internal error: Slot {slot} no rune.",
@@ -533,6 +544,8 @@ STRINGS: dict[str, str] = {
     "opt.partial_fail": "Done, but at least one monster could not be built.",
     "opt.stable_solution": "stable solution without further improvement",
     "opt.no_improvement": "no improvement in consecutive passes",
+    "opt.time_budget_used": "time budget used up",
+    "opt.bound_reached": "no further pass can beat the best one",
     "opt.multi_pass": (
         "{prefix} Multi-pass active: best result from {used} "
         "passes (pass {pass_idx})."
@@ -542,6 +555,13 @@ STRINGS: dict[str, str] = {
         "planned passes (pass {pass_idx}); stopped early "
         "({reason})."
     ),
+    "opt.incremental": "{prefix} Incremental: re-optimized {solved} of {total} units.",
+    "opt.lns": "{prefix} LNS: {accepted} of {tried} neighborhood solves improved the result ({reason}).",
+    "opt.lns_local_optimum": "no neighborhood improves further",
+    "opt.team_decomposition": (
+        "{prefix} Team decomposition: {teams} teams, {rounds} pricing rounds, "
+        "{repaired} teams re-solved in the repair."
+    ),
 
     # -- Update service messages ---------------------------------
     "svc.no_repo": "No GitHub repo configured (github_repo missing).",
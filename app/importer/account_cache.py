@@ -0,0 +1,276 @@
+"""Binary cache of the normalized account next to the persisted snapshot.
+
+Restoring the snapshot on startup means re-parsing the raw JSON and
+normalizing it again.  This module stores the result of that work -- the
+``AccountData`` plus the precomputed ``RuneTable`` / ``ArtifactTable``
+columns (stats, efficiency, quality) -- as NumPy arrays in one ``.npz`` file.
+The cache is keyed by a content hash of the snapshot file and by
+``CACHE_VERSION``; anything that does not match (or fails to load) makes
+``load_account_cache`` return ``None`` so callers fall back to the JSON path.
+
+Bump ``CACHE_VERSION`` whenever the model layout or the efficiency/quality
+formulas behind the table columns change.
+"""
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.domain.models import AccountData, Artifact, Rune, Unit, _effect_tuple, clear_effect_tuples
+
+CACHE_VERSION = 1
+
+_UNIT_FIELDS = [f.name for f in dataclasses.fields(Unit)]
+_RUNE_INT_FIELDS = [
+    "rune_id", "slot_no", "set_id", "rank", "rune_class", "upgrade_curr",
+    "occupied_type", "occupied_id", "origin_class",
+]
+_ARTIFACT_INT_FIELDS = [
+    "artifact_id", "occupied_id", "slot", "type_", "attribute", "rank", "level", "original_rank",
+]
+# AccountData fields stored as JSON (everything except the item lists and caches).
+_META_FIELDS = [
+    f.name for f in dataclasses.fields(AccountData)
+    if f.init and f.name not in ("units_by_id", "runes", "artifacts")
+]
+_MAX_EXACT_INT = 1 << 53
+
+
+class _Unsupported(Exception):
+    """The account holds values the binary layout cannot represent exactly."""
+
+
+def cache_path_for(snapshot_path: str | Path) -> Path:
+    p = Path(snapshot_path)
+    return p.with_name(p.stem + ".account_cache.npz")
+
+
+def snapshot_digest(snapshot_path: str | Path) -> str:
+    h = hashlib.blake2b(digest_size=20)
+    with Path(snapshot_path).open("rb") as fp:
+        for chunk in iter(lambda: fp.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+# ------------------------------------------------------------
+# Effect tuples: stored once in a table, referenced by index
+# ------------------------------------------------------------
+class _EffectTable:
+    def __init__(self) -> None:
+        self.index: Dict[Tuple, int] = {}
+        self.kinds: List[int] = []
+        self.ints: List[int] = []
+        self.floats: List[float] = []
+        self.offsets: List[int] = [0]
+
+    def add(self, values: Sequence[Any]) -> int:
+        key = (tuple(values), tuple(type(v) for v in values))
+        idx = self.index.get(key)
+        if idx is not None:
+            return idx
+        for v in values:
+            if type(v) is int and -_MAX_EXACT_INT < v < _MAX_EXACT_INT:
+                self.kinds.append(0)
+                self.ints.append(v)
+                self.floats.append(0.0)
+            elif type(v) is float:
+                self.kinds.append(1)
+                self.ints.append(0)
+                self.floats.append(v)
+            else:
+                raise _Unsupported(f"effect value {v!r}")
+        self.offsets.append(len(self.kinds))
+        idx = len(self.offsets) - 2
+        self.index[key] = idx
+        return idx
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        return {
+            "eff_kind": np.asarray(self.kinds, dtype=np.uint8),
+            "eff_int": np.asarray(self.ints, dtype=np.int64),
+            "eff_float": np.asarray(self.floats, dtype=np.float64),
+            "eff_offsets": np.asarray(self.offsets, dtype=np.int64),
+        }
+
+
+def _decode_effects(z: Any) -> List[Tuple]:
+    kinds = z["eff_kind"].tolist()
+    ints = z["eff_int"].tolist()
+    floats = z["eff_float"].tolist()
+    offsets = z["eff_offsets"].tolist()
+    values = [f if k else i for k, i, f in zip(kinds, ints, floats)]
+    # Canonical instances, so the model constructors below take their fast path.
+    return [_effect_tuple(values[offsets[i]:offsets[i + 1]]) for i in range(len(offsets) - 1)]
+
+
+def _ragged(groups: Sequence[Sequence[int]]) -> Tuple[np.ndarray, np.ndarray]:
+    offsets = np.zeros(len(groups) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(g) for g in groups])
+    flat = np.fromiter((i for g in groups for i in g), dtype=np.int64, count=int(offsets[-1]))
+    return flat, offsets
+
+
+def _int_column(values: Sequence[Any], what: str) -> np.ndarray:
+    for v in values:
+        if type(v) is not int:
+            raise _Unsupported(f"{what} {v!r}")
+    return np.asarray(values, dtype=np.int64)
+
+
+def _meta_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {"__int_keys__": [[int(k), v] for k, v in value.items()]}
+    return value
+
+
+def _from_meta_value(value: Any) -> Any:
+    if isinstance(value, dict) and "__int_keys__" in value:
+        return {int(k): v for k, v in value["__int_keys__"]}
+    return value
+
+
+def _table_arrays(prefix: str, table: Any) -> Dict[str, np.ndarray]:
+    return {
+        prefix + f.name: getattr(table, f.name)
+        for f in dataclasses.fields(table)
+        if isinstance(getattr(table, f.name), np.ndarray)
+    }
+
+
+# ------------------------------------------------------------
+# Save / load
+# ------------------------------------------------------------
+def _encode(account: AccountData, digest: str) -> Dict[str, np.ndarray]:
+    from app.engine.rune_table import account_artifact_table, account_rune_table
+
+    effects = _EffectTable()
+    units = list(account.units_by_id.values())
+    runes = list(account.runes)
+    arts = list(account.artifacts)
+
+    unit_ints = _int_column([getattr(u, name) for u in units for name in _UNIT_FIELDS], "unit field")
+    rune_ints = _int_column([getattr(r, name) for r in runes for name in _RUNE_INT_FIELDS], "rune field")
+    art_ints = _int_column([getattr(a, name) for a in arts for name in _ARTIFACT_INT_FIELDS], "artifact field")
+    json_score = np.asarray([a.json_score for a in arts], dtype=np.float64)
+    if any(type(a.json_score) is not float for a in arts):
+        raise _Unsupported("artifact json_score")
+
+    rune_sec, rune_sec_offsets = _ragged([[effects.add(s) for s in r.sec_eff] for r in runes])
+    art_sec, art_sec_offsets = _ragged([[effects.add(s) for s in a.sec_effects] for a in arts])
+    meta = {
+        "version": CACHE_VERSION,
+        "digest": digest,
+        "unit_keys": [int(k) for k in account.units_by_id],
+        "fields": {name: _meta_value(getattr(account, name)) for name in _META_FIELDS},
+    }
+    arrays: Dict[str, np.ndarray] = {
+        "meta": np.frombuffer(json.dumps(meta).encode("utf-8"), dtype=np.uint8),
+        "units": unit_ints.reshape(len(units), len(_UNIT_FIELDS)),
+        "runes": rune_ints.reshape(len(runes), len(_RUNE_INT_FIELDS)),
+        "rune_pri": np.asarray([effects.add(r.pri_eff) for r in runes], dtype=np.int64),
+        "rune_prefix": np.asarray([effects.add(r.prefix_eff) for r in runes], dtype=np.int64),
+        "rune_sec": rune_sec,
+        "rune_sec_offsets": rune_sec_offsets,
+        "artifacts": art_ints.reshape(len(arts), len(_ARTIFACT_INT_FIELDS)),
+        "art_json_score": json_score,
+        "art_pri": np.asarray([effects.add(a.pri_effect) for a in arts], dtype=np.int64),
+        "art_sec": art_sec,
+        "art_sec_offsets": art_sec_offsets,
+    }
+    arrays.update(effects.arrays())
+    arrays.update(_table_arrays("rt_", account_rune_table(account)))
+    arrays.update(_table_arrays("at_", account_artifact_table(account)))
+    return arrays
+
+
+def _decode(z: Any, digest: str) -> Optional[AccountData]:
+    from app.engine.rune_table import ArtifactTable, RuneTable
+
+    meta = json.loads(z["meta"].tobytes().decode("utf-8"))
+    if meta.get("version") != CACHE_VERSION or meta.get("digest") != digest:
+        return None
+    clear_effect_tuples()
+    effects = _decode_effects(z)
+
+    acc = AccountData(**{name: _from_meta_value(v) for name, v in meta["fields"].items()})
+    acc.units_by_id = {
+        uid: Unit(*row)
+        for uid, row in zip(meta["unit_keys"], z["units"].tolist())
+    }
+
+    sec = z["rune_sec"].tolist()
+    off = z["rune_sec_offsets"].tolist()
+    acc.runes = [
+        Rune(
+            rid, slot, set_id, rank, rune_class, upgrade, effects[pri], effects[prefix],
+            tuple([effects[i] for i in sec[off[n]:off[n + 1]]]),
+            occ_type, occ_id, origin,
+        )
+        for n, ((rid, slot, set_id, rank, rune_class, upgrade, occ_type, occ_id, origin), pri, prefix)
+        in enumerate(zip(z["runes"].tolist(), z["rune_pri"].tolist(), z["rune_prefix"].tolist()))
+    ]
+
+    sec = z["art_sec"].tolist()
+    off = z["art_sec_offsets"].tolist()
+    acc.artifacts = [
+        Artifact(*ints, pri_effect=effects[pri], sec_effects=tuple([effects[i] for i in sec[off[n]:off[n + 1]]]),
+                 json_score=score)
+        for n, (ints, pri, score)
+        in enumerate(zip(z["artifacts"].tolist(), z["art_pri"].tolist(), z["art_json_score"].tolist()))
+    ]
+
+    rune_table = RuneTable(
+        runes=acc.runes,
+        row_of={rid: row for row, rid in enumerate(z["rt_rune_id"].tolist())},
+        **{name[3:]: z[name] for name in z.files if name.startswith("rt_")},
+    )
+    artifact_table = ArtifactTable(
+        artifacts=acc.artifacts,
+        row_of={aid: row for row, aid in enumerate(z["at_artifact_id"].tolist())},
+        **{name[3:]: z[name] for name in z.files if name.startswith("at_")},
+    )
+    acc.cached_index("rune_table", lambda: rune_table)
+    acc.cached_index("artifact_table", lambda: artifact_table)
+    return acc
+
+
+def save_account_cache(account: AccountData, snapshot_path: str | Path) -> bool:
+    """Write the binary cache for *account*, normalized from *snapshot_path*.
+
+    Best effort: returns False (and leaves no partial file) if the account
+    cannot be stored exactly or the file cannot be written.
+    """
+    target = cache_path_for(snapshot_path)
+    tmp = target.with_name(target.name + ".tmp")
+    try:
+        arrays = _encode(account, snapshot_digest(snapshot_path))
+        with tmp.open("wb") as fp:
+            np.savez(fp, **arrays)
+        os.replace(tmp, target)
+        return True
+    except (OSError, ValueError, _Unsupported):
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+        return False
+
+
+def load_account_cache(snapshot_path: str | Path) -> Optional[AccountData]:
+    """Account from the binary cache, or None if it is missing, stale or unreadable."""
+    target = cache_path_for(snapshot_path)
+    if not target.exists():
+        return None
+    try:
+        digest = snapshot_digest(snapshot_path)
+        with np.load(target, allow_pickle=False) as z:
+            return _decode(z, digest)
+    except Exception:
+        return None
@@ -0,0 +1,176 @@
+"""Diff a freshly imported account against the one currently loaded.
+
+Re-imports usually change a handful of runes (an upgrade, a gem, a few
+swaps).  ``reconcile_accounts`` compares the two accounts by rune_id,
+artifact_id and unit_id, returns an ``AccountChanges`` set and hands back the
+new account with every unchanged object replaced by the *old* instance.  Caches
+that key on object identity -- the rune/artifact tables, the gem suggestion
+rows -- then only recompute the rows that actually changed.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, fields
+from typing import Any, Dict, Tuple
+
+from app.domain.models import AccountData, Artifact, Rune
+
+_RUNE_EQUIP_FIELDS = ("occupied_type", "occupied_id")
+_ARTIFACT_EQUIP_FIELDS = ("occupied_id",)
+
+
+@dataclass(frozen=True)
+class AccountChanges:
+    added_runes: Tuple[int, ...] = ()
+    removed_runes: Tuple[int, ...] = ()
+    upgraded_runes: Tuple[int, ...] = ()      # stats, level, gem/grind or set changed
+    reequipped_runes: Tuple[int, ...] = ()    # occupant changed
+    added_artifacts: Tuple[int, ...] = ()
+    removed_artifacts: Tuple[int, ...] = ()
+    upgraded_artifacts: Tuple[int, ...] = ()
+    reequipped_artifacts: Tuple[int, ...] = ()
+    added_units: Tuple[int, ...] = ()
+    removed_units: Tuple[int, ...] = ()
+    changed_units: Tuple[int, ...] = ()
+    # Anything outside the item lists: mode equip maps, defense/deck lists, gems, totem.
+    other_changed: bool = False
+
+    def is_empty(self) -> bool:
+        return not any(
+            (
+                self.added_runes, self.removed_runes, self.upgraded_runes, self.reequipped_runes,
+                self.added_artifacts, self.removed_artifacts, self.upgraded_artifacts,
+                self.reequipped_artifacts, self.added_units, self.removed_units, self.changed_units,
+                self.other_changed,
+            )
+        )
+
+    def rune_count(self) -> int:
+        return len(
+            set(self.added_runes) | set(self.removed_runes)
+            | set(self.upgraded_runes) | set(self.reequipped_runes)
+        )
+
+    def artifact_count(self) -> int:
+        return len(
+            set(self.added_artifacts) | set(self.removed_artifacts)
+            | set(self.upgraded_artifacts) | set(self.reequipped_artifacts)
+        )
+
+
+def _split_change(old: Any, new: Any, equip_fields: Tuple[str, ...]) -> Tuple[bool, bool]:
+    """(content changed, equip changed) between two versions of one item."""
+    equip = any(getattr(old, f) != getattr(new, f) for f in equip_fields)
+    if not equip:
+        return True, False
+    content = any(
+        getattr(old, f.name) != getattr(new, f.name)
+        for f in fields(old)
+        if f.name not in equip_fields
+    )
+    return content, True
+
+
+def reconcile_accounts(old: AccountData, new: AccountData) -> Tuple[AccountData, AccountChanges]:
+    """Diff *new* against *old*; return *new* (sharing unchanged objects) and the change set.
+
+    The returned account is *new* itself with its ``units_by_id`` / ``runes`` /
+    ``artifacts`` containers replaced; order and content are unchanged.  When
+    *old* already built its rune/artifact tables, the new account's tables are
+    built from them, recomputing only the rows of changed items.  Efficiency
+    memo entries of changed or removed items are dropped.
+    """
+    from app.engine.efficiency import forget_memoized
+    from app.engine.rune_table import ArtifactTable, RuneTable
+
+    old_runes: Dict[int, Rune] = old.runes_by_id()
+    new_runes: Dict[int, Rune] = {}
+    runes = []
+    upgraded_runes, reequipped_runes, added_runes = [], [], []
+    for r in new.runes:
+        prev = old_runes.get(r.rune_id)
+        if prev is None:
+            added_runes.append(r.rune_id)
+        elif prev == r:
+            r = prev
+        else:
+            content, equip = _split_change(prev, r, _RUNE_EQUIP_FIELDS)
+            if content:
+                upgraded_runes.append(r.rune_id)
+            if equip:
+                reequipped_runes.append(r.rune_id)
+        runes.append(r)
+        new_runes[r.rune_id] = r
+    removed_runes = [rid for rid in old_runes if rid not in new_runes]
+
+    old_arts: Dict[int, Artifact] = old.artifacts_by_id()
+    new_art_ids = set()
+    artifacts = []
+    upgraded_arts, reequipped_arts, added_arts = [], [], []
+    for a in new.artifacts:
+        prev = old_arts.get(a.artifact_id)
+        if prev is None:
+            added_arts.append(a.artifact_id)
+        elif prev == a:
+            a = prev
+        else:
+            content, equip = _split_change(prev, a, _ARTIFACT_EQUIP_FIELDS)
+            if content:
+                upgraded_arts.append(a.artifact_id)
+            if equip:
+                reequipped_arts.append(a.artifact_id)
+        artifacts.append(a)
+        new_art_ids.add(a.artifact_id)
+    removed_arts = [aid for aid in old_arts if aid not in new_art_ids]
+
+    units_by_id = {}
+    added_units, changed_units = [], []
+    for uid, u in new.units_by_id.items():
+        prev_u = old.units_by_id.get(uid)
+        if prev_u is None:
+            added_units.append(uid)
+        elif prev_u == u:
+            u = prev_u
+        else:
+            changed_units.append(uid)
+        units_by_id[uid] = u
+    removed_units = [uid for uid in old.units_by_id if uid not in units_by_id]
+
+    other_changed = any(
+        getattr(old, name) != getattr(new, name)
+        for name in (
+            "guildsiege_defense_unit_list", "arena_defense_unit_list", "arena_deck_teams",
+            "sky_tribe_totem_level", "sky_tribe_totem_spd_pct", "craft_stuff", "craft_stuff_imported",
+            "guild_rune_equip", "rta_rune_equip", "rta_artifact_equip",
+        )
+    )
+
+    old_rune_table = old.built_index("rune_table")
+    old_artifact_table = old.built_index("artifact_table")
+    new.units_by_id = units_by_id
+    new.runes = runes
+    new.artifacts = artifacts
+    if old_rune_table is not None:
+        new.cached_index("rune_table", lambda: RuneTable.build(new.runes, previous=old_rune_table))
+    if old_artifact_table is not None:
+        new.cached_index("artifact_table", lambda: ArtifactTable.build(new.artifacts, previous=old_artifact_table))
+
+    forget_memoized(
+        rune_ids=[*removed_runes, *upgraded_runes, *reequipped_runes],
+        artifact_ids=[*removed_arts, *upgraded_arts, *reequipped_arts],
+    )
+
+    changes = AccountChanges(
+        added_runes=tuple(added_runes),
+        removed_runes=tuple(removed_runes),
+        upgraded_runes=tuple(upgraded_runes),
+        reequipped_runes=tuple(reequipped_runes),
+        added_artifacts=tuple(added_arts),
+        removed_artifacts=tuple(removed_arts),
+        upgraded_artifacts=tuple(upgraded_arts),
+        reequipped_artifacts=tuple(reequipped_arts),
+        added_units=tuple(added_units),
+        removed_units=tuple(removed_units),
+        changed_units=tuple(changed_units),
+        other_changed=other_changed,
+    )
+    return new, changes
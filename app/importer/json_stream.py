@@ -0,0 +1,163 @@
+"""Incremental reader for the top-level object of a large JSON file.
+
+Account exports are a single JSON object whose large members (``unit_list``,
+``runes``, ``artifacts``, ...) are arrays of small objects.  ``iter_top_level``
+walks that object chunk by chunk, decoding only the members the caller asks
+for: "streamed" members are yielded element by element, "kept" members are
+decoded whole and everything else is skipped without building Python
+objects.  Peak memory is therefore bounded by the chunk size plus whatever the
+caller retains, instead of file text + full dict.
+"""
+from __future__ import annotations
+
+import codecs
+import json
+import re
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Iterator, Optional, Set, Tuple
+
+ProgressFn = Callable[[int, int], None]
+
+_CHUNK_SIZE = 1 << 20
+_WS = re.compile(r"[ \t\n\r]*")
+_STRUCT = re.compile(r'["\[\]{}]')
+_STRING_TAIL = re.compile(r'(?:[^"\\]|\\.)*"', re.DOTALL)
+
+# Yielded item kinds.
+ELEMENT = "element"   # (ELEMENT, key, one array element of a streamed member)
+VALUE = "value"       # (VALUE, key, the whole decoded value of a kept member)
+
+
+class _Reader:
+    def __init__(self, fp: BinaryIO, total: int, progress: Optional[ProgressFn]) -> None:
+        self._fp = fp
+        self._decode = codecs.getincrementaldecoder("utf-8")(errors="replace").decode
+        self._json = json.JSONDecoder()
+        self._total = int(total)
+        self._progress = progress
+        self._read = 0
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        """Append the next chunk to the buffer; False at end of file."""
+        if self.eof:
+            return False
+        raw = self._fp.read(_CHUNK_SIZE)
+        self._read += len(raw)
+        text = self._decode(raw, final=not raw)
+        if not raw:
+            self.eof = True
+        # Drop the consumed prefix so the buffer stays around one chunk.
+        self.buf = self.buf[self.pos:] + text
+        self.pos = 0
+        if self._progress is not None:
+            self._progress(self._read, self._total)
+        return bool(raw) or bool(text)
+
+    def peek(self) -> str:
+        while True:
+            self.pos = _WS.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                raise ValueError("unexpected end of JSON input")
+
+    def expect(self, ch: str) -> None:
+        if self.peek() != ch:
+            raise ValueError(f"expected {ch!r} at offset {self._read - len(self.buf) + self.pos}")
+        self.pos += 1
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                obj, end = self._json.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.fill():
+                    continue
+                raise
+            # A number (or literal) ending exactly at the buffer edge may be cut off.
+            if end >= len(self.buf) and not self.eof and self.fill():
+                continue
+            self.pos = end
+            return obj
+
+    def skip(self) -> None:
+        """Skip one value without decoding nested containers."""
+        if self.peek() not in "[{":
+            self.value()
+            return
+        depth = 0
+        while True:
+            m = _STRUCT.search(self.buf, self.pos)
+            if m is None:
+                self.pos = len(self.buf)
+                if not self.fill():
+                    raise ValueError("unexpected end of JSON input")
+                continue
+            ch = m.group()
+            if ch == '"':
+                tail = _STRING_TAIL.match(self.buf, m.end())
+                if tail is None:
+                    self.pos = m.start()
+                    if not self.fill():
+                        raise ValueError("unterminated string in JSON input")
+                    continue
+                self.pos = tail.end()
+                continue
+            self.pos = m.end()
+            depth += 1 if ch in "[{" else -1
+            if depth == 0:
+                return
+
+
+def iter_top_level(
+    path: str | Path,
+    stream: Set[str],
+    keep: Set[str],
+    progress: Optional[ProgressFn] = None,
+) -> Iterator[Tuple[str, str, Any]]:
+    """Yield (kind, key, payload) for the wanted members of the top-level object.
+
+    Array members named in *stream* are yielded element by element (kind
+    ``ELEMENT``); members named in *keep* (or streamed members that are not
+    arrays) are yielded whole (kind ``VALUE``).  *progress* receives
+    ``(bytes_read, total_bytes)`` after every chunk.
+    """
+    p = Path(path)
+    total = p.stat().st_size
+    with p.open("rb") as fp:
+        r = _Reader(fp, total, progress)
+        if r.fill() and r.buf.startswith("\ufeff"):
+            r.pos = 1
+        r.expect("{")
+        if r.peek() == "}":
+            return
+        while True:
+            key = r.value()
+            if not isinstance(key, str):
+                raise ValueError("object keys must be strings")
+            r.expect(":")
+            if key in stream and r.peek() == "[":
+                r.pos += 1
+                if r.peek() == "]":
+                    r.pos += 1
+                else:
+                    while True:
+                        yield ELEMENT, key, r.value()
+                        if r.peek() == ",":
+                            r.pos += 1
+                            continue
+                        r.expect("]")
+                        break
+            elif key in stream or key in keep:
+                yield VALUE, key, r.value()
+            else:
+                r.skip()
+            if r.peek() == ",":
+                r.pos += 1
+                continue
+            r.expect("}")
+            return
@@ -1,10 +1,10 @@
 from __future__ import annotations
 
-import json
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List, Tuple
 
-from app.domain.models import AccountData, Unit, Rune, Artifact
+from app.domain.models import AccountData, Unit, Rune, Artifact, clear_effect_tuples
+from app.importer.json_stream import ELEMENT, VALUE, iter_top_level
 
 
 def _safe_int(x: Any, default: int = 0) -> int:
@@ -81,6 +81,16 @@ def _extract_sky_tribe_totem_level(data: Dict[str, Any]) -> int:
     return 0
 
 
+_CRAFT_NODE_KEYS = ("wizard_info", "wizard", "user", "account", "account_info", "summoner")
+_CRAFT_KEYS = (
+    "craft_stuff",
+    "craft_stuff_list",
+    "craft_item_list",
+    "craft_items",
+    "rune_craft_item_list",
+)
+
+
 def _extract_craft_stuff_entries(data: Dict[str, Any]) -> tuple[list[Any], bool]:
     """Return craft entries and whether craft data was explicitly present.
 
@@ -89,22 +99,15 @@ def _extract_craft_stuff_entries(data: Dict[str, Any]) -> tuple[list[Any], bool]
     even when the list is empty.
     """
     candidate_nodes: list[Any] = [data]
-    for key in ("wizard_info", "wizard", "user", "account", "account_info", "summoner"):
+    for key in _CRAFT_NODE_KEYS:
         node = data.get(key)
         if isinstance(node, dict):
             candidate_nodes.append(node)
 
-    craft_keys = (
-        "craft_stuff",
-        "craft_stuff_list",
-        "craft_item_list",
-        "craft_items",
-        "rune_craft_item_list",
-    )
     for node in candidate_nodes:
         if not isinstance(node, dict):
             continue
-        for key in craft_keys:
+        for key in _CRAFT_KEYS:
             if key not in node:
                 continue
             raw = node.get(key)
@@ -144,19 +147,63 @@ def _parse_artifact(a: Dict[str, Any], occupied_id_override: int | None = None)
         level=_safe_int(a.get("level")),
         original_rank=original_rank,
         pri_effect=tuple(raw_pri) if raw_pri else (),
-        sec_effects=[list(s) for s in raw_sec],
+        sec_effects=tuple(tuple(s) for s in raw_sec),
         json_score=json_score,
     )
 
 
-def load_account_json(path: str | Path) -> AccountData:
+# Top-level sections read by the importer.  The large ones are arrays that the
+# streaming loader hands over element by element; the rest are small and are
+# decoded whole.  Everything else in an export (buildings, quests, ...) is skipped.
+_UNIT_SECTIONS = ("unit_list", "unit_storage_normal_list")
+_STREAMED_SECTIONS = frozenset(_UNIT_SECTIONS + ("runes", "artifacts"))
+_KEPT_SECTIONS = frozenset(
+    (
+        "deco_list",
+        "artifact_equip_list",
+        "guildsiege_defense_unit_list",
+        "defense_deck_info",
+        "server_arena_defense_unit_list",
+        "deck_list",
+        "equip_info_list",
+        "world_arena_rune_equip_list",
+        "world_arena_artifact_equip_list",
+    )
+    + _CRAFT_NODE_KEYS
+    + _CRAFT_KEYS
+)
+
+
+def load_account_json(
+    path: str | Path,
+    progress: Callable[[int, int], None] | None = None,
+    raw_sections: Dict[str, Any] | None = None,
+) -> AccountData:
     """
     Lädt einen Summoners-War-JSON-Export und normalisiert
     Units, Runen, Artefakte und Guild-Siege-Listen.
+
+    The file is streamed: only the sections listed above are decoded, and
+    units/runes/artifacts are converted one entry at a time.  *progress*
+    receives ``(bytes_read, total_bytes)``.  If *raw_sections* is given it is
+    filled with the raw JSON of the sections that were read (enough for
+    ``load_account_from_data`` to rebuild the same account), e.g. for saving a
+    snapshot.
     """
-    p = Path(path)
-    data = json.loads(p.read_text(encoding="utf-8", errors="replace"))
-    return _normalize_account_data(data)
+    builder = _AccountBuilder()
+    sections: Dict[str, Any] = {}
+    for kind, key, payload in iter_top_level(path, _STREAMED_SECTIONS, _KEPT_SECTIONS, progress):
+        if raw_sections is not None:
+            if kind == ELEMENT:
+                raw_sections.setdefault(key, []).append(payload)
+            else:
+                raw_sections[key] = payload
+        if kind == VALUE and key not in _STREAMED_SECTIONS:
+            sections[key] = payload
+            continue
+        for entry in ([payload] if kind == ELEMENT else (payload or [])):
+            builder.add(key, entry)
+    return builder.finish(sections)
 
 
 def load_account_from_data(raw_data: Dict[str, Any]) -> AccountData:
@@ -167,94 +214,125 @@ def load_account_from_data(raw_data: Dict[str, Any]) -> AccountData:
 
 
 def _normalize_account_data(data: Dict[str, Any]) -> AccountData:
-    acc = AccountData()
-    acc.sky_tribe_totem_level = _extract_sky_tribe_totem_level(data)
-    acc.sky_tribe_totem_spd_pct = _sky_tribe_totem_spd_pct_from_level(acc.sky_tribe_totem_level)
-
-    # Some exports split owned units between the active box and monster storage.
-    # We need both sources so stored monsters (e.g. Shi Hou) appear in the UI.
-    unit_sources = [
-        data.get("unit_list", []) or [],
-        data.get("unit_storage_normal_list", []) or [],
-    ]
-    for units in unit_sources:
-        for u in units:
-            unit_id = _safe_int(u.get("unit_id"))
-            unit_master_id = _safe_int(u.get("unit_master_id"))
-            if unit_id == 0 or unit_master_id == 0:
-                continue
+    builder = _AccountBuilder()
+    for key in (*_UNIT_SECTIONS, "runes", "artifacts"):
+        for entry in (data.get(key, []) or []):
+            builder.add(key, entry)
+    return builder.finish(data)
 
-            unit = Unit(
-                unit_id=unit_id,
-                unit_master_id=unit_master_id,
-                attribute=_safe_int(u.get("attribute")),
-                unit_level=_safe_int(u.get("unit_level")),
-                unit_class=_safe_int(u.get("class")),
-                base_con=_safe_int(u.get("con")),
-                base_atk=_safe_int(u.get("atk")),
-                base_def=_safe_int(u.get("def")),
-                base_spd=_safe_int(u.get("spd")),
-                base_res=_safe_int(u.get("resist")),
-                base_acc=_safe_int(u.get("accuracy")),
-                crit_rate=_safe_int(u.get("critical_rate")),
-                crit_dmg=_safe_int(u.get("critical_damage")),
-            )
-            acc.units_by_id[unit_id] = unit
-
-            for r in (u.get("runes") or []):
-                rune_id = _safe_int(r.get("rune_id"))
-                if rune_id == 0:
-                    continue
-                try:
-                    rune = Rune(
-                        rune_id=rune_id,
-                        slot_no=_safe_int(r.get("slot_no")),
-                        set_id=_safe_int(r.get("set_id")),
-                        rank=_safe_int(r.get("rank")),
-                        rune_class=_safe_int(r.get("class")),
-                        upgrade_curr=_safe_int(r.get("upgrade_curr")),
-                        pri_eff=tuple(r.get("pri_eff") or [0, 0]),
-                        prefix_eff=tuple(r.get("prefix_eff") or [0, 0]),
-                        sec_eff=[tuple(x) for x in (r.get("sec_eff") or [])],
-                        occupied_type=_safe_int(r.get("occupied_type")),
-                        occupied_id=_safe_int(r.get("occupied_id")),
-                        origin_class=_parse_rune_origin_class(r),
-                    )
-                    acc.runes.append(rune)
-                except Exception:
-                    continue
-
-            for a in (u.get("artifacts") or []):
-                try:
-                    art = _parse_artifact(a)
-                    if art and art.slot in (1, 2):
-                        acc.artifacts.append(art)
-                except Exception:
-                    continue
-
-    for r in (data.get("runes") or []):
-        rune_id = _safe_int(r.get("rune_id"))
-        if rune_id == 0:
-            continue
-        try:
-            rune = Rune(
-                rune_id=rune_id,
-                slot_no=_safe_int(r.get("slot_no")),
-                set_id=_safe_int(r.get("set_id")),
-                rank=_safe_int(r.get("rank")),
-                rune_class=_safe_int(r.get("class")),
-                upgrade_curr=_safe_int(r.get("upgrade_curr")),
-                pri_eff=tuple(r.get("pri_eff") or [0, 0]),
-                prefix_eff=tuple(r.get("prefix_eff") or [0, 0]),
-                sec_eff=[tuple(x) for x in (r.get("sec_eff") or [])],
-                occupied_type=_safe_int(r.get("occupied_type")),
-                occupied_id=_safe_int(r.get("occupied_id")),
-                origin_class=_parse_rune_origin_class(r),
-            )
-            acc.runes.append(rune)
-        except Exception:
-            continue
 
+def _parse_rune(r: Dict[str, Any]) -> Rune | None:
+    rune_id = _safe_int(r.get("rune_id"))
+    if rune_id == 0:
+        return None
+    try:
+        return Rune(
+            rune_id=rune_id,
+            slot_no=_safe_int(r.get("slot_no")),
+            set_id=_safe_int(r.get("set_id")),
+            rank=_safe_int(r.get("rank")),
+            rune_class=_safe_int(r.get("class")),
+            upgrade_curr=_safe_int(r.get("upgrade_curr")),
+            pri_eff=tuple(r.get("pri_eff") or [0, 0]),
+            prefix_eff=tuple(r.get("prefix_eff") or [0, 0]),
+            sec_eff=tuple(tuple(x) for x in (r.get("sec_eff") or [])),
+            occupied_type=_safe_int(r.get("occupied_type")),
+            occupied_id=_safe_int(r.get("occupied_id")),
+            origin_class=_parse_rune_origin_class(r),
+        )
+    except Exception:
+        return None
+
+
+class _AccountBuilder:
+    """Collects units/runes/artifacts entry by entry, in any section order.
+
+    Parsed objects are buffered per section and merged in ``finish`` in the
+    canonical order (unit_list, unit storage, top-level runes/artifacts), so
+    the result does not depend on the key order of the export.
+    """
+
+    def __init__(self) -> None:
+        # A new account shares effect tuples among its own items only.
+        clear_effect_tuples()
+        self._units: Dict[str, List[Tuple[Unit, List[Rune], List[Artifact]]]] = {
+            key: [] for key in _UNIT_SECTIONS
+        }
+        self._runes: List[Rune] = []
+        self._artifacts: List[Artifact] = []
+
+    def add(self, section: str, entry: Dict[str, Any]) -> None:
+        if section in self._units:
+            self._add_unit(section, entry)
+        elif section == "runes":
+            rune = _parse_rune(entry)
+            if rune is not None:
+                self._runes.append(rune)
+        elif section == "artifacts":
+            try:
+                art = _parse_artifact(entry)
+            except Exception:
+                return
+            if art:
+                self._artifacts.append(art)
+
+    def _add_unit(self, section: str, u: Dict[str, Any]) -> None:
+        unit_id = _safe_int(u.get("unit_id"))
+        unit_master_id = _safe_int(u.get("unit_master_id"))
+        if unit_id == 0 or unit_master_id == 0:
+            return
+
+        unit = Unit(
+            unit_id=unit_id,
+            unit_master_id=unit_master_id,
+            attribute=_safe_int(u.get("attribute")),
+            unit_level=_safe_int(u.get("unit_level")),
+            unit_class=_safe_int(u.get("class")),
+            base_con=_safe_int(u.get("con")),
+            base_atk=_safe_int(u.get("atk")),
+            base_def=_safe_int(u.get("def")),
+            base_spd=_safe_int(u.get("spd")),
+            base_res=_safe_int(u.get("resist")),
+            base_acc=_safe_int(u.get("accuracy")),
+            crit_rate=_safe_int(u.get("critical_rate")),
+            crit_dmg=_safe_int(u.get("critical_damage")),
+        )
+
+        runes: List[Rune] = []
+        for r in (u.get("runes") or []):
+            rune = _parse_rune(r)
+            if rune is not None:
+                runes.append(rune)
+
+        arts: List[Artifact] = []
+        for a in (u.get("artifacts") or []):
+            try:
+                art = _parse_artifact(a)
+                if art and art.slot in (1, 2):
+                    arts.append(art)
+            except Exception:
+                continue
+        self._units[section].append((unit, runes, arts))
+
+    def finish(self, data: Dict[str, Any]) -> AccountData:
+        """Build the account; *data* supplies the small (non-streamed) sections."""
+        acc = AccountData()
+        acc.sky_tribe_totem_level = _extract_sky_tribe_totem_level(data)
+        acc.sky_tribe_totem_spd_pct = _sky_tribe_totem_spd_pct_from_level(acc.sky_tribe_totem_level)
+
+        # Some exports split owned units between the active box and monster storage.
+        # We need both sources so stored monsters (e.g. Shi Hou) appear in the UI.
+        for section in _UNIT_SECTIONS:
+            for unit, runes, arts in self._units[section]:
+                acc.units_by_id[unit.unit_id] = unit
+                acc.runes.extend(runes)
+                acc.artifacts.extend(arts)
+        acc.runes.extend(self._runes)
+        _merge_account_sections(acc, self._artifacts, data)
+        return acc
+
+
+def _merge_account_sections(acc: AccountData, top_level_artifacts: List[Artifact], data: Dict[str, Any]) -> None:
     runes_by_id: Dict[int, Rune] = {}
     for ru in acc.runes:
         prev = runes_by_id.get(ru.rune_id)
@@ -271,11 +349,8 @@ def _normalize_account_data(data: Dict[str, Any]) -> AccountData:
     # Some exports do not provide a top-level "artifacts" list, so we must
     # preserve unit-level data and only enrich/override occupied mapping later.
     full_arts_by_id: Dict[int, Artifact] = {int(a.artifact_id): a for a in acc.artifacts}
-    for a in (data.get("artifacts") or []):
+    for art in top_level_artifacts:
         try:
-            art = _parse_artifact(a)
-            if not art:
-                continue
             prev = full_arts_by_id.get(int(art.artifact_id))
             if prev is None:
                 full_arts_by_id[art.artifact_id] = art
@@ -434,5 +509,3 @@ def _normalize_account_data(data: Dict[str, Any]) -> AccountData:
         uid = _safe_int(entry.get("occupied_id"))
         if art_id and uid:
             acc.rta_artifact_equip.setdefault(uid, []).append(art_id)
-
-    return acc
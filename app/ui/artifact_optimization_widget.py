@@ -2,6 +2,8 @@ from __future__ import annotations
 
 from typing import Callable, Optional
 
+import numpy as np
+
 from PySide6.QtCore import Qt
 from PySide6.QtGui import (
     QAbstractTextDocumentLayout,
@@ -34,7 +36,7 @@ from app.domain.artifact_effects import (
     artifact_effect_text,
     ARTIFACT_MAIN_FOCUS_BY_EFFECT_ID,
 )
-from app.engine.efficiency import artifact_efficiency
+from app.engine.rune_table import account_artifact_table
 from app.i18n import tr
 from app.ui.dpi import dp
 from app.ui.widgets.selection_combos import _UnitSearchComboBox
@@ -335,8 +337,10 @@ class ArtifactOptimizationWidget(QWidget):
             self.table.setSortingEnabled(True)
             return
 
-        all_artifacts = list(self._account.artifacts or [])
-        all_artifacts.sort(key=lambda a: (artifact_efficiency(a), int(a.artifact_id or 0)), reverse=True)
+        table = account_artifact_table(self._account)
+        rows = np.lexsort((table.artifact_id, table.efficiency))[::-1].tolist()
+        all_artifacts = [table.artifacts[i] for i in rows]
+        eff_by_aid = {int(table.artifact_id[i]): float(table.efficiency[i]) for i in rows}
         self._populate_filters(all_artifacts)
 
         if not all_artifacts:
@@ -365,7 +369,7 @@ class ArtifactOptimizationWidget(QWidget):
         self.table.setRowCount(len(artifacts))
 
         for row, art in enumerate(artifacts):
-            eff = artifact_efficiency(art)
+            eff = eff_by_aid[int(art.artifact_id or 0)]
 
             type_item = QTableWidgetItem(_type_text(art))
             type_item.setData(Qt.UserRole, int(art.type_ or 0))
@@ -2260,23 +2260,17 @@ class BuildDialog(QDialog):
         if uid <= 0:
             return {}
 
-        by_id = {int(a.artifact_id): a for a in (self._account.artifacts or [])}
         out: Dict[int, int] = {}
 
         if str(rune_mode).strip().lower() == "rta":
-            for aid in (self._account.rta_artifact_equip.get(int(uid), []) or []):
-                art = by_id.get(int(aid))
-                if art is None:
-                    continue
+            for art in self._account.artifacts_equipped_on(int(uid), "rta"):
                 art_type = int(getattr(art, "type_", 0) or 0)
                 if art_type in (1, 2) and art_type not in out:
-                    out[int(art_type)] = int(aid)
+                    out[int(art_type)] = int(art.artifact_id)
             if len(out) >= 2:
                 return out
 
-        for art in (self._account.artifacts or []):
-            if int(getattr(art, "occupied_id", 0) or 0) != int(uid):
-                continue
+        for art in self._account.artifacts_equipped_on(int(uid), "pve"):
             art_type = int(getattr(art, "type_", 0) or 0)
             aid = int(getattr(art, "artifact_id", 0) or 0)
             if art_type in (1, 2) and aid > 0 and art_type not in out:
@@ -42,6 +42,7 @@ from app.engine.efficiency import (
     rune_efficiency,
     rune_efficiency_gem_swap,
 )
+from app.engine.rune_table import account_rune_table
 from app.i18n import tr
 from app.ui.dpi import dp
 from app.ui.widgets.selection_combos import _UnitSearchComboBox
@@ -763,6 +764,9 @@ class GemSuggestionWidget(QWidget):
         self._monster_name_fn = monster_name_fn
         self._updating_filters = False
         self._swap_combo_states: dict[QComboBox, dict] = {}
+        # rune_id -> (rune instance, pattern key, swap options).  Re-imports keep
+        # unchanged rune instances, so only changed runes are re-evaluated.
+        self._swap_cache: dict[int, tuple[Rune, tuple, list]] = {}
 
         layout = QVBoxLayout(self)
         layout.setContentsMargins(dp(8), dp(8), dp(8), dp(8))
@@ -1119,7 +1123,9 @@ class GemSuggestionWidget(QWidget):
             r for r in account_runes
             if int(r.upgrade_curr or 0) >= 12 and not _has_gem(r)
         ]
-        all_candidates.sort(key=lambda r: rune_efficiency(r), reverse=True)
+        rune_table = account_rune_table(self._account)
+        eff_by_id = dict(zip(rune_table.rune_id.tolist(), rune_table.efficiency.tolist()))
+        all_candidates.sort(key=lambda r: eff_by_id[int(r.rune_id or 0)], reverse=True)
         self._populate_filters(all_candidates)
 
         if not all_candidates:
@@ -1130,13 +1136,21 @@ class GemSuggestionWidget(QWidget):
         # Pre-compute top swap options and availability for all candidates
         # (avail = _AVAIL_UNKNOWN if not imported, else set-specific gem count >= 0)
         swap_data: list[tuple] = []
+        pattern_key = (tuple(sorted(gem_counts.items())), tuple(sorted(grind_counts.items())))
+        swap_cache: dict[int, tuple[Rune, tuple, list]] = {}
         for rune in all_candidates:
-            options = _find_top_gem_swaps(
-                rune,
-                gem_counts=gem_counts,
-                grind_counts=grind_counts,
-                limit=4,
-            )
+            rid = int(rune.rune_id or 0)
+            cached = self._swap_cache.get(rid)
+            if cached is not None and cached[0] is rune and cached[1] == pattern_key:
+                options = cached[2]
+            else:
+                options = _find_top_gem_swaps(
+                    rune,
+                    gem_counts=gem_counts,
+                    grind_counts=grind_counts,
+                    limit=4,
+                )
+            swap_cache[rid] = (rune, pattern_key, options)
             option_rows: list[dict] = []
             for swap in options:
                 _, new_id, *_ = swap
@@ -1160,6 +1174,7 @@ class GemSuggestionWidget(QWidget):
                     }
                 )
             swap_data.append((rune, option_rows))
+        self._swap_cache = swap_cache
 
         # --- Apply filters ---
         selected_set = int(self.combo_filter_set.currentData() or 0)
@@ -1208,7 +1223,7 @@ class GemSuggestionWidget(QWidget):
         self._swap_combo_states.clear()
 
         for row, (rune, options, display_index) in enumerate(filtered):
-            current_eff = float(rune_efficiency(rune))
+            current_eff = float(eff_by_id[int(rune.rune_id or 0)])
             set_id = int(rune.set_id or 0)
             icon = self._rune_set_icon_fn(set_id) if self._rune_set_icon_fn else QIcon()
             monster_name = ""
@@ -528,8 +528,9 @@ class MainWindow(QMainWindow):
         self,
         text: str,
         work_fn: Callable[[Callable[[], bool], Callable[[Any], None], Callable[[int, int], None]], Any],
+        title: str | None = None,
     ) -> Any:
-        return _sec_run_with_busy_progress(self, text, work_fn)
+        return _sec_run_with_busy_progress(self, text, work_fn, title=title)
 
     # ============================================================
     # Helpers: names+icons
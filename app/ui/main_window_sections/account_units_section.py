@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import json
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Tuple
@@ -9,13 +8,19 @@ from PySide6.QtCore import Qt, QSize
 from PySide6.QtGui import QIcon, QStandardItem, QStandardItemModel
 from PySide6.QtWidgets import QComboBox, QFileDialog, QMessageBox, QWidget
 
-from app.importer.sw_json_importer import load_account_from_data
+from app.importer.account_cache import load_account_cache, save_account_cache
+from app.importer.account_diff import reconcile_accounts
+from app.importer.sw_json_importer import load_account_from_data, load_account_json
 from app.domain.presets import SET_NAMES
 from app.i18n import tr
 from app.ui.dpi import dp
 from app.ui.widgets.selection_combos import _UnitSearchComboBox
 
 
+class _ImportCancelled(Exception):
+    pass
+
+
 def on_import(window) -> None:
     path, _ = QFileDialog.getOpenFileName(
         window,
@@ -25,14 +30,47 @@ def on_import(window) -> None:
     )
     if not path:
         return
+    # Large exports are streamed in a worker so the UI stays responsive; only
+    # the sections the app reads are kept for the snapshot.
+    raw_sections: Dict[str, Any] = {}
+    previous = getattr(window, "account", None)
+
+    def _work(is_cancelled, _register_solver, report_progress):
+        def _progress(done: int, total: int) -> None:
+            if is_cancelled():
+                raise _ImportCancelled()
+            report_progress(done, total)
+
+        try:
+            account = load_account_json(path, progress=_progress, raw_sections=raw_sections)
+        except _ImportCancelled:
+            return None
+        if previous is None:
+            return account, None
+        return reconcile_accounts(previous, account)
+
     try:
-        raw_json = json.loads(Path(path).read_text(encoding="utf-8", errors="replace"))
-        window.account_persistence.save(raw_json, source_name=Path(path).name)
-        account = load_account_from_data(raw_json)
+        result = window._run_with_busy_progress(tr("main.importing"), _work, title=tr("main.import_btn"))
+        if result is None:
+            return
+        account, changes = result
+        window.account_persistence.save(raw_sections, source_name=Path(path).name)
     except Exception as e:
         QMessageBox.critical(window, tr("main.import_failed"), str(e))
         return
+    raw_sections.clear()
+    save_account_cache(account, window.account_persistence.active_snapshot_path())
+    if changes is not None and changes.is_empty():
+        # Same account content: keep the current account and every view as is.
+        window.lbl_status.setText(tr("main.import_label", source=Path(path).name))
+        window.statusBar().showMessage(tr("main.import_unchanged"), 5000)
+        return
     window._apply_saved_account(account, Path(path).name)
+    if changes is not None:
+        window.statusBar().showMessage(
+            tr("main.import_changes", runes=changes.rune_count(), artifacts=changes.artifact_count()),
+            5000,
+        )
 
 
 def apply_saved_account(window, account, source_label: str) -> None:
@@ -105,14 +143,19 @@ def apply_saved_account(window, account, source_label: str) -> None:
 def try_restore_snapshot(window) -> None:
     if not window.account_persistence.exists():
         return
-    raw = window.account_persistence.load()
-    if not raw:
-        return
-    try:
-        account = load_account_from_data(raw)
-    except Exception as exc:
-        QMessageBox.warning(window, tr("main.snapshot_title"), tr("main.snapshot_failed", exc=exc))
-        return
+    snapshot_path = window.account_persistence.active_snapshot_path()
+    account = load_account_cache(snapshot_path)
+    if account is None:
+        raw = window.account_persistence.load()
+        if not raw:
+            return
+        try:
+            account = load_account_from_data(raw)
+        except Exception as exc:
+            QMessageBox.warning(window, tr("main.snapshot_title"), tr("main.snapshot_failed", exc=exc))
+            return
+        del raw
+        save_account_cache(account, snapshot_path)
     meta = window.account_persistence.load_meta()
     source_name = str(meta.get("source_name", "")).strip() or tr("main.source_unknown")
     imported_at_raw = str(meta.get("imported_at", "")).strip()
@@ -31,10 +31,11 @@ def run_with_busy_progress(
     window,
     text: str,
     work_fn: Callable[[Callable[[], bool], Callable[[Any], None], Callable[[int, int], None]], Any],
+    title: str | None = None,
 ) -> Any:
     show_extra = bool(getattr(window, "_show_extra_info_enabled", lambda: False)())
     dlg = QProgressDialog(text, tr("btn.cancel"), 0, 0, window)
-    dlg.setWindowTitle(tr("btn.optimize"))
+    dlg.setWindowTitle(title or tr("btn.optimize"))
     dlg.setLabelText(text)
     dlg.setWindowModality(Qt.ApplicationModal)
     dlg.setCancelButtonText(tr("btn.cancel"))
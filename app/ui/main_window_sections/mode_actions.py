@@ -17,6 +17,11 @@ from app.i18n import tr
 from app.ui.dialogs.build_dialog import BuildDialog
 from app.ui.toast import show_toast
 
+# Average solve time per unit and pass; the run budget is shared unevenly.
+UNIT_SOLVE_TIME_S = 5.0
+# Unit solves stop once their objective has not improved for this long.
+UNIT_PLATEAU_WINDOW_S = 1.0
+
 
 @dataclass
 class TeamSelection:
@@ -24,6 +29,10 @@ class TeamSelection:
     unit_ids: List[int]
 
 
+def _run_time_budget_s(unit_count: int, pass_count: int) -> float:
+    return float(UNIT_SOLVE_TIME_S) * float(max(1, int(unit_count))) * float(max(1, int(pass_count)))
+
+
 def _user_facing_result_message(window, ok: bool, detailed: str) -> str:
     if bool(getattr(window, "_show_extra_info_enabled", lambda: False)()):
         return str(detailed or "")
@@ -316,11 +325,10 @@ def on_optimize_siege(window) -> None:
                     rid = int(rune.rune_id or 0)
                     if rid > 0:
                         excluded_rune_ids.add(rid)
-                for art in window.account.artifacts:
-                    if int(art.occupied_id or 0) == int(uid):
-                        aid = int(art.artifact_id or 0)
-                        if aid > 0:
-                            excluded_artifact_ids.add(aid)
+                for art in window.account.artifacts_equipped_on(uid, "pve"):
+                    aid = int(art.artifact_id or 0)
+                    if aid > 0:
+                        excluded_artifact_ids.add(aid)
 
         res = window._run_with_busy_progress(
             running_text,
@@ -330,12 +338,15 @@ def on_optimize_siege(window) -> None:
                 GreedyRequest(
                     mode="siege",
                     unit_ids_in_order=ordered_unit_ids,
-                    time_limit_per_unit_s=5.0,
+                    time_limit_per_unit_s=UNIT_SOLVE_TIME_S,
+                    time_budget_s=_run_time_budget_s(len(ordered_unit_ids), pass_count),
+                    plateau_window_s=UNIT_PLATEAU_WINDOW_S,
                     workers=workers,
                     multi_pass_enabled=bool(pass_count > 1),
                     multi_pass_count=pass_count,
                     multi_pass_strategy="greedy_refine",
                     quality_profile=quality_profile,
+                    decompose_teams=True,
                     progress_callback=progress_cb,
                     is_cancelled=is_cancelled,
                     register_solver=register_solver,
@@ -549,7 +560,9 @@ def on_optimize_wgb(window) -> None:
             GreedyRequest(
                 mode="wgb",
                 unit_ids_in_order=ordered_unit_ids,
-                time_limit_per_unit_s=5.0,
+                time_limit_per_unit_s=UNIT_SOLVE_TIME_S,
+                time_budget_s=_run_time_budget_s(len(ordered_unit_ids), pass_count),
+                plateau_window_s=UNIT_PLATEAU_WINDOW_S,
                 workers=workers,
                 multi_pass_enabled=bool(pass_count > 1),
                 multi_pass_count=pass_count,
@@ -744,7 +757,9 @@ def on_optimize_rta(window) -> None:
             GreedyRequest(
                 mode="rta",
                 unit_ids_in_order=ids,
-                time_limit_per_unit_s=5.0,
+                time_limit_per_unit_s=UNIT_SOLVE_TIME_S,
+                time_budget_s=_run_time_budget_s(len(ids), pass_count),
+                plateau_window_s=UNIT_PLATEAU_WINDOW_S,
                 workers=workers,
                 multi_pass_enabled=bool(pass_count > 1),
                 multi_pass_count=pass_count,
@@ -27,17 +27,13 @@ def show_optimize_results(
     if not window.account:
         QMessageBox.warning(window, tr("result.title_siege"), tr("dlg.load_import_first"))
         return
-    rune_lookup: Dict[int, Rune] = {r.rune_id: r for r in window.account.runes}
-    artifact_lookup: Dict[int, Artifact] = {int(a.artifact_id): a for a in window.account.artifacts}
+    rune_lookup: Dict[int, Rune] = window.account.runes_by_id()
+    artifact_lookup: Dict[int, Artifact] = window.account.artifacts_by_id()
     mode_rune_owner: Dict[int, int] = {}
     if mode in ("siege", "guild", "wgb", "arena_rush"):
-        for uid, rids in window.account.guild_rune_equip.items():
-            for rid in rids:
-                mode_rune_owner[rid] = uid
+        mode_rune_owner = window.account.rune_owner_by_id("guild")
     elif mode == "rta":
-        for uid, rids in window.account.rta_rune_equip.items():
-            for rid in rids:
-                mode_rune_owner[rid] = uid
+        mode_rune_owner = window.account.rune_owner_by_id("rta")
     prev_result_mode_ctx = getattr(window, "_result_mode_context", "")
     window._result_mode_context = str(mode or "").strip().lower()
     mode_key = str(mode or "").strip().lower()
@@ -4,6 +4,7 @@ from types import SimpleNamespace
 from typing import Dict, List, Tuple
 
 from app.engine.arena_rush_timing import effective_spd_buff_pct_for_unit, spd_buff_increase_pct_for_unit
+from app.engine.unit_stats import compute_units_stats
 
 def unit_base_stats(window, unit_id: int) -> Dict[str, int]:
     if not window.account:
@@ -143,7 +144,7 @@ def _arena_rush_spd_buff_profile_for_unit(
         break
     if not applies:
         return 0, 0.0, 0.0
-    artifact_lookup = {int(a.artifact_id): a for a in (window.account.artifacts or [])}
+    artifact_lookup = window.account.artifacts_by_id()
     selected_artifacts = dict((artifacts_by_unit or {}).get(int(target_uid), {}) or {})
     artifact_ids = [int(aid) for aid in selected_artifacts.values() if int(aid or 0) > 0]
     inc_pct = spd_buff_increase_pct_for_unit(artifact_ids, artifact_lookup)
@@ -240,7 +241,7 @@ def unit_final_spd_value(
     if not u:
         return 0
     base_spd = int(u.base_spd or 0)
-    rune_lookup = {r.rune_id: r for r in window.account.runes}
+    rune_lookup = window.account.runes_by_id()
     rune_ids = list((runes_by_unit.get(unit_id) or {}).values())
 
     rune_spd_flat = 0
@@ -280,117 +281,24 @@ def unit_final_stats_values(
     if not u:
         return {}
 
-    base_hp = int((u.base_con or 0) * 15)
-    base_atk = int(u.base_atk or 0)
-    base_def = int(u.base_def or 0)
-    base_spd = int(u.base_spd or 0)
-    base_cr = int(u.crit_rate or 15)
-    base_cd = int(u.crit_dmg or 50)
-    base_res = int(u.base_res or 15)
-    base_acc = int(u.base_acc or 0)
-
-    flat_hp = flat_atk = flat_def = 0
-    pct_hp = pct_atk = pct_def = 0
-    add_spd = add_cr = add_cd = add_res = add_acc = 0
-
-    rune_lookup = {r.rune_id: r for r in window.account.runes}
-    rune_ids = list((runes_by_unit.get(unit_id) or {}).values())
-    rune_set_ids: List[int] = []
-
-    def _acc_stat(eff_id: int, value: int) -> None:
-        nonlocal flat_hp, flat_atk, flat_def, pct_hp, pct_atk, pct_def
-        nonlocal add_spd, add_cr, add_cd, add_res, add_acc
-        if eff_id == 1:
-            flat_hp += int(value or 0)
-        elif eff_id == 2:
-            pct_hp += int(value or 0)
-        elif eff_id == 3:
-            flat_atk += int(value or 0)
-        elif eff_id == 4:
-            pct_atk += int(value or 0)
-        elif eff_id == 5:
-            flat_def += int(value or 0)
-        elif eff_id == 6:
-            pct_def += int(value or 0)
-        elif eff_id == 8:
-            add_spd += int(value or 0)
-        elif eff_id == 9:
-            add_cr += int(value or 0)
-        elif eff_id == 10:
-            add_cd += int(value or 0)
-        elif eff_id == 11:
-            add_res += int(value or 0)
-        elif eff_id == 12:
-            add_acc += int(value or 0)
-
-    for rid in rune_ids:
-        rune = rune_lookup.get(int(rid))
-        if not rune:
-            continue
-        rune_set_ids.append(int(rune.set_id or 0))
-        try:
-            _acc_stat(int(rune.pri_eff[0] or 0), int(rune.pri_eff[1] or 0))
-        except Exception:
-            pass
-        try:
-            _acc_stat(int(rune.prefix_eff[0] or 0), int(rune.prefix_eff[1] or 0))
-        except Exception:
-            pass
-        for sec in (rune.sec_eff or []):
-            if not sec:
-                continue
-            try:
-                eff = int(sec[0] or 0)
-                val = int(sec[1] or 0)
-                grind = int(sec[3] or 0) if len(sec) >= 4 else 0
-                _acc_stat(eff, val + grind)
-            except Exception:
-                continue
-
-    swift_sets = rune_set_ids.count(3) // 4
-    spd_from_swift = int(base_spd * (25 * swift_sets) / 100)
-    spd_from_totem = int(base_spd * int(window.account.sky_tribe_totem_spd_pct or 0) / 100)
-
+    rune_lookup = window.account.runes_by_id()
+    runes = [
+        rune
+        for rid in (runes_by_unit.get(unit_id) or {}).values()
+        if (rune := rune_lookup.get(int(rid))) is not None
+    ]
     ls = window._team_leader_skill(team_unit_ids)
-    lead_hp = lead_atk = lead_def = lead_spd = 0
-    lead_cr = lead_cd = lead_res = lead_acc = 0
-    if ls:
-        s, a = ls.stat, ls.amount
-        if s == "HP%":
-            lead_hp = int(base_hp * a / 100)
-        elif s == "ATK%":
-            lead_atk = int(base_atk * a / 100)
-        elif s == "DEF%":
-            lead_def = int(base_def * a / 100)
-        elif s == "SPD%":
-            lead_spd = int(base_spd * a / 100)
-        elif s == "CR%":
-            lead_cr = a
-        elif s == "CD%":
-            lead_cd = a
-        elif s == "RES%":
-            lead_res = a
-        elif s == "ACC%":
-            lead_acc = a
-
-    hp = base_hp + flat_hp + int(base_hp * pct_hp / 100) + lead_hp
-    atk = base_atk + flat_atk + int(base_atk * pct_atk / 100) + lead_atk
-    deff = base_def + flat_def + int(base_def * pct_def / 100) + lead_def
     spd_buff_bonus = _arena_rush_spd_buff_bonus_for_unit(
-        window, unit_id, team_unit_ids, base_spd, artifacts_by_unit=artifacts_by_unit
+        window, unit_id, team_unit_ids, int(u.base_spd or 0), artifacts_by_unit=artifacts_by_unit
     )
-    spd = base_spd + add_spd + spd_from_swift + spd_from_totem + lead_spd + spd_buff_bonus
-
-    return {
-        "HP": int(hp),
-        "ATK": int(atk),
-        "DEF": int(deff),
-        "SPD": int(spd),
-        "CR": int(base_cr + add_cr + lead_cr),
-        "CD": int(base_cd + add_cd + lead_cd),
-        "RES": int(base_res + add_res + lead_res),
-        "ACC": int(base_acc + add_acc + lead_acc),
-    }
+    stats = compute_units_stats(
+        [u],
+        [runes],
+        leaders=[(ls.stat, ls.amount) if ls else None],
+        sky_tribe_totem_spd_pct=int(window.account.sky_tribe_totem_spd_pct or 0),
+        extra_spd=[spd_buff_bonus],
+    )
+    return stats.as_dict(0)
 
 
 def team_leader_skill(window, team_unit_ids: List[int]):
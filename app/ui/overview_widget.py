@@ -5,6 +5,7 @@ import time
 from collections import Counter
 from typing import Callable, List, Optional, Tuple, Any
 
+import numpy as np
 from PySide6.QtCore import Qt, QMargins, QPointF, QPropertyAnimation, QEasingCurve, QVariantAnimation, QEvent, QRectF
 from PySide6.QtGui import QColor, QFont, QPainter, QFontMetrics, QCursor, QPen
 from PySide6.QtWidgets import (
@@ -23,12 +24,8 @@ from app.domain.artifact_effects import (
     artifact_effect_text,
     ARTIFACT_MAIN_FOCUS_BY_EFFECT_ID,
 )
-from app.engine.efficiency import (
-    rune_efficiencies,
-    rune_efficiency,
-    artifact_efficiency,
-    rune_efficiency_max,
-)
+from app.engine.efficiency import rune_efficiency_arrays
+from app.engine.rune_table import account_artifact_table, account_rune_table
 from app.i18n import tr
 from app.ui.dpi import dp
 
@@ -1277,8 +1274,9 @@ class OverviewWidget(QWidget):
     # -- cards -----------------------------------------
     def _update_cards(self, acc: AccountData) -> None:
         n_units = len(acc.units_by_id)
-        filtered_runes = [r for r in acc.runes if int(r.upgrade_curr or 0) >= 12]
-        n_runes = len(filtered_runes)
+        rune_table = account_rune_table(acc)
+        upgraded = rune_table.upgrade >= 12
+        n_runes = int(upgraded.sum())
         n_arts = len(acc.artifacts)
 
         self._card_units.update_value(str(n_units))
@@ -1288,11 +1286,13 @@ class OverviewWidget(QWidget):
         self._card_artifacts.update_value(f"{n_arts:,}".replace(",", "."))
         self._card_artifacts.set_subtitle("")
 
-        r_effs = rune_efficiencies(filtered_runes) if filtered_runes else []
-        artifacts_t1 = [a for a in acc.artifacts if int(a.type_ or 0) == 1 and a.sec_effects]
-        artifacts_t2 = [a for a in acc.artifacts if int(a.type_ or 0) == 2 and a.sec_effects]
-        a_effs_t1 = [artifact_efficiency(a) for a in artifacts_t1]
-        a_effs_t2 = [artifact_efficiency(a) for a in artifacts_t2]
+        # Efficiencies come from the account tables, which are only recomputed
+        # for runes/artifacts that changed since the last import.
+        r_effs = rune_table.efficiency[upgraded].tolist()
+        art_table = account_artifact_table(acc)
+        has_secs = np.fromiter((bool(a.sec_effects) for a in acc.artifacts), dtype=bool, count=len(acc.artifacts))
+        a_effs_t1 = art_table.efficiency[(art_table.type_ == 1) & has_secs].tolist()
+        a_effs_t2 = art_table.efficiency[(art_table.type_ == 2) & has_secs].tolist()
 
         if r_effs:
             avg = sum(r_effs) / len(r_effs)
@@ -1321,7 +1321,7 @@ class OverviewWidget(QWidget):
             self._card_art_avg_t2.set_subtitle("")
 
         for sid, card in self._set_eff_cards.items():
-            vals = [rune_efficiency(r) for r in filtered_runes if int(r.set_id or 0) == sid]
+            vals = rune_table.efficiency[upgraded & (rune_table.set_id == sid)].tolist()
             if vals:
                 avg_v = sum(vals) / len(vals)
                 card.update_value(f"{avg_v:.1f}%")
@@ -1346,15 +1346,19 @@ class OverviewWidget(QWidget):
     def _build_charts(self, acc: AccountData) -> None:
         self._clear_grid()
 
-        filtered_runes = [r for r in acc.runes if int(r.upgrade_curr or 0) >= 12]
-        rune_items = (
-            [(rune_efficiency(r), r) for r in filtered_runes]
-            if filtered_runes else []
-        )
-        art_items = (
-            [(artifact_efficiency(a), a) for a in acc.artifacts if a.sec_effects]
-            if acc.artifacts else []
-        )
+        rune_table = account_rune_table(acc)
+        art_table = account_artifact_table(acc)
+        rune_items = [
+            (eff, r)
+            for r, eff, upgraded in zip(acc.runes, rune_table.efficiency.tolist(), (rune_table.upgrade >= 12).tolist())
+            if upgraded
+        ]
+        filtered_runes = [r for _, r in rune_items]
+        art_items = [
+            (eff, a)
+            for a, eff in zip(acc.artifacts, art_table.efficiency.tolist())
+            if a.sec_effects
+        ]
 
         self._rune_eff_view = self._build_rune_eff_chart(rune_items)
         self._rune_set_view = self._build_rune_set_chart(filtered_runes)
@@ -1415,11 +1419,13 @@ class OverviewWidget(QWidget):
 
         top_n = int(self._top_n_combo.currentData() or 400)
         ranked_base = sorted(items, key=lambda x: x[0], reverse=True)[:top_n]
-        ranked_payload: List[Tuple[Rune, float, float, float]] = []
-        for curr_eff, rune in ranked_base:
-            hero_eff = rune_efficiency_max(rune, "hero")
-            legend_eff = rune_efficiency_max(rune, "legend")
-            ranked_payload.append((rune, curr_eff, hero_eff, legend_eff))
+        max_effs = rune_efficiency_arrays([rune for _, rune in ranked_base], ("hero", "legend"))
+        ranked_payload: List[Tuple[Rune, float, float, float]] = [
+            (rune, curr_eff, hero_eff, legend_eff)
+            for (curr_eff, rune), hero_eff, legend_eff in zip(
+                ranked_base, max_effs["hero"].tolist(), max_effs["legend"].tolist()
+            )
+        ]
         n = len(ranked_payload)
 
         current_items: List[Tuple[float, Any]] = []
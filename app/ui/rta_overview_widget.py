@@ -10,8 +10,9 @@ from PySide6.QtWidgets import (
     QScrollArea, QGridLayout, QPushButton,
 )
 
-from app.domain.models import AccountData, Unit, Rune, Artifact, compute_unit_stats
+from app.domain.models import AccountData, Unit, Rune, Artifact
 from app.domain.monster_db import MonsterDB
+from app.engine.unit_stats import STAT_KEYS, compute_units_stats
 from app.ui.siege_cards_widget import MonsterCard, _icon_for, _build_stat_breakdown
 from app.i18n import tr
 from app.ui.dpi import dp
@@ -172,34 +173,28 @@ class RtaOverviewWidget(QWidget):
 
         active_uids = self._account.rta_active_unit_ids()
 
+        units = [u for uid in active_uids if (u := self._account.units_by_id.get(uid)) is not None]
+        unit_runes = [self._account.equipped_runes_for(int(u.unit_id), mode="rta") for u in units]
+        unit_artifacts = [self._equipped_artifacts_for(int(u.unit_id)) for u in units]
+        stats = compute_units_stats(
+            units,
+            unit_runes,
+            artifacts_per_unit=unit_artifacts,
+            leaders=[("SPD%", int(self._current_speed_lead_pct or 0))] * len(units),
+            sky_tribe_totem_spd_pct=int(self._account.sky_tribe_totem_spd_pct or 0),
+        )
+        spd_col = stats.total[:, STAT_KEYS.index("SPD")].tolist()
+
         # Build (unit, name, element, icon, runes, artifacts, stats) tuples
         entries: List[Tuple[Unit, str, str, QIcon, List[Rune], List[Artifact], Dict[str, Dict[str, int]], int]] = []
-        for uid in active_uids:
-            unit = self._account.units_by_id.get(uid)
-            if not unit:
-                continue
+        for row, unit in enumerate(units):
             name = self._monster_db.name_for(unit.unit_master_id)
             element = self._monster_db.element_for(unit.unit_master_id)
             icon = _icon_for(self._monster_db, unit.unit_master_id, self._assets_dir)
-            runes = self._account.equipped_runes_for(uid, mode="rta")
-            artifacts = self._equipped_artifacts_for(uid)
-            stats = compute_unit_stats(
-                unit,
-                runes,
-                self._current_speed_lead_pct,
-                int(self._account.sky_tribe_totem_spd_pct or 0),
+            breakdown = _build_stat_breakdown(stats, row)
+            entries.append(
+                (unit, name, element, icon, unit_runes[row], unit_artifacts[row], breakdown, int(spd_col[row]))
             )
-            leader_bonus: Dict[str, int] = {}
-            if int(self._current_speed_lead_pct or 0) > 0:
-                leader_bonus["SPD"] = int(int(unit.base_spd or 0) * int(self._current_speed_lead_pct) / 100)
-            breakdown = _build_stat_breakdown(
-                unit=unit,
-                artifacts=artifacts,
-                total_with_tower_and_leader=stats,
-                leader_bonus=leader_bonus,
-                sky_tribe_totem_spd_pct=int(self._account.sky_tribe_totem_spd_pct or 0),
-            )
-            entries.append((unit, name, element, icon, runes, artifacts, breakdown, int(stats.get("SPD", 0))))
 
         # Sort by SPD descending (turn order: fastest first)
         entries.sort(key=lambda e: int(e[7]), reverse=True)
@@ -229,19 +224,13 @@ class RtaOverviewWidget(QWidget):
     def _equipped_artifacts_for(self, unit_id: int) -> List[Artifact]:
         if not self._account:
             return []
-        by_id: Dict[int, Artifact] = {int(a.artifact_id): a for a in (self._account.artifacts or [])}
         result: Dict[int, Artifact] = {}
-        for aid in (self._account.rta_artifact_equip.get(int(unit_id), []) or []):
-            art = by_id.get(int(aid))
-            if not art:
-                continue
+        for art in self._account.artifacts_equipped_on(int(unit_id), "rta"):
             art_type = int(art.type_ or 0)
             if art_type in (1, 2) and art_type not in result:
                 result[art_type] = art
         if not result:
-            for art in (self._account.artifacts or []):
-                if int(art.occupied_id or 0) != int(unit_id):
-                    continue
+            for art in self._account.artifacts_equipped_on(int(unit_id), "pve"):
                 art_type = int(art.type_ or 0)
                 if art_type in (1, 2) and art_type not in result:
                     result[art_type] = art
@@ -2,6 +2,8 @@ from __future__ import annotations
 
 from typing import Callable, Optional
 
+import numpy as np
+
 from PySide6.QtCore import Qt
 from PySide6.QtGui import QIcon, QPalette
 from PySide6.QtWidgets import (
@@ -24,7 +26,7 @@ from PySide6.QtGui import QTextDocument, QAbstractTextDocumentLayout, QPainter,
 
 from app.domain.models import AccountData, Rune
 from app.domain.presets import SET_NAMES, EFFECT_ID_TO_MAINSTAT_KEY
-from app.engine.efficiency import rune_efficiency, rune_efficiency_max
+from app.engine.rune_table import account_rune_table
 from app.i18n import tr
 from app.ui.dpi import dp
 from app.ui.widgets.selection_combos import _UnitSearchComboBox
@@ -379,8 +381,11 @@ class RuneOptimizationWidget(QWidget):
             self.table.setSortingEnabled(True)
             return
 
-        all_runes = [r for r in self._account.runes if int(r.upgrade_curr or 0) >= 12]
-        all_runes.sort(key=lambda r: (rune_efficiency(r), int(r.rune_id or 0)), reverse=True)
+        table = account_rune_table(self._account)
+        rows = np.flatnonzero(table.upgrade >= 12)
+        rows = rows[np.lexsort((table.rune_id[rows], table.efficiency[rows]))[::-1]].tolist()
+        all_runes = [table.runes[i] for i in rows]
+        row_by_rid = {int(table.rune_id[i]): i for i in rows}
         self._populate_filters(all_runes)
 
         if not all_runes:
@@ -406,10 +411,13 @@ class RuneOptimizationWidget(QWidget):
         self.lbl_info.setText(tr("rune_opt.count_filtered", shown=len(runes), total=len(all_runes)))
         self.table.setRowCount(len(runes))
 
+        hero_max_col = table.efficiency_max("hero")
+        legend_max_col = table.efficiency_max("legend")
         for row, rune in enumerate(runes):
-            current = float(rune_efficiency(rune))
-            hero_max = float(rune_efficiency_max(rune, "hero"))
-            legend_max = float(rune_efficiency_max(rune, "legend"))
+            table_row = row_by_rid[int(rune.rune_id or 0)]
+            current = float(table.efficiency[table_row])
+            hero_max = float(hero_max_col[table_row])
+            legend_max = float(legend_max_col[table_row])
             hero_potential = max(0.0, hero_max - current)
             legend_potential = max(0.0, legend_max - current)
             set_id = int(rune.set_id or 0)
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import weakref
 from pathlib import Path
-from typing import ClassVar, List, Dict, Optional, Tuple, Any
+from typing import ClassVar, List, Dict, Optional, Tuple
 
 from PySide6.QtCore import Qt, QSize, QRectF, QEvent, QPropertyAnimation, QEasingCurve
 from PySide6.QtGui import QIcon, QPainter, QColor, QFont, QBrush, QPixmap
@@ -12,7 +12,7 @@ from PySide6.QtWidgets import (
     QSizePolicy, QGraphicsDropShadowEffect,
 )
 
-from app.domain.models import AccountData, Rune, Unit, Artifact, compute_unit_stats
+from app.domain.models import AccountData, Rune, Unit, Artifact
 from app.domain.monster_db import MonsterDB
 from app.domain.optimization_store import SavedOptimization
 from app.domain.presets import EFFECT_ID_TO_MAINSTAT_KEY, SET_NAMES
@@ -22,6 +22,7 @@ from app.domain.artifact_effects import (
     artifact_rank_label,
 )
 from app.engine.efficiency import rune_efficiency
+from app.engine.unit_stats import STAT_KEYS, UnitStats, compute_units_stats
 from app.i18n import tr
 from app.ui.dpi import dp
 
@@ -271,96 +272,20 @@ def _artifact_rich_tooltip(art: Artifact) -> str:
     return "<br>".join(lines)
 
 
-def _unit_base_stats(unit: Unit) -> Dict[str, int]:
+def _build_stat_breakdown(stats: UnitStats, row: int) -> Dict[str, Dict[str, int]]:
+    """Card stat lines of unit *row*: base, rune+artifact bonus, total (without
+    the totem) and total with the leader skill."""
+    base = stats.base[row].tolist()
+    rune_art = (stats.runes[row] + stats.artifacts[row]).tolist()
+    leader = stats.leader[row].tolist()
     return {
-        "HP": int((unit.base_con or 0) * 15),
-        "ATK": int(unit.base_atk or 0),
-        "DEF": int(unit.base_def or 0),
-        "SPD": int(unit.base_spd or 0),
-        "CR": int(unit.crit_rate or 15),
-        "CD": int(unit.crit_dmg or 50),
-        "RES": int(unit.base_res or 15),
-        "ACC": int(unit.base_acc or 0),
-    }
-
-
-def _leader_bonus_for_unit(unit: Unit, leader_skill: Any) -> Dict[str, int]:
-    out: Dict[str, int] = {}
-    if leader_skill is None:
-        return out
-    stat = str(getattr(leader_skill, "stat", "") or "").upper()
-    amount = int(getattr(leader_skill, "amount", 0) or 0)
-    if amount <= 0:
-        return out
-    base = _unit_base_stats(unit)
-    if stat == "HP%":
-        out["HP"] = int(base["HP"] * amount / 100)
-    elif stat == "ATK%":
-        out["ATK"] = int(base["ATK"] * amount / 100)
-    elif stat == "DEF%":
-        out["DEF"] = int(base["DEF"] * amount / 100)
-    elif stat == "SPD%":
-        out["SPD"] = int(base["SPD"] * amount / 100)
-    elif stat == "CR%":
-        out["CR"] = int(amount)
-    elif stat == "CD%":
-        out["CD"] = int(amount)
-    elif stat == "RES%":
-        out["RES"] = int(amount)
-    elif stat == "ACC%":
-        out["ACC"] = int(amount)
-    return out
-
-
-def _artifact_stat_bonus(artifacts: List[Artifact]) -> Dict[str, int]:
-    out: Dict[str, int] = {k: 0 for k in ("HP", "ATK", "DEF", "SPD", "CR", "CD", "RES", "ACC")}
-
-    def _acc(eff_id: int, value: int) -> None:
-        # Keep only direct primary-stat effects; artifact combat effects are not base stat lines.
-        if eff_id in (1, 100):
-            out["HP"] += int(value)
-        elif eff_id in (3, 101):
-            out["ATK"] += int(value)
-        elif eff_id in (5, 102):
-            out["DEF"] += int(value)
-
-    for art in artifacts or []:
-        try:
-            if art.pri_effect and len(art.pri_effect) >= 2:
-                _acc(int(art.pri_effect[0] or 0), int(art.pri_effect[1] or 0))
-        except Exception:
-            pass
-    return out
-
-
-def _build_stat_breakdown(
-    unit: Unit,
-    artifacts: List[Artifact],
-    total_with_tower_and_leader: Dict[str, int],
-    leader_bonus: Dict[str, int],
-    sky_tribe_totem_spd_pct: int = 0,
-) -> Dict[str, Dict[str, int]]:
-    base = _unit_base_stats(unit)
-    totem_spd = int(base["SPD"] * int(sky_tribe_totem_spd_pct or 0) / 100)
-    total = {k: int(total_with_tower_and_leader.get(k, 0)) for k in base.keys()}
-    # subtract totem bonus from SPD so card shows only rune values
-    total["SPD"] -= totem_spd
-    leader = {k: int(leader_bonus.get(k, 0)) for k in base.keys()}
-    total_no_leader = {k: int(total[k] - leader[k]) for k in base.keys()}
-    art = _artifact_stat_bonus(artifacts)
-    total_no_leader = {k: int(total_no_leader[k] + art.get(k, 0)) for k in base.keys()}
-    total_with_leader = {k: int(total_no_leader[k] + leader[k]) for k in base.keys()}
-    rune_art: Dict[str, int] = {}
-    for k in base.keys():
-        rune_art[k] = int(total_no_leader[k] - base[k])
-    return {
-        k: {
-            "base": int(base[k]),
-            "rune_art": int(rune_art[k]),
-            "total": int(total_no_leader[k]),
-            "total_leader": int(total_with_leader[k]),
+        key: {
+            "base": int(base[i]),
+            "rune_art": int(rune_art[i]),
+            "total": int(base[i] + rune_art[i]),
+            "total_leader": int(base[i] + rune_art[i] + leader[i]),
         }
-        for k in base.keys()
+        for i, key in enumerate(STAT_KEYS)
     }
 
 
@@ -909,7 +834,7 @@ class SiegeDefCardsWidget(QWidget):
         """Render a saved optimization using its stored rune assignments."""
         self._clear()
         runes_by_id = account.runes_by_id()
-        artifacts_by_id = {int(a.artifact_id): a for a in account.artifacts}
+        artifacts_by_id = account.artifacts_by_id()
         rune_overrides: Dict[int, List[Rune]] = {}
         artifact_overrides: Dict[int, List[Artifact]] = {}
         for res in opt.results:
@@ -956,7 +881,9 @@ class SiegeDefCardsWidget(QWidget):
                       team_label_prefix: str = "",
                       team_titles: Optional[List[str]] = None):
         self._rta_flat_grid_active = False
-        for ti, team in enumerate(teams, start=1):
+        team_entries: List[List[Tuple[Unit, List[Rune], List[Artifact]]]] = []
+        leaders: List[Optional[Tuple[str, int]]] = []
+        for team in teams:
             team_leader = None
             if team:
                 lead_unit = account.units_by_id.get(int(team[0]))
@@ -970,41 +897,31 @@ class SiegeDefCardsWidget(QWidget):
                         else:
                             if area in ("General", "Guild"):
                                 team_leader = ls
-
-            speed_lead_pct = 0
-            if team_leader and str(getattr(team_leader, "stat", "") or "").upper() == "SPD%":
-                speed_lead_pct = int(getattr(team_leader, "amount", 0) or 0)
-
+            lead = None
+            if team_leader is not None:
+                lead = (str(getattr(team_leader, "stat", "") or ""), int(getattr(team_leader, "amount", 0) or 0))
+            entries = self._team_equipment(team, account, rune_mode, rune_overrides, artifact_overrides)
+            team_entries.append(entries)
+            leaders.extend([lead] * len(entries))
+
+        # One stat pass over every unit of every team.
+        flat = [entry for entries in team_entries for entry in entries]
+        stats = compute_units_stats(
+            [u for u, _, _ in flat],
+            [equipped for _, equipped, _ in flat],
+            artifacts_per_unit=[arts for _, _, arts in flat],
+            leaders=leaders,
+            sky_tribe_totem_spd_pct=int(account.sky_tribe_totem_spd_pct or 0),
+        )
+        row = 0
+        for ti, entries in enumerate(team_entries, start=1):
             unit_data: List[Tuple[Unit, str, str, QIcon, List[Rune], List[Artifact], Dict[str, Dict[str, int]]]] = []
-            for uid in team:
-                u = account.units_by_id.get(uid)
-                if not u:
-                    continue
+            for u, equipped, equipped_artifacts in entries:
                 name = monster_db.name_for(u.unit_master_id)
                 element = monster_db.element_for(u.unit_master_id)
                 icon = _icon_for(monster_db, u.unit_master_id, assets_dir)
-                if rune_overrides and uid in rune_overrides:
-                    equipped = rune_overrides[uid]
-                else:
-                    equipped = account.equipped_runes_for(uid, rune_mode)
-                if artifact_overrides and uid in artifact_overrides:
-                    equipped_artifacts = artifact_overrides[uid]
-                else:
-                    equipped_artifacts = self._equipped_artifacts_for(account, uid, rune_mode)
-                stats = compute_unit_stats(
-                    u,
-                    equipped,
-                    speed_lead_pct,
-                    int(account.sky_tribe_totem_spd_pct or 0),
-                )
-                leader_bonus = _leader_bonus_for_unit(u, team_leader)
-                stat_breakdown = _build_stat_breakdown(
-                    unit=u,
-                    artifacts=equipped_artifacts,
-                    total_with_tower_and_leader=stats,
-                    leader_bonus=leader_bonus,
-                    sky_tribe_totem_spd_pct=int(account.sky_tribe_totem_spd_pct or 0),
-                )
+                stat_breakdown = _build_stat_breakdown(stats, row)
+                row += 1
                 unit_data.append((u, name, element, icon, equipped, equipped_artifacts, stat_breakdown))
             if unit_data:
                 if team_titles and (ti - 1) < len(team_titles):
@@ -1053,40 +970,26 @@ class SiegeDefCardsWidget(QWidget):
         artifact_overrides = p["artifact_overrides"]
         speed_lead_pct = self._current_speed_lead_pct
 
+        grid_units = [
+            entry
+            for team in teams
+            for entry in self._team_equipment(team, account, rune_mode, rune_overrides, artifact_overrides)
+        ]
+        stats = compute_units_stats(
+            [u for u, _, _ in grid_units],
+            [equipped for _, equipped, _ in grid_units],
+            artifacts_per_unit=[arts for _, _, arts in grid_units],
+            leaders=[("SPD%", speed_lead_pct)] * len(grid_units),
+            sky_tribe_totem_spd_pct=int(account.sky_tribe_totem_spd_pct or 0),
+        )
+        sort_spd = stats.total[:, STAT_KEYS.index("SPD")].tolist()
         all_units: List[Tuple[Unit, str, str, QIcon, List[Rune], List[Artifact], Dict[str, Dict[str, int]], int]] = []
-        for team in teams:
-            for uid in team:
-                u = account.units_by_id.get(uid)
-                if not u:
-                    continue
-                name = monster_db.name_for(u.unit_master_id)
-                element = monster_db.element_for(u.unit_master_id)
-                icon = _icon_for(monster_db, u.unit_master_id, assets_dir)
-                if rune_overrides and uid in rune_overrides:
-                    equipped = rune_overrides[uid]
-                else:
-                    equipped = account.equipped_runes_for(uid, rune_mode)
-                if artifact_overrides and uid in artifact_overrides:
-                    equipped_artifacts = artifact_overrides[uid]
-                else:
-                    equipped_artifacts = self._equipped_artifacts_for(account, uid, rune_mode)
-                stats = compute_unit_stats(
-                    u,
-                    equipped,
-                    speed_lead_pct,
-                    int(account.sky_tribe_totem_spd_pct or 0),
-                )
-                leader_bonus: Dict[str, int] = {}
-                if speed_lead_pct > 0:
-                    leader_bonus["SPD"] = int(int(u.base_spd or 0) * speed_lead_pct / 100)
-                stat_breakdown = _build_stat_breakdown(
-                    unit=u,
-                    artifacts=equipped_artifacts,
-                    total_with_tower_and_leader=stats,
-                    leader_bonus=leader_bonus,
-                    sky_tribe_totem_spd_pct=int(account.sky_tribe_totem_spd_pct or 0),
-                )
-                all_units.append((u, name, element, icon, equipped, equipped_artifacts, stat_breakdown, int(stats.get("SPD", 0))))
+        for row, (u, equipped, equipped_artifacts) in enumerate(grid_units):
+            name = monster_db.name_for(u.unit_master_id)
+            element = monster_db.element_for(u.unit_master_id)
+            icon = _icon_for(monster_db, u.unit_master_id, assets_dir)
+            stat_breakdown = _build_stat_breakdown(stats, row)
+            all_units.append((u, name, element, icon, equipped, equipped_artifacts, stat_breakdown, int(sort_spd[row])))
 
         all_units.sort(key=lambda e: e[7], reverse=True)
 
@@ -1174,21 +1077,40 @@ class SiegeDefCardsWidget(QWidget):
             " QPushButton:hover { background: #505050; border-color: #888; }"
         )
 
+    def _team_equipment(
+        self,
+        team: List[int],
+        account: AccountData,
+        rune_mode: str,
+        rune_overrides: Optional[Dict[int, List[Rune]]] = None,
+        artifact_overrides: Optional[Dict[int, List[Artifact]]] = None,
+    ) -> List[Tuple[Unit, List[Rune], List[Artifact]]]:
+        """(unit, runes, artifacts) of every known unit in *team*, overrides first."""
+        out: List[Tuple[Unit, List[Rune], List[Artifact]]] = []
+        for uid in team:
+            u = account.units_by_id.get(uid)
+            if not u:
+                continue
+            if rune_overrides and uid in rune_overrides:
+                equipped = rune_overrides[uid]
+            else:
+                equipped = account.equipped_runes_for(uid, rune_mode)
+            if artifact_overrides and uid in artifact_overrides:
+                equipped_artifacts = artifact_overrides[uid]
+            else:
+                equipped_artifacts = self._equipped_artifacts_for(account, uid, rune_mode)
+            out.append((u, equipped, equipped_artifacts))
+        return out
+
     def _equipped_artifacts_for(self, account: AccountData, unit_id: int, rune_mode: str) -> List[Artifact]:
-        by_id: Dict[int, Artifact] = {int(a.artifact_id): a for a in (account.artifacts or [])}
         result: Dict[int, Artifact] = {}
         if rune_mode == "rta":
-            for aid in (account.rta_artifact_equip.get(int(unit_id), []) or []):
-                art = by_id.get(int(aid))
-                if not art:
-                    continue
+            for art in account.artifacts_equipped_on(int(unit_id), "rta"):
                 art_type = int(art.type_ or 0)
                 if art_type in (1, 2) and art_type not in result:
                     result[art_type] = art
         if not result:
-            for art in (account.artifacts or []):
-                if int(art.occupied_id or 0) != int(unit_id):
-                    continue
+            for art in account.artifacts_equipped_on(int(unit_id), "pve"):
                 art_type = int(art.type_ or 0)
                 if art_type in (1, 2) and art_type not in result:
                     result[art_type] = art
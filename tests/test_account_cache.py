@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import numpy as np
+
+import app.importer.account_cache as account_cache
+from app.engine.rune_table import RuneTable, account_rune_table
+from app.importer.sw_json_importer import load_account_from_data
+
+
+def _snapshot(tmp_path: Path) -> Path:
+    rune = {
+        "rune_id": 1, "slot_no": 2, "set_id": 3, "rank": 5, "class": 6, "upgrade_curr": 15,
+        "pri_eff": [8, 42], "prefix_eff": [0, 0], "sec_eff": [[9, 6, 0, 0], [10, 7, 1, 0]],
+        "occupied_type": 1, "occupied_id": 7,
+    }
+    data = {
+        "unit_list": [{
+            "unit_id": 7, "unit_master_id": 10101, "con": 800, "atk": 700, "def": 600, "spd": 100,
+            "runes": [rune],
+            "artifacts": [{"rid": 11, "occupied_id": 7, "slot": 1, "type": 1, "rank": 5, "level": 15,
+                           "pri_effect": [100, 1500], "sec_effects": [[204, 5.5, 2], [218, 3, 0]]}],
+        }],
+        "runes": [dict(rune, rune_id=2, occupied_type=2, occupied_id=0)],
+        "craft_stuff": [{"id": 20, "quantity": 3}],
+        "equip_info_list": [{"rune_equip_list": [{"rune_id": 2, "occupied_id": 7}]}],
+    }
+    path = tmp_path / "account_snapshot.json"
+    path.write_text(json.dumps(data), encoding="utf-8")
+    return path
+
+
+def test_cache_round_trips_account_and_tables(tmp_path: Path) -> None:
+    path = _snapshot(tmp_path)
+    account = load_account_from_data(json.loads(path.read_text(encoding="utf-8")))
+
+    assert account_cache.load_account_cache(path) is None
+    assert account_cache.save_account_cache(account, path)
+    cached = account_cache.load_account_cache(path)
+
+    assert cached == account
+    assert cached.craft_stuff == {20: 3} and cached.guild_rune_equip == {7: [2]}
+    assert isinstance(cached.artifacts[0].sec_effects[1][1], int)
+    table = account_rune_table(cached)
+    assert np.array_equal(table.quality, RuneTable.build(cached.runes).quality)
+
+
+def test_cache_is_ignored_when_snapshot_or_version_changes(tmp_path: Path, monkeypatch) -> None:
+    path = _snapshot(tmp_path)
+    account = load_account_from_data(json.loads(path.read_text(encoding="utf-8")))
+    assert account_cache.save_account_cache(account, path)
+
+    monkeypatch.setattr(account_cache, "CACHE_VERSION", account_cache.CACHE_VERSION + 1)
+    assert account_cache.load_account_cache(path) is None
+    monkeypatch.undo()
+
+    path.write_text(path.read_text(encoding="utf-8") + " ", encoding="utf-8")
+    assert account_cache.load_account_cache(path) is None
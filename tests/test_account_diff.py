@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import dataclasses
+
+import numpy as np
+
+from app.domain.models import AccountData, Artifact, Rune, Unit
+from app.engine.rune_table import ArtifactTable, RuneTable, account_artifact_table, account_rune_table
+from app.importer.account_diff import reconcile_accounts
+
+
+def _rune(rid: int, upgrade: int = 12, occupied_id: int = 0) -> Rune:
+    return Rune(rid, rid % 6 + 1, 3, 5, 6, upgrade, (8, 42), (0, 0), ((9, 6, 0, 0), (10, 7, 0, 0)),
+                1 if occupied_id else 2, occupied_id)
+
+
+def _account(runes, artifacts) -> AccountData:
+    return AccountData(
+        units_by_id={7: Unit(7, 10101, 1, 40, 6, 800, 700, 600, 100, 15, 0, 15, 50)},
+        runes=list(runes),
+        artifacts=list(artifacts),
+    )
+
+
+def test_reconcile_reports_changes_and_reuses_unchanged_items() -> None:
+    art = Artifact(11, 7, 1, 1, 2, 5, 15, 5, (100, 1500), ((204, 5.5, 2),))
+    old = _account([_rune(1), _rune(2), _rune(3, occupied_id=7), _rune(4)], [art])
+    account_rune_table(old).efficiency_max("legend")
+    account_artifact_table(old)
+
+    new = _account(
+        [_rune(1), _rune(2, upgrade=15), _rune(3, occupied_id=0), _rune(5)],
+        [dataclasses.replace(art, occupied_id=0)],
+    )
+    merged, changes = reconcile_accounts(old, new)
+
+    assert changes.added_runes == (5,)
+    assert changes.removed_runes == (4,)
+    assert changes.upgraded_runes == (2,)
+    assert changes.reequipped_runes == (3,)
+    assert changes.reequipped_artifacts == (11,) and changes.upgraded_artifacts == ()
+    assert changes.rune_count() == 4 and not changes.is_empty()
+    assert merged.runes[0] is old.runes[0]
+    assert merged.units_by_id[7] is old.units_by_id[7]
+
+    table = account_rune_table(merged)
+    fresh = RuneTable.build(merged.runes)
+    for name in ("stats", "efficiency", "quality", "rune_id", "occupied_type", "upgrade"):
+        assert np.array_equal(getattr(table, name), getattr(fresh, name)), name
+    assert np.array_equal(table._eff_max["legend"], fresh.efficiency_max("legend"))
+    art_table = account_artifact_table(merged)
+    assert np.array_equal(art_table.occupied_id, ArtifactTable.build(merged.artifacts).occupied_id)
+
+
+def test_reconcile_of_identical_import_is_empty() -> None:
+    old = _account([_rune(1), _rune(2)], [])
+    new = _account([_rune(1), _rune(2)], [])
+
+    merged, changes = reconcile_accounts(old, new)
+
+    assert changes.is_empty()
+    assert all(a is b for a, b in zip(merged.runes, old.runes))
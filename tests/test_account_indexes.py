@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from app.domain.models import AccountData, Artifact, Rune
+
+
+def _rune(rid: int, slot: int, set_id: int, main: int, occupied_id: int = 0) -> Rune:
+    return Rune(rid, slot, set_id, 5, 6, 15, (main, 10), (0, 0), [], 1 if occupied_id else 2, occupied_id)
+
+
+def _account() -> AccountData:
+    return AccountData(
+        runes=[
+            _rune(1, 2, 3, 8, occupied_id=7),
+            _rune(2, 1, 3, 3, occupied_id=7),
+            _rune(3, 2, 13, 4),
+            _rune(4, 4, 13, 10, occupied_id=9),
+        ],
+        artifacts=[
+            Artifact(11, 7, 1, 1, 2, 5, 15),
+            Artifact(12, 0, 2, 2, 0, 4, 12),
+            Artifact(13, 9, 2, 2, 0, 3, 0),
+        ],
+        guild_rune_equip={9: [3, 4]},
+        rta_artifact_equip={7: [12]},
+    )
+
+
+def test_indexes_group_runes_and_artifacts() -> None:
+    account = _account()
+
+    assert account.runes_by_id() is account.runes_by_id()
+    assert [r.rune_id for r in account.runes_in_slot(2)] == [1, 3]
+    assert [r.rune_id for r in account.runes_of_set(13)] == [3, 4]
+    assert [r.rune_id for r in account.runes_with_mainstat(8)] == [1]
+    assert account.artifacts_by_id()[13].occupied_id == 9
+    assert [a.artifact_id for a in account.artifacts_equipped_on(7)] == [11]
+    assert [a.artifact_id for a in account.artifacts_equipped_on(7, "rta")] == [12]
+    assert account.rune_owner_by_id("guild") == {3: 9, 4: 9}
+    assert account.rune_owner_by_id("pve") == {1: 7, 2: 7, 4: 9}
+
+
+def test_equipped_runes_for_uses_mode_equip_then_pve_fallback() -> None:
+    account = _account()
+
+    assert [r.rune_id for r in account.equipped_runes_for(7)] == [2, 1]
+    assert [r.rune_id for r in account.equipped_runes_for(9, "siege")] == [3, 4]
+    assert [r.rune_id for r in account.equipped_runes_for(9, "rta")] == [4]
+    assert account.equipped_runes_for(5) == []
+
+
+def test_indexes_follow_replaced_lists_and_explicit_invalidation() -> None:
+    account = _account()
+    assert len(account.runes_in_slot(2)) == 2
+
+    account.runes = account.runes + [_rune(5, 2, 3, 8)]
+    assert [r.rune_id for r in account.runes_in_slot(2)] == [1, 3, 5]
+
+    account.runes[-1] = _rune(6, 2, 3, 8)
+    account.invalidate_indexes()
+    assert 6 in account.runes_by_id()
+    assert 5 not in account.runes_by_id()
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import dataclasses
+
+import app.engine.efficiency as efficiency
+from app.domain.models import AccountData, Rune
+from app.importer.account_diff import reconcile_accounts
+
+
+def _rune(rid: int, sub_val: int = 6) -> Rune:
+    return Rune(rid, 2, 3, 5, 6, 12, (8, 42), (0, 0), ((9, sub_val, 0, 0), (10, 7, 0, 0)), 2, 0)
+
+
+def test_memo_follows_rune_content_and_reimport(monkeypatch) -> None:
+    memo = efficiency._ContentMemo(maxsize=3)
+    monkeypatch.setattr(efficiency, "_RUNE_MEMO", memo)
+    calls = []
+    monkeypatch.setattr(
+        efficiency, "_rune_efficiency_internal",
+        lambda rune, max_tier=None: calls.append(rune.rune_id) or float(rune.sec_eff[0][1]),
+    )
+
+    rune = _rune(1)
+    assert efficiency.rune_efficiency(rune) == 6.0
+    assert efficiency.rune_efficiency(_rune(1)) == 6.0      # equal content, other instance
+    assert calls == [1]
+
+    upgraded = _rune(1, sub_val=9)
+    assert efficiency.rune_efficiency(upgraded) == 9.0      # same id, new content
+    assert calls == [1, 1]
+
+    for rid in (2, 3, 4):
+        efficiency.rune_efficiency(_rune(rid))
+    assert len(memo) == 3 and 1 not in memo._entries        # oldest entry evicted
+
+    old = AccountData(runes=[_rune(2), _rune(3)])
+    new = AccountData(runes=[dataclasses.replace(_rune(2), upgrade_curr=15), _rune(3)])
+    reconcile_accounts(old, new)
+    assert 2 not in memo._entries and 3 in memo._entries
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import random
+
+import numpy as np
+
+from app.domain.models import Artifact, Rune
+from app.engine.efficiency import (
+    artifact_efficiency,
+    artifact_efficiency_array,
+    artifact_score,
+    artifact_score_array,
+    rune_efficiency,
+    rune_efficiency_arrays,
+    rune_efficiency_max,
+)
+
+_SUB_IDS = [1, 2, 3, 4, 5, 6, 8, 9, 10, 11, 12, 7, 0, 99]
+
+
+def _random_rune(rng: random.Random, rid: int) -> Rune:
+    subs = []
+    for _ in range(rng.choice([0, 1, 2, 3, 4, 4, 4])):
+        eff_id = rng.choice(_SUB_IDS)
+        sub = [eff_id, rng.choice([rng.randint(0, 40), rng.uniform(0, 30), 600])]
+        if rng.random() < 0.8:
+            sub.append(rng.choice([0, 0, 0, 1]))
+            if rng.random() < 0.8:
+                sub.append(rng.choice([0, rng.randint(1, 12), 2.5]))
+        subs.append(tuple(sub))
+    if rng.random() < 0.05:
+        subs.append(("bad", 3, 0, 0))
+    prefix = (rng.choice([0, 2, 4, 8, 9, 12]), rng.randint(0, 10)) if rng.random() < 0.7 else ()
+    rune_class = rng.choice([5, 6, 15, 16])
+    return Rune(rid, rng.randint(1, 6), rng.randint(1, 25), 5, rune_class, rng.choice([9, 12, 15]),
+                (rng.choice([2, 4, 8]), 63), prefix, tuple(subs), 2, 0, rng.choice([0, 0, 16]))
+
+
+def _random_artifact(rng: random.Random, aid: int) -> Artifact:
+    ids = [200, 202, 204, 206, 210, 214, 215, 218, 219, 220, 221, 223, 300, 405]
+    secs = tuple(
+        (rng.choice(ids), rng.choice([rng.randint(1, 20), round(rng.uniform(0.5, 12), 1)]), rng.randint(0, 2))
+        for _ in range(rng.randint(0, 4))
+    )
+    if rng.random() < 0.05:
+        secs += ((204,),)
+    score = rng.choice([0.0, 0.0, 0.0, 187.456])
+    return Artifact(aid, 0, 1, 1, 1, 5, 15, 5, (100, 1500), secs, score)
+
+
+def test_vectorized_rune_efficiencies_match_scalar() -> None:
+    rng = random.Random(7)
+    runes = [_random_rune(rng, i) for i in range(1500)]
+
+    arrays = rune_efficiency_arrays(runes)
+
+    assert arrays["current"].tolist() == [rune_efficiency(r) for r in runes]
+    assert arrays["hero"].tolist() == [rune_efficiency_max(r, "hero") for r in runes]
+    assert arrays["legend"].tolist() == [rune_efficiency_max(r, "legend") for r in runes]
+    assert rune_efficiency_arrays([], ("hero",))["hero"].shape == (0,)
+
+
+def test_vectorized_artifact_scores_match_scalar() -> None:
+    rng = random.Random(11)
+    artifacts = [_random_artifact(rng, i) for i in range(800)]
+
+    assert artifact_score_array(artifacts).tolist() == [artifact_score(a) for a in artifacts]
+    assert artifact_efficiency_array(artifacts).tolist() == [artifact_efficiency(a) for a in artifacts]
+    assert isinstance(artifact_score_array([]), np.ndarray)
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import threading
+
+from app.domain.models import AccountData, Rune
+from app.domain.presets import BuildStore
+from app.engine import greedy_optimizer
+from app.engine.greedy_optimizer import GreedyRequest, GreedyResult, GreedyUnitResult, optimize_greedy
+
+
+def _patch_passes(monkeypatch, calls):
+    lock = threading.Lock()
+
+    def _fake_pass(account, presets, req, unit_ids, time_limit_per_unit_s, **_kwargs):
+        with lock:
+            calls.append((tuple(unit_ids), int(req.workers)))
+        return [GreedyUnitResult(int(uid), True, "OK", runes_by_slot={1: int(unit_ids[0])}) for uid in unit_ids]
+
+    def _fake_score(account, req, results):
+        return (int(results[0].runes_by_slot[1]) if results else 0, 0, 0, 0, 0, 0, 0)
+
+    monkeypatch.setattr(greedy_optimizer, "_run_greedy_pass", _fake_pass)
+    monkeypatch.setattr(greedy_optimizer, "_evaluate_pass_score", _fake_score)
+    monkeypatch.setattr(greedy_optimizer, "_prepare_cloud_build_prior_by_uid", lambda *a, **k: {})
+    monkeypatch.setattr(greedy_optimizer, "_upload_cloud_build_preferences_for_request", lambda *a, **k: None)
+
+
+def _request(parallel: int) -> GreedyRequest:
+    return GreedyRequest(
+        mode="siege",
+        unit_ids_in_order=[1, 2, 3, 4],
+        workers=8,
+        multi_pass_count=4,
+        multi_pass_strategy="greedy_only",
+        multi_pass_parallel=parallel,
+    )
+
+
+def test_parallel_greedy_only_passes_match_sequential_run(monkeypatch) -> None:
+    sequential_calls: list = []
+    _patch_passes(monkeypatch, sequential_calls)
+    sequential = optimize_greedy(AccountData(), BuildStore(), _request(1))
+
+    parallel_calls: list = []
+    _patch_passes(monkeypatch, parallel_calls)
+    parallel = optimize_greedy(AccountData(), BuildStore(), _request(4))
+
+    assert parallel.message == sequential.message
+    assert [r.runes_by_slot for r in parallel.results] == [r.runes_by_slot for r in sequential.results]
+    assert {workers for _order, workers in sequential_calls} == {8}
+    assert {workers for _order, workers in parallel_calls} == {2}
+    assert sorted(o for o, _ in parallel_calls) == sorted(o for o, _ in sequential_calls)
+
+
+def test_incremental_run_resolves_changed_units_and_their_conflicts(monkeypatch) -> None:
+    calls: list = []
+    new_speed = {1: 150, 2: 170, 3: 125, 4: 115}
+    _patch_passes(monkeypatch, [])
+
+    def _fake_pass(account, presets, req, unit_ids, time_limit_per_unit_s, **_kwargs):
+        calls.append((tuple(unit_ids), set(req.excluded_rune_ids or ()), dict(req.unit_max_final_speed or {})))
+        return [GreedyUnitResult(u, True, "OK", runes_by_slot={1: 10 + u}, final_speed=new_speed[u]) for u in unit_ids]
+
+    monkeypatch.setattr(greedy_optimizer, "_run_greedy_pass", _fake_pass)
+    account = AccountData(runes=[Rune(rid, 1, 3, 5, 6, 15, (4, 63), (0, 0), (), 0, 0) for rid in range(1, 5)])
+    previous = GreedyResult(True, "OK", [
+        GreedyUnitResult(u, True, "OK", runes_by_slot={1: u}, final_speed=spd)
+        for u, spd in ((1, 180), (2, 160), (3, 130), (4, 120))
+    ])
+
+    def _run(changed, max_scope=0.5):
+        calls.clear()
+        return optimize_greedy(account, BuildStore(), GreedyRequest(
+            mode="siege",
+            unit_ids_in_order=[1, 2, 3, 4],
+            multi_pass_enabled=False,
+            unit_team_index={1: 0, 2: 0, 3: 1, 4: 1},
+            unit_team_turn_order={1: 1, 2: 2, 3: 1, 4: 2},
+            previous_result=previous,
+            changed_unit_ids=set(changed),
+            incremental_max_scope=max_scope,
+        ))
+
+    # The opener got slower than its kept follower, so the follower is re-solved too.
+    result = _run({1})
+    assert [c[0] for c in calls] == [(1,), (1, 2)]
+    assert calls[0][1] == {2, 3, 4} and calls[1][1] == {3, 4}
+    assert [r.runes_by_slot[1] for r in result.results] == [11, 12, 3, 4]
+
+    # A follower is capped below its kept opener.
+    result = _run({2})
+    assert calls == [((2,), {1, 3, 4}, {2: 179})]
+    assert [r.final_speed for r in result.results] == [180, 170, 130, 120]
+
+    _run({1, 3, 4})
+    assert [c[0] for c in calls] == [(1, 2, 3, 4)]
+
+
+def test_max_quality_runs_share_the_time_budget(monkeypatch) -> None:
+    from app.engine import global_optimizer
+
+    budgets: list = []
+
+    def _fake_global(account, presets, req):
+        budgets.append(float(req.time_budget_s))
+        results = [GreedyUnitResult(uid, True, "OK", runes_by_slot={}) for uid in req.unit_ids_in_order]
+        return GreedyResult(True, "OK", results)
+
+    monkeypatch.setattr(greedy_optimizer, "_prepare_cloud_build_prior_by_uid", lambda *a, **k: {})
+    monkeypatch.setattr(greedy_optimizer, "_upload_cloud_build_preferences_for_request", lambda *a, **k: None)
+    monkeypatch.setattr(greedy_optimizer, "_evaluate_pass_score", lambda *a: (0, 0, 0, 0, 0, 0, 0))
+    monkeypatch.setattr(global_optimizer, "optimize_global", _fake_global)
+    req = GreedyRequest(
+        mode="siege",
+        unit_ids_in_order=[1, 2],
+        workers=2,
+        multi_pass_enabled=True,
+        multi_pass_count=5,
+        quality_profile="max_quality",
+        decompose_teams=False,
+        time_budget_s=60.0,
+    )
+
+    result = optimize_greedy(AccountData(), BuildStore(), req)
+
+    # Five runs, two at a time: three waves of 20 s each.
+    assert result.ok and len(budgets) == 5
+    assert all(b == 20.0 for b in budgets)
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import app.importer.json_stream as json_stream
+from app.importer.sw_json_importer import load_account_from_data, load_account_json
+
+
+def _export() -> dict:
+    rune = {
+        "rune_id": 1, "slot_no": 2, "set_id": 3, "rank": 5, "class": 6, "upgrade_curr": 15,
+        "pri_eff": [8, 42], "prefix_eff": [0, 0], "sec_eff": [[9, 6, 0, 0], [10, 123456, 0, 0]],
+        "occupied_type": 1, "occupied_id": 7, "extra": 15,
+    }
+    return {
+        "command": "HubUserLogin",
+        "building_list": [{"name": "a \"quoted\" ] { string", "list": [[1, 2], {"x": "\\\\"}]}],
+        "runes": [dict(rune, rune_id=2, occupied_type=2, occupied_id=0, set_id=13)],
+        "wizard_info": {"wizard_name": "Übermensch", "craft_stuff": [{"id": 20, "quantity": 3}]},
+        "unit_list": [
+            {
+                "unit_id": 7, "unit_master_id": 10101, "attribute": 1, "unit_level": 40, "class": 6,
+                "con": 800, "atk": 700, "def": 600, "spd": 100, "resist": 15, "accuracy": 0,
+                "critical_rate": 15, "critical_damage": 50, "runes": [rune],
+                "artifacts": [{"rid": 11, "occupied_id": 7, "slot": 1, "type": 1, "attribute": 1,
+                               "rank": 5, "level": 15, "pri_effect": [100, 1500],
+                               "sec_effects": [[204, 5.5, 2]]}],
+            }
+        ],
+        "deco_list": [{"master_id": 6, "level": 20}],
+        "world_arena_rune_equip_list": [{"rune_id": 2, "occupied_id": 7}],
+        "unit_storage_normal_list": [],
+    }
+
+
+def test_streamed_import_matches_dict_import(tmp_path: Path, monkeypatch) -> None:
+    data = _export()
+    path = tmp_path / "export.json"
+    path.write_text("\ufeff" + json.dumps(data, indent=1, ensure_ascii=False), encoding="utf-8")
+    # Tiny chunks so tokens, strings and numbers straddle chunk boundaries.
+    monkeypatch.setattr(json_stream, "_CHUNK_SIZE", 7)
+
+    progress: list[tuple[int, int]] = []
+    raw_sections: dict = {}
+    account = load_account_json(path, progress=lambda done, total: progress.append((done, total)),
+                                raw_sections=raw_sections)
+
+    assert account == load_account_from_data(data)
+    assert account.runes[0].sec_eff[1] == (10, 123456, 0, 0)
+    assert account.sky_tribe_totem_spd_pct == 15
+    assert account.craft_stuff == {20: 3}
+    assert "building_list" not in raw_sections
+    assert load_account_from_data(raw_sections) == account
+    assert progress[-1] == (path.stat().st_size, path.stat().st_size)
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from app.domain.models import AccountData
+from app.domain.presets import BuildStore
+from app.engine import greedy_optimizer, lns_optimizer
+from app.engine.greedy_optimizer import GreedyRequest, GreedyResult, GreedyUnitResult, optimize_greedy
+from app.engine.lns_optimizer import _Neighborhoods, _neighborhood_request
+
+_SPEED = {1: 150, 2: 149, 3: 130, 4: 120}
+
+
+def _unit(uid: int, rid: int) -> GreedyUnitResult:
+    return GreedyUnitResult(uid, True, "OK", runes_by_slot={1: rid}, artifacts_by_type={}, final_speed=_SPEED[uid])
+
+
+def _request(**kwargs) -> GreedyRequest:
+    return GreedyRequest(
+        mode="siege",
+        unit_ids_in_order=[1, 2, 3, 4],
+        multi_pass_strategy="lns",
+        time_budget_s=60.0,
+        unit_team_index={1: 0, 2: 0, 3: 1, 4: 1},
+        unit_team_turn_order={1: 1, 2: 2, 3: 1, 4: 2},
+        **kwargs,
+    )
+
+
+def test_neighborhood_request_fixes_other_units_and_their_turn_order() -> None:
+    current = {uid: _unit(uid, uid) for uid in _SPEED}
+
+    follower = _neighborhood_request(_request(), [1, 2, 3, 4], (2, 3), current, 2.0)
+    assert follower.unit_ids_in_order == [2, 3] and follower.time_budget_s == 2.0
+    assert follower.excluded_rune_ids == {1, 4}
+    assert follower.unit_max_final_speed == {2: 149} and follower.unit_min_final_speed == {3: 121}
+    assert follower.unit_hint_runes_by_slot == {2: {1: 2}, 3: {1: 3}}
+
+
+def test_chain_of_unit_without_team_is_the_unit_alone() -> None:
+    req = GreedyRequest(mode="siege", unit_ids_in_order=[1, 2], unit_team_index={2: 0},
+                        unit_team_turn_order={1: 1, 2: 1})
+    hoods = _Neighborhoods(req, None, [1, 2], 4)
+    current = {uid: _unit(uid, uid) for uid in (1, 2)}
+    assert hoods.chain(1, current) == [1] and hoods.chain(2, current) == [2]
+
+
+def test_lns_keeps_improving_neighborhood_moves(monkeypatch) -> None:
+    sub_requests: list = []
+
+    def _fake_global(account, presets, req):
+        sub_requests.append(req)
+        return GreedyResult(True, "OK", [_unit(uid, 100 + uid) for uid in req.unit_ids_in_order])
+
+    def _fake_score(account, req, results):
+        return (len(results), sum(int(r.runes_by_slot[1]) for r in results), 0, 0, 0, 0, 0)
+
+    monkeypatch.setattr(greedy_optimizer, "_prepare_cloud_build_prior_by_uid", lambda *a, **k: {})
+    monkeypatch.setattr(greedy_optimizer, "_upload_cloud_build_preferences_for_request", lambda *a, **k: None)
+    monkeypatch.setattr(lns_optimizer, "optimize_global", _fake_global)
+    monkeypatch.setattr(lns_optimizer, "_evaluate_pass_score", _fake_score)
+    monkeypatch.setattr(
+        lns_optimizer,
+        "_optimize_greedy",
+        lambda account, presets, req: GreedyResult(True, "OK", [_unit(uid, uid) for uid in req.unit_ids_in_order]),
+    )
+
+    result = optimize_greedy(AccountData(), BuildStore(), _request())
+
+    assert result.ok and [r.runes_by_slot[1] for r in result.results] == [101, 102, 103, 104]
+    # Team and tight turn-order neighborhoods; every solve keeps the other team's items.
+    assert {tuple(r.unit_ids_in_order) for r in sub_requests} == {(1, 2), (3, 4)}
+    for sub in sub_requests:
+        assert not (sub.excluded_rune_ids & {rid for uid in sub.unit_ids_in_order for rid in (uid, 100 + uid)})
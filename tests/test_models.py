@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import dataclasses
+
+import pytest
+
+from app.domain import models
+from app.domain.models import Artifact, Rune
+
+
+def test_rune_effects_are_stored_as_shared_tuples() -> None:
+    a = Rune(1, 2, 3, 5, 6, 15, [8, 42], [0, 0], [[9, 6, 0, 0], [10, 7, 0, 0]], 1, 7)
+    b = Rune(2, 2, 3, 5, 6, 15, (8, 42), (0, 0), [(9, 6, 0, 0), (10, 7, 0, 0)], 1, 7)
+
+    assert a.pri_eff == (8, 42)
+    assert a.sec_eff == ((9, 6, 0, 0), (10, 7, 0, 0))
+    assert a.sec_eff[0] is b.sec_eff[0]
+    assert not hasattr(a, "__dict__")
+    assert hash(a) != hash(b)
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        a.slot_no = 1  # type: ignore[misc]
+
+
+def test_artifact_effects_keep_value_types() -> None:
+    a = Artifact(11, 0, 1, 1, 2, 5, 15, 5, [100, 1500], [[204, 5, 2]])
+    b = Artifact(12, 0, 1, 1, 2, 5, 15, 5, [100, 1500], [[204, 5.0, 2]])
+
+    assert a.sec_effects == ((204, 5, 2),)
+    assert isinstance(a.sec_effects[0][1], int)
+    assert isinstance(b.sec_effects[0][1], float)
+    assert a.pri_effect is b.pri_effect
+
+
+def test_effect_tuple_table_is_bounded(monkeypatch) -> None:
+    monkeypatch.setattr(models, "_EFFECT_TUPLES_MAX", 4)
+    models.clear_effect_tuples()
+    first = Rune(1, 2, 3, 5, 6, 15, (8, 42), (0, 0), [(9, 6, 0, 0)], 1, 7)
+    for value in range(10):
+        Rune(2, 2, 3, 5, 6, 15, (8, value), (0, 0), [], 1, 7)
+
+    assert len(models._EFFECT_TUPLES) <= 4 and len(models._CANONICAL_BY_ID) <= 4
+    again = Rune(3, 2, 3, 5, 6, 15, (8, 42), (0, 0), [(9, 6, 0, 0)], 1, 7)
+    assert again.pri_eff == first.pri_eff and again.sec_eff == first.sec_eff
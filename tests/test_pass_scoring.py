@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+from app.domain.models import AccountData, Artifact, Rune
+from app.engine.efficiency import artifact_efficiency, rune_efficiency
+from app.engine.greedy_optimizer import (
+    ARTIFACT_ROLE_CONTEXT_WEIGHT,
+    GreedyRequest,
+    GreedyUnitResult,
+    PassBound,
+    PassScorer,
+    _artifact_context_score_proxy,
+    _artifact_hint_score,
+    _artifact_quality_score,
+    _evaluate_pass_score,
+    _rune_quality_score,
+)
+
+
+def _account() -> AccountData:
+    return AccountData(
+        runes=[
+            Rune(1, 1, 3, 5, 6, 15, (3, 160), (8, 4), [(8, 12, 0, 2), (9, 6, 0, 0), (10, 7, 0, 0), (4, 5, 0, 3)], 1, 7),
+            Rune(2, 2, 13, 5, 16, 12, (8, 39), (0, 0), [(1, 300, 0, 0), (2, 8, 0, 4), (11, 6, 0, 0), (12, 5, 0, 0)], 2, 0, 16),
+            Rune(3, 4, 15, 4, 5, 9, (5, 40), (2, 5), [(4, 6, 0, 0), (6, 7, 0, 0), (8, 5, 0, 0)], 1, 9),
+            Rune(4, 6, 25, 3, 6, 0, (12, 11), (0, 0), [], 0, 0),
+        ],
+        artifacts=[
+            Artifact(11, 7, 1, 1, 2, 5, 15, 5, (100, 1500), [[204, 5.0, 2], [218, 0.3, 1]]),
+            Artifact(12, 0, 2, 2, 0, 4, 12, 3, (101, 100), [[206, 4.0, 1]]),
+            Artifact(13, 9, 2, 2, 0, 3, 0, 0, (102, 100), []),
+        ],
+    )
+
+
+def test_pass_scorer_matches_scalar_helpers() -> None:
+    account = _account()
+    hints = {"preferred_effect_ids": [204]}
+    req = GreedyRequest(mode="siege", unit_ids_in_order=[7], unit_artifact_hints_by_uid={7: hints})
+    scorer = PassScorer(account, req)
+    res = GreedyUnitResult(7, True, "OK", runes_by_slot={1: 1, 2: 2, 4: 3}, artifacts_by_type={1: 11, 2: 12})
+
+    runes = account.runes[:3]
+    arts = account.artifacts[:2]
+    expected_quality = sum(_rune_quality_score(r, 7, None) for r in runes)
+    for art in arts:
+        expected_quality += _artifact_quality_score(art, 7, None)
+        expected_quality += int(ARTIFACT_ROLE_CONTEXT_WEIGHT * _artifact_context_score_proxy(
+            art, role="support", base_hp=0, base_atk=0, base_def=0, base_spd=0
+        ))
+        expected_quality += int(_artifact_hint_score(art, dict(hints)))
+    expected_eff = sum(round(rune_efficiency(r) * 10.0) for r in runes) + sum(
+        round(artifact_efficiency(a) * 10.0) for a in arts
+    )
+
+    assert scorer.unit_quality_and_efficiency(res) == (expected_quality, expected_eff)
+    # Served from the scorer's memo the second time.
+    assert scorer.unit_quality_and_efficiency(res) == (expected_quality, expected_eff)
+    assert PassScorer(account).efficiency_milli([res, GreedyUnitResult(8, False, "x")]) == sum(
+        round(rune_efficiency(r) * 1000.0) for r in runes
+    ) + sum(round(artifact_efficiency(a) * 1000.0) for a in arts)
+
+
+def test_pass_bound_covers_every_assignment_and_prunes_below_best() -> None:
+    account = _account()
+    req = GreedyRequest(mode="siege", unit_ids_in_order=[7])
+    bound = PassBound(PassScorer(account, req), req)
+    effective, quality = bound.unit_bound(7)
+
+    scores = []
+    for art in (12, 13):
+        res = GreedyUnitResult(7, True, "OK", runes_by_slot={1: 1, 2: 2, 4: 3, 6: 4}, artifacts_by_type={1: 11, 2: art})
+        scores.append(_evaluate_pass_score(account, req, [res]))
+        assert scores[-1][1] <= effective and scores[-1][2] <= quality
+
+    assert bound.can_improve([], [7])
+    bound.best_score = max(scores)
+    assert bound.can_improve([], [7])
+    bound.best_score = (1, effective + 1, 0, 0, 0, 0, 0)
+    assert not bound.can_improve([], [7])
+    bound.best_score = (2, 0, 0, 0, 0, 0, 0)
+    assert not bound.can_improve([], [7])
+
+    # Items taken by solved units or excluded by the request drop out of the bound.
+    taken = bound.unit_bound(7, taken_runes={1})
+    assert taken[0] < effective
+    excluded_req = GreedyRequest(mode="siege", unit_ids_in_order=[7], excluded_rune_ids={1})
+    assert PassBound(PassScorer(account, excluded_req), excluded_req).unit_bound(7) == taken
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from app.domain.models import AccountData, Rune
+from app.domain.presets import BuildStore
+from app.engine.greedy_optimizer import GreedyRequest, UnitSolveCache, _UnitModelTemplateCache
+from app.engine.process_pool import ProcessJobPool, picklable_request
+
+
+def _job(account, presets, req, tag=""):
+    return tag, len(account.runes), list(req.unit_ids_in_order), bool(req.is_cancelled())
+
+
+def _account() -> AccountData:
+    return AccountData(runes=[Rune(1, 1, 3, 5, 6, 15, (4, 63), (0, 0), (), 0, 0)])
+
+
+def test_picklable_request_drops_callbacks_and_caches() -> None:
+    req = GreedyRequest(
+        mode="siege",
+        unit_ids_in_order=[7],
+        progress_callback=lambda *_a: None,
+        is_cancelled=lambda: False,
+        register_solver=lambda _s: None,
+        unit_model_templates=_UnitModelTemplateCache(),
+        unit_solve_cache=UnitSolveCache(),
+    )
+
+    clean = picklable_request(req)
+
+    assert clean.progress_callback is None and clean.is_cancelled is None
+    assert clean.register_solver is None and clean.unit_model_templates is None
+    assert clean.unit_solve_cache is None
+    assert clean.unit_ids_in_order == [7] and req.is_cancelled is not None
+
+
+def test_process_pool_runs_jobs_against_shipped_account() -> None:
+    req = GreedyRequest(mode="siege", unit_ids_in_order=[7, 8], is_cancelled=lambda: False)
+    with ProcessJobPool(_account(), BuildStore(), 2) as pool:
+        assert pool.submit(_job, req, tag="a").result(timeout=60) == ("a", 1, [7, 8], False)
+        pool.cancel()
+        assert pool.submit(_job, req, tag="b").result(timeout=60) == ("b", 1, [7, 8], True)
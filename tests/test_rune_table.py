@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from app.domain.models import AccountData, Artifact, Rune
+from app.engine.efficiency import artifact_efficiency, rune_efficiency, rune_efficiency_max
+from app.engine.greedy_optimizer import (
+    _artifact_quality_score,
+    _rune_quality_score,
+    _rune_stat_total,
+)
+from app.engine.rune_table import STAT_IDS, account_artifact_table, account_rune_table
+
+
+def _account() -> AccountData:
+    return AccountData(
+        runes=[
+            Rune(1, 1, 3, 5, 6, 15, (3, 160), (8, 4), [(8, 12, 0, 2), (9, 6, 0, 0), (10, 7, 0, 0), (4, 5, 0, 3)], 1, 7),
+            Rune(2, 2, 13, 5, 16, 12, (8, 39), (0, 0), [(1, 300, 0, 0), (2, 8, 0, 4), (11, 6, 0, 0), (12, 5, 0, 0)], 2, 0, 16),
+            Rune(3, 4, 15, 4, 5, 9, (5, 40), (2, 5), [(4, 6, 0, 0), (6, 7, 0, 0), (8, 5, 0, 0)], 1, 9),
+            Rune(4, 6, 25, 3, 6, 0, (12, 11), (0, 0), [], 0, 0),
+        ],
+        artifacts=[
+            Artifact(11, 7, 1, 1, 2, 5, 15, 5, (100, 1500), [[204, 5.0, 2], [218, 0.3, 1]]),
+            Artifact(12, 0, 2, 2, 0, 4, 12, 3, (101, 100), [[206, 4.0, 1]]),
+            Artifact(13, 9, 2, 2, 0, 3, 0, 0, (102, 100), []),
+        ],
+    )
+
+
+def test_rune_table_matches_scalar_helpers() -> None:
+    account = _account()
+    table = account_rune_table(account)
+
+    assert account_rune_table(account) is table
+    for row, rune in enumerate(account.runes):
+        assert table.row_of[rune.rune_id] == row
+        for col, eff_id in enumerate(STAT_IDS):
+            assert int(table.stats[row, col]) == _rune_stat_total(rune, eff_id)
+        assert float(table.efficiency[row]) == rune_efficiency(rune)
+        assert float(table.efficiency_max("legend")[row]) == rune_efficiency_max(rune, "legend")
+        for uid in (0, 7, 9):
+            assert int(table.quality_for_unit(uid)[row]) == _rune_quality_score(rune, uid, None)
+        assert int(table.quality_for_unit(7, {2, 3})[row]) == _rune_quality_score(rune, 7, {2, 3})
+
+
+def test_artifact_table_matches_scalar_helpers() -> None:
+    account = _account()
+    table = account_artifact_table(account)
+
+    for row, art in enumerate(account.artifacts):
+        assert float(table.efficiency[row]) == artifact_efficiency(art)
+        for uid in (0, 7, 9):
+            assert int(table.quality_for_unit(uid)[row]) == _artifact_quality_score(art, uid, None)
+        assert int(table.quality_for_unit(7, {12})[row]) == _artifact_quality_score(art, 7, {12})
+
+
+def test_account_tables_rebuild_when_lists_change() -> None:
+    account = _account()
+    table = account_rune_table(account)
+
+    account.runes = account.runes[:2]
+
+    rebuilt = account_rune_table(account)
+    assert rebuilt is not table
+    assert len(rebuilt) == 2
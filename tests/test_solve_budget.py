@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+from app.engine.solve_budget import SolveBudget, history_seconds_per_var
+
+
+def test_slices_follow_model_size_and_observed_effort() -> None:
+    budget = SolveBudget(100.0, min_slice_s=0.01)
+    budget.plan([1, 2], repeats=2)
+
+    # Unseen units share by model size: unit 2 is assumed three times as hard.
+    budget.slice_for(2, 300)
+    first = budget.slice_for(1, 100)
+    assert 10.0 < first < 15.0
+
+    # Unit 1 proved its optimum fast; unit 2 hit its limit and gets the rest.
+    budget.record(1, 0.1, first, optimal=True)
+    budget.finish(1)
+    hard = budget.slice_for(2, 300)
+    budget.record(2, hard, hard, optimal=False)
+    budget.finish(2)
+    assert budget.slice_for(1, 100) < 1.0
+    assert budget.slice_for(2, 300) > 90.0
+
+
+def test_slices_never_exceed_remaining_time_or_undercut_minimum() -> None:
+    budget = SolveBudget(1.0, min_slice_s=0.2, concurrency=4)
+    budget.plan([1])
+    assert budget.slice_for(1, 50) <= 1.0
+    assert SolveBudget(0.0, min_slice_s=0.2).slice_for(1, 50) == 0.2
+
+
+def test_history_round_trip(tmp_path) -> None:
+    path = tmp_path / "history.jsonl"
+    path.write_text('{"kind": "run", "total_ms": 1000}\n', encoding="utf-8")
+    assert history_seconds_per_var("siege", path=path) is None
+
+    budget = SolveBudget(10.0)
+    budget.plan([1])
+    budget.slice_for(1, 200)
+    budget.record(1, 0.5, 2.0, optimal=True)
+    budget.record_history("siege", path=path)
+
+    assert history_seconds_per_var("siege", path=path) == 0.5 / 200
+    assert history_seconds_per_var("rta", path=path) is None
+    assert SolveBudget(10.0, prior_s_per_var=0.5 / 200).slice_for(1, 200) > 0.0
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from app.domain.models import AccountData
+from app.domain.presets import BuildStore
+from app.engine import team_decomposition
+from app.engine.greedy_optimizer import GreedyRequest, GreedyResult, GreedyUnitResult
+from app.engine.team_decomposition import _team_groups, optimize_team_decomposed
+
+# Rune 50 is every team's favourite; team 1 gives it up once it costs 25 %.
+_GIVE_UP_PCT = {0: 50, 1: 25}
+
+
+def _patch_global(monkeypatch, calls):
+    def _fake_global(account, presets, req, rune_discount_pct=None, artifact_discount_pct=None):
+        team = int(req.unit_team_index[req.unit_ids_in_order[0]])
+        calls.append((team, dict(rune_discount_pct or {}), set(req.excluded_rune_ids or ())))
+        wants_50 = int((rune_discount_pct or {}).get(50, 0)) < _GIVE_UP_PCT[team]
+        first = 50 if wants_50 and 50 not in (req.excluded_rune_ids or ()) else 60 + team
+        return GreedyResult(True, "OK", [
+            GreedyUnitResult(uid, True, "OK", runes_by_slot={1: first if k == 0 else 70 + uid}, artifacts_by_type={})
+            for k, uid in enumerate(req.unit_ids_in_order)
+        ])
+
+    monkeypatch.setattr(team_decomposition, "optimize_global", _fake_global)
+
+
+def _request() -> GreedyRequest:
+    return GreedyRequest(
+        mode="siege",
+        unit_ids_in_order=[1, 2, 3, 4, 5],
+        time_budget_s=60.0,
+        workers=4,
+        unit_team_index={1: 0, 2: 0, 3: 1, 4: 1},
+    )
+
+
+def test_team_groups_keep_order_and_single_units() -> None:
+    assert _team_groups(_request()) == [[1, 2], [3, 4], [5]]
+
+
+def test_contested_rune_is_priced_out_of_the_team_that_values_it_least(monkeypatch) -> None:
+    calls: list = []
+    _patch_global(monkeypatch, calls)
+    req = _request()
+    req.unit_ids_in_order = [1, 2, 3, 4]
+
+    result = optimize_team_decomposed(AccountData(), BuildStore(), req)
+
+    assert result.ok and [r.runes_by_slot[1] for r in result.results] == [50, 72, 61, 74]
+    # Round 2 re-solves only the two teams holding rune 50, now priced at 25 %.
+    assert sorted((team, pct.get(50, 0)) for team, pct, _excl in calls) == [(0, 0), (0, 25), (1, 0), (1, 25)]
+
+
+def test_repair_resolves_remaining_conflicts_around_kept_teams(monkeypatch) -> None:
+    calls: list = []
+    _patch_global(monkeypatch, calls)
+    monkeypatch.setattr(team_decomposition, "DECOMPOSITION_MAX_ROUNDS", 1)
+    req = _request()
+    req.unit_ids_in_order = [1, 2, 3, 4]
+
+    result = optimize_team_decomposed(AccountData(), BuildStore(), req)
+
+    assert [r.runes_by_slot[1] for r in result.results] == [50, 72, 61, 74]
+    # Team 1 is solved again without the items team 0 kept and without prices.
+    assert calls[-1] == (1, {}, {50, 72})
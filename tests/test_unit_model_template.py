@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+from ortools.sat.python import cp_model
+
+from app.domain.models import AccountData, Artifact, Rune, Unit
+from app.domain.optimization_store import SavedOptimization, SavedUnitResult
+from app.domain.presets import Build
+from app.engine.greedy_optimizer import (
+    _collapse_equivalent_runes,
+    _max_final_speed_by_dp,
+    _PlateauMonitor,
+    _preflight_unit_builds,
+    _prune_dominated_runes,
+    _solve_single_unit_best,
+    _UnitModelTemplateCache,
+    _warm_start_hint_vars,
+    saved_optimization_hints,
+)
+
+
+def _account() -> AccountData:
+    runes = []
+    for slot in range(1, 7):
+        for k, spd in enumerate((4, 12, 20)):
+            rid = slot * 10 + k
+            runes.append(Rune(rid, slot, 3, 5, 6, 15, (8, 42) if slot == 2 else (4, 63), (0, 0),
+                              ((8, spd, 0, 0), (9, 6, 0, 0)), 2, 0))
+    artifacts = [
+        Artifact(101, 0, 1, 1, 1, 5, 15, 5, (100, 1500), ((204, 5.0, 2),)),
+        Artifact(102, 0, 1, 1, 1, 5, 15, 5, (101, 100), ()),
+        Artifact(201, 0, 2, 2, 0, 5, 15, 5, (102, 100), ((206, 4.0, 1),)),
+    ]
+    return AccountData(
+        units_by_id={7: Unit(7, 10101, 1, 40, 6, 700, 650, 600, 101, 15, 0, 15, 50)},
+        runes=runes,
+        artifacts=artifacts,
+    )
+
+
+def _solve(account: AccountData, cache, blocked=(), max_final_speed=None, builds=()):
+    return _solve_single_unit_best(
+        uid=7, pool=list(account.runes), artifact_pool=list(account.artifacts), builds=list(builds), time_limit_s=2.0,
+        workers=1, base_hp=10500, base_atk=650, base_def=600, base_spd=101, base_spd_bonus_flat=0,
+        base_cr=15, base_cd=50, base_res=15, base_acc=0, max_final_speed=max_final_speed, account=account,
+        blocked_rune_ids=set(blocked), model_templates=cache,
+    )
+
+
+def test_template_is_reused_with_blocked_runes_and_speed_caps() -> None:
+    account = _account()
+    cache = _UnitModelTemplateCache()
+
+    first = _solve(account, cache)
+    assert first.ok and set(first.runes_by_slot.values()) == {slot * 10 + 2 for slot in range(1, 7)}
+
+    taken = set(first.runes_by_slot.values())
+    second = _solve(account, cache, blocked=taken, max_final_speed=first.final_speed - 60)
+    assert second.ok and not (set(second.runes_by_slot.values()) & taken)
+    assert second.final_speed <= first.final_speed - 60
+    assert len(cache) == 1
+
+    # The caps of one solve must not leak into the cached model.
+    assert _solve(account, cache).runes_by_slot == first.runes_by_slot
+
+    blocked_slot = _solve(account, cache, blocked={10, 11, 12})
+    assert not blocked_slot.ok and len(cache) == 1
+
+
+def test_cached_solves_are_looked_up_and_stored_under_the_budget_slice() -> None:
+    class _Budget:
+        def slice_for(self, uid, model_size):
+            return 0.5
+
+        def record(self, uid, elapsed_s, slice_s, optimal):
+            pass
+
+    class _Cache:
+        def __init__(self):
+            self.limits = []
+
+        def get(self, key, time_limit_s):
+            self.limits.append(("get", time_limit_s))
+
+        def put(self, key, result, time_limit_s, optimal):
+            self.limits.append(("put", time_limit_s))
+
+    account = _account()
+    cache = _Cache()
+    res = _solve_single_unit_best(
+        uid=7, pool=list(account.runes), artifact_pool=list(account.artifacts), builds=[], time_limit_s=30.0,
+        workers=1, base_hp=10500, base_atk=650, base_def=600, base_spd=101, base_spd_bonus_flat=0,
+        base_cr=15, base_cd=50, base_res=15, base_acc=0, account=account,
+        result_cache=cache, time_budget=_Budget(),
+    )
+    assert res.ok and cache.limits == [("get", 0.5), ("put", 0.5)]
+
+
+def test_dominance_pruning_keeps_optimum_and_enough_runes() -> None:
+    account = _account()
+    cache = _UnitModelTemplateCache()
+    full = _solve(account, cache)
+
+    pruned_cache = _UnitModelTemplateCache()
+    pruned = _solve_single_unit_best(
+        uid=7, pool=list(account.runes), artifact_pool=list(account.artifacts), builds=[], time_limit_s=2.0,
+        workers=1, base_hp=10500, base_atk=650, base_def=600, base_spd=101, base_spd_bonus_flat=0,
+        base_cr=15, base_cd=50, base_res=15, base_acc=0, max_final_speed=None, account=account,
+        model_templates=pruned_cache, dominance_keep=1, speed_cap_possible=False,
+    )
+    assert pruned.runes_by_slot == full.runes_by_slot
+    assert pruned.final_speed == full.final_speed
+
+
+def test_prune_dominated_runes_respects_keep_and_overcap() -> None:
+    runes = {
+        1: [
+            Rune(rid, 1, 1, 5, 6, 15, (3, 160), (0, 0), (), 2, 0)
+            for rid in (1, 2, 3, 4)
+        ]
+    }
+    # rid -> HP, HP%, ATK, ATK%, DEF, DEF%, SPD, CR, CD, RES, ACC
+    stats = {
+        1: [0, 0, 160, 0, 0, 0, 20, 0, 0, 0, 0],
+        2: [0, 0, 160, 0, 0, 0, 12, 0, 0, 0, 0],
+        3: [0, 0, 160, 0, 0, 0, 4, 0, 0, 0, 0],
+        # Faster, but its RES can only push the unit over the cap.
+        4: [0, 0, 160, 0, 0, 0, 30, 0, 0, 40, 0],
+    }
+    coefs = {1: (10, 10), 2: (10, 10), 3: (10, 10), 4: (11, 11)}
+
+    one = _prune_dominated_runes(runes, stats, coefs, stat_cols=(6,), exact_cols=(), keep=1)
+    assert [r.rune_id for r in one[1]] == [1, 4]
+
+    two = _prune_dominated_runes(runes, stats, coefs, stat_cols=(6,), exact_cols=(), keep=2)
+    assert [r.rune_id for r in two[1]] == [1, 2, 4]
+
+    exact = _prune_dominated_runes(runes, stats, coefs, stat_cols=(), exact_cols=(6,), keep=1)
+    assert [r.rune_id for r in exact[1]] == [1, 2, 3, 4]
+
+
+def test_equivalent_runes_share_one_variable() -> None:
+    account = _account()
+    twins = [
+        Rune(100 + slot, slot, 3, 5, 6, 15, (8, 42) if slot == 2 else (4, 63), (0, 0),
+             ((8, 20, 0, 0), (9, 6, 0, 0)), 2, 0)
+        for slot in range(1, 7)
+    ]
+    account.runes = list(account.runes) + twins
+    by_slot = {slot: [r for r in account.runes if r.slot_no == slot] for slot in range(1, 7)}
+
+    reps, members = _collapse_equivalent_runes(by_slot, owner_ids={7})
+    assert [r.rune_id for r in reps[1]] == [10, 11, 12]
+    assert members[12] == (12, 101)
+    reps, members = _collapse_equivalent_runes(by_slot, owner_ids={7}, distinct_ids={101})
+    assert [r.rune_id for r in reps[1]] == [10, 11, 12, 101]
+
+    cache = _UnitModelTemplateCache()
+    first = _solve(account, cache)
+    assert set(first.runes_by_slot.values()) == {slot * 10 + 2 for slot in range(1, 7)}
+    second = _solve(account, cache, blocked=set(first.runes_by_slot.values()))
+    assert set(second.runes_by_slot.values()) == {100 + slot for slot in range(1, 7)}
+    assert second.final_speed == first.final_speed
+
+
+def test_warm_start_hints_drop_stale_items_and_keep_the_optimum() -> None:
+    model = cp_model.CpModel()
+    a, b, art = model.NewBoolVar("a"), model.NewBoolVar("b"), model.NewBoolVar("art")
+    rune_vars = {1: {10: a, 11: a}, 2: {20: b}}
+    art_vars = {1: {101: art}}
+    assert _warm_start_hint_vars(rune_vars, art_vars, {1: 11, 2: 20}, {1: 101}, True) == [a, b, art]
+    assert _warm_start_hint_vars(rune_vars, art_vars, {1: 11, 2: 21}, {1: 101}, True) == []
+    assert _warm_start_hint_vars(rune_vars, art_vars, {1: 11, 2: 21}, {1: 101}, False) == [a, art]
+
+    saved = SavedOptimization("s", "s", "siege", [[7]], [SavedUnitResult(7, {1: 10, 2: 0}, {1: 101})])
+    assert saved_optimization_hints(saved) == ({7: {1: 10}}, {7: {1: 101}})
+
+    account = _account()
+    best = _solve(account, _UnitModelTemplateCache())
+    stale = {slot: slot * 10 for slot in range(1, 7)}
+    for hint, feasible_only in ((best.runes_by_slot, True), (stale, True), (stale, False)):
+        hinted = _solve_single_unit_best(
+            uid=7, pool=list(account.runes), artifact_pool=list(account.artifacts), builds=[], time_limit_s=2.0,
+            workers=1, base_hp=10500, base_atk=650, base_def=600, base_spd=101, base_spd_bonus_flat=0,
+            base_cr=15, base_cd=50, base_res=15, base_acc=0, max_final_speed=None, account=account,
+            blocked_rune_ids={10}, hint_runes_by_slot=hint, hint_feasible_only=feasible_only,
+        )
+        assert hinted.ok and hinted.final_speed == best.final_speed
+
+
+def test_max_speed_dp_handles_swift_sets_mainstats_and_caps() -> None:
+    # (SPD, set_id, mainstat key): Swift 5 SPD or Energy 10 SPD per slot, slot 2 SPD main.
+    items = {slot: [(5, 3, "ATK%"), (10, 1, "ATK%")] for slot in range(1, 7)}
+    items[2] = [(42, 3, "SPD"), (11, 1, "HP%")]
+    arts = {1: [Artifact(101, 0, 1, 1, 1, 5, 15, 5, (100, 1500), ())],
+            2: [Artifact(201, 0, 2, 2, 0, 5, 15, 5, (102, 100), ())]}
+
+    def dp(builds, **kwargs):
+        return _max_final_speed_by_dp(items, arts, builds, base_spd=100, base_spd_bonus_flat=0, **kwargs)
+
+    # 42 + three Swift + two Energy, plus 25 from the Swift set.
+    assert dp([Build()]) == (202, True)
+    assert dp([Build()], max_final_speed=200) == (197, True)
+    assert dp([Build(mainstats={2: ["HP%"]})]) == (166, True)
+    assert dp([Build(set_options=[["Energy"]])]) == (202, True)
+    assert dp([Build(set_options=[["Energy"]])], broken_set_excluded_set_ids={3}) == (161, True)
+    assert dp([Build(set_options=[["Energy", "Energy", "Energy"]])]) == (161, True)
+    assert dp([Build(set_options=[["Violent"]])]) == (None, True)
+    assert dp([Build(min_stats={"CR": 70})]) == (202, False)
+    assert dp([Build(min_stats={"SPD": 203})]) == (None, True)
+
+    # One Intangible piece may stand in for a missing set piece.
+    items[6] = items[6] + [(30, 25, "ATK%")]
+    assert dp([Build(set_options=[["Energy", "Energy", "Energy"]])]) == (181, True)
+
+
+def test_preflight_rejects_unsatisfiable_builds_without_solving() -> None:
+    account = _account()
+    runes_by_slot = {slot: [r for r in account.runes if r.slot_no == slot] for slot in range(1, 7)}
+    artifacts_by_type = {t: [a for a in account.artifacts if a.type_ == t] for t in (1, 2)}
+    builds = [
+        Build(),
+        Build(min_stats={"SPD": 288}),
+        Build(min_stats={"SPD": 289}),
+        Build(mainstats={4: ["CR"]}),
+        Build(set_options=[["Violent"]]),
+        Build(min_stats={"CR": 52}),
+    ]
+    # Full Swift: 101 base + 42 SPD main + 6 x 20 SPD subs + 25 set bonus = 288 at most.
+    reasons = _preflight_unit_builds(
+        runes_by_slot, artifacts_by_type, builds, base_hp=10500, base_atk=650, base_def=600, base_spd=101,
+        base_spd_bonus_flat=0, base_cr=15, base_cd=50, base_res=15, base_acc=0,
+        min_final_speed=None, max_final_speed=None, mode="siege", account=account,
+    )
+    assert [bool(reason) for reason in reasons] == [False, False, True, True, True, True]
+
+    assert not _solve(account, _UnitModelTemplateCache(), builds=builds[2:6]).ok
+    mixed = _solve(account, _UnitModelTemplateCache(), builds=[builds[2], builds[1]])
+    assert mixed.ok and mixed.final_speed == 288
+
+
+def test_plateau_monitor_records_improvements_and_stops_on_stale_solutions() -> None:
+    model = cp_model.CpModel()
+    xs = [model.NewIntVar(0, 10, f"x{i}") for i in range(4)]
+    model.Add(sum(xs) <= 25)
+    model.Maximize(sum((i + 1) * x for i, x in enumerate(xs)))
+    solver = cp_model.CpSolver()
+    solver.parameters.num_search_workers = 1
+
+    monitor = _PlateauMonitor(solver, window_s=5.0)
+    assert monitor.solve(model) == cp_model.OPTIMAL and not monitor.stopped
+    objectives = [obj for _t, obj in monitor.improvements]
+    assert objectives and objectives == sorted(objectives) and objectives[-1] == solver.ObjectiveValue()
+
+    # With an unreachable gain every solution after the first is stale.
+    stale = _PlateauMonitor(solver, window_s=0.0, window_solutions=1, min_rel_gain=1e9)
+    status = stale.solve(model)
+    assert len(stale.improvements) == 1
+    assert stale.stopped or status == cp_model.OPTIMAL
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import dataclasses
+
+from app.domain.models import Rune
+from app.engine.greedy_optimizer import GreedyUnitResult, UnitSolveCache, _items_fingerprint, _UnitModelTemplateCache
+
+
+def _result(uid: int, rid: int) -> GreedyUnitResult:
+    return GreedyUnitResult(uid, True, "OK", "b1", "Build", {1: rid}, {1: 101, 2: 201}, 180)
+
+
+def test_cache_needs_enough_time_or_a_proven_optimum() -> None:
+    cache = UnitSolveCache()
+    key = UnitSolveCache.key_digest((7, "pool", ()))
+
+    cache.put(key, _result(7, 11), time_limit_s=2.0, optimal=False)
+    assert cache.get(key, 5.0) is None
+    hit = cache.get(key, 2.0)
+    assert hit is not None and hit.runes_by_slot == {1: 11} and hit.final_speed == 180
+
+    # A shorter, unproven solve never replaces a longer one.
+    cache.put(key, _result(7, 12), time_limit_s=1.0, optimal=False)
+    assert cache.get(key, 2.0).runes_by_slot == {1: 11}
+
+    cache.put(key, _result(7, 13), time_limit_s=1.0, optimal=True)
+    assert cache.get(key, 30.0).runes_by_slot == {1: 13}
+
+    cache.put("failed", GreedyUnitResult(7, False, "nope"), time_limit_s=9.0, optimal=True)
+    assert cache.get("failed", 1.0) is None
+
+
+def test_cache_evicts_least_recently_used_and_persists(tmp_path) -> None:
+    path = tmp_path / "unit_solve_cache.json"
+    cache = UnitSolveCache(max_entries=2, path=path)
+    cache.put("a", _result(1, 11), 1.0, True)
+    cache.put("b", _result(2, 12), 1.0, True)
+    assert cache.get("a", 1.0) is not None
+    cache.put("c", _result(3, 13), 1.0, True)
+    assert cache.get("b", 1.0) is None and len(cache) == 2
+    assert cache.save()
+
+    reloaded = UnitSolveCache(max_entries=2, path=path)
+    assert reloaded.get("a", 1.0).runes_by_slot == {1: 11}
+    assert reloaded.get("c", 1.0).artifacts_by_type == {1: 101, 2: 201}
+
+
+def test_pool_fingerprint_follows_item_contents() -> None:
+    runes = [Rune(rid, 1, 3, 5, 6, 12, (8, 40), (0, 0), [(9, 6, 0, 0)], 1, 0) for rid in (1, 2)]
+    pool = list(runes)
+    fingerprint = _items_fingerprint(pool, [])
+
+    assert _items_fingerprint(pool, []) == fingerprint
+    assert _items_fingerprint(list(runes), []) == fingerprint
+    upgraded = [runes[0], dataclasses.replace(runes[1], upgrade_curr=15)]
+    assert _items_fingerprint(upgraded, []) != fingerprint
+
+    templates = _UnitModelTemplateCache()
+    assert templates.items_fingerprint(pool, []) == fingerprint
+    assert templates.items_fingerprint(upgraded, []) == _items_fingerprint(upgraded, [])
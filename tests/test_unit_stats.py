@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import numpy as np
+
+from app.domain.models import Artifact, Rune, Unit, compute_unit_stats
+from app.engine.unit_stats import compute_units_stats
+
+
+def _rune(rid: int, set_id: int, pri: tuple, subs: tuple) -> Rune:
+    return Rune(rid, rid % 6 + 1, set_id, 5, 6, 15, pri, (0, 0), subs, 1, 7)
+
+
+def test_compute_unit_stats_applies_runes_sets_lead_and_totem() -> None:
+    unit = Unit(7, 10101, 1, 40, 6, 700, 650, 600, 101, 15, 0, 15, 50)
+    runes = [_rune(i, 3, (8, 42) if i == 2 else (4, 63), ((2, 10, 0, 4), (9, 6, 0, 0))) for i in range(1, 5)]
+    runes += [_rune(5, 1, (3, 160), ((12, 8, 1, 0),)), _rune(6, 1, (5, 160), ((10, 7, 0, 0),))]
+
+    stats = compute_unit_stats(unit, runes, speed_lead_pct=24, sky_tribe_totem_spd_pct=15)
+
+    assert stats == {
+        "HP": 10500 + 10500 * 56 // 100,
+        "ATK": 650 + 160 + 650 * 189 // 100,
+        "DEF": 600 + 160,
+        "SPD": 101 + 42 + 25 + 24 + 15,
+        "CR": 15 + 24,
+        "CD": 50 + 7,
+        "RES": 15,
+        "ACC": 8,
+    }
+
+
+def test_batch_matches_single_units_and_splits_contributions() -> None:
+    u1 = Unit(1, 10101, 1, 40, 6, 700, 650, 600, 101, 15, 0, 15, 50)
+    u2 = Unit(2, 10201, 2, 40, 6, 900, 500, 700, 99, 40, 25, 30, 50)
+    runes1 = [_rune(1, 3, (8, 42), ((1, 300, 0, 0),))]
+    runes2 = [_rune(2, 1, (2, 63), ((8, 12, 0, 3),))]
+    art = Artifact(11, 2, 1, 1, 1, 5, 15, 5, (100, 1500), ())
+
+    batch = compute_units_stats(
+        [u1, u2], [runes1, runes2],
+        artifacts_per_unit=[[], [art]],
+        leaders=[None, ("HP%", 33)],
+        sky_tribe_totem_spd_pct=15,
+        extra_spd=[0, 9],
+    )
+
+    assert batch.as_dict(0) == compute_unit_stats(u1, runes1, sky_tribe_totem_spd_pct=15)
+    hp = batch.as_dict(1)["HP"]
+    assert hp == 13500 + 13500 * 63 // 100 + 1500 + 13500 * 33 // 100
+    assert batch.leader[1].tolist() == [4455, 0, 0, 0, 0, 0, 0, 0]
+    assert batch.extra[1, 3] == 9 and batch.artifacts[1, 0] == 1500
+    assert np.array_equal(batch.total, batch.base + batch.runes + batch.artifacts + batch.leader
+                          + batch.totem + batch.extra)
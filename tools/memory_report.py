@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import sys
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.domain.models import AccountData  # noqa: E402
+import app.engine.greedy_optimizer  # noqa: E402,F401  (imported up front so it is not measured)
+from app.engine.rune_table import account_artifact_table, account_rune_table  # noqa: E402
+from app.importer.sw_json_importer import load_account_from_data  # noqa: E402
+
+
+def _measure(build: Callable[..., Any], *args: Any) -> Tuple[Any, int, int]:
+    """Return (result, retained bytes, peak bytes) of *build(*args)*."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        result = build(*args)
+        gc.collect()
+        after, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, max(0, after - before), max(0, peak - before)
+
+
+def _mib(n: int) -> str:
+    return f"{n / (1024 * 1024):8.1f} MiB"
+
+
+def _report(path: Path) -> None:
+    text = path.read_text(encoding="utf-8", errors="replace")
+    raw, raw_bytes, _ = _measure(json.loads, text)
+    del text
+
+    account, account_bytes, account_peak = _measure(load_account_from_data, raw)
+    assert isinstance(account, AccountData)
+    del raw
+    gc.collect()
+
+    _, tables_bytes, _ = _measure(lambda: (account_rune_table(account), account_artifact_table(account)))
+    _, index_bytes, _ = _measure(lambda: (
+        account.runes_by_id(),
+        account.artifacts_by_id(),
+        account.runes_in_slot(1),
+        account.runes_of_set(0),
+        account.runes_with_mainstat(0),
+        account.rune_owner_by_id("pve"),
+    ))
+
+    n_runes = len(account.runes)
+    n_arts = len(account.artifacts)
+    print(f"export:        {path}")
+    print(f"units/runes/artifacts: {len(account.units_by_id)}/{n_runes}/{n_arts}")
+    print(f"raw JSON:      {_mib(raw_bytes)}")
+    print(f"AccountData:   {_mib(account_bytes)}  (peak while normalizing {_mib(account_peak).strip()})")
+    if n_runes or n_arts:
+        print(f"  per item:    {account_bytes / max(1, n_runes + n_arts):8.0f} B")
+    print(f"tables:        {_mib(tables_bytes)}")
+    print(f"indexes:       {_mib(index_bytes)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure memory held by an imported account export.")
+    parser.add_argument("export", type=Path, help="Summoners War JSON export")
+    args = parser.parse_args()
+    _report(args.export)
+
+
+if __name__ == "__main__":
+    main()